@@ -0,0 +1,81 @@
+"""Bounded executors for calling blocking model and storage code from asyncio."""
+
+import asyncio
+import contextvars
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from .config import Config
+
+T = TypeVar("T")
+
+# Two pools so slow Chroma I/O never starves the embedding/NLP models and a
+# burst of model calls never blocks storage. Both are created lazily.
+_model_executor: Optional[ThreadPoolExecutor] = None
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_model_executor() -> ThreadPoolExecutor:
+    """
+    Get the executor for CPU/GPU-bound model calls (embeddings, spaCy, RoBERTa).
+
+    Kept small on purpose: the models already use all cores (or the GPU), so
+    more threads only add contention. Size with ASYNC_MODEL_WORKERS.
+    """
+    global _model_executor
+    if _model_executor is None:
+        _model_executor = ThreadPoolExecutor(
+            max_workers=Config.ASYNC_MODEL_WORKERS,
+            thread_name_prefix="ai_brain_model"
+        )
+    return _model_executor
+
+
+def get_io_executor() -> ThreadPoolExecutor:
+    """Get the executor for blocking storage calls (ChromaDB reads and writes)."""
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(
+            max_workers=Config.ASYNC_IO_WORKERS,
+            thread_name_prefix="ai_brain_io"
+        )
+    return _io_executor
+
+
+def _in_current_context(func: Callable[..., T], *args: Any, **kwargs: Any) -> Callable[[], T]:
+    """Bind a call to the caller's contextvars so tracing spans nest across threads."""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, func, *args, **kwargs)
+
+
+async def run_model_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking model call on the bounded model executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_model_executor(), _in_current_context(func, *args, **kwargs)
+    )
+
+
+async def run_io_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a blocking storage call on the bounded I/O executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_io_executor(), _in_current_context(func, *args, **kwargs)
+    )
+
+
+def submit_io_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> Future:
+    """Start a blocking storage call on the bounded I/O executor from synchronous code."""
+    return get_io_executor().submit(_in_current_context(func, *args, **kwargs))
+
+
+def shutdown_executors(wait: bool = True):
+    """Shut down both executors (they are recreated on next use)."""
+    global _model_executor, _io_executor
+    if _model_executor is not None:
+        _model_executor.shutdown(wait=wait)
+        _model_executor = None
+    if _io_executor is not None:
+        _io_executor.shutdown(wait=wait)
+        _io_executor = None
@@ -16,6 +16,7 @@ from .config import Config
 from .memory import MemoryStore
 from .inference import AIBrain
 from .logger import get_logger
+from .tracing import format_perf_report, traced
 
 
 class ChatInterface:
@@ -123,6 +124,7 @@ Welcome to your AI assistant with persistent memory!
 **Commands:**
 - `/help` - Show this help message
 - `/stats` - Show memory statistics
+- `/perf` - Show per-stage latency (p50/p95) for this session
 - `/topics` - Show conversation topic analysis
 - `/clear` - Clear all memories
 - `/exit` or `/quit` - Exit the chat
@@ -195,6 +197,9 @@ Start chatting below!
         elif cmd == "/stats":
             self.show_stats()
         
+        elif cmd == "/perf":
+            self.show_perf()
+        
         elif cmd == "/topics":
             self.show_topics()
         
@@ -210,6 +215,20 @@ Start chatting below!
         
         return True
     
+    def show_perf(self):
+        """Show per-stage latency (p50/p95) for this session."""
+        report = format_perf_report()
+        
+        if report is None:
+            self.console.print("[yellow]No timings yet. Send a message first![/yellow]")
+            return
+        
+        self.console.print(Panel(
+            Markdown(report),
+            border_style="magenta",
+            title="⏱️ Performance"
+        ))
+    
     def show_stats(self):
         """Show memory statistics."""
         stats = self.memory.get_stats()
@@ -222,6 +241,13 @@ Start chatting below!
 - **Storage:** {stats['persist_dir']}
 - **Model:** {Config.OPENROUTER_MODEL}
         """
+        hot_tier = stats.get("hot_tier")
+        if hot_tier:
+            stats_text += (
+                f"\n- **Hot Tier:** {hot_tier['size']}/{hot_tier['capacity']} memories, "
+                f"{hot_tier['hit_ratio']:.0%} of lookups served from memory (~{hot_tier['saved_ms']:.0f}ms saved)"
+            )
+        
         self.console.print(Panel(Markdown(stats_text), border_style="blue"))
     
     def show_topics(self):
@@ -266,6 +292,7 @@ Start chatting below!
             title="💬 Topic Analysis"
         ))
     
+    @traced("turn")
     def process_message(self, user_message: str):
         """Process user message and generate response."""
         # Analyze incoming message with spaCy to enhance query
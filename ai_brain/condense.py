@@ -0,0 +1,205 @@
+"""
+Skipping the condense step of RAG chat for standalone questions.
+
+CondensePlusContextChatEngine rewrites every follow-up message into a
+standalone question with an extra LLM call before retrieving context for
+it. Most messages don't need it: "What does the paper say about
+photosynthesis?" retrieves the same context with or without the
+conversation. needs_context() decides per message, locally, whether the
+rewrite is needed. A message needs it when it:
+
+- opens as a continuation ("and", "what about", "how about", "also")
+  or refers back explicitly ("tell me more", "the latter", "you said")
+- uses a third-person or demonstrative pronoun ("it", "they", "that")
+  with no noun before it in the message for it to refer to
+- is a fragment: a few words without a verb ("the second one?", "why?")
+
+With a spaCy Doc (NLPAnalyzer.needs_context()) the checks use
+part-of-speech tags, so "there is" or "I think that" don't count as
+references and nouns inside the message resolve pronouns; without one
+they run on the words alone and resolve pronouns only to capitalized
+names. Either way, an unclear message is condensed: a needless rewrite
+costs one LLM call, a missing one retrieves context for half a question.
+
+SelectiveCondenseChatEngine applies the decision and CondenseStats counts
+the calls skipped and the latency they would have cost.
+"""
+
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from llama_index.core.chat_engine import CondensePlusContextChatEngine
+from llama_index.core.llms import ChatMessage
+
+CONDENSE_MODES = ("auto", "always", "never")
+
+_CONTINUATION = re.compile(
+    r"^\s*(?:and|also|but|or|so|then|plus|what about|how about|what else|why not|how come|how so|same for)\b",
+    re.IGNORECASE
+)
+_BACK_REFERENCE = re.compile(
+    r"\b(?:tell me more|more (?:about|on|details?)|go on|elaborate|the (?:former|latter|previous|above|same)|"
+    r"as (?:you|i) (?:said|mentioned)|you (?:just )?(?:said|mentioned)|"
+    r"the (?:first|second|third|last|other) one)\b",
+    re.IGNORECASE
+)
+# Pronouns that point back to something said before (first/second person ones don't)
+_ANAPHORS = {"it", "its", "itself", "they", "them", "their", "theirs", "themselves", "he", "him", "his",
+             "himself", "she", "her", "hers", "herself", "those", "these", "ones"}
+_DEMONSTRATIVES = {"this", "that"}
+# Messages that need no context at all
+_SOCIAL = re.compile(r"^\s*(?:hi|hello|hey|thanks|thank you|good (?:morning|afternoon|evening)|bye)\b[\s!.?]*$",
+                     re.IGNORECASE)
+# Without a parser, this many words or fewer is a fragment
+_FRAGMENT_WORDS = 3
+# With a parser, a verbless message of this many words or fewer is a fragment
+_FRAGMENT_TOKENS = 6
+_WORD = re.compile(r"[A-Za-z']+|[^\w\s]")
+# Common verbs, for the checks without a parser
+_VERBS = {"is", "are", "was", "were", "be", "do", "does", "did", "can", "could", "will", "would", "should", "has",
+          "have", "had", "mean", "means", "work", "works", "explain", "define", "describe", "tell", "show", "list",
+          "summarize", "compare", "give", "find"}
+
+
+def _tokens(text: str, doc) -> List[Dict[str, Any]]:
+    if doc is not None:
+        return [{"text": t.text, "lower": t.text.lower(), "pos": t.pos_, "dep": t.dep_} for t in doc]
+    return [{"text": w, "lower": w.lower(), "pos": None, "dep": None} for w in _WORD.findall(text)]
+
+
+def needs_context(text: str, doc=None) -> bool:
+    """
+    Whether a chat message needs the conversation to be understood (see module docstring).
+
+    Args:
+        text: The user's message
+        doc: spaCy Doc of the message, for part-of-speech aware checks
+
+    Returns:
+        True if the message should be condensed with the chat history
+    """
+    if not text.strip() or _SOCIAL.match(text):
+        return False
+    if _CONTINUATION.match(text) or _BACK_REFERENCE.search(text):
+        return True
+
+    tokens = _tokens(text, doc)
+    words = [t for t in tokens if t["lower"][0].isalpha()]
+    tagged = doc is not None
+    noun_seen = False
+    sentence_start = True
+    for i, token in enumerate(tokens):
+        lower = token["lower"]
+        if not lower[0].isalpha():
+            sentence_start = sentence_start or lower in (".", "!", "?")
+            continue
+        first, sentence_start = sentence_start, False
+        if tagged:
+            if token["pos"] in ("NOUN", "PROPN"):
+                noun_seen = True
+                continue
+            # Pronouns and demonstrative determiners, not expletives ("there is") or complementizers ("that")
+            referring = (lower in _ANAPHORS or lower in _DEMONSTRATIVES) and token["pos"] in ("PRON", "DET") \
+                and token["dep"] != "expl"
+        else:
+            if not first and token["text"][0].isupper() and not lower.startswith("i'") and lower != "i":
+                noun_seen = True  # A name
+                continue
+            nxt = tokens[i + 1]["lower"] if i + 1 < len(tokens) else None
+            # "this"/"that" on their own ("what does that mean", "explain this"), not "that book" or "so that"
+            referring = lower in _ANAPHORS or (lower in _DEMONSTRATIVES and (
+                nxt is None or not nxt[0].isalpha() or nxt in _VERBS or nxt in ("one", "again", "too")))
+        if referring and not noun_seen:
+            return True
+
+    if tagged:
+        has_verb = any(t["pos"] in ("VERB", "AUX") for t in tokens)
+        return not has_verb and len(words) <= _FRAGMENT_TOKENS
+    return len(words) <= _FRAGMENT_WORDS and not any(t["lower"] in _VERBS for t in words)
+
+
+class CondenseStats:
+    """Counts of condensed and skipped follow-ups, and the condense latency saved."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.first_turns = 0
+        self.skipped = 0
+        self.condensed = 0
+        self.condense_seconds = 0.0
+
+    def record_first_turn(self):
+        with self._lock:
+            self.first_turns += 1
+
+    def record_skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def record_condense(self, seconds: float):
+        with self._lock:
+            self.condensed += 1
+            self.condense_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            first_turns (no history, nothing to condense), skipped (standalone
+            follow-ups), condensed, mean_condense_ms (measured per call) and
+            saved_ms (skipped × mean_condense_ms, 0 until a call was measured)
+        """
+        with self._lock:
+            mean = self.condense_seconds / self.condensed if self.condensed else 0.0
+            return {
+                "first_turns": self.first_turns,
+                "skipped": self.skipped,
+                "condensed": self.condensed,
+                "mean_condense_ms": round(mean * 1000, 1),
+                "saved_ms": round(self.skipped * mean * 1000, 1),
+            }
+
+
+class SelectiveCondenseChatEngine(CondensePlusContextChatEngine):
+    """
+    CondensePlusContextChatEngine that condenses only the follow-ups that need it.
+
+    Build it with from_defaults(), then set needs_context (message -> bool)
+    and condense_stats; without needs_context every follow-up is condensed.
+    """
+
+    needs_context: Optional[Callable[[str], bool]] = None
+    condense_stats: Optional[CondenseStats] = None
+
+    def _should_condense(self, chat_history: List[ChatMessage], latest_message: str) -> bool:
+        stats = self.condense_stats
+        if self._skip_condense:
+            return False
+        if not chat_history:
+            if stats:
+                stats.record_first_turn()
+            return False
+        if self.needs_context is not None and not self.needs_context(latest_message):
+            if stats:
+                stats.record_skip()
+            return False
+        return True
+
+    def _condense_question(self, chat_history: List[ChatMessage], latest_message: str) -> str:
+        if not self._should_condense(chat_history, latest_message):
+            return latest_message
+        start = time.perf_counter()
+        question = super()._condense_question(chat_history, latest_message)
+        if self.condense_stats:
+            self.condense_stats.record_condense(time.perf_counter() - start)
+        return question
+
+    async def _acondense_question(self, chat_history: List[ChatMessage], latest_message: str) -> str:
+        if not self._should_condense(chat_history, latest_message):
+            return latest_message
+        start = time.perf_counter()
+        question = await super()._acondense_question(chat_history, latest_message)
+        if self.condense_stats:
+            self.condense_stats.record_condense(time.perf_counter() - start)
+        return question
@@ -25,10 +25,54 @@ class Config:
     
     # ChromaDB
     CHROMA_PERSIST_DIR = Path(os.getenv("CHROMA_PERSIST_DIR", "./chroma_db"))
+    # Vector storage engine under MemoryStore
+    # Options: "chroma" (ChromaDB) or "local" (in-process: memory-mapped vectors under
+    #          CHROMA_PERSIST_DIR/local, NumPy brute force, hnswlib HNSW for large collections)
+    VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+    LOCAL_HNSW_THRESHOLD = int(os.getenv("LOCAL_HNSW_THRESHOLD", "20000"))  # Vectors before switching to HNSW
+    # Compact scan codes for the local engine (float32 stays on disk for exact rescoring)
+    # Quantization options: "none", "float16", "int8"; reduction options: "pca", "prefix" (Matryoshka models)
+    LOCAL_VECTOR_QUANTIZATION = os.getenv("LOCAL_VECTOR_QUANTIZATION", "none")
+    LOCAL_VECTOR_DIMS = int(os.getenv("LOCAL_VECTOR_DIMS", "0"))  # Dimensions kept in the codes (0 = all)
+    LOCAL_VECTOR_REDUCTION = os.getenv("LOCAL_VECTOR_REDUCTION", "pca")
+    LOCAL_RESCORE_FACTOR = int(os.getenv("LOCAL_RESCORE_FACTOR", "4"))  # Candidates rescored exactly per result
     CHROMA_COLLECTION_NAME = "ai_brain_memory"
+    # Document RAG corpus (LlamaIndex), kept apart from conversational memory
+    RAG_COLLECTION_NAME = os.getenv("RAG_COLLECTION_NAME", f"{CHROMA_COLLECTION_NAME}_rag")
+    # Document ingestion: chunking and parallel parsing (embedding uses EMBEDDING_BATCH_SIZE)
+    RAG_CHUNK_SIZE = int(os.getenv("RAG_CHUNK_SIZE", "1024"))  # Tokens per chunk
+    RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "200"))  # Tokens shared by consecutive chunks
+    RAG_INGEST_WORKERS = int(os.getenv("RAG_INGEST_WORKERS", str(min(4, os.cpu_count() or 1))))  # Parser processes
+    # .txt/.md/.pdf files from this size up are read a window or page at a time (bounded memory)
+    RAG_STREAM_MIN_MB = float(os.getenv("RAG_STREAM_MIN_MB", "64"))
+    # Watch mode (python -m scripts.watch_documents): directories kept indexed as files change
+    RAG_WATCH_DIRS = [d.strip() for d in os.getenv("RAG_WATCH_DIRS", "").split(",") if d.strip()]
+    RAG_WATCH_DEBOUNCE_MS = int(os.getenv("RAG_WATCH_DEBOUNCE_MS", "2000"))  # Quiet time before a file is indexed
+    RAG_WATCH_BATCH_FILES = int(os.getenv("RAG_WATCH_BATCH_FILES", "64"))  # Files per ingestion run
+    # Which corpora a query searches when documents are enabled
+    # Options: "auto" (decided per query), "both", "memories", "documents"
+    RETRIEVAL_ROUTING = os.getenv("RETRIEVAL_ROUTING", "auto")
+    # Rewriting follow-ups into standalone questions before retrieval in RAG chat (one LLM call each)
+    # Options: "auto" (only messages that refer back to the conversation), "always", "never"
+    RAG_CONDENSE = os.getenv("RAG_CONDENSE", "auto")
+    # Memory namespaces for user_id scoping
+    # Options: "shared" (one collection, filtered by user_id) or
+    #          "per_user" (one collection per user, cost scales with that user's data)
+    MEMORY_NAMESPACE_LAYOUT = os.getenv("MEMORY_NAMESPACE_LAYOUT", "shared")
+    MEMORY_COLLECTION_CACHE_SIZE = int(os.getenv("MEMORY_COLLECTION_CACHE_SIZE", "256"))  # Open per-user handles
+    # HNSW index parameters (Chroma defaults). M and construction_ef only apply
+    # when a collection is built; rebuild existing ones with scripts/migrate_to_cosine.py.
+    # search_ef is updated in place on startup. Use scripts/tune_hnsw.py to pick values.
+    HNSW_M = int(os.getenv("HNSW_M", "16"))  # Graph neighbours per node (memory vs recall)
+    HNSW_CONSTRUCTION_EF = int(os.getenv("HNSW_CONSTRUCTION_EF", "100"))  # Build-time candidate list
+    HNSW_SEARCH_EF = int(os.getenv("HNSW_SEARCH_EF", "100"))  # Query-time candidate list (latency vs recall)
     
     # Embeddings (GPU-accelerated: MPS on Mac, CUDA on Windows/Linux)
     EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))  # Texts per encode call in bulk adds
+    # Next embedding model: memories are re-embedded with it in the background while
+    # EMBEDDING_MODEL keeps serving; switch EMBEDDING_MODEL to it once ready (see reembedding.py)
+    REEMBED_MODEL = os.getenv("REEMBED_MODEL", "")
     
     # NLP Models
     # Emotion detection model (RoBERTa) - Detects 11 emotions
@@ -43,7 +87,66 @@ class Config:
     MAX_MEMORY_ITEMS = int(os.getenv("MAX_MEMORY_ITEMS", "1000"))
     MEMORY_RELEVANCE_THRESHOLD = float(os.getenv("MEMORY_RELEVANCE_THRESHOLD", "0.3"))
     MEMORY_CONTEXT_SIZE = 5  # Number of relevant memories to retrieve
-    
+    # Hot tier: recent/recently retrieved memories searched in memory before the vector store
+    MEMORY_HOT_TIER_SIZE = int(os.getenv("MEMORY_HOT_TIER_SIZE", "2048"))  # Memories kept (0 disables)
+    # The store query is skipped when MEMORY_HOT_TIER_MIN_HITS hot hits (at most n_results)
+    # reach MEMORY_HOT_TIER_SKIP_SIMILARITY; below n_results the rest come from the hot tier too
+    MEMORY_HOT_TIER_SKIP_SIMILARITY = float(os.getenv("MEMORY_HOT_TIER_SKIP_SIMILARITY", "0.85"))
+    MEMORY_HOT_TIER_MIN_HITS = int(os.getenv("MEMORY_HOT_TIER_MIN_HITS", "5"))
+    # Retrieval reranking on top of similarity (see ai_brain/scoring.py); 0 disables a term, all off by default
+    MEMORY_RECENCY_WEIGHT = float(os.getenv("MEMORY_RECENCY_WEIGHT", "0.0"))  # Bonus for a brand-new memory
+    MEMORY_RECENCY_HALF_LIFE_DAYS = float(os.getenv("MEMORY_RECENCY_HALF_LIFE_DAYS", "30"))
+    MEMORY_ACCESS_WEIGHT = float(os.getenv("MEMORY_ACCESS_WEIGHT", "0.0"))  # > 0 also counts accesses (a write per retrieval)
+    MEMORY_EMOTION_WEIGHT = float(os.getenv("MEMORY_EMOTION_WEIGHT", "0.0"))  # Times user_emotion_score
+    # Maximal Marginal Relevance: drop near-duplicates from the retrieved memories
+    MEMORY_MMR = os.getenv("MEMORY_MMR", "false").lower() == "true"
+    MEMORY_MMR_LAMBDA = float(os.getenv("MEMORY_MMR_LAMBDA", "0.7"))  # 1.0 = relevance only, lower = more diverse
+    # Write-time near-duplicate merge: a new memory this similar to one of the same
+    # type/session/role bumps its "occurrences" instead of being stored (scripts/dedup_memories.py for existing stores)
+    MEMORY_DEDUP = os.getenv("MEMORY_DEDUP", "false").lower() == "true"
+    MEMORY_DEDUP_SIMILARITY = float(os.getenv("MEMORY_DEDUP_SIMILARITY", "0.95"))
+
+    # Async API - bounded thread pools for blocking calls made from asyncio code
+    ASYNC_MODEL_WORKERS = int(os.getenv("ASYNC_MODEL_WORKERS", "2"))  # Embeddings, spaCy, RoBERTa
+    ASYNC_IO_WORKERS = int(os.getenv("ASYNC_IO_WORKERS", "16"))  # ChromaDB reads/writes
+
+    # Chat server (multi-user HTTP/WebSocket entry point)
+    SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+    SERVER_PORT = int(os.getenv("SERVER_PORT", "8000"))
+    # Options: "langchain", "basic"
+    SERVER_BRAIN = os.getenv("SERVER_BRAIN", "langchain")
+    SERVER_MAX_CONCURRENT_REQUESTS = int(os.getenv("SERVER_MAX_CONCURRENT_REQUESTS", "64"))
+    SERVER_MAX_REQUESTS_PER_USER = int(os.getenv("SERVER_MAX_REQUESTS_PER_USER", "2"))
+    SERVER_QUEUE_TIMEOUT = float(os.getenv("SERVER_QUEUE_TIMEOUT", "30"))  # Seconds to wait for a slot
+
+    # Conversation logs (logs/conversations/*.jsonl, append-only)
+    # fsync policy: "always" (every turn), "interval" (at most every LOG_FSYNC_INTERVAL s), "never"
+    LOG_FSYNC = os.getenv("LOG_FSYNC", "interval")
+    LOG_FSYNC_INTERVAL = float(os.getenv("LOG_FSYNC_INTERVAL", "1.0"))
+    # Background log writer: turns and system prompts are queued and written in batches
+    LOG_BACKGROUND_WRITER = os.getenv("LOG_BACKGROUND_WRITER", "true").lower() == "true"
+    LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # Records beyond this are dropped
+    LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+    LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))  # Seconds
+    # Prompt log segments (logs/prompts/): rotation, zstd compression, retention (0 = disabled)
+    LOG_ROTATE_MAX_MB = float(os.getenv("LOG_ROTATE_MAX_MB", "64"))
+    LOG_ROTATE_INTERVAL_HOURS = float(os.getenv("LOG_ROTATE_INTERVAL_HOURS", "24"))
+    LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() == "true"
+    LOG_COMPRESSION_LEVEL = int(os.getenv("LOG_COMPRESSION_LEVEL", "3"))
+    LOG_RETENTION_DAYS = float(os.getenv("LOG_RETENTION_DAYS", "30"))
+    LOG_RETENTION_MAX_MB = float(os.getenv("LOG_RETENTION_MAX_MB", "1024"))
+    # Prompt log format: "dedup" (content-addressed blocks + per-turn manifest) or "text"
+    PROMPT_LOG_FORMAT = os.getenv("PROMPT_LOG_FORMAT", "dedup")
+    PROMPT_STORE_KEYFRAME_INTERVAL = int(os.getenv("PROMPT_STORE_KEYFRAME_INTERVAL", "100"))  # Full manifest every N turns
+
+    # Per-stage latency tracing (OpenTelemetry spans + in-process stats for /perf)
+    TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    # Options: "none" (local /perf stats only), "file" (JSONL under TRACING_DIR), "otlp", "console"
+    TRACING_EXPORTER = os.getenv("TRACING_EXPORTER", "none")
+    TRACING_DIR = Path(os.getenv("TRACING_DIR", "logs/traces"))
+    TRACING_OTLP_ENDPOINT = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4317")
+    TRACING_MAX_SAMPLES = int(os.getenv("TRACING_MAX_SAMPLES", "10000"))  # Per stage, for /perf
+
     # System prompt - can be customized in multiple ways:
     # 1. Set SYSTEM_PROMPT environment variable directly
     # 2. Set SYSTEM_PROMPT_FILE to point to a template file
@@ -0,0 +1,471 @@
+"""
+Incremental, parallel document ingestion for the RAG corpus.
+
+ingest_paths() brings a document collection in line with a set of files and
+directories:
+
+- Every file's content hash is kept in a manifest next to the store
+  (CHROMA_PERSIST_DIR/ingest_manifest_<collection>.json). Files whose size
+  and modification time match the manifest are skipped without reading
+  them; the others are hashed, and only new or changed content is parsed.
+- Changed files have their old chunks deleted before the new ones are
+  written, and files that disappeared from an ingested directory have
+  their chunks removed.
+- Files are parsed and chunked (SentenceSplitter, RAG_CHUNK_SIZE /
+  RAG_CHUNK_OVERLAP) in RAG_INGEST_WORKERS processes, kept between runs,
+  while the main process embeds finished files in EMBEDDING_BATCH_SIZE
+  batches and writes the chunks to the vector store in bulk. A few small
+  changes are parsed in-process, which is faster than starting workers.
+- .txt/.md/.pdf files of RAG_STREAM_MIN_MB or more are never loaded whole:
+  stream_file() reads text files a window at a time (cut at paragraph or
+  line breaks) and PDFs a page at a time, and each window's chunks go to
+  the embedding batcher as they are produced, so memory stays bounded by
+  the window and batch sizes whatever the file size. A streamed file's
+  old chunks are deleted before its new ones are written.
+
+The manifest is saved after every write, so an interrupted run loses at
+most the files of one batch, and those are simply processed again.
+"""
+
+import codecs
+import json
+import multiprocessing
+import os
+import time
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from llama_index.core import Document, SimpleDirectoryReader
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.readers.file.base import default_file_metadata_func
+from llama_index.core.schema import BaseNode, MetadataMode
+
+from .config import Config
+from .file_utils import sha256_file
+
+try:
+    from pypdf import PdfReader
+    PYPDF_AVAILABLE = True
+except ImportError:
+    PYPDF_AVAILABLE = False
+
+MANIFEST_VERSION = 1
+# Metadata key holding a chunk's source file (absolute path); chunks are deleted by it
+SOURCE_KEY = "source"
+# Chunks embedded and written per vector store write
+_FLUSH_CHUNKS = 2048
+# Below this much new content, parsing in-process beats starting worker processes
+_PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+# Streamed formats (RAG_STREAM_MIN_MB), read as text windows or PDF pages
+_STREAM_TEXT_SUFFIXES = (".txt", ".md")
+# Characters split into chunks at a time from a streamed text file, and bytes read per read()
+_STREAM_WINDOW_CHARS = 1024 * 1024
+_READ_BLOCK = 256 * 1024
+# A streamed PDF's reader is reopened after this many pages, dropping the objects pypdf caches
+_PDF_REOPEN_PAGES = 256
+# File metadata SimpleDirectoryReader keeps out of embeddings and prompts (only file_path stays in)
+_FILE_METADATA_EXCLUDED = ["file_name", "file_type", "file_size", "creation_date", "last_modified_date",
+                           "last_accessed_date"]
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_workers = 0
+_pool_lock = threading.Lock()
+
+
+def manifest_path(collection_name: str) -> Path:
+    return Path(Config.CHROMA_PERSIST_DIR) / f"ingest_manifest_{collection_name}.json"
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Ingested files by absolute path: sha256, size, mtime_ns, chunks, ingested_at."""
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))["files"]
+
+
+def save_manifest(path: Path, files: Dict[str, Dict[str, Any]]):
+    """Write the manifest atomically (a crash leaves the previous version)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": MANIFEST_VERSION, "files": files}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _is_hidden(path: Path) -> bool:
+    return any(part.startswith(".") for part in path.parts)
+
+
+def expand_paths(paths: Iterable[str], recursive: bool = False) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Resolve files and directories into the files to ingest.
+
+    Returns:
+        (files, directories, missing): absolute paths of the files found
+        (hidden ones skipped), of the directories given and of the paths
+        that don't exist
+    """
+    files, directories, missing = [], [], []
+    for path in (Path(p).resolve() for p in paths):
+        if path.is_file():
+            files.append(str(path))
+        elif path.is_dir():
+            directories.append(str(path))
+            candidates = path.rglob("*") if recursive else path.iterdir()
+            files.extend(
+                str(f) for f in sorted(candidates) if f.is_file() and not _is_hidden(f.relative_to(path))
+            )
+        else:
+            missing.append(str(path))
+    return list(dict.fromkeys(files)), directories, missing
+
+
+def _in_scope(path: str, files: List[str], directories: List[str], recursive: bool) -> bool:
+    """Whether a manifest entry belongs to the paths being ingested."""
+    if path in files:
+        return True
+    parent = os.path.dirname(path)
+    return any(parent == d or (recursive and path.startswith(d + os.sep)) for d in directories)
+
+
+def parse_file(path: str, chunk_size: int, chunk_overlap: int) -> List[BaseNode]:
+    """Read a file (SimpleDirectoryReader) and split it into chunks; runs in a worker process."""
+    documents = SimpleDirectoryReader(input_files=[path], raise_on_error=True).load_data()
+    splitter = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return splitter.get_nodes_from_documents(documents)
+
+
+def is_streamed(path: str, size: int) -> bool:
+    """Whether a file is read with stream_file() instead of being loaded whole."""
+    suffix = Path(path).suffix.lower()
+    streamable = suffix in _STREAM_TEXT_SUFFIXES or (suffix == ".pdf" and PYPDF_AVAILABLE)
+    return streamable and size >= Config.RAG_STREAM_MIN_MB * 1024 * 1024
+
+
+def _break_at(text: str, limit: int) -> int:
+    """Where to cut a window: the last paragraph, line or sentence break in its second half."""
+    for separator in ("\n\n", "\n", ". "):
+        index = text.rfind(separator, limit // 2, limit)
+        if index != -1:
+            return index + len(separator)
+    return limit
+
+
+def iter_text_windows(path: str, window_chars: Optional[int] = None) -> Iterator[str]:
+    """
+    Read a UTF-8 text file in windows of at most window_chars characters.
+
+    Windows end at a paragraph, line or sentence break where there is one, so
+    few sentences are split between two windows.
+    """
+    window_chars = window_chars or _STREAM_WINDOW_CHARS
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buffer = ""
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(_READ_BLOCK)
+            buffer += decoder.decode(block, final=not block)
+            while len(buffer) >= window_chars:
+                cut = _break_at(buffer, window_chars)
+                yield buffer[:cut]
+                buffer = buffer[cut:]
+            if not block:
+                break
+    if buffer:
+        yield buffer
+
+
+def iter_pdf_pages(path: str) -> Iterator[Tuple[str, str]]:
+    """Read a PDF one page at a time; yields (page_label, text)."""
+    reader = PdfReader(path)
+    for index in range(len(reader.pages)):
+        if index and index % _PDF_REOPEN_PAGES == 0:
+            reader = PdfReader(path)
+        yield str(index + 1), reader.pages[index].extract_text() or ""
+
+
+def stream_file(path: str, chunk_size: int, chunk_overlap: int) -> Iterator[List[BaseNode]]:
+    """
+    Chunks of a .txt/.md/.pdf file, one text window or PDF page at a time.
+
+    The documents carry the metadata SimpleDirectoryReader gives them (plus
+    page_label for PDF pages), so streamed and loaded files look the same.
+    """
+    splitter = SentenceSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    metadata = default_file_metadata_func(path)
+    if Path(path).suffix.lower() == ".pdf":
+        parts = ((text, {**metadata, "page_label": label}) for label, text in iter_pdf_pages(path))
+    else:
+        parts = ((text, metadata) for text in iter_text_windows(path))
+    for text, part_metadata in parts:
+        if not text.strip():
+            continue
+        document = Document(text=text, metadata=dict(part_metadata),
+                            excluded_embed_metadata_keys=list(_FILE_METADATA_EXCLUDED),
+                            excluded_llm_metadata_keys=list(_FILE_METADATA_EXCLUDED))
+        yield splitter.get_nodes_from_documents([document])
+
+
+def get_parse_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The parser processes, started on first use and kept for later runs.
+
+    Workers are spawned rather than forked: the parent holds model and
+    storage threads that must not be forked.
+    """
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=True)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def shutdown_parse_pool():
+    """Stop the parser processes (they are restarted on next use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def delete_chunks(vector_store, path: str):
+    """Delete every chunk of a source file."""
+    vector_store.client.delete(where={SOURCE_KEY: path})
+
+
+class _Writer:
+    """Embeds parsed files in batches and writes them, replacing their previous chunks."""
+
+    def __init__(self, vector_store, embed_model, manifest: Dict[str, Dict[str, Any]], manifest_file: Path,
+                 metadata: Optional[Dict[str, Any]]):
+        self.vector_store = vector_store
+        self.embed_model = embed_model
+        self.manifest = manifest
+        self.manifest_file = manifest_file
+        self.metadata = metadata or {}
+        self.nodes: List[BaseNode] = []
+        self.files: List[Tuple[str, Dict[str, Any]]] = []
+        self.chunks_written = 0
+        self.chunks_replaced = 0
+
+    def _stamp(self, path: str, nodes: List[BaseNode], entry: Dict[str, Any], loaded_at: str):
+        for node in nodes:
+            node.metadata.update({SOURCE_KEY: path, "content_hash": entry["sha256"], "loaded_at": loaded_at,
+                                  **self.metadata})
+
+    def add(self, path: str, nodes: List[BaseNode], entry: Dict[str, Any]):
+        loaded_at = datetime.now().isoformat()
+        self._stamp(path, nodes, entry, loaded_at)
+        self.nodes.extend(nodes)
+        self.files.append((path, {**entry, "chunks": len(nodes), "ingested_at": loaded_at}))
+        if len(self.nodes) >= _FLUSH_CHUNKS:
+            self.flush()
+
+    def add_stream(self, path: str, batches: Iterable[List[BaseNode]], entry: Dict[str, Any]) -> int:
+        """
+        Write a streamed file's chunks as they are produced, _FLUSH_CHUNKS at a time.
+
+        Returns:
+            Number of chunks written
+        """
+        self.flush()
+        loaded_at = datetime.now().isoformat()
+        # The previous version's chunks, or those of an interrupted run (its manifest entry is written last)
+        delete_chunks(self.vector_store, path)
+        replaced = self.manifest.pop(path, {}).get("chunks", 0)
+        chunks = 0
+        try:
+            for nodes in batches:
+                self._stamp(path, nodes, entry, loaded_at)
+                self.nodes.extend(nodes)
+                chunks += len(nodes)
+                if len(self.nodes) >= _FLUSH_CHUNKS:
+                    self._write()
+            self._write()
+        except BaseException:
+            self.chunks_written -= chunks - len(self.nodes)
+            self.nodes = []
+            delete_chunks(self.vector_store, path)
+            save_manifest(self.manifest_file, self.manifest)
+            raise
+        self.chunks_replaced += replaced
+        self.manifest[path] = {**entry, "chunks": chunks, "ingested_at": loaded_at}
+        save_manifest(self.manifest_file, self.manifest)
+        return chunks
+
+    def _embed(self):
+        if self.nodes:
+            texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in self.nodes]
+            embeddings = self.embed_model.get_text_embedding_batch(texts)
+            for node, embedding in zip(self.nodes, embeddings):
+                node.embedding = embedding
+
+    def _add(self):
+        if self.nodes:
+            self.vector_store.add(self.nodes)
+        self.chunks_written += len(self.nodes)
+        self.nodes = []
+
+    def _write(self):
+        """Embed and write the buffered chunks."""
+        self._embed()
+        self._add()
+
+    def flush(self):
+        if not self.files:
+            return
+        self._embed()
+        for path, _ in self.files:
+            if path in self.manifest:
+                delete_chunks(self.vector_store, path)
+                self.chunks_replaced += self.manifest[path]["chunks"]
+        self._add()
+        for path, entry in self.files:
+            self.manifest[path] = entry
+        save_manifest(self.manifest_file, self.manifest)
+        self.files = []
+
+
+def ingest_paths(vector_store, embed_model, paths: Iterable[str], manifest_file: Path,
+                 metadata: Optional[Dict[str, Any]] = None, recursive: bool = False,
+                 workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 chunk_overlap: Optional[int] = None, progress: bool = True) -> Dict[str, Any]:
+    """
+    Ingest new and changed files into a document vector store (see module docstring).
+
+    Args:
+        vector_store: ChromaVectorStore of the document collection
+        embed_model: LlamaIndex embedding model
+        paths: Files and directories
+        manifest_file: Content-hash manifest of the collection (manifest_path())
+        metadata: Extra metadata for every chunk
+        recursive: Include subdirectories of the directories given
+        workers: Parsing processes (default: RAG_INGEST_WORKERS; 1, or less than
+            _PARALLEL_MIN_BYTES of new content, parses in-process)
+        chunk_size: Tokens per chunk (default: RAG_CHUNK_SIZE)
+        chunk_overlap: Tokens shared by consecutive chunks (default: RAG_CHUNK_OVERLAP)
+        progress: Print one line per file
+
+    Returns:
+        Report dict: files_seen, files_new, files_changed, files_unchanged,
+        files_removed, files_failed, files_streamed, missing, chunks_added,
+        chunks_removed, seconds, files_per_s, chunks_per_s
+    """
+    start = time.perf_counter()
+    workers = workers or Config.RAG_INGEST_WORKERS
+    chunk_size = chunk_size or Config.RAG_CHUNK_SIZE
+    chunk_overlap = Config.RAG_CHUNK_OVERLAP if chunk_overlap is None else chunk_overlap
+    if chunk_overlap >= chunk_size:
+        raise ValueError(f"Chunk overlap ({chunk_overlap}) must be smaller than the chunk size ({chunk_size})")
+    manifest = load_manifest(manifest_file)
+    files, directories, missing = expand_paths(paths, recursive)
+    for path in missing:
+        if path not in manifest:  # Ingested before: a deletion, handled below
+            print(f"⚠️  File not found: {path}")
+
+    # Unchanged size and mtime: skip without reading; otherwise compare content hashes
+    stats = {path: os.stat(path) for path in files}
+    suspects = [
+        path for path in files
+        if path not in manifest or (manifest[path]["size"], manifest[path]["mtime_ns"])
+        != (stats[path].st_size, stats[path].st_mtime_ns)
+    ]
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        digests = dict(zip(suspects, pool.map(sha256_file, suspects)))
+    todo = []
+    for path, digest in digests.items():
+        entry = {"sha256": digest, "size": stats[path].st_size, "mtime_ns": stats[path].st_mtime_ns}
+        if path in manifest and manifest[path]["sha256"] == digest:
+            manifest[path].update(entry)  # Touched, not changed
+        else:
+            todo.append((path, entry))
+    new = sum(1 for path, _ in todo if path not in manifest)
+
+    removed = [path for path in manifest if _in_scope(path, files + missing, directories, recursive)
+               and not os.path.exists(path)]
+    chunks_removed = 0
+    for path in removed:
+        delete_chunks(vector_store, path)
+        chunks_removed += manifest.pop(path)["chunks"]
+        if progress:
+            print(f"🗑️  Removed {Path(path).name}")
+
+    writer = _Writer(vector_store, embed_model, manifest, manifest_file, metadata)
+    failed = 0
+
+    def done(path: str, entry: Dict[str, Any], nodes: List[BaseNode]):
+        writer.add(path, nodes, entry)
+        if progress:
+            print(f"✅ Loaded {Path(path).name} ({len(nodes)} chunks)")
+
+    def fail(path: str, error: Exception):
+        nonlocal failed
+        failed += 1
+        print(f"❌ Failed to load {path}: {error}")
+
+    def stream_all():
+        for path, entry in streamed:
+            try:
+                chunks = writer.add_stream(path, stream_file(path, chunk_size, chunk_overlap), entry)
+            except Exception as e:
+                fail(path, e)
+                continue
+            if progress:
+                print(f"✅ Loaded {Path(path).name} ({chunks} chunks, streamed)")
+
+    # Large text and PDF files are streamed in this process; the others are loaded whole
+    streamed = [(path, entry) for path, entry in todo if is_streamed(path, entry["size"])]
+    loaded = [(path, entry) for path, entry in todo if not is_streamed(path, entry["size"])]
+    if workers > 1 and len(loaded) > 1 and sum(entry["size"] for _, entry in loaded) >= _PARALLEL_MIN_BYTES:
+        pool = get_parse_pool(workers)
+        futures = {pool.submit(parse_file, path, chunk_size, chunk_overlap): (path, entry) for path, entry in loaded}
+        stream_all()  # While the workers parse
+        for future in as_completed(futures):
+            path, entry = futures[future]
+            try:
+                nodes = future.result()
+            except BrokenProcessPool as e:
+                shutdown_parse_pool()  # A worker died (e.g. out of memory); start fresh next time
+                fail(path, e)
+                continue
+            except Exception as e:
+                fail(path, e)
+                continue
+            done(path, entry, nodes)
+    else:
+        stream_all()
+        for path, entry in loaded:
+            try:
+                nodes = parse_file(path, chunk_size, chunk_overlap)
+            except Exception as e:
+                fail(path, e)
+                continue
+            done(path, entry, nodes)
+    writer.flush()
+    if removed or digests:
+        save_manifest(manifest_file, manifest)  # Removals and touched files
+
+    seconds = time.perf_counter() - start
+    processed = len(todo) - failed
+    return {
+        "files_seen": len(files),
+        "files_new": new,
+        "files_changed": len(todo) - new,
+        "files_unchanged": len(files) - len(todo),
+        "files_removed": len(removed),
+        "files_failed": failed,
+        "files_streamed": len(streamed),
+        "missing": len(missing),
+        "chunks_added": writer.chunks_written,
+        "chunks_removed": chunks_removed + writer.chunks_replaced,
+        "seconds": round(seconds, 2),
+        "files_per_s": round(processed / seconds, 1) if seconds else 0.0,
+        "chunks_per_s": round(writer.chunks_written / seconds, 1) if seconds else 0.0,
+    }
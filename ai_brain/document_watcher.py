@@ -0,0 +1,316 @@
+"""
+Watch mode: keep the RAG corpus in line with directories as files change.
+
+DocumentWatcher runs two threads:
+
+- The watch thread receives change events for the watched directories
+  (watchfiles) and queues the affected paths. A path changed again while
+  queued is not queued twice; it just has to wait longer.
+- The ingestion thread takes the paths that have had no change for
+  RAG_WATCH_DEBOUNCE_MS (a file being copied or saved in several writes
+  is indexed once, when it's complete), at most RAG_WATCH_BATCH_FILES at
+  a time, and runs them through incremental ingestion
+  (document_ingestion.ingest_paths): new and changed files are parsed in
+  at most RAG_INGEST_WORKERS processes and written, deleted ones have
+  their chunks removed. One ingestion run at a time, so a burst of events
+  never piles up parsers or concurrent writes.
+
+On start, the watched directories are ingested once, which only processes
+what changed while nothing was watching.
+
+The watcher's status (queue depth, lag of the oldest queued change, last
+batch and totals) is returned by status() and written to
+CHROMA_PERSIST_DIR/watch_status_<collection>.json, which
+`python -m scripts.watch_documents --status` reads from another process.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .config import Config
+from .document_ingestion import _is_hidden, expand_paths, load_manifest, manifest_path
+
+try:
+    import watchfiles
+    WATCHFILES_AVAILABLE = True
+except ImportError:
+    WATCHFILES_AVAILABLE = False
+
+# Seconds between status file writes while idle (also written at the start and end of every batch)
+_STATUS_INTERVAL = 2.0
+
+
+def status_path(collection_name: str) -> Path:
+    return Path(Config.CHROMA_PERSIST_DIR) / f"watch_status_{collection_name}.json"
+
+
+def read_status(collection_name: str) -> Optional[Dict[str, Any]]:
+    """
+    The status last written by the watcher of a collection.
+
+    Returns:
+        status() of the watcher plus "running" (its process is alive and the
+        status is fresh) and "age_s" (seconds since it was written), or None
+        if no watcher ever ran for the collection
+    """
+    path = status_path(collection_name)
+    if not path.exists():
+        return None
+    status = json.loads(path.read_text(encoding="utf-8"))
+    age = (datetime.now() - datetime.fromisoformat(status["updated_at"])).total_seconds()
+    try:
+        os.kill(status["pid"], 0)
+        alive = True
+    except (OSError, ProcessLookupError):
+        alive = False
+    status["age_s"] = round(age, 1)
+    status["running"] = alive and status["state"] != "stopped" and age < 10 * _STATUS_INTERVAL
+    return status
+
+
+class DocumentWatcher:
+    """Continuous incremental indexing of directories into a LlamaIndexRAG corpus (see module docstring)."""
+
+    def __init__(
+        self,
+        rag,
+        directories: Optional[Iterable[str]] = None,
+        recursive: bool = False,
+        debounce_ms: Optional[int] = None,
+        batch_files: Optional[int] = None,
+        workers: Optional[int] = None,
+        initial_scan: bool = True,
+        progress: bool = True
+    ):
+        """
+        Args:
+            rag: LlamaIndexRAG whose document collection is kept up to date
+            directories: Directories to watch (default: RAG_WATCH_DIRS)
+            recursive: Include subdirectories
+            debounce_ms: Quiet time before a changed file is indexed (default: RAG_WATCH_DEBOUNCE_MS)
+            batch_files: Files per ingestion run (default: RAG_WATCH_BATCH_FILES)
+            workers: Parser processes per run (default: RAG_INGEST_WORKERS)
+            initial_scan: Ingest the directories once on start
+            progress: Print one line per file and per batch
+
+        Raises:
+            ImportError: watchfiles is not installed
+            ValueError: No directories, or one of them doesn't exist
+        """
+        if not WATCHFILES_AVAILABLE:
+            raise ImportError("Watch mode requires watchfiles: pip install watchfiles")
+        directories = [str(Path(d).resolve()) for d in (directories or Config.RAG_WATCH_DIRS)]
+        if not directories:
+            raise ValueError("No directories to watch (set RAG_WATCH_DIRS or pass them)")
+        for directory in directories:
+            if not os.path.isdir(directory):
+                raise ValueError(f"Not a directory: {directory}")
+        self.rag = rag
+        self.directories = directories
+        self.recursive = recursive
+        self.debounce_ms = Config.RAG_WATCH_DEBOUNCE_MS if debounce_ms is None else debounce_ms
+        self.batch_files = max(batch_files or Config.RAG_WATCH_BATCH_FILES, 1)
+        self.workers = workers
+        self.initial_scan = initial_scan
+        self.progress = progress
+        self.collection_name = rag.chroma_collection.name
+        self._store = str(Path(Config.CHROMA_PERSIST_DIR).resolve())
+
+        self._lock = threading.Lock()
+        # Queued path -> (first, last) change time (time.monotonic())
+        self._pending: Dict[str, Tuple[float, float]] = {}
+        # Paths of the running batch -> first change time
+        self._in_progress: Dict[str, float] = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._status: Dict[str, Any] = {
+            "pid": os.getpid(), "collection": self.collection_name, "directories": directories,
+            "recursive": recursive, "debounce_ms": self.debounce_ms, "batch_files": self.batch_files,
+            "state": "starting", "started_at": datetime.now().isoformat(),
+            "batches": 0, "files_indexed": 0, "files_removed": 0, "chunks_added": 0, "chunks_removed": 0,
+            "errors": 0, "last_error": None, "last_batch": None,
+        }
+        self._watch_thread = threading.Thread(target=self._watch, name="document_watcher", daemon=True)
+        self._ingest_thread = threading.Thread(target=self._ingest, name="document_ingester", daemon=True)
+
+    def start(self) -> "DocumentWatcher":
+        self._watch_thread.start()
+        self._ingest_thread.start()
+        return self
+
+    def stop(self, timeout: Optional[float] = 30.0):
+        """Stop watching; the running batch (if any) is finished, queued changes are dropped."""
+        self._stop.set()
+        self._wake.set()
+        for thread in (self._watch_thread, self._ingest_thread):
+            if thread.is_alive():
+                thread.join(timeout)
+        self._update(state="stopped")
+        self._write_status()
+
+    def run(self):
+        """Watch until interrupted (Ctrl+C)."""
+        self.start()
+        try:
+            while self._ingest_thread.is_alive():
+                self._ingest_thread.join(0.5)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Current state ("starting", "scanning", "idle", "indexing" or "stopped"),
+        queue_depth (changed paths waiting), in_progress (paths being ingested),
+        lag_s (age of the oldest change not yet indexed), totals and last_batch.
+        """
+        now = time.monotonic()
+        with self._lock:
+            firsts = [first for first, _ in self._pending.values()] + list(self._in_progress.values())
+            return {
+                **self._status,
+                "queue_depth": len(self._pending),
+                "in_progress": len(self._in_progress),
+                "lag_s": round(now - min(firsts), 2) if firsts else 0.0,
+                "updated_at": datetime.now().isoformat(),
+            }
+
+    def notify(self, paths: Iterable[str]):
+        """Queue changed paths (files, directories or deleted paths)."""
+        now = time.monotonic()
+        with self._lock:
+            for path in paths:
+                first, _ = self._pending.get(path, (now, now))
+                self._pending[path] = (first, now)
+        self._wake.set()
+
+    def _update(self, **values):
+        with self._lock:
+            self._status.update(values)
+
+    def _write_status(self):
+        path = status_path(self.collection_name)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.status(), indent=2), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"⚠️  Could not write watch status: {e}")
+
+    def _accept(self, change, path: str) -> bool:
+        """watchfiles filter: editor/VCS noise, hidden files and the store itself are ignored."""
+        if not watchfiles.DefaultFilter()(change, path) or path.startswith(self._store):
+            return False
+        root = next((d for d in self.directories if path.startswith(d + os.sep)), None)
+        return root is not None and not _is_hidden(Path(os.path.relpath(path, root)))
+
+    def _watch(self):
+        try:
+            for changes in watchfiles.watch(
+                *self.directories,
+                watch_filter=self._accept,
+                recursive=self.recursive,
+                debounce=min(self.debounce_ms, 1600),
+                stop_event=self._stop,
+                raise_interrupt=False
+            ):
+                self.notify(path for _, path in changes)
+        except Exception as e:
+            self._update(state="stopped", last_error=f"Watching failed: {e}")
+            print(f"❌ Watching {', '.join(self.directories)} failed: {e}")
+            self._stop.set()
+            self._wake.set()
+
+    def _take_ready(self, now: Optional[float] = None) -> Tuple[Dict[str, float], float]:
+        """
+        Dequeue up to batch_files paths that have been quiet for debounce_ms, oldest change first.
+
+        Returns:
+            (paths -> first change time, seconds until the next queued path is ready)
+        """
+        now = time.monotonic() if now is None else now
+        debounce = self.debounce_ms / 1000
+        with self._lock:
+            ready = sorted((first, path) for path, (first, last) in self._pending.items() if now - last >= debounce)
+            batch = {path: first for first, path in ready[:self.batch_files]}
+            for path in batch:
+                del self._pending[path]
+            self._in_progress = dict(batch)
+            waits = [debounce - (now - last) for _, last in self._pending.values()]
+        return batch, max(min(waits), 0.0) if waits else _STATUS_INTERVAL
+
+    def _targets(self, paths: Iterable[str]) -> List[str]:
+        """The files to ingest for changed paths (a deleted directory stands for every file ingested from it)."""
+        targets = []
+        for path in paths:
+            if os.path.isdir(path):
+                if self.recursive:  # e.g. a directory moved in: one event for all its files
+                    targets.extend(expand_paths([path], recursive=True)[0])
+            elif os.path.exists(path):
+                targets.append(path)
+            else:  # Deleted; nothing to do for a file that was gone before it was indexed
+                manifest = load_manifest(manifest_path(self.collection_name))
+                targets.extend(p for p in manifest if p == path or p.startswith(path + os.sep))
+        return list(dict.fromkeys(targets))
+
+    def _ingest(self):
+        if self.initial_scan:
+            self._update(state="scanning")
+            self._write_status()
+            self._run_batch(self.directories, {}, scan=True)
+        self._update(state="idle")
+        self._write_status()
+        last_write = time.monotonic()
+        while not self._stop.is_set():
+            batch, wait = self._take_ready()
+            if batch:
+                self._run_batch(self._targets(batch), batch)
+                with self._lock:
+                    self._in_progress = {}
+                self._update(state="idle")
+            else:
+                self._wake.wait(min(wait, _STATUS_INTERVAL))
+                self._wake.clear()
+            if batch or time.monotonic() - last_write >= _STATUS_INTERVAL:
+                self._write_status()
+                last_write = time.monotonic()
+
+    def _run_batch(self, paths: List[str], firsts: Dict[str, float], scan: bool = False):
+        if not paths:
+            return
+        if not scan:
+            self._update(state="indexing")
+            self._write_status()
+        try:
+            report = self.rag.ingest(paths, recursive=scan and self.recursive, workers=self.workers,
+                                     progress=self.progress)
+        except Exception as e:
+            with self._lock:
+                self._status["errors"] += 1
+                self._status["last_error"] = f"{datetime.now().isoformat()}: {e}"
+            print(f"❌ Indexing {len(paths)} path(s) failed: {e}")
+            return
+        indexed = report["files_new"] + report["files_changed"]
+        lag = time.monotonic() - min(firsts.values()) if firsts else 0.0
+        with self._lock:
+            for key, value in (("files_indexed", indexed), ("files_removed", report["files_removed"]),
+                               ("chunks_added", report["chunks_added"]), ("chunks_removed", report["chunks_removed"])):
+                self._status[key] += value
+            self._status["errors"] += report["files_failed"]
+            self._status["batches"] += 1
+            self._status["last_batch"] = {
+                "finished_at": datetime.now().isoformat(), "scan": scan, "paths": len(paths),
+                "files_indexed": indexed, "files_removed": report["files_removed"],
+                "files_failed": report["files_failed"], "chunks_added": report["chunks_added"],
+                "chunks_removed": report["chunks_removed"], "seconds": report["seconds"], "lag_s": round(lag, 2),
+            }
+        if self.progress and (indexed or report["files_removed"]):
+            print(f"🔁 Indexed {indexed}, removed {report['files_removed']} file(s) in {report['seconds']}s"
+                  + (f" ({lag:.1f}s after the first change)" if firsts else ""))
@@ -10,12 +10,15 @@ from prompt_toolkit.auto_suggest import AutoSuggestFromHistory
 from prompt_toolkit.formatted_text import HTML
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, List
 
 from .config import Config
 from .memory import MemoryStore
 from .langchain_brain import LangChainBrain
 from .llamaindex_rag import LlamaIndexRAG
+from .retrieval_router import MEMORIES, RetrievalRouter
 from .logger import get_logger
+from .tracing import format_perf_report, traced
 
 
 class EnhancedChatInterface:
@@ -33,6 +36,7 @@ class EnhancedChatInterface:
         self.memory = None
         self.brain = None
         self.rag = None
+        self.router = None
         self.session = None
         self.use_langchain = use_langchain
         self.use_llamaindex = use_llamaindex
@@ -68,9 +72,15 @@ class EnhancedChatInterface:
         if self.use_llamaindex:
             try:
                 self.rag = LlamaIndexRAG(
-                    chroma_client=self.memory.client,
-                    collection_name=f"{Config.CHROMA_COLLECTION_NAME}_rag"
+                    chroma_client=self.memory.chroma_client,
+                    collection_name=Config.RAG_COLLECTION_NAME
                 )
+                # Chat context comes from memories, documents or both, decided per query
+                self.router = RetrievalRouter(self.memory, self.rag)
+                self.rag.use_router(self.router)
+                # Follow-ups are only condensed when they refer back to the conversation
+                from .nlp_analyzer import get_analyzer
+                self.rag.use_analyzer(get_analyzer())
                 self.console.print("[green]✨ Using LlamaIndex for advanced RAG[/green]")
             except Exception as e:
                 self.console.print(f"[yellow]⚠️  LlamaIndex initialization failed: {e}[/yellow]")
@@ -134,6 +144,7 @@ Welcome to your AI assistant with persistent memory!
 **Commands:**
 - `/help` - Show this help message
 - `/stats` - Show memory statistics
+- `/perf` - Show per-stage latency (p50/p95) for this session
 - `/clear` - Clear all memories
 - `/mode` - Switch between LangChain/LlamaIndex/Basic modes
 - `/exit` or `/quit` - Exit the chat
@@ -201,6 +212,9 @@ Start chatting below!
         elif cmd == "/stats":
             self.show_stats()
         
+        elif cmd == "/perf":
+            self.show_perf()
+        
         elif cmd == "/clear":
             if Prompt.ask("Are you sure you want to clear all memories?", 
                          choices=["y", "n"], default="n") == "y":
@@ -220,6 +234,20 @@ Start chatting below!
         
         return True
     
+    def show_perf(self):
+        """Show per-stage latency (p50/p95) for this session."""
+        report = format_perf_report()
+        
+        if report is None:
+            self.console.print("[yellow]No timings yet. Send a message first![/yellow]")
+            return
+        
+        self.console.print(Panel(
+            Markdown(report),
+            border_style="magenta",
+            title="⏱️ Performance"
+        ))
+    
     def show_stats(self):
         """Show memory statistics."""
         stats = self.memory.get_stats()
@@ -238,9 +266,26 @@ Start chatting below!
 - **Pipeline Mode:** {mode}
         """
         
+        hot_tier = stats.get("hot_tier")
+        if hot_tier:
+            stats_text += (
+                f"\n- **Hot Tier:** {hot_tier['size']}/{hot_tier['capacity']} memories, "
+                f"{hot_tier['hit_ratio']:.0%} of lookups served from memory (~{hot_tier['saved_ms']:.0f}ms saved)"
+            )
+        
         if self.use_llamaindex:
             rag_stats = self.rag.get_stats()
-            stats_text += f"\n- **RAG Documents:** {rag_stats['total_documents']}"
+            stats_text += f"\n- **RAG Documents:** {rag_stats['total_chunks']} chunks in {rag_stats['collection']}"
+            routes = self.router.get_stats()["routes"]
+            stats_text += (
+                f"\n- **Retrieval Routing ({self.router.mode}):** {routes['memories']} memories only, "
+                f"{routes['documents']} documents only, {routes['both']} both"
+            )
+            condense = rag_stats["condense"]
+            stats_text += (
+                f"\n- **Follow-up Condensing ({Config.RAG_CONDENSE}):** {condense['condensed']} rewritten, "
+                f"{condense['skipped']} standalone skipped (~{condense['saved_ms']:.0f}ms saved)"
+            )
         
         self.console.print(Panel(Markdown(stats_text), border_style="blue"))
     
@@ -258,6 +303,55 @@ To change modes, edit the code in `main.py` or create command-line flags.
         """
         self.console.print(Panel(Markdown(info), border_style="yellow"))
     
+    def _log_system_prompt(self, user_message: str, relevant_memories: List[Dict], conversation_history: List[Dict]):
+        """
+        Log the system prompt used for this turn.
+        
+        Reuses the system message the brain already built while generating, so
+        nothing is rebuilt just for logging; the write itself happens on the
+        logger's background thread.
+        """
+        if self.use_llamaindex:
+            self.logger.log_system_prompt(
+                prompt="LlamaIndex RAG Mode (system prompt built internally)",
+                context_type="llamaindex",
+                metadata={
+                    "user_message_preview": user_message[:100]
+                }
+            )
+            return
+        
+        if not (self.use_langchain and self.brain):
+            return
+        
+        full_prompt = getattr(self.brain, "last_system_message", None) or "N/A"
+        if conversation_history:
+            # Add note about recent messages that were added separately
+            # Use all 10 messages to match emotional trajectory analysis window
+            recent_turns = conversation_history[-10:]
+            preview = [
+                "\n\n=== RECENT MESSAGES (Added to chat history) ===",
+                f"\n(Last {len(recent_turns)} messages will be added as proper chat messages)"
+            ]
+            for conv in recent_turns[:3]:  # Show preview of first 3
+                role = "User" if conv.get('metadata', {}).get('role') == 'user' else "Assistant"
+                content_preview = conv.get('content', '')[:80]
+                preview.append(f"\n{role}: {content_preview}...")
+            if len(recent_turns) > 3:
+                preview.append(f"\n... and {len(recent_turns) - 3} more messages")
+            full_prompt += "".join(preview)
+        
+        self.logger.log_system_prompt(
+            prompt=full_prompt,
+            context_type="langchain",
+            metadata={
+                "num_memories": len(relevant_memories),
+                "num_history": len(conversation_history),
+                "user_message_preview": user_message[:100]
+            }
+        )
+    
+    @traced("turn")
     def process_message(self, user_message: str):
         """Process user message and generate response."""
         # Analyze incoming message with spaCy to enhance query
@@ -271,55 +365,22 @@ To change modes, edit the code in `main.py` or create command-line flags.
             if focus_items:
                 self.console.print(f"[dim]🔍 Query focus: {', '.join(focus_items)}[/dim]")
         
-        # Retrieve relevant memories using enhanced query WITH hybrid search
-        relevant_memories = self.memory.retrieve_memories(
-            query=query_analysis["enhanced_query"],
-            n_results=Config.MEMORY_CONTEXT_SIZE,
-            query_analysis=query_analysis  # Pass for metadata boosting
-        )
+        # LlamaIndex chat searches memories itself, through the router; the hits are reported after the response
+        routed = self.use_llamaindex and self.router is not None
+        if routed:
+            relevant_memories = []
+            self.router.last_results = []
+        else:
+            # Retrieve relevant memories using enhanced query WITH hybrid search
+            relevant_memories = self.memory.retrieve_memories(
+                query=query_analysis["enhanced_query"],
+                n_results=Config.MEMORY_CONTEXT_SIZE,
+                query_analysis=query_analysis  # Pass for metadata boosting
+            )
         
         # Get recent conversation history for emotional context
         conversation_history = self.memory.get_conversation_history(n_recent=10)
         
-        # Log system prompt for debugging
-        if self.use_langchain and self.brain:
-            # Get the full system message that will be sent to LLM
-            system_message = self.brain._build_system_message(
-                relevant_memories, conversation_history, query_analysis
-            ) if hasattr(self.brain, '_build_system_message') else "N/A"
-            
-            # Add note about recent messages that will be added separately
-            full_prompt = system_message
-            if conversation_history:
-                # Use all 10 messages to match emotional trajectory analysis window
-                recent_turns = conversation_history[-10:]
-                full_prompt += "\n\n=== RECENT MESSAGES (Added to chat history) ==="
-                full_prompt += f"\n(Last {len(recent_turns)} messages will be added as proper chat messages)"
-                for conv in recent_turns[:3]:  # Show preview of first 3
-                    role = "User" if conv.get('metadata', {}).get('role') == 'user' else "Assistant"
-                    content_preview = conv.get('content', '')[:80]
-                    full_prompt += f"\n{role}: {content_preview}..."
-                if len(recent_turns) > 3:
-                    full_prompt += f"\n... and {len(recent_turns) - 3} more messages"
-            
-            self.logger.log_system_prompt(
-                prompt=full_prompt,
-                context_type="langchain",
-                metadata={
-                    "num_memories": len(relevant_memories),
-                    "num_history": len(conversation_history),
-                    "user_message_preview": user_message[:100]
-                }
-            )
-        elif self.use_llamaindex:
-            self.logger.log_system_prompt(
-                prompt="LlamaIndex RAG Mode (system prompt built internally)",
-                context_type="llamaindex",
-                metadata={
-                    "user_message_preview": user_message[:100]
-                }
-            )
-        
         # Show memory context if any
         if relevant_memories:
             self.console.print(f"[dim]💭 Using {len(relevant_memories)} relevant memories[/dim]")
@@ -349,6 +410,8 @@ To change modes, edit the code in `main.py` or create command-line flags.
                 for chunk in self.rag.chat(user_message, stream=True):
                     self.console.print(chunk, end="")
                     response_text += chunk
+                if routed:
+                    relevant_memories = [r for r in self.router.last_results if r["source"] == MEMORIES]
             elif self.use_langchain:
                 # Use LangChain brain with streaming
                 for chunk in self.brain.generate_response_streaming(
@@ -373,8 +436,12 @@ To change modes, edit the code in `main.py` or create command-line flags.
             self.console.print(f"\n[red]❌ Error: {e}[/red]")
             error_occurred = True
             return
+        finally:
+            self._log_system_prompt(user_message, relevant_memories, conversation_history)
         
         self.console.print()  # Newline after response
+        if routed and relevant_memories:
+            self.console.print(f"[dim]💭 Used {len(relevant_memories)} relevant memories[/dim]")
         
         # Only store conversation in memory if no error occurred
         if not error_occurred and response_text.strip():
@@ -396,13 +463,6 @@ To change modes, edit the code in `main.py` or create command-line flags.
                 enable_nlp=True  # Enable NLP enrichment
             )
             
-            # Also add to LlamaIndex if enabled
-            if self.use_llamaindex:
-                self.rag.add_memory(
-                    content=f"User: {user_message}\nAssistant: {response_text}",
-                    metadata={"timestamp": timestamp}
-                )
-            
             # Log the conversation turn
             self.logger.log_conversation_turn(
                 user_message=user_message,
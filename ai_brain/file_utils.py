@@ -0,0 +1,25 @@
+"""File helpers shared by snapshots and document ingestion."""
+
+import hashlib
+from pathlib import Path
+from typing import Union
+
+# Bytes read per read() while hashing; large files are never loaded whole
+_HASH_BLOCK = 1 << 20
+
+
+def sha256_file(path: Union[str, Path]) -> str:
+    """
+    SHA-256 of a file's contents, read a block at a time.
+
+    Args:
+        path: File to hash
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while block := f.read(_HASH_BLOCK):
+            digest.update(block)
+    return digest.hexdigest()
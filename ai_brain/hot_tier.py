@@ -0,0 +1,317 @@
+"""
+In-memory hot tier for the memory store.
+
+Most retrievals land on memories written or recalled recently, yet every
+query still goes to the persistent index. HotTier keeps the most recently
+written/retrieved memories (LRU, MEMORY_HOT_TIER_SIZE of them) as unit rows of
+one contiguous float32 matrix, with their documents and metadata, so a lookup
+is a single matrix-vector product. MemoryStore searches it first, merges its
+hits with the persistent (cold) tier and skips the cold query altogether when
+the hot tier alone has enough high-similarity hits.
+
+Distances are cosine distances (1 - cos), the same as the memory collections.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Metadata keys MemoryStore filters on; kept as columns for vectorized masks
+FILTER_KEYS = ("type", "user_id", "session_id", "role")
+
+
+class HotTier:
+    """Fixed-capacity LRU of memory embeddings with brute-force cosine search."""
+
+    def __init__(self, capacity: int):
+        """
+        Args:
+            capacity: Maximum number of memories kept in memory
+        """
+        self.capacity = capacity
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._slots: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = [None] * capacity
+        self._documents: List[Optional[str]] = [None] * capacity
+        self._metadatas: List[Optional[Dict[str, Any]]] = [None] * capacity
+        # Namespace and filter values as int codes (-1 = missing) so masks are integer compares
+        self._vocab: Dict[str, Dict[Any, int]] = {key: {} for key in ("namespace",) + FILTER_KEYS}
+        self._columns = {key: np.full(capacity, -1, dtype=np.int32) for key in self._vocab}
+        self._used = np.zeros(capacity, dtype=bool)
+        self._last_used = np.zeros(capacity, dtype=np.int64)
+        self._tick = 0
+        self._lock = threading.Lock()
+
+        # Counters for get_stats()
+        self.lookups = 0
+        self.cold_skipped = 0
+        self.results = 0
+        self.hot_results = 0
+        self._hot_seconds = 0.0
+        self._cold_seconds = 0.0
+        self._cold_queries = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(
+        self,
+        namespace: str,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        documents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]]
+    ):
+        """
+        Insert or refresh memories, evicting the least recently used ones.
+
+        Args:
+            namespace: Collection the memories live in
+            ids: Memory IDs
+            embeddings: Their embeddings
+            documents: Their contents
+            metadatas: Their metadata
+        """
+        if not ids or self.capacity <= 0:
+            return
+        # Only the last `capacity` entries of a bulk import would survive anyway
+        start = max(0, len(ids) - self.capacity)
+        vectors = np.asarray(embeddings[start:], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms > 0, norms, 1.0)
+
+        with self._lock:
+            if self.dim != vectors.shape[1]:
+                # First use, or the embedding model changed
+                self._reset(vectors.shape[1])
+            for offset, memory_id in enumerate(ids[start:]):
+                slot = self._slots.get(memory_id)
+                if slot is None:
+                    slot = self._free_slot()
+                    self._slots[memory_id] = slot
+                    self._ids[slot] = memory_id
+                    self._used[slot] = True
+                metadata = metadatas[start + offset] or {}
+                self._matrix[slot] = vectors[offset]
+                self._documents[slot] = documents[start + offset]
+                self._metadatas[slot] = dict(metadata)
+                self._columns["namespace"][slot] = self._code("namespace", namespace)
+                for key in FILTER_KEYS:
+                    self._columns[key][slot] = self._code(key, metadata.get(key))
+                self._tick += 1
+                self._last_used[slot] = self._tick
+
+    def search(
+        self,
+        namespace: str,
+        query_embedding: Sequence[float],
+        n_results: int,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Nearest cached memories of a namespace, closest first.
+
+        Returned memories count as used for the LRU.
+
+        Args:
+            namespace: Collection to search
+            query_embedding: Query vector
+            n_results: Maximum number of results
+            filters: Exact-match conditions on FILTER_KEYS
+            include_embeddings: Also return each memory's (unit-normalized) "embedding"
+
+        Returns:
+            List of {"id", "content", "metadata", "distance"}
+        """
+        with self._lock:
+            if not self._slots or n_results <= 0:
+                return []
+            query = np.asarray(query_embedding, dtype=np.float32)
+            if query.shape[0] != self.dim:
+                return []
+
+            mask = self._mask(namespace, filters)
+            candidates = int(mask.sum())
+            if candidates == 0:
+                return []
+
+            norm = float(np.linalg.norm(query))
+            query = query / norm if norm > 0 else query
+            if candidates * 4 < self.capacity:
+                # Narrow filter (one user/session): score only the matching rows
+                rows = np.flatnonzero(mask)
+                scores = np.full(self.capacity, -np.inf, dtype=np.float32)
+                scores[rows] = self._matrix[rows] @ query
+            else:
+                scores = self._matrix @ query
+                scores[~mask] = -np.inf
+            n = min(n_results, candidates)
+            top = np.argpartition(-scores, n - 1)[:n]
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            self._tick += 1
+            self._last_used[top] = self._tick
+            hits = [
+                {
+                    "id": self._ids[slot],
+                    "content": self._documents[slot],
+                    "metadata": dict(self._metadatas[slot]),
+                    "distance": float(1.0 - scores[slot])
+                }
+                for slot in top
+            ]
+            if include_embeddings:
+                for hit, slot in zip(hits, top):
+                    hit["embedding"] = self._matrix[slot].copy()
+            return hits
+
+    def update_metadata(self, namespace: str, ids: Sequence[str], metadatas: Sequence[Dict[str, Any]]):
+        """
+        Replace the cached metadata of memories updated in the persistent store.
+
+        Args:
+            namespace: Collection the memories live in
+            ids: Memory IDs (ones not cached are ignored)
+            metadatas: Their new metadata
+        """
+        with self._lock:
+            for memory_id, metadata in zip(ids, metadatas):
+                slot = self._slots.get(memory_id)
+                if slot is None or self._columns["namespace"][slot] != self._code("namespace", namespace):
+                    continue
+                self._metadatas[slot] = dict(metadata)
+                for key in FILTER_KEYS:
+                    self._columns[key][slot] = self._code(key, metadata.get(key))
+
+    def remove(self, namespace: Optional[str] = None, filters: Optional[Dict[str, Any]] = None, ids: Sequence[str] = ()):
+        """
+        Drop memories that were deleted from the persistent store.
+
+        Args:
+            namespace: Drop everything cached for this collection (narrowed by filters)
+            filters: Exact-match conditions on FILTER_KEYS
+            ids: Drop these memory IDs
+        """
+        with self._lock:
+            slots = [self._slots[memory_id] for memory_id in ids if memory_id in self._slots]
+            if namespace is not None:
+                slots.extend(np.flatnonzero(self._mask(namespace, filters)).tolist())
+            for slot in set(slots):
+                del self._slots[self._ids[slot]]
+                self._ids[slot] = self._documents[slot] = self._metadatas[slot] = None
+                for column in self._columns.values():
+                    column[slot] = -1
+                self._used[slot] = False
+                self._last_used[slot] = 0
+
+    def clear(self):
+        """Drop every cached memory (counters are kept)."""
+        with self._lock:
+            self._reset(self.dim)
+
+    def record(self, hot_seconds: float, cold_seconds: Optional[float], hot_results: int, results: int):
+        """
+        Account one retrieval.
+
+        Args:
+            hot_seconds: Time spent searching the hot tier
+            cold_seconds: Time of the cold query, or None if it was skipped
+            hot_results: Returned memories that came from the hot tier
+            results: Returned memories
+        """
+        with self._lock:
+            self.lookups += 1
+            self._hot_seconds += hot_seconds
+            if cold_seconds is None:
+                self.cold_skipped += 1
+            else:
+                self._cold_queries += 1
+                self._cold_seconds += cold_seconds
+            self.hot_results += hot_results
+            self.results += results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit ratio and latency savings so far.
+
+        saved_ms estimates the cold query time avoided by skipped lookups
+        (at the mean measured cold latency) minus the time all hot tier
+        searches cost.
+        """
+        with self._lock:
+            hot_ms = self._hot_seconds * 1000 / self.lookups if self.lookups else 0.0
+            cold_ms = self._cold_seconds * 1000 / self._cold_queries if self._cold_queries else 0.0
+            return {
+                "size": len(self._slots),
+                "capacity": self.capacity,
+                "lookups": self.lookups,
+                "cold_skipped": self.cold_skipped,
+                "hit_ratio": round(self.cold_skipped / self.lookups, 4) if self.lookups else 0.0,
+                "result_hit_ratio": round(self.hot_results / self.results, 4) if self.results else 0.0,
+                "hot_ms_mean": round(hot_ms, 3),
+                "cold_ms_mean": round(cold_ms, 3),
+                "saved_ms": round(self.cold_skipped * cold_ms - self._hot_seconds * 1000, 1),
+            }
+
+    def _reset(self, dim: Optional[int]):
+        """Empty every slot, sizing the matrix for `dim`-dimensional vectors."""
+        self.dim = dim
+        self._matrix = np.zeros((self.capacity, dim), dtype=np.float32) if dim else None
+        self._slots.clear()
+        self._ids = [None] * self.capacity
+        self._documents = [None] * self.capacity
+        self._metadatas = [None] * self.capacity
+        for key, column in self._columns.items():
+            column[:] = -1
+            self._vocab[key].clear()
+        self._used[:] = False
+        self._last_used[:] = 0
+
+    def _code(self, key: str, value: Any) -> int:
+        """Int code of a column value (-1 for None)."""
+        if value is None:
+            return -1
+        vocab = self._vocab[key]
+        code = vocab.get(value)
+        if code is None:
+            if len(vocab) >= 2 * self.capacity:
+                # Evicted memories leave their values behind (one per session_id, ...)
+                self._compact(key)
+            code = vocab[value] = len(vocab)
+        return code
+
+    def _compact(self, key: str):
+        """Drop the values of a column that no occupied slot holds, renumbering the rest."""
+        column = self._columns[key]
+        live = np.unique(column[self._used & (column >= 0)])
+        remap = np.full(len(self._vocab[key]), -1, dtype=np.int32)
+        remap[live] = np.arange(live.size, dtype=np.int32)
+        values = {code: value for value, code in self._vocab[key].items()}
+        self._vocab[key] = {values[int(code)]: new for new, code in enumerate(live)}
+        column[column >= 0] = remap[column[column >= 0]]
+
+    def _mask(self, namespace: str, filters: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Occupied slots of a namespace matching every filter."""
+        conditions = {"namespace": namespace, **(filters or {})}
+        mask = self._used.copy()
+        for key, value in conditions.items():
+            if key not in self._vocab:
+                raise ValueError(f"Hot tier cannot filter on '{key}'")
+            code = self._vocab[key].get(value)
+            if code is None:
+                mask[:] = False
+                break
+            mask &= self._columns[key] == code
+        return mask
+
+    def _free_slot(self) -> int:
+        """An empty slot, or the least recently used one after evicting it."""
+        free = np.flatnonzero(~self._used)
+        if free.size:
+            return int(free[0])
+        slot = int(np.argmin(self._last_used))
+        del self._slots[self._ids[slot]]
+        return slot
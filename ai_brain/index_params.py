@@ -0,0 +1,86 @@
+"""HNSW index parameters for memory collections."""
+
+from typing import Any, Dict, Optional, Tuple
+
+from .config import Config
+
+# Changing these requires rebuilding the index; search_ef can be changed in place
+REBUILD_PARAMS = ("space", "M", "construction_ef")
+
+# Chroma's configuration names for each parameter (chromadb >= 1.0)
+_CONFIGURATION_KEYS = {
+    "space": "space",
+    "M": "max_neighbors",
+    "construction_ef": "ef_construction",
+    "search_ef": "ef_search",
+}
+
+
+def wanted_params() -> Dict[str, Any]:
+    """The index parameters requested by Config."""
+    return {
+        "space": "cosine",
+        "M": Config.HNSW_M,
+        "construction_ef": Config.HNSW_CONSTRUCTION_EF,
+        "search_ef": Config.HNSW_SEARCH_EF,
+    }
+
+
+def hnsw_metadata(params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Collection metadata entries that create an index with the given parameters.
+
+    Args:
+        params: Parameters as returned by wanted_params() (defaults to Config)
+    """
+    params = params or wanted_params()
+    return {f"hnsw:{name}": value for name, value in params.items()}
+
+
+def read_params(collection) -> Dict[str, Any]:
+    """
+    The parameters an existing collection's index was built with.
+
+    Reads Chroma's collection configuration (which reflects in-place
+    changes), falling back to the creation metadata and Chroma's defaults.
+    """
+    hnsw = {}
+    try:
+        hnsw = (collection.configuration_json or {}).get("hnsw") or {}
+    except AttributeError:
+        pass  # chromadb < 1.0
+    metadata = collection.metadata or {}
+    defaults = {"space": "l2", "M": 16, "construction_ef": 100, "search_ef": 10}
+    return {
+        name: hnsw.get(_CONFIGURATION_KEYS[name], metadata.get(f"hnsw:{name}", defaults[name]))
+        for name in _CONFIGURATION_KEYS
+    }
+
+
+def param_drift(collection, wanted: Optional[Dict[str, Any]] = None) -> Dict[str, Tuple[Any, Any]]:
+    """
+    Parameters whose current value differs from the wanted one.
+
+    Returns:
+        {name: (current, wanted)} for every differing parameter
+    """
+    wanted = wanted or wanted_params()
+    current = read_params(collection)
+    return {name: (current[name], value) for name, value in wanted.items() if current[name] != value}
+
+
+def set_search_ef(collection, search_ef: int) -> bool:
+    """
+    Change a collection's search_ef in place (no rebuild needed).
+
+    Chroma loads an index with the configuration current at its first use in
+    a process, so call this before querying or counting the collection.
+
+    Returns:
+        True if the change was applied, False if this Chroma version can't
+    """
+    try:
+        collection.modify(configuration={"hnsw": {"ef_search": int(search_ef)}})
+        return True
+    except Exception:
+        return False
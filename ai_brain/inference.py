@@ -1,9 +1,10 @@
 """AI inference using OpenRouter API or local Ollama."""
 
-from openai import OpenAI
-from typing import List, Dict, Generator
+from openai import OpenAI, AsyncOpenAI
+from typing import List, Dict, Generator, AsyncGenerator
 from datetime import datetime
 from .config import Config
+from .tracing import LLMCallTrace, span, traced
 
 
 class AIBrain:
@@ -15,21 +16,25 @@ class AIBrain:
         
         if backend == "ollama":
             # Use local Ollama
-            self.client = OpenAI(
-                base_url=f"{Config.OLLAMA_BASE_URL}/v1",
-                api_key="ollama",  # Ollama doesn't require a real key
-            )
+            client_kwargs = {
+                "base_url": f"{Config.OLLAMA_BASE_URL}/v1",
+                "api_key": "ollama",  # Ollama doesn't require a real key
+            }
             self.model = Config.OLLAMA_MODEL
             print(f"🤖 AI Brain initialized with Ollama model: {self.model}")
             print(f"   Base URL: {Config.OLLAMA_BASE_URL}")
         else:
             # Use OpenRouter (default)
-            self.client = OpenAI(
-                base_url=Config.OPENROUTER_BASE_URL,
-                api_key=Config.OPENROUTER_API_KEY,
-            )
+            client_kwargs = {
+                "base_url": Config.OPENROUTER_BASE_URL,
+                "api_key": Config.OPENROUTER_API_KEY,
+            }
             self.model = Config.OPENROUTER_MODEL
             print(f"🤖 AI Brain initialized with OpenRouter model: {self.model}")
+        
+        self.client = OpenAI(**client_kwargs)
+        # Async client shares the configuration; used by the a* methods
+        self.async_client = AsyncOpenAI(**client_kwargs)
     
     def generate_response(
         self,
@@ -51,6 +56,46 @@ class AIBrain:
             Generated response (streamed or complete)
         """
         # Build messages
+        messages = self._build_messages(message, relevant_memories, conversation_history)
+        
+        # Generate response
+        try:
+            if stream:
+                return self._stream_response(messages)
+            else:
+                with span("llm.generate", streaming=False, model=self.model):
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=messages,
+                        temperature=0.7,
+                    )
+                return response.choices[0].message.content
+        except Exception as e:
+            error_msg = f"Error generating response: {e}"
+            print(f"❌ {error_msg}")
+            return error_msg if not stream else iter([error_msg])
+    
+    @traced("brain.build_messages")
+    def _build_messages(
+        self,
+        message: str,
+        relevant_memories: List[Dict] = None,
+        conversation_history: List[Dict] = None,
+        conversation_summary: str = None
+    ) -> List[Dict]:
+        """
+        Build the chat message list sent to the LLM.
+        
+        Args:
+            message: User message
+            relevant_memories: Relevant memories from vector store
+            conversation_history: Recent conversation history
+            conversation_summary: Precomputed summary of older history (computed
+                here if needed and not provided)
+            
+        Returns:
+            List of OpenAI-style message dicts
+        """
         messages = [{"role": "system", "content": Config.SYSTEM_PROMPT}]
         
         # Add relevant memories as context
@@ -83,12 +128,13 @@ class AIBrain:
             # If conversation is long (>20 messages), summarize older messages
             if len(conversation_history) > 20:
                 # Summarize messages 1 to N-10 (keep last 10 in full)
-                old_messages = conversation_history[:-10]
-                summary = self._summarize_conversation_chunk(old_messages)
-                if summary:
+                if conversation_summary is None:
+                    old_messages = conversation_history[:-10]
+                    conversation_summary = self._summarize_conversation_chunk(old_messages)
+                if conversation_summary:
                     messages.append({
                         "role": "system",
-                        "content": f"=== EARLIER CONVERSATION SUMMARY ===\n{summary}"
+                        "content": f"=== EARLIER CONVERSATION SUMMARY ===\n{conversation_summary}"
                     })
             
             # Add recent conversation history (last 10 messages = 5 user/assistant turns)
@@ -104,35 +150,64 @@ class AIBrain:
         # Add current message
         messages.append({"role": "user", "content": message})
         
-        # Generate response
+        return messages
+    
+    def _stream_response(self, messages: List[Dict]) -> Generator[str, None, None]:
+        """Stream response from OpenRouter."""
         try:
-            if stream:
-                return self._stream_response(messages)
-            else:
-                response = self.client.chat.completions.create(
+            with LLMCallTrace(streaming=True, model=self.model) as call:
+                stream = self.client.chat.completions.create(
                     model=self.model,
                     messages=messages,
                     temperature=0.7,
+                    stream=True,
                 )
-                return response.choices[0].message.content
+                
+                for chunk in stream:
+                    if chunk.choices[0].delta.content:
+                        call.chunk()
+                        yield chunk.choices[0].delta.content
         except Exception as e:
-            error_msg = f"Error generating response: {e}"
-            print(f"❌ {error_msg}")
-            return error_msg if not stream else iter([error_msg])
+            yield f"\n\n❌ Error: {e}"
     
-    def _stream_response(self, messages: List[Dict]) -> Generator[str, None, None]:
-        """Stream response from OpenRouter."""
-        try:
-            stream = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                temperature=0.7,
-                stream=True,
-            )
+    async def agenerate_response_streaming(
+        self,
+        message: str,
+        relevant_memories: List[Dict] = None,
+        conversation_history: List[Dict] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Async streaming counterpart of generate_response() using AsyncOpenAI.
+        
+        Args:
+            message: User message
+            relevant_memories: Relevant memories from vector store
+            conversation_history: Recent conversation history
             
-            for chunk in stream:
-                if chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+        Yields:
+            Response text chunks
+        """
+        conversation_summary = None
+        if conversation_history and len(conversation_history) > 20:
+            conversation_summary = await self._asummarize_conversation_chunk(conversation_history[:-10])
+        
+        messages = self._build_messages(
+            message, relevant_memories, conversation_history, conversation_summary
+        )
+        
+        try:
+            with LLMCallTrace(streaming=True, model=self.model) as call:
+                stream = await self.async_client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.7,
+                    stream=True,
+                )
+                
+                async for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        call.chunk()
+                        yield chunk.choices[0].delta.content
         except Exception as e:
             yield f"\n\n❌ Error: {e}"
     
@@ -197,6 +272,7 @@ class AIBrain:
         except Exception:
             return ""
     
+    @traced("llm.summarize")
     def _summarize_conversation_chunk(self, messages: List[Dict]) -> str:
         """
         Summarize a chunk of older conversation messages.
@@ -207,9 +283,48 @@ class AIBrain:
         Returns:
             A concise summary of the conversation chunk
         """
-        if not messages:
+        summary_prompt = self._build_summary_prompt(messages)
+        if not summary_prompt:
+            return ""
+        
+        try:
+            # Use OpenRouter to generate summary (non-streaming)
+            response = self.client.chat.completions.create(
+                model=self.model,
+                messages=summary_prompt,
+                temperature=0.3,  # Lower temperature for more focused summaries
+                max_tokens=150,  # Limit summary length
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            print(f"⚠️  Warning: Failed to summarize conversation: {e}")
+            # Fallback: return a simple concatenation
+            return f"Earlier conversation covered: {len(messages)} messages"
+    
+    @traced("llm.summarize")
+    async def _asummarize_conversation_chunk(self, messages: List[Dict]) -> str:
+        """Async counterpart of _summarize_conversation_chunk() using AsyncOpenAI."""
+        summary_prompt = self._build_summary_prompt(messages)
+        if not summary_prompt:
             return ""
         
+        try:
+            response = await self.async_client.chat.completions.create(
+                model=self.model,
+                messages=summary_prompt,
+                temperature=0.3,
+                max_tokens=150,
+            )
+            return response.choices[0].message.content
+        except Exception as e:
+            print(f"⚠️  Warning: Failed to summarize conversation: {e}")
+            return f"Earlier conversation covered: {len(messages)} messages"
+    
+    def _build_summary_prompt(self, messages: List[Dict]) -> List[Dict]:
+        """Build the summarization request for a chunk of older messages."""
+        if not messages:
+            return []
+        
         # Build conversation text for summarization
         conversation_text = []
         for msg in messages:
@@ -220,10 +335,10 @@ class AIBrain:
                 conversation_text.append(f"{role_label}: {content}")
         
         if not conversation_text:
-            return ""
+            return []
         
         # Create summarization prompt
-        summary_prompt = [
+        return [
             {
                 "role": "system",
                 "content": "You are a conversation summarizer. Create a concise summary of the following conversation, focusing on key topics, decisions, and important information. Keep it under 100 words."
@@ -233,17 +348,3 @@ class AIBrain:
                 "content": "\n".join(conversation_text)
             }
         ]
-        
-        try:
-            # Use OpenRouter to generate summary (non-streaming)
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=summary_prompt,
-                temperature=0.3,  # Lower temperature for more focused summaries
-                max_tokens=150,  # Limit summary length
-            )
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"⚠️  Warning: Failed to summarize conversation: {e}")
-            # Fallback: return a simple concatenation
-            return f"Earlier conversation covered: {len(messages)} messages"
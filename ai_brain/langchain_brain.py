@@ -1,12 +1,13 @@
 """LangChain-based pipeline for AI Brain with advanced prompt management."""
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, AsyncGenerator
 from datetime import datetime
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 
 from .config import Config
+from .tracing import LLMCallTrace, span, traced
 
 
 class LangChainBrain:
@@ -40,6 +41,9 @@ class LangChainBrain:
         
         # Simple message history (in-session)
         self.message_history: List[HumanMessage | AIMessage | SystemMessage] = []
+        
+        # System message sent with the last synchronous turn (read by the CLI for prompt logging)
+        self.last_system_message: Optional[str] = None
     
     def _format_time_ago(self, timestamp: str) -> str:
         """
@@ -69,13 +73,20 @@ class LangChainBrain:
         except Exception:
             return "recently"
     
+    @traced("brain.build_system_message")
     def _build_system_message(
         self,
         relevant_memories: Optional[List[Dict]] = None,
         conversation_history: Optional[List[Dict]] = None,
-        query_analysis: Optional[Dict] = None
+        query_analysis: Optional[Dict] = None,
+        conversation_summary: Optional[str] = None
     ) -> str:
-        """Build system message with memory context."""
+        """
+        Build system message with memory context.
+        
+        If the history needs summarizing and no precomputed
+        conversation_summary is given, it is generated here (blocking).
+        """
         system_parts = [
             "You are an advanced AI assistant with persistent memory capabilities.",
             "",
@@ -163,10 +174,11 @@ class LangChainBrain:
             if len(conversation_history) > 20:
                 system_parts.append("=== EARLIER CONVERSATION SUMMARY ===")
                 # Summarize messages 1 to N-10 (keep last 10 in full)
-                old_messages = conversation_history[:-10]
-                summary = self._summarize_conversation_chunk(old_messages)
-                if summary:
-                    system_parts.append(summary)
+                if conversation_summary is None:
+                    old_messages = conversation_history[:-10]
+                    conversation_summary = self._summarize_conversation_chunk(old_messages)
+                if conversation_summary:
+                    system_parts.append(conversation_summary)
                 system_parts.append("")
             
             # Add recent conversation context (last 10 messages = 5 complete turns)
@@ -205,6 +217,7 @@ class LangChainBrain:
         except Exception:
             return ""
     
+    @traced("llm.summarize")
     def _summarize_conversation_chunk(self, messages: List[Dict]) -> str:
         """
         Summarize a chunk of older conversation messages.
@@ -215,6 +228,50 @@ class LangChainBrain:
         Returns:
             A concise summary of the conversation chunk
         """
+        summary_message = self._build_summary_message(messages)
+        if not summary_message:
+            return ""
+        
+        try:
+            # Use LangChain to generate summary
+            chain = self._summary_prompt() | self.llm
+            response = chain.invoke({"conversation": summary_message})
+            
+            if hasattr(response, 'content'):
+                return response.content
+            return str(response)
+        except Exception as e:
+            print(f"⚠️  Warning: Failed to summarize conversation: {e}")
+            # Fallback: return a simple message
+            return f"Earlier conversation covered: {len(messages)} messages"
+    
+    @traced("llm.summarize")
+    async def _asummarize_conversation_chunk(self, messages: List[Dict]) -> str:
+        """Async counterpart of _summarize_conversation_chunk() using ainvoke."""
+        summary_message = self._build_summary_message(messages)
+        if not summary_message:
+            return ""
+        
+        try:
+            chain = self._summary_prompt() | self.llm
+            response = await chain.ainvoke({"conversation": summary_message})
+            
+            if hasattr(response, 'content'):
+                return response.content
+            return str(response)
+        except Exception as e:
+            print(f"⚠️  Warning: Failed to summarize conversation: {e}")
+            return f"Earlier conversation covered: {len(messages)} messages"
+    
+    def _summary_prompt(self) -> ChatPromptTemplate:
+        """Prompt template used for conversation summarization."""
+        return ChatPromptTemplate.from_messages([
+            ("system", "You are a conversation summarizer. Be concise and focus on key information."),
+            ("human", "{conversation}")
+        ])
+    
+    def _build_summary_message(self, messages: List[Dict]) -> str:
+        """Build the summarization request text for a chunk of older messages."""
         if not messages:
             return ""
         
@@ -230,31 +287,45 @@ class LangChainBrain:
         if not conversation_text:
             return ""
         
-        # Create summarization prompt
-        summary_message = (
+        return (
             "Create a concise summary of the following conversation, "
             "focusing on key topics, decisions, and important information. "
             "Keep it under 100 words.\n\n"
             + "\n".join(conversation_text)
         )
+    
+    def _build_messages(
+        self,
+        message: str,
+        system_content: str,
+        conversation_history: Optional[List[Dict]] = None
+    ) -> List[HumanMessage | AIMessage | SystemMessage]:
+        """Build the LangChain message sequence: system, recent history, current message."""
+        # Create message sequence with recent history from DB
+        messages = [SystemMessage(content=system_content)]
         
-        try:
-            # Use LangChain to generate summary
-            summary_prompt = ChatPromptTemplate.from_messages([
-                ("system", "You are a conversation summarizer. Be concise and focus on key information."),
-                ("human", "{conversation}")
-            ])
-            
-            chain = summary_prompt | self.llm
-            response = chain.invoke({"conversation": summary_message})
-            
-            if hasattr(response, 'content'):
-                return response.content
-            return str(response)
-        except Exception as e:
-            print(f"⚠️  Warning: Failed to summarize conversation: {e}")
-            # Fallback: return a simple message
-            return f"Earlier conversation covered: {len(messages)} messages"
+        # Add recent conversation history from database (last 5 turns = 10 messages)
+        # This matches our emotional trajectory analysis window
+        if conversation_history:
+            recent_turns = conversation_history[-10:]
+            for entry in recent_turns:
+                role = entry.get('metadata', {}).get('role', 'user')
+                content = entry.get('content', '')
+                if role == 'user':
+                    messages.append(HumanMessage(content=content))
+                else:
+                    messages.append(AIMessage(content=content))
+        
+        # Add current message
+        messages.append(HumanMessage(content=message))
+        return messages
+    
+    def _remember_exchange(self, message: str, response_text: str):
+        """Store an exchange in the in-session history (last 10 exchanges)."""
+        self.message_history.append(HumanMessage(content=message))
+        self.message_history.append(AIMessage(content=response_text))
+        if len(self.message_history) > 20:
+            self.message_history = self.message_history[-20:]
     
     def generate_response(
         self,
@@ -275,37 +346,20 @@ class LangChainBrain:
         Returns:
             Generated response text
         """
-        # Build the system message with context
+        # Build the system message with context (never leave the previous turn's behind)
+        self.last_system_message = None
         system_content = self._build_system_message(relevant_memories, conversation_history, query_analysis)
-        
-        # Create message sequence with recent history from DB
-        messages = [SystemMessage(content=system_content)]
-        
-        # Add recent conversation history from database (last 5 turns = 10 messages)
-        # This matches our emotional trajectory analysis window
-        if conversation_history:
-            recent_turns = conversation_history[-10:]
-            for entry in recent_turns:
-                role = entry.get('metadata', {}).get('role', 'user')
-                content = entry.get('content', '')
-                if role == 'user':
-                    messages.append(HumanMessage(content=content))
-                else:
-                    messages.append(AIMessage(content=content))
-        
-        # Add current message
-        messages.append(HumanMessage(content=message))
+        self.last_system_message = system_content
+        messages = self._build_messages(message, system_content, conversation_history)
         
         try:
             # Get response from LLM
-            response = self.llm.invoke(messages)
+            with span("llm.generate", streaming=False):
+                response = self.llm.invoke(messages)
             response_text = response.content
             
             # Store in session history (for continuity within this session)
-            self.message_history.append(HumanMessage(content=message))
-            self.message_history.append(AIMessage(content=response_text))
-            if len(self.message_history) > 20:  # Keep last 10 exchanges
-                self.message_history = self.message_history[-20:]
+            self._remember_exchange(message, response_text)
             
             return response_text
             
@@ -333,47 +387,76 @@ class LangChainBrain:
         Yields:
             Response text chunks
         """
-        # Build the system message with context
+        # Build the system message with context (never leave the previous turn's behind)
+        self.last_system_message = None
         system_content = self._build_system_message(relevant_memories, conversation_history, query_analysis)
-        
-        # Create message sequence with recent history from DB
-        messages = [SystemMessage(content=system_content)]
-        
-        # Add recent conversation history from database (last 5 turns = 10 messages)
-        # This matches our emotional trajectory analysis window
-        if conversation_history:
-            recent_turns = conversation_history[-10:]
-            for entry in recent_turns:
-                role = entry.get('metadata', {}).get('role', 'user')
-                content = entry.get('content', '')
-                if role == 'user':
-                    messages.append(HumanMessage(content=content))
-                else:
-                    messages.append(AIMessage(content=content))
-        
-        # Add current message
-        messages.append(HumanMessage(content=message))
+        self.last_system_message = system_content
+        messages = self._build_messages(message, system_content, conversation_history)
         
         full_response = []
         try:
             # Stream response from LLM
-            for chunk in self.llm.stream(messages):
-                if hasattr(chunk, 'content') and chunk.content:
-                    full_response.append(chunk.content)
-                    yield chunk.content
+            with LLMCallTrace(streaming=True) as call:
+                for chunk in self.llm.stream(messages):
+                    if hasattr(chunk, 'content') and chunk.content:
+                        call.chunk()
+                        full_response.append(chunk.content)
+                        yield chunk.content
             
             # Store in session history after streaming completes
-            response_text = "".join(full_response)
-            self.message_history.append(HumanMessage(content=message))
-            self.message_history.append(AIMessage(content=response_text))
-            if len(self.message_history) > 20:
-                self.message_history = self.message_history[-20:]
+            self._remember_exchange(message, "".join(full_response))
                 
         except Exception as e:
             error_msg = f"Error generating streaming response: {str(e)}"
             print(f"❌ {error_msg}")
             yield error_msg
     
+    async def agenerate_response_streaming(
+        self,
+        message: str,
+        relevant_memories: Optional[List[Dict]] = None,
+        conversation_history: Optional[List[Dict]] = None,
+        query_analysis: Optional[Dict] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Async streaming counterpart of generate_response_streaming() using llm.astream.
+        
+        Args:
+            message: User's input message
+            relevant_memories: List of relevant memories from vector DB
+            conversation_history: Recent conversation history
+            query_analysis: Query enhancement details (entities, keywords)
+            
+        Yields:
+            Response text chunks
+        """
+        self.last_system_message = None
+        conversation_summary = None
+        if conversation_history and len(conversation_history) > 20:
+            conversation_summary = await self._asummarize_conversation_chunk(conversation_history[:-10])
+        
+        system_content = self._build_system_message(
+            relevant_memories, conversation_history, query_analysis, conversation_summary
+        )
+        self.last_system_message = system_content
+        messages = self._build_messages(message, system_content, conversation_history)
+        
+        full_response = []
+        try:
+            with LLMCallTrace(streaming=True) as call:
+                async for chunk in self.llm.astream(messages):
+                    if hasattr(chunk, 'content') and chunk.content:
+                        call.chunk()
+                        full_response.append(chunk.content)
+                        yield chunk.content
+            
+            self._remember_exchange(message, "".join(full_response))
+        
+        except Exception as e:
+            error_msg = f"Error generating streaming response: {str(e)}"
+            print(f"❌ {error_msg}")
+            yield error_msg
+    
     def format_memory_for_display(self, memories: List[Dict]) -> str:
         """Format memories for display to the user."""
         if not memories:
@@ -1,6 +1,6 @@
 """LlamaIndex-based RAG pipeline for advanced memory retrieval."""
 
-from typing import List, Dict, Optional
+from typing import Any, Callable, List, Dict, Optional, Tuple
 from llama_index.core import (
     VectorStoreIndex,
     Document,
@@ -12,12 +12,36 @@ from llama_index.vector_stores.chroma import ChromaVectorStore
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.llms.openai import OpenAI
 from llama_index.core.memory import ChatMemoryBuffer
-from llama_index.core.chat_engine import CondensePlusContextChatEngine
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
 import chromadb
 from datetime import datetime
 
+from .condense import CONDENSE_MODES, CondenseStats, SelectiveCondenseChatEngine, needs_context
 from .config import Config
 from .device_utils import get_torch_device, get_device
+from .document_ingestion import ingest_paths, manifest_path
+from .index_params import hnsw_metadata, read_params
+
+
+class RouterRetriever(BaseRetriever):
+    """LlamaIndex retriever over a RetrievalRouter: memories, documents or both, fused."""
+    
+    def __init__(self, router, top_k: int = None):
+        super().__init__()
+        self.router = router
+        self.top_k = top_k or Config.MEMORY_CONTEXT_SIZE
+    
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        nodes = []
+        for result in self.router.retrieve(query_bundle.query_str, n_results=self.top_k):
+            # Only the corpus and time reach the prompt, not the memory store's NLP metadata
+            metadata = {"corpus": result["source"]}
+            if result["metadata"].get("timestamp"):
+                metadata["timestamp"] = result["metadata"]["timestamp"]
+            node = TextNode(id_=result["id"], text=result["content"], metadata=metadata)
+            nodes.append(NodeWithScore(node=node, score=result["fused_score"]))
+        return nodes
 
 
 class LlamaIndexRAG:
@@ -26,8 +50,21 @@ class LlamaIndexRAG:
     for sophisticated memory retrieval and context generation.
     """
     
-    def __init__(self, chroma_client: chromadb.PersistentClient, collection_name: str):
-        """Initialize LlamaIndex RAG components."""
+    def __init__(self, chroma_client: chromadb.PersistentClient, collection_name: str = None):
+        """
+        Initialize LlamaIndex RAG components.
+        
+        Args:
+            chroma_client: ChromaDB client
+            collection_name: Document collection (default: RAG_COLLECTION_NAME). Must not be
+                the memory collection: document chunks would be retrieved as memories.
+        """
+        collection_name = collection_name or Config.RAG_COLLECTION_NAME
+        if collection_name == Config.CHROMA_COLLECTION_NAME:
+            raise ValueError(
+                f"'{collection_name}' is the conversational memory collection; load documents into "
+                f"RAG_COLLECTION_NAME ('{Config.RAG_COLLECTION_NAME}') instead"
+            )
         print("🦙 Initializing LlamaIndex RAG...")
         
         # Get device info
@@ -38,8 +75,11 @@ class LlamaIndexRAG:
         # Configure LlamaIndex settings with proper device
         Settings.embed_model = HuggingFaceEmbedding(
             model_name=Config.EMBEDDING_MODEL,
-            device=torch_device
+            device=torch_device,
+            embed_batch_size=Config.EMBEDDING_BATCH_SIZE
         )
+        Settings.chunk_size = Config.RAG_CHUNK_SIZE
+        Settings.chunk_overlap = Config.RAG_CHUNK_OVERLAP
         
         backend = Config.LLM_BACKEND.lower()
         
@@ -62,10 +102,18 @@ class LlamaIndexRAG:
             )
             print(f"   Using OpenRouter model: {Config.OPENROUTER_MODEL}")
         
-        # Get ChromaDB collection
+        # Get ChromaDB collection (new ones use the memory collections' cosine space and HNSW parameters)
         self.chroma_collection = chroma_client.get_or_create_collection(
-            name=collection_name
+            name=collection_name,
+            metadata={"description": "Documents for RAG", **hnsw_metadata()}
         )
+        self.router_retriever = None
+        # Retriever, query engine and chat engine with the configuration each was built for (see _engine())
+        self._engines: Dict[str, Tuple[tuple, Any]] = {}
+        self.engine_builds = 0
+        # Whether a follow-up needs condensing (RAG_CONDENSE=auto); use_analyzer() adds spaCy parsing
+        self.context_check: Callable[[str], bool] = needs_context
+        self.condense_stats = CondenseStats()
         
         # Create ChromaDB vector store
         self.vector_store = ChromaVectorStore(
@@ -122,6 +170,22 @@ class LlamaIndexRAG:
             "Rephrase the follow-up question to be a standalone question."
         )
     
+    def _engine(self, kind: str, config: tuple, build: Callable[[], Any]) -> Any:
+        """
+        The retriever or engine of a kind, built on first use and reused.
+        
+        Engines only hold configuration and references (index, LLM, chat memory),
+        so one instance serves every turn. It is rebuilt when its configuration
+        (top_k, streaming, the LLM) differs from the one it was built for.
+        """
+        cached = self._engines.get(kind)
+        if cached is not None and cached[0] == config:
+            return cached[1]
+        engine = build()
+        self._engines[kind] = (config, engine)
+        self.engine_builds += 1
+        return engine
+    
     def add_memory(
         self,
         content: str,
@@ -155,63 +219,61 @@ class LlamaIndexRAG:
     def load_documents_from_files(
         self,
         file_paths: List[str],
-        metadata: Optional[Dict] = None
+        metadata: Optional[Dict] = None,
+        recursive: bool = False
     ) -> int:
         """
         Load documents from files into the RAG index.
         
         Supports: .txt, .md, .pdf, .docx (if dependencies installed)
+        Unchanged files are skipped; see ingest() for details.
         
         Args:
-            file_paths: List of file paths to load
+            file_paths: List of file or directory paths to load
             metadata: Additional metadata to add to all documents
+            recursive: Include subdirectories of directories
+            
+        Returns:
+            Number of new or changed files loaded
+        """
+        report = self.ingest(file_paths, metadata=metadata, recursive=recursive)
+        return report["files_new"] + report["files_changed"] - report["files_failed"]
+    
+    def ingest(
+        self,
+        file_paths: List[str],
+        metadata: Optional[Dict] = None,
+        recursive: bool = False,
+        workers: int = None,
+        progress: bool = True
+    ) -> Dict:
+        """
+        Incrementally ingest files and directories (see document_ingestion.py).
+        
+        New and changed files are parsed and chunked in parallel, embedded in
+        batches and written in bulk; chunks of changed and deleted files are
+        replaced or removed, and unchanged files are skipped.
+        
+        Args:
+            file_paths: Files and directories
+            metadata: Additional metadata for every chunk
+            recursive: Include subdirectories of directories
+            workers: Parser processes (default: RAG_INGEST_WORKERS)
+            progress: Print one line per file
             
         Returns:
-            Number of documents successfully loaded
+            ingest_paths() report (file and chunk counts, files_per_s, chunks_per_s)
         """
-        from llama_index.core import SimpleDirectoryReader
-        from pathlib import Path
-        
-        loaded_count = 0
-        
-        for file_path in file_paths:
-            try:
-                path = Path(file_path)
-                if not path.exists():
-                    print(f"⚠️  File not found: {file_path}")
-                    continue
-                
-                # Load document
-                if path.is_file():
-                    documents = SimpleDirectoryReader(
-                        input_files=[str(path)]
-                    ).load_data()
-                elif path.is_dir():
-                    documents = SimpleDirectoryReader(
-                        input_dir=str(path)
-                    ).load_data()
-                else:
-                    print(f"⚠️  Invalid path: {file_path}")
-                    continue
-                
-                # Add metadata
-                for doc in documents:
-                    doc.metadata["source"] = str(file_path)
-                    doc.metadata["loaded_at"] = datetime.now().isoformat()
-                    if metadata:
-                        doc.metadata.update(metadata)
-                
-                # Insert into index
-                for doc in documents:
-                    self.index.insert(doc)
-                    loaded_count += 1
-                
-                print(f"✅ Loaded {len(documents)} document(s) from {path.name}")
-                
-            except Exception as e:
-                print(f"❌ Failed to load {file_path}: {e}")
-        
-        return loaded_count
+        return ingest_paths(
+            self.vector_store,
+            Settings.embed_model,
+            file_paths,
+            manifest_path(self.chroma_collection.name),
+            metadata=metadata,
+            recursive=recursive,
+            workers=workers,
+            progress=progress
+        )
     
     def query(
         self,
@@ -233,11 +295,13 @@ class LlamaIndexRAG:
         if top_k is None:
             top_k = Config.MEMORY_CONTEXT_SIZE
         
-        # Create query engine
-        query_engine = self.index.as_query_engine(
-            similarity_top_k=top_k,
-            text_qa_template=self.context_prompt,
-            streaming=stream
+        query_engine = self._engine(
+            "query", (top_k, stream, id(Settings.llm)),
+            lambda: self.index.as_query_engine(
+                similarity_top_k=top_k,
+                text_qa_template=self.context_prompt,
+                streaming=stream
+            )
         )
         
         # Execute query
@@ -263,24 +327,42 @@ class LlamaIndexRAG:
         Yields:
             Response chunks or complete response
         """
-        # Create chat engine with context
-        chat_engine = self.index.as_chat_engine(
-            chat_mode="condense_plus_context",
-            memory=self.chat_memory,
-            context_prompt=self.context_prompt,
-            condense_prompt=self.condense_prompt,
-            streaming=stream,
-            similarity_top_k=Config.MEMORY_CONTEXT_SIZE
+        chat_engine = self._engine(
+            "chat", (Config.MEMORY_CONTEXT_SIZE, Config.RAG_CONDENSE, id(Settings.llm)),
+            self._build_chat_engine
         )
         
-        # Get response
-        response = chat_engine.chat(message)
-        
+        # Get response (chat() responses have no token generator; stream_chat() does)
         if stream:
+            response = chat_engine.stream_chat(message)
             for chunk in response.response_gen:
                 yield chunk
         else:
-            yield response.response
+            yield chat_engine.chat(message).response
+    
+    def _build_chat_engine(self) -> SelectiveCondenseChatEngine:
+        """
+        Chat engine with context (routed across memories and documents if a router is set).
+        
+        Follow-ups are condensed into standalone questions per RAG_CONDENSE;
+        with "auto", only those context_check() says refer back to the conversation.
+        """
+        mode = Config.RAG_CONDENSE
+        if mode not in CONDENSE_MODES:
+            raise ValueError(f"Unknown RAG_CONDENSE '{mode}' (expected one of {', '.join(CONDENSE_MODES)})")
+        retriever = self.router_retriever or self.index.as_retriever(similarity_top_k=Config.MEMORY_CONTEXT_SIZE)
+        chat_engine = SelectiveCondenseChatEngine.from_defaults(
+            retriever=retriever,
+            llm=Settings.llm,
+            memory=self.chat_memory,
+            context_prompt=self.context_prompt,
+            condense_prompt=self.condense_prompt,
+            skip_condense=mode == "never"
+        )
+        if mode == "auto":
+            chat_engine.needs_context = lambda message: self.context_check(message)
+        chat_engine.condense_stats = self.condense_stats
+        return chat_engine
     
     def retrieve_relevant_context(
         self,
@@ -300,12 +382,13 @@ class LlamaIndexRAG:
         if top_k is None:
             top_k = Config.MEMORY_CONTEXT_SIZE
         
-        retriever = self.index.as_retriever(similarity_top_k=top_k)
+        retriever = self._engine("retriever", (top_k,), lambda: self.index.as_retriever(similarity_top_k=top_k))
         nodes = retriever.retrieve(query)
         
         results = []
         for node in nodes:
             results.append({
+                "id": node.node_id,
                 "content": node.text,
                 "metadata": node.metadata,
                 "score": node.score
@@ -313,6 +396,30 @@ class LlamaIndexRAG:
         
         return results
     
+    @property
+    def space(self) -> str:
+        """Distance metric of the document collection ("cosine", "l2" or "ip")."""
+        return read_params(self.chroma_collection)["space"]
+    
+    def use_router(self, router):
+        """
+        Retrieve chat context through a RetrievalRouter (memories, documents or both).
+        
+        Args:
+            router: RetrievalRouter built with this RAG as its document corpus
+        """
+        self.router_retriever = RouterRetriever(router)
+        self._engines.clear()
+    
+    def use_analyzer(self, analyzer):
+        """
+        Decide which follow-ups to condense with an NLPAnalyzer's parser.
+        
+        Args:
+            analyzer: Loaded NLPAnalyzer (its spaCy model tags pronouns and verbs)
+        """
+        self.context_check = analyzer.needs_context
+    
     def clear_chat_history(self):
         """Clear the chat memory."""
         self.chat_memory.reset()
@@ -322,6 +429,10 @@ class LlamaIndexRAG:
         """Get statistics about the RAG system."""
         return {
             "total_documents": len(self.index.docstore.docs),
+            "total_chunks": self.chroma_collection.count(),
+            "collection": self.chroma_collection.name,
+            "engine_builds": self.engine_builds,
+            "condense": self.condense_stats.snapshot(),
             "embedding_model": Config.EMBEDDING_MODEL,
             "llm_model": Config.OPENROUTER_MODEL
         }
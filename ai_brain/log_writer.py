@@ -0,0 +1,390 @@
+"""Background log writer with batching, segment rotation, compression and retention."""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config import Config
+
+try:
+    import zstandard
+except ImportError:  # Compression is skipped if zstandard is unavailable
+    zstandard = None
+
+
+class RotatingLogFile:
+    """
+    A text log split into numbered segments.
+
+    Segments are named ``<prefix>_<seq><suffix>`` (``.log`` by default). A segment is closed once it
+    exceeds ``max_bytes`` or has been open longer than ``max_age`` seconds;
+    closed segments are compressed to ``<suffix>.zst`` and old ones are pruned
+    according to the retention policy.
+
+    Not thread-safe: only the BackgroundLogWriter thread touches it.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        prefix: str,
+        suffix: str = ".log",
+        max_bytes: Optional[int] = None,
+        max_age: Optional[float] = None,
+        compress: Optional[bool] = None,
+        retention_days: Optional[float] = None,
+        retention_max_bytes: Optional[int] = None
+    ):
+        """
+        Args:
+            directory: Directory holding the segments
+            prefix: Segment name prefix (e.g. "prompts_<session>")
+            suffix: Segment file extension
+            max_bytes: Rotate once a segment reaches this size (0 = never)
+            max_age: Rotate once a segment is this many seconds old (0 = never)
+            compress: Compress closed segments with zstandard
+            retention_days: Delete closed segments older than this (0 = keep)
+            retention_max_bytes: Keep closed segments under this total size (0 = no cap)
+        """
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.suffix = suffix
+        self.max_bytes = int(Config.LOG_ROTATE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.max_age = Config.LOG_ROTATE_INTERVAL_HOURS * 3600 if max_age is None else max_age
+        self.compress = Config.LOG_COMPRESS if compress is None else compress
+        self.retention_days = Config.LOG_RETENTION_DAYS if retention_days is None else retention_days
+        self.retention_max_bytes = (
+            int(Config.LOG_RETENTION_MAX_MB * 1024 * 1024) if retention_max_bytes is None else retention_max_bytes
+        )
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._file = None
+        self._path: Optional[Path] = None
+        self._opened_at = 0.0
+        self._size = 0
+        self._seq = self._next_seq()
+        self.rotations = 0
+
+    def _next_seq(self) -> int:
+        """Continue numbering after any segments left by an earlier run."""
+        seqs = []
+        for path in self.directory.glob(f"{self.prefix}_*{self.suffix}*"):
+            tail = path.name[len(self.prefix) + 1:].split(".", 1)[0]
+            if tail.isdigit():
+                seqs.append(int(tail))
+        return max(seqs) + 1 if seqs else 1
+
+    @property
+    def current_path(self) -> Optional[Path]:
+        """Path of the open segment, if any."""
+        return self._path
+
+    def write(self, text: str):
+        """Append text to the current segment, rotating first if it is due."""
+        self.rotate_if_due()
+        if self._file is None:
+            self._open_segment()
+        data = text.encode("utf-8")
+        self._file.write(data)
+        self._size += len(data)
+
+    def rotate_if_due(self) -> bool:
+        """
+        Rotate the current segment if it is over its size or age limit.
+        
+        Returns:
+            True if a segment was closed (the next write starts a new one)
+        """
+        if self._file is not None and self._rotation_due():
+            self.rotate()
+            return True
+        return False
+
+    def _rotation_due(self) -> bool:
+        if self.max_bytes and self._size >= self.max_bytes:
+            return True
+        if self.max_age and time.time() - self._opened_at >= self.max_age:
+            return True
+        return False
+
+    def _open_segment(self):
+        self._path = self.directory / f"{self.prefix}_{self._seq:04d}{self.suffix}"
+        self._file = open(self._path, "ab")
+        self._opened_at = time.time()
+        self._size = self._path.stat().st_size
+
+    def flush(self):
+        """Flush buffered bytes to the OS."""
+        if self._file is not None:
+            self._file.flush()
+
+    def rotate(self):
+        """Close the current segment, compress it and apply retention."""
+        closed = self._close_segment()
+        if closed is None:
+            return
+        self._seq += 1
+        self.rotations += 1
+        if self.compress:
+            compress_segment(closed)
+        self.apply_retention()
+
+    def close(self):
+        """Close the current segment (it is compressed like any rotated segment)."""
+        closed = self._close_segment()
+        if closed is not None and self.compress:
+            compress_segment(closed)
+
+    def _close_segment(self) -> Optional[Path]:
+        if self._file is None:
+            return None
+        self._file.close()
+        closed = self._path
+        self._file = None
+        self._path = None
+        if closed.stat().st_size == 0:
+            closed.unlink()
+            return None
+        return closed
+
+    def apply_retention(self):
+        """
+        Delete closed segments past the age limit, then the oldest ones until
+        the directory's closed segments fit the size cap. Uncompressed segments
+        left behind by other runs are compressed first.
+        """
+        segments = []
+        for path in self.directory.glob(f"*{self.suffix}*"):
+            if path == self._path or path.suffix not in (self.suffix, ".zst"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if path.suffix == self.suffix:
+                # Only touch plain segments no writer could still be appending to
+                if not self.compress or not self.max_age or time.time() - stat.st_mtime < self.max_age:
+                    continue
+                path = compress_segment(path)
+                if path is None:
+                    continue
+                stat = path.stat()
+            segments.append((stat.st_mtime, stat.st_size, path))
+
+        segments.sort()
+        if self.retention_days:
+            cutoff = (datetime.now() - timedelta(days=self.retention_days)).timestamp()
+            while segments and segments[0][0] < cutoff:
+                _remove_quietly(segments.pop(0)[2])
+
+        if self.retention_max_bytes:
+            total = sum(size for _, size, _ in segments)
+            while segments and total > self.retention_max_bytes:
+                _, size, path = segments.pop(0)
+                _remove_quietly(path)
+                total -= size
+
+
+def compress_segment(path: Path) -> Optional[Path]:
+    """
+    Compress a closed segment to ``<name>.zst`` and remove the original.
+
+    Returns the compressed path, or the original path when zstandard is not
+    installed (None if the file disappeared in the meantime).
+    """
+    if zstandard is None:
+        return path
+    target = path.with_name(path.name + ".zst")
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        compressor = zstandard.ZstdCompressor(level=Config.LOG_COMPRESSION_LEVEL)
+        with open(path, "rb") as src, open(tmp, "wb") as dst:
+            compressor.copy_stream(src, dst)
+        os.replace(tmp, target)
+        path.unlink()
+        return target
+    except FileNotFoundError:
+        _remove_quietly(tmp)
+        return None
+
+
+def read_segment(path: Path) -> str:
+    """Read a log segment, decompressing ``.zst`` segments transparently."""
+    path = Path(path)
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read compressed log segments")
+        with open(path, "rb") as f:
+            return zstandard.ZstdDecompressor().stream_reader(f).read().decode("utf-8")
+    return path.read_text(encoding="utf-8")
+
+
+def _remove_quietly(path: Path):
+    try:
+        path.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class BackgroundLogWriter:
+    """
+    Write log records on a dedicated thread so logging never blocks a turn.
+
+    Callers ``submit()`` a record for a sink; the writer thread drains the
+    queue in batches, hands each sink its records in one ``write_batch()``
+    call and then ``flush()``es it. When the queue is full, records are
+    dropped (and counted) instead of blocking the caller.
+
+    A sink is any object with ``write_batch(records)``, ``flush()`` and
+    ``close()`` methods.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            queue_size: Maximum queued records before new ones are dropped
+            batch_size: Maximum records written per batch
+            flush_interval: Seconds to wait collecting a batch before flushing
+        """
+        self.batch_size = batch_size or Config.LOG_BATCH_SIZE
+        self.flush_interval = Config.LOG_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size or Config.LOG_QUEUE_SIZE)
+        self._sinks: List[Any] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.stats: Dict[str, int] = {"submitted": 0, "written": 0, "dropped": 0, "batches": 0, "errors": 0}
+
+        self._thread = threading.Thread(target=self._run, name="ai_brain_log_writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, sink: Any, record: Any) -> bool:
+        """
+        Queue a record for a sink without blocking.
+
+        Returns:
+            False if the record was dropped (queue full or writer closed)
+        """
+        if self._closed:
+            self.stats["dropped"] += 1
+            return False
+        with self._lock:
+            if sink not in self._sinks:
+                self._sinks.append(sink)
+            try:
+                self._queue.put_nowait((sink, record))
+            except queue.Full:
+                self.stats["dropped"] += 1
+                return False
+            self.stats["submitted"] += 1
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every record queued so far has been written.
+
+        Returns:
+            False if the timeout expired first
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put((None, done), timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def close(self, timeout: Optional[float] = 10.0):
+        """Write everything still queued, close all sinks and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._queue.put((None, self._STOP))
+        self._thread.join(timeout)
+        with self._lock:
+            sinks, self._sinks = self._sinks, []
+        for sink in sinks:
+            try:
+                sink.close()
+            except Exception as e:
+                print(f"⚠️  Failed to close log sink: {e}")
+
+    def _run(self):
+        while True:
+            batch, markers, stop = self._collect_batch()
+            self._write_batch(batch)
+            for marker in markers:
+                marker.set()
+            if stop:
+                return
+
+    def _collect_batch(self) -> Tuple[List[Tuple[Any, Any]], List[threading.Event], bool]:
+        """Wait for one record, then gather more until the batch is full or the interval passes."""
+        batch: List[Tuple[Any, Any]] = []
+        markers: List[threading.Event] = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            sink, record = item
+            if sink is None:
+                if record is self._STOP:
+                    return batch, markers, True
+                markers.append(record)
+                # A flush request ends the batch so the caller is not kept waiting
+                return batch, markers, False
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, markers, False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, markers, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, markers, False
+
+    def _write_batch(self, batch: List[Tuple[Any, Any]]):
+        if not batch:
+            return
+        grouped: Dict[int, Tuple[Any, List[Any]]] = {}
+        for sink, record in batch:
+            grouped.setdefault(id(sink), (sink, []))[1].append(record)
+
+        for sink, records in grouped.values():
+            try:
+                sink.write_batch(records)
+                sink.flush()
+                self.stats["written"] += len(records)
+            except Exception as e:
+                self.stats["errors"] += 1
+                print(f"⚠️  Background log write failed: {e}")
+        self.stats["batches"] += 1
+
+
+class CallbackSink:
+    """Adapt plain callables to the sink interface expected by BackgroundLogWriter."""
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[Any]], None],
+        flush: Optional[Callable[[], None]] = None,
+        close: Optional[Callable[[], None]] = None
+    ):
+        self.write_batch = write_batch
+        self.flush = flush or (lambda: None)
+        self.close = close or (lambda: None)
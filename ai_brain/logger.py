@@ -1,20 +1,37 @@
 """Logging utilities for conversation and system prompt tracking."""
 
 import json
+import os
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
+
+from .config import Config
+from .log_writer import BackgroundLogWriter, CallbackSink, RotatingLogFile
+from .prompt_store import PromptStore
 
 
 class ConversationLogger:
     """Log conversations and system prompts for debugging and analysis."""
     
-    def __init__(self, logs_dir: str = "logs"):
+    def __init__(
+        self,
+        logs_dir: str = "logs",
+        fsync_policy: Optional[str] = None,
+        background: Optional[bool] = None
+    ):
         """
         Initialize the logger.
         
         Args:
             logs_dir: Directory to store log files
+            fsync_policy: "always" (fsync every turn), "interval" (at most every
+                LOG_FSYNC_INTERVAL seconds) or "never" (leave it to the OS).
+                Defaults to Config.LOG_FSYNC.
+            background: Write logs on a background thread (batched) instead of
+                in the caller. Defaults to Config.LOG_BACKGROUND_WRITER.
         """
         self.logs_dir = Path(logs_dir)
         self.conversations_dir = self.logs_dir / "conversations"
@@ -28,6 +45,34 @@ class ConversationLogger:
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.conversation_log: List[Dict[str, Any]] = []
         
+        # Append-only JSONL conversation log (opened on first turn)
+        self.fsync_policy = (fsync_policy or Config.LOG_FSYNC).lower()
+        self._conversation_file = None
+        self._last_fsync = 0.0
+        self._write_lock = threading.Lock()
+        
+        # System prompts go to rotating, compressed segments (opened on first prompt):
+        # a deduplicating PromptStore, or plain text when PROMPT_LOG_FORMAT=text
+        self.prompt_log_format = Config.PROMPT_LOG_FORMAT.lower()
+        self._prompt_store: Optional[PromptStore] = None
+        self._prompt_log: Optional[RotatingLogFile] = None
+        
+        # Background writer: turns and prompts are queued and written in batches
+        use_background = Config.LOG_BACKGROUND_WRITER if background is None else background
+        self._writer: Optional[BackgroundLogWriter] = None
+        if use_background:
+            self._writer = BackgroundLogWriter()
+            self._conversation_sink = CallbackSink(
+                write_batch=self._write_turns,
+                flush=self._sync_conversation_file,
+                close=self._close_conversation_file
+            )
+            self._prompt_sink = CallbackSink(
+                write_batch=self._write_prompts,
+                flush=self._flush_prompt_log,
+                close=self._close_prompt_log
+            )
+        
     def log_conversation_turn(
         self,
         user_message: str,
@@ -51,32 +96,109 @@ class ConversationLogger:
         
         self.conversation_log.append(turn)
         
-        # Append to JSON file
-        conversation_file = self.conversations_dir / f"conversation_{self.session_id}.json"
-        
+        # Append one JSON line; the full-session JSON shape is rebuilt on
+        # demand by read_conversation_log()
+        if self._writer is not None:
+            self._writer.submit(self._conversation_sink, turn)
+            return
         try:
-            # Read existing data
-            if conversation_file.exists():
-                with open(conversation_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            else:
-                data = {
-                    "session_id": self.session_id,
-                    "started_at": turn["timestamp"],
-                    "turns": []
-                }
-            
-            # Append new turn
-            data["turns"].append(turn)
-            data["last_updated"] = turn["timestamp"]
-            
-            # Write back
-            with open(conversation_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-                
+            self._write_turns([turn])
+            self._sync_conversation_file()
         except Exception as e:
             print(f"⚠️  Failed to log conversation turn: {e}")
     
+    def _write_turns(self, turns: List[Dict[str, Any]]):
+        """Append turn records to the session's JSONL log."""
+        with self._write_lock:
+            if self._conversation_file is None:
+                self._open_conversation_file(turns[0]["timestamp"])
+            for turn in turns:
+                self._append_record({"record": "turn", **turn})
+    
+    def _open_conversation_file(self, started_at: str):
+        """Open the session's JSONL log for appending, writing the header on first use."""
+        path = self.conversations_dir / f"conversation_{self.session_id}.jsonl"
+        is_new = not path.exists() or path.stat().st_size == 0
+        needs_newline = False
+        if not is_new:
+            # Terminate a line left partial by a crash so the next record stays parseable
+            with open(path, 'rb') as existing:
+                existing.seek(-1, os.SEEK_END)
+                needs_newline = existing.read(1) != b"\n"
+        
+        self._conversation_file = open(path, 'a', encoding='utf-8')
+        if needs_newline:
+            self._conversation_file.write("\n")
+        if is_new:
+            self._append_record({
+                "record": "session",
+                "session_id": self.session_id,
+                "started_at": started_at
+            })
+    
+    def _append_record(self, record: Dict[str, Any]):
+        """Append a single JSON line (buffered until the next sync)."""
+        self._conversation_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    def _sync_conversation_file(self):
+        """Flush the conversation log and apply the fsync policy."""
+        with self._write_lock:
+            f = self._conversation_file
+            if f is None:
+                return
+            f.flush()
+            
+            if self.fsync_policy == "always":
+                os.fsync(f.fileno())
+            elif self.fsync_policy == "interval":
+                now = time.monotonic()
+                if now - self._last_fsync >= Config.LOG_FSYNC_INTERVAL:
+                    os.fsync(f.fileno())
+                    self._last_fsync = now
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all queued log records are written (no-op without a background writer).
+        
+        Returns:
+            False if the timeout expired first
+        """
+        if self._writer is not None:
+            return self._writer.flush(timeout)
+        return True
+    
+    def close(self):
+        """Write pending records, then flush, fsync and close all log files."""
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            self._close_conversation_file()
+            self._close_prompt_log()
+    
+    def _close_conversation_file(self):
+        with self._write_lock:
+            if self._conversation_file is not None:
+                try:
+                    self._conversation_file.flush()
+                    if self.fsync_policy != "never":
+                        os.fsync(self._conversation_file.fileno())
+                finally:
+                    self._conversation_file.close()
+                    self._conversation_file = None
+    
+    def get_writer_stats(self) -> Dict[str, int]:
+        """Counters from the background writer (submitted, written, dropped, ...)."""
+        if self._writer is None:
+            return {}
+        stats = dict(self._writer.stats)
+        stats["queued"] = self._writer.stats["submitted"] - self._writer.stats["written"]
+        if self._prompt_store is not None:
+            stats["prompt_rotations"] = self._prompt_store.log.rotations
+            stats.update(self._prompt_store.stats)
+        elif self._prompt_log is not None:
+            stats["prompt_rotations"] = self._prompt_log.rotations
+        return stats
+    
     def log_system_prompt(
         self,
         prompt: str,
@@ -86,32 +208,67 @@ class ConversationLogger:
         """
         Log a system prompt for debugging.
         
+        The entry is encoded and written by the background writer, into
+        ``prompts/prompts_<session>_<seq>.jsonl`` segments (deduplicated, see
+        PromptStore; ``.log`` text when PROMPT_LOG_FORMAT=text) that rotate by
+        size and age and are compressed once closed.
+        
         Args:
             prompt: The full system prompt
             context_type: Type of context (e.g., 'langchain', 'basic', 'rag')
             metadata: Additional metadata about the prompt
         """
-        timestamp = datetime.now()
-        prompt_file = self.prompts_dir / f"prompts_{self.session_id}.log"
+        entry = (datetime.now(), prompt, context_type, metadata)
+        if self._writer is not None:
+            self._writer.submit(self._prompt_sink, entry)
+            return
         
         try:
-            with open(prompt_file, 'a', encoding='utf-8') as f:
-                f.write(f"\n{'='*80}\n")
-                f.write(f"Timestamp: {timestamp.isoformat()}\n")
-                f.write(f"Context Type: {context_type}\n")
-                
-                if metadata:
-                    f.write(f"Metadata: {json.dumps(metadata, indent=2)}\n")
-                
-                f.write(f"{'-'*80}\n")
-                f.write("SYSTEM PROMPT:\n")
-                f.write(f"{'-'*80}\n")
-                f.write(prompt)
-                f.write(f"\n{'='*80}\n\n")
-                
+            self._write_prompts([entry])
+            self._flush_prompt_log()
         except Exception as e:
             print(f"⚠️  Failed to log system prompt: {e}")
     
+    def _write_prompts(self, entries: List[tuple]):
+        """Encode prompt entries and append them to the rotating prompt log."""
+        if self.prompt_log_format != "text":
+            if self._prompt_store is None:
+                self._prompt_store = PromptStore(self.prompts_dir, self.session_id)
+            self._prompt_store.write_batch(entries)
+            return
+        
+        if self._prompt_log is None:
+            self._prompt_log = RotatingLogFile(self.prompts_dir, f"prompts_{self.session_id}")
+        
+        for timestamp, prompt, context_type, metadata in entries:
+            parts = [
+                f"\n{'='*80}\n",
+                f"Timestamp: {timestamp.isoformat()}\n",
+                f"Context Type: {context_type}\n"
+            ]
+            if metadata:
+                parts.append(f"Metadata: {json.dumps(metadata, indent=2)}\n")
+            parts.extend([
+                f"{'-'*80}\n",
+                "SYSTEM PROMPT:\n",
+                f"{'-'*80}\n",
+                prompt,
+                f"\n{'='*80}\n\n"
+            ])
+            self._prompt_log.write("".join(parts))
+    
+    def _flush_prompt_log(self):
+        if self._prompt_store is not None:
+            self._prompt_store.flush()
+        if self._prompt_log is not None:
+            self._prompt_log.flush()
+    
+    def _close_prompt_log(self):
+        if self._prompt_store is not None:
+            self._prompt_store.close()
+        if self._prompt_log is not None:
+            self._prompt_log.close()
+    
     def save_session_summary(self, summary_data: Optional[Dict[str, Any]] = None):
         """
         Save a summary of the current session.
@@ -160,4 +317,80 @@ def get_logger() -> ConversationLogger:
 def reset_logger():
     """Reset the global logger (useful for new sessions)."""
     global _logger
+    if _logger is not None:
+        _logger.close()
     _logger = None
+
+
+def read_conversation_log(path: Union[str, Path]) -> Dict[str, Any]:
+    """
+    Reconstruct a session's conversation log as a single JSON object.
+    
+    Reads the append-only ``conversation_<session>.jsonl`` format (or a legacy
+    ``.json`` file) and returns the familiar shape:
+    {"session_id", "started_at", "last_updated", "turns": [...]}
+    
+    A truncated final line (e.g. from a crash mid-write) is skipped.
+    """
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
+    data: Dict[str, Any] = {"session_id": None, "started_at": None, "turns": []}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️  Skipping corrupt line {line_number} in {path.name}")
+                continue
+            
+            kind = record.pop("record", "turn")
+            if kind == "session":
+                data["session_id"] = record.get("session_id")
+                data["started_at"] = record.get("started_at")
+            else:
+                data["turns"].append(record)
+    
+    if data["session_id"] is None:
+        data["session_id"] = path.stem.replace("conversation_", "", 1)
+    if data["started_at"] is None and data["turns"]:
+        data["started_at"] = data["turns"][0].get("timestamp")
+    if data["turns"]:
+        data["last_updated"] = data["turns"][-1].get("timestamp")
+    return data
+
+
+def convert_legacy_log(json_path: Union[str, Path], remove_original: bool = False) -> Path:
+    """
+    Convert a legacy ``conversation_<session>.json`` log to the JSONL format.
+    
+    The JSONL file is written next to the original (via a temp file and an
+    atomic rename). Returns the path of the new file.
+    """
+    json_path = Path(json_path)
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    
+    jsonl_path = json_path.with_suffix(".jsonl")
+    tmp_path = jsonl_path.with_suffix(".jsonl.tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        header = {
+            "record": "session",
+            "session_id": data.get("session_id", json_path.stem.replace("conversation_", "", 1)),
+            "started_at": data.get("started_at")
+        }
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for turn in data.get("turns", []):
+            f.write(json.dumps({"record": "turn", **turn}, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, jsonl_path)
+    
+    if remove_original:
+        json_path.unlink()
+    return jsonl_path
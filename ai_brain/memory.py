@@ -1,13 +1,26 @@
-"""Memory management using ChromaDB for persistent vector storage."""
+"""Memory management using ChromaDB (or the local vector engine) for persistent vector storage."""
 
-import chromadb
-from chromadb.config import Settings
+import asyncio
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
+from collections import OrderedDict
 from datetime import datetime
+import hashlib
+import threading
+import time
 import uuid
 
 from .config import Config
+from .async_utils import run_model_call, run_io_call
+from .tracing import span, traced
+from .index_params import hnsw_metadata, param_drift, read_params, set_search_ef
+from .migration import read_checkpoint
+from .reembedding import (
+    EMBEDDING_MODEL_KEY, EmbeddingModelMismatch, ReEmbedder, finish_pending, record_model, recorded_model
+)
+from .hot_tier import HotTier
+from .scoring import access_tracking_enabled, created_at, importance_scores, mmr_select, scoring_enabled
+from .vector_backends import create_backend
 from .device_utils import get_torch_device, get_device
 
 
@@ -15,29 +28,26 @@ class MemoryStore:
     """Persistent memory store using ChromaDB with local embeddings."""
     
     def __init__(self):
-        """Initialize ChromaDB and embedding model."""
+        """Initialize the vector backend and embedding model."""
         print(f"🧠 Initializing memory store at {Config.CHROMA_PERSIST_DIR}...")
         
         # Create persist directory if it doesn't exist
         Config.CHROMA_PERSIST_DIR.mkdir(parents=True, exist_ok=True)
         
-        # Initialize ChromaDB with persistence
-        self.client = chromadb.PersistentClient(
-            path=str(Config.CHROMA_PERSIST_DIR),
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+        # Initialize the vector backend (ChromaDB or the local engine) with persistence
+        self.backend = create_backend()
         
         # Get or create collection with cosine distance for semantic similarity
-        self.collection = self.client.get_or_create_collection(
+        # and the configured HNSW parameters
+        self.collection = self.backend.get_or_create_collection(
             name=Config.CHROMA_COLLECTION_NAME,
             metadata={
                 "description": "AI Brain persistent memory",
-                "hnsw:space": "cosine"  # Use cosine similarity for embeddings
+                EMBEDDING_MODEL_KEY: Config.EMBEDDING_MODEL,
+                **hnsw_metadata()
             }
         )
+        self._check_index_params(self.collection)
         
         # Initialize embedding model with proper device
         print(f"🔮 Loading embedding model: {Config.EMBEDDING_MODEL}...")
@@ -47,15 +57,125 @@ class MemoryStore:
         torch_device = get_torch_device()
         self.embedding_model = SentenceTransformer(Config.EMBEDDING_MODEL, device=torch_device)
         
+        # Swap in collections re-embedded for this model (REEMBED_MODEL), then
+        # refuse to serve vectors from any other model
+        swapped = finish_pending(self.backend, self.embedding_model, Config.EMBEDDING_MODEL)
+        if Config.CHROMA_COLLECTION_NAME in swapped:
+            self.collection = self.backend.get_collection(Config.CHROMA_COLLECTION_NAME)
+        self._check_embedding_model(self.collection)
+        
+        # Namespace layout: "shared" keeps every tenant in one collection and
+        # filters by user_id; "per_user" gives each user their own collection
+        self.namespace_layout = Config.MEMORY_NAMESPACE_LAYOUT.lower()
+        
+        # LRU of open per-user collection handles
+        self._tenant_collections: "OrderedDict[str, Any]" = OrderedDict()
+        self._tenant_lock = threading.Lock()
+        
+        # Hot tier of recent memories (cosine only, like the collections it mirrors)
+        self.hot_tier: Optional[HotTier] = None
+        if Config.MEMORY_HOT_TIER_SIZE > 0:
+            if read_params(self.collection)["space"] == "cosine":
+                self.hot_tier = HotTier(Config.MEMORY_HOT_TIER_SIZE)
+                self._warm_hot_tier()
+            else:
+                print("⚠️  Hot tier disabled: collection does not use cosine distance")
+        
+        # Writes merged into an existing near-duplicate (MEMORY_DEDUP)
+        self.duplicates_merged = 0
+        
+        # Background re-embedding with the next embedding model, if one is configured
+        self.reembedder: Optional[ReEmbedder] = None
+        if Config.REEMBED_MODEL and Config.REEMBED_MODEL != Config.EMBEDDING_MODEL:
+            print(f"🔁 Re-embedding memories with {Config.REEMBED_MODEL} in the background")
+            self.reembedder = ReEmbedder(self.backend, Config.REEMBED_MODEL).start()
+        
         print(f"✅ Memory store initialized with {self.collection.count()} memories")
         print(f"   Using device: {device_desc}")
+        if self.backend.name != "chroma":
+            print(f"   Vector backend: {self.backend.name}")
+        if self.namespace_layout == "per_user":
+            print(f"   Namespace layout: collection per user (LRU of {Config.MEMORY_COLLECTION_CACHE_SIZE})")
+        if self.hot_tier is not None:
+            print(f"   Hot tier: {len(self.hot_tier)}/{self.hot_tier.capacity} recent memories in memory")
+    
+    @property
+    def chroma_client(self):
+        """ChromaDB client on the store's directory (the document RAG always uses Chroma)."""
+        return self.backend.chroma_client()
+    
+    def _check_index_params(self, collection, quiet: bool = False):
+        """
+        Compare a collection's HNSW parameters with Config.
+        
+        search_ef is applied in place; M, construction_ef and the distance
+        space only take effect when the index is rebuilt, so a drift there is
+        reported with the migration command.
+        
+        Args:
+            collection: Collection to check
+            quiet: Only apply search_ef, print nothing (per-user collections)
+        """
+        drift = param_drift(collection)
+        if "search_ef" in drift:
+            current, wanted = drift.pop("search_ef")
+            if set_search_ef(collection, wanted) and not quiet:
+                print(f"   HNSW search_ef: {current} → {wanted}")
+        if drift and not quiet:
+            changes = ", ".join(f"{name} {current} → {wanted}" for name, (current, wanted) in drift.items())
+            print(f"⚠️  Collection '{collection.name}' was built with different HNSW parameters ({changes}).")
+            print("   Run 'python -m scripts.migrate_to_cosine' to rebuild it with the configured ones.")
+        checkpoint = read_checkpoint(collection.name)
+        # Re-embedding shadows (REEMBED_MODEL) catch up with new memories; other migrations can't
+        if not quiet and checkpoint is not None and EMBEDDING_MODEL_KEY not in checkpoint["settings"]:
+            print(f"⚠️  Collection '{collection.name}' has an unfinished migration: new memories will stop it.")
+            print("   Stop the application and run 'python -m scripts.migrate_to_cosine' to finish it.")
     
+    def _check_embedding_model(self, collection):
+        """
+        Refuse a collection whose vectors come from another model than EMBEDDING_MODEL.
+        
+        Collections that predate the check (and empty ones) are stamped with
+        the configured model instead.
+        
+        Raises:
+            EmbeddingModelMismatch: The collection holds vectors from another model
+        """
+        recorded = recorded_model(collection)
+        if recorded == Config.EMBEDDING_MODEL:
+            return
+        if recorded is None or collection.count() == 0:
+            record_model(collection, Config.EMBEDDING_MODEL)
+            return
+        raise EmbeddingModelMismatch(
+            f"Collection '{collection.name}' holds vectors from {recorded}, but EMBEDDING_MODEL is "
+            f"{Config.EMBEDDING_MODEL}. Re-embed it first: run with EMBEDDING_MODEL={recorded} and "
+            f"REEMBED_MODEL={Config.EMBEDDING_MODEL}, or stop the application and run "
+            f"'python -m scripts.reembed_memories --model {Config.EMBEDDING_MODEL}'."
+        )
+    
+    def _warm_hot_tier(self):
+        """Load the newest memories of the main collection (insertion order) into the hot tier."""
+        count = self.collection.count()
+        if count == 0:
+            return
+        limit = min(self.hot_tier.capacity, count)
+        rows = self.collection.get(
+            offset=count - limit,
+            limit=limit,
+            include=["embeddings", "documents", "metadatas"]
+        )
+        self.hot_tier.add(self.collection.name, rows["ids"], rows["embeddings"], rows["documents"], rows["metadatas"])
+    
+    @traced("memory.add")
     def add_memory(
         self,
         content: str,
         memory_type: str = "conversation",
         metadata: Optional[Dict[str, Any]] = None,
-        enable_nlp: bool = True
+        enable_nlp: bool = True,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
     ) -> str:
         """
         Add a new memory to the store with optional NLP enrichment.
@@ -65,21 +185,17 @@ class MemoryStore:
             memory_type: Type of memory (conversation, fact, event, etc.)
             metadata: Additional metadata
             enable_nlp: Whether to perform NLP analysis for enrichment
+            user_id: Owner of the memory (selects the user's namespace)
+            session_id: Conversation session the memory belongs to
             
         Returns:
             Memory ID
         """
-        memory_id = str(uuid.uuid4())
-        
         # Generate embedding
-        embedding = self.embedding_model.encode(content).tolist()
+        embedding = self._encode(content)
         
         # Prepare base metadata
-        meta = {
-            "type": memory_type,
-            "timestamp": datetime.now().isoformat(),
-            **(metadata or {})
-        }
+        meta = self._build_metadata(memory_type, metadata, user_id, session_id)
         
         # Add NLP enrichment if enabled
         if enable_nlp:
@@ -92,22 +208,219 @@ class MemoryStore:
             except Exception as e:
                 print(f"⚠️  NLP enrichment failed: {e}")
         
-        # Store in ChromaDB
-        self.collection.add(
+        return self._store(content, embedding, meta, user_id)
+    
+    @traced("memory.add")
+    async def aadd_memory(
+        self,
+        content: str,
+        memory_type: str = "conversation",
+        metadata: Optional[Dict[str, Any]] = None,
+        enable_nlp: bool = True,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> str:
+        """
+        Async counterpart of add_memory().
+        
+        The embedding and NLP enrichment run concurrently on the bounded model
+        executor; the ChromaDB write runs on the I/O executor.
+        
+        Returns:
+            Memory ID
+        """
+        meta = self._build_metadata(memory_type, metadata, user_id, session_id)
+        embedding_task = run_model_call(self._encode, content)
+        
+        if enable_nlp:
+            from .nlp_analyzer import get_analyzer
+            role = metadata.get("role", "user") if metadata else "user"
+            results = await asyncio.gather(
+                embedding_task,
+                get_analyzer().aenrich(content, role=role),
+                return_exceptions=True
+            )
+            embedding, nlp_metadata = results
+            if isinstance(embedding, BaseException):
+                raise embedding
+            if isinstance(nlp_metadata, BaseException):
+                print(f"⚠️  NLP enrichment failed: {nlp_metadata}")
+            else:
+                meta.update(nlp_metadata)
+        else:
+            embedding = await embedding_task
+        
+        return await run_io_call(self._store, content, embedding, meta, user_id)
+    
+    @traced("memory.add_batch")
+    def add_memories(
+        self,
+        contents: List[str],
+        memory_type: str = "conversation",
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        embeddings: Optional[Sequence[Sequence[float]]] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        Add many memories at once (bulk import path).
+        
+        Embeddings are computed in batches of EMBEDDING_BATCH_SIZE (unless
+        precomputed ones are passed) and written with as few ChromaDB calls as
+        the client's max batch size allows. No NLP enrichment is done here;
+        pass already-enriched metadata instead.
+        
+        Args:
+            contents: Texts to remember
+            memory_type: Type of memory for every entry
+            metadatas: Per-entry metadata (same length as contents)
+            embeddings: Precomputed embeddings (same length as contents)
+            user_id: Owner of the memories (selects the user's namespace)
+            session_id: Conversation session the memories belong to
+        
+        Returns:
+            Memory IDs in input order
+        """
+        if not contents:
+            return []
+        if metadatas is not None and len(metadatas) != len(contents):
+            raise ValueError("metadatas must have one entry per content")
+        if embeddings is not None and len(embeddings) != len(contents):
+            raise ValueError("embeddings must have one entry per content")
+        
+        if embeddings is None:
+            with span("memory.embed", batch=len(contents)):
+                embeddings = self.embedding_model.encode(
+                    contents, batch_size=Config.EMBEDDING_BATCH_SIZE, show_progress_bar=False
+                )
+        if hasattr(embeddings, "tolist"):
+            embeddings = embeddings.tolist()
+        
+        metas = [
+            self._build_metadata(memory_type, metadatas[i] if metadatas else None, user_id, session_id)
+            for i in range(len(contents))
+        ]
+        ids = [str(uuid.uuid4()) for _ in contents]
+        
+        collection = self._collection_for(user_id)
+        max_batch = self.backend.get_max_batch_size()
+        with span("memory.write", batch=len(contents)):
+            for start in range(0, len(contents), max_batch):
+                end = start + max_batch
+                collection.add(
+                    ids=ids[start:end],
+                    embeddings=list(embeddings[start:end]),
+                    documents=list(contents[start:end]),
+                    metadatas=metas[start:end]
+                )
+        if self.hot_tier is not None:
+            self.hot_tier.add(collection.name, ids, embeddings, contents, metas)
+        
+        return ids
+    
+    @traced("memory.embed")
+    def _encode(self, text: str) -> List[float]:
+        """Encode text into an embedding vector."""
+        return self.embedding_model.encode(text).tolist()
+    
+    def _build_metadata(
+        self,
+        memory_type: str,
+        metadata: Optional[Dict[str, Any]],
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Build the base metadata stored with every memory."""
+        meta = {
+            "type": memory_type,
+            "timestamp": datetime.now().isoformat(),
+            **(metadata or {})
+        }
+        if "created_at" not in meta:
+            # Numeric copy of the timestamp so ranking never parses ISO strings
+            meta["created_at"] = created_at(meta)
+        if user_id is not None:
+            meta["user_id"] = user_id
+        if session_id is not None:
+            meta["session_id"] = session_id
+        return meta
+    
+    @traced("memory.write")
+    def _store(
+        self,
+        content: str,
+        embedding: List[float],
+        meta: Dict[str, Any],
+        user_id: Optional[str] = None
+    ) -> str:
+        """
+        Write a single memory to the user's namespace and return its ID.
+        
+        With MEMORY_DEDUP, a memory at least MEMORY_DEDUP_SIMILARITY similar to
+        an existing one of the same type, session and role is merged into it
+        (occurrences + 1, last_seen updated) and the existing ID is returned.
+        """
+        collection = self._collection_for(user_id)
+        if Config.MEMORY_DEDUP:
+            with span("memory.dedup") as dedup_span:
+                duplicate = self._find_duplicate(collection, embedding, meta)
+                if dedup_span is not None:
+                    dedup_span.set_attribute("dedup.merged", duplicate is not None)
+            if duplicate is not None:
+                return self._merge_duplicate(collection, duplicate, meta)
+        
+        memory_id = str(uuid.uuid4())
+        collection.add(
             ids=[memory_id],
             embeddings=[embedding],
             documents=[content],
             metadatas=[meta]
         )
+        if self.hot_tier is not None:
+            self.hot_tier.add(collection.name, [memory_id], [embedding], [content], [meta])
         
         return memory_id
     
+    def _find_duplicate(self, collection, embedding: List[float], meta: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """The closest memory in the new memory's type/session/role scope, if similar enough to merge."""
+        scope = (meta.get("type"), meta.get("user_id"), meta.get("session_id"), meta.get("role"))
+        if self.hot_tier is not None:
+            # Restatements are usually recent: the hot tier often answers without a store query
+            hits = self.hot_tier.search(collection.name, embedding, 1, self._hot_filters(*scope))
+            if hits and 1 - hits[0]["distance"] >= Config.MEMORY_DEDUP_SIMILARITY:
+                return hits[0]
+        results = collection.query(
+            query_embeddings=[embedding],
+            n_results=1,
+            where=self._build_where(*scope),
+            include=["metadatas", "distances"]
+        )
+        if results["ids"] and results["ids"][0] and 1 - results["distances"][0][0] >= Config.MEMORY_DEDUP_SIMILARITY:
+            return {"id": results["ids"][0][0], "metadata": results["metadatas"][0][0] or {}}
+        return None
+    
+    def _merge_duplicate(self, collection, duplicate: Dict[str, Any], meta: Dict[str, Any]) -> str:
+        """Count a new occurrence on an existing memory instead of storing a copy."""
+        update = {
+            "occurrences": int(duplicate["metadata"].get("occurrences", 1)) + 1,
+            "last_seen": meta.get("created_at", time.time())
+        }
+        # Metadata-only update: both engines merge it into the stored metadata
+        collection.update(ids=[duplicate["id"]], metadatas=[update])
+        if self.hot_tier is not None:
+            self.hot_tier.update_metadata(collection.name, [duplicate["id"]], [{**duplicate["metadata"], **update}])
+        self.duplicates_merged += 1
+        return duplicate["id"]
+    
+    @traced("memory.retrieve")
     def retrieve_memories(
         self,
         query: str,
         n_results: int = None,
         memory_type: Optional[str] = None,
-        query_analysis: Optional[Dict[str, Any]] = None
+        query_analysis: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant memories using hybrid search (vector + metadata boosting).
@@ -117,51 +430,143 @@ class MemoryStore:
             n_results: Number of results to return
             memory_type: Filter by memory type
             query_analysis: Optional query analysis from enhance_query() for metadata boosting
+            user_id: Only search memories belonging to this user
+            session_id: Only search memories from this session
             
         Returns:
             List of relevant memories with metadata and boosted scores
         """
-        if n_results is None:
-            n_results = Config.MEMORY_CONTEXT_SIZE
+        # Generate query embedding
+        query_embedding = self._encode(query)
         
-        # Check if collection is empty
-        collection_count = self.collection.count()
-        if collection_count == 0:
-            return []
+        return self._retrieve_by_embedding(
+            query_embedding, n_results, memory_type, query_analysis, user_id, session_id
+        )
+    
+    @traced("memory.retrieve")
+    async def aretrieve_memories(
+        self,
+        query: str,
+        n_results: int = None,
+        memory_type: Optional[str] = None,
+        query_analysis: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Async counterpart of retrieve_memories().
         
-        # Generate query embedding
-        query_embedding = self.embedding_model.encode(query).tolist()
+        The query embedding runs on the bounded model executor and the
+        ChromaDB query plus reranking on the I/O executor.
+        """
+        query_embedding = await run_model_call(self._encode, query)
+        return await run_io_call(
+            self._retrieve_by_embedding, query_embedding, n_results, memory_type, query_analysis,
+            user_id, session_id
+        )
+    
+    def _retrieve_by_embedding(
+        self,
+        query_embedding: List[float],
+        n_results: int = None,
+        memory_type: Optional[str] = None,
+        query_analysis: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Query the hot tier and ChromaDB with a precomputed embedding and apply hybrid boosting.
         
-        # Build where clause for filtering
-        where_clause = {"type": memory_type} if memory_type else None
+        The hot tier is searched first; when it has MEMORY_HOT_TIER_MIN_HITS
+        hits (at most n_results) with similarity >= MEMORY_HOT_TIER_SKIP_SIMILARITY
+        the collection is not queried. Otherwise both result lists are merged
+        by ID and the memories returned from the collection are promoted into
+        the hot tier.
         
-        # Fetch 3x results for reranking (if we have enough memories)
-        fetch_size = min(n_results * 3, collection_count) if query_analysis else min(n_results, collection_count)
+        Candidates are reranked by entity/keyword matches (with query_analysis)
+        and by recency, access count and emotional intensity (see scoring.py),
+        then diversified with MMR when MEMORY_MMR is on.
+        """
+        if n_results is None:
+            n_results = Config.MEMORY_CONTEXT_SIZE
         
-        # Query ChromaDB
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=fetch_size,
-            where=where_clause
-        )
+        collection = self._collection_for(user_id)
+        
+        # Fetch 3x results for reranking
+        diversify = Config.MEMORY_MMR
+        rerank = bool(query_analysis) or scoring_enabled() or diversify
+        wanted = n_results * 3 if rerank else n_results
+        
+        hot_hits: List[Dict[str, Any]] = []
+        hot_seconds = 0.0
+        skip_cold = False
+        if self.hot_tier is not None:
+            start = time.perf_counter()
+            with span("memory.hot_tier") as hot_span:
+                hot_hits = self.hot_tier.search(
+                    collection.name, query_embedding, wanted,
+                    self._hot_filters(memory_type, user_id, session_id),
+                    include_embeddings=diversify
+                )
+                strong = sum(1 for hit in hot_hits if 1 - hit["distance"] >= Config.MEMORY_HOT_TIER_SKIP_SIMILARITY)
+                skip_cold = strong >= max(1, min(n_results, Config.MEMORY_HOT_TIER_MIN_HITS))
+                if hot_span is not None:
+                    hot_span.set_attribute("hot_tier.hits", len(hot_hits))
+                    hot_span.set_attribute("hot_tier.skip_cold", skip_cold)
+            hot_seconds = time.perf_counter() - start
+        
+        candidates = {hit["id"]: hit for hit in hot_hits}
+        hot_ids = set(candidates)
+        embeddings: Dict[str, Any] = {hit["id"]: hit["embedding"] for hit in hot_hits if "embedding" in hit}
+        cold_seconds = None
+        if not skip_cold:
+            # Build where clause for filtering
+            where_clause = self._build_where(memory_type, user_id, session_id)
+            
+            include = ["documents", "metadatas", "distances"]
+            if self.hot_tier is not None or diversify:
+                include.append("embeddings")  # To promote what gets returned / for MMR
+            
+            # Query ChromaDB (a smaller or empty collection just returns fewer
+            # results, so no count() round-trip first)
+            start = time.perf_counter()
+            with span("memory.query", n_results=wanted):
+                results = collection.query(
+                    query_embeddings=[query_embedding],
+                    n_results=wanted,
+                    where=where_clause,
+                    include=include
+                )
+            cold_seconds = time.perf_counter() - start
+            
+            if results["documents"] and results["documents"][0]:
+                for i, doc in enumerate(results["documents"][0]):
+                    memory_id = results["ids"][0][i]
+                    if "embeddings" in include:
+                        embeddings.setdefault(memory_id, results["embeddings"][0][i])
+                    if memory_id not in candidates:
+                        candidates[memory_id] = {
+                            "id": memory_id,
+                            "content": doc,
+                            "metadata": results["metadatas"][0][i],
+                            "distance": results["distances"][0][i] if results["distances"] else 0
+                        }
         
-        # Format results
+        # Format results (hot and cold candidates ranked together)
         memories = []
-        if results["documents"] and results["documents"][0]:
-            for i, doc in enumerate(results["documents"][0]):
-                distance = results["distances"][0][i] if results["distances"] else 0
-                similarity = 1 - distance  # Convert distance to similarity
-                
-                # Filter by relevance threshold
-                if similarity >= Config.MEMORY_RELEVANCE_THRESHOLD:
-                    memory = {
-                        "id": results["ids"][0][i],
-                        "content": doc,
-                        "metadata": results["metadatas"][0][i],
-                        "similarity": similarity,
-                        "boosted_score": similarity  # Will be adjusted if query_analysis provided
-                    }
-                    memories.append(memory)
+        for candidate in sorted(candidates.values(), key=lambda c: c["distance"])[:wanted]:
+            similarity = 1 - candidate["distance"]  # Convert distance to similarity
+            
+            # Filter by relevance threshold
+            if similarity >= Config.MEMORY_RELEVANCE_THRESHOLD:
+                memory = {
+                    "id": candidate["id"],
+                    "content": candidate["content"],
+                    "metadata": candidate["metadata"],
+                    "similarity": similarity,
+                    "boosted_score": similarity  # Will be adjusted if query_analysis provided
+                }
+                memories.append(memory)
         
         # HYBRID SEARCH: Boost scores based on metadata matching
         if query_analysis and memories:
@@ -199,26 +604,93 @@ class MemoryStore:
                 # Apply boost (cap at 1.0 for final score)
                 memory["boosted_score"] = min(memory["similarity"] + total_boost, 1.0)
         
-        # Sort by boosted score if hybrid search was used, otherwise by similarity
-        if query_analysis:
+        # Recency / importance terms, computed over all candidates at once
+        if scoring_enabled() and memories:
+            terms = importance_scores([m["metadata"] for m in memories])
+            for i, memory in enumerate(memories):
+                memory["recency_score"] = float(terms["recency"][i])
+                memory["access_score"] = float(terms["access"][i])
+                memory["emotion_score"] = float(terms["emotion"][i])
+                memory["importance_boost"] = float(terms["total"][i])
+                memory["boosted_score"] += memory["importance_boost"]
+        
+        # Sort by boosted score if reranking was used, otherwise by similarity
+        if rerank:
             memories.sort(key=lambda x: x["boosted_score"], reverse=True)
         
+        if diversify and len(memories) > n_results:
+            # Greedy MMR over the reranked candidates (relevance = boosted score)
+            picked = mmr_select(
+                [embeddings[m["id"]] for m in memories],
+                [m["boosted_score"] for m in memories],
+                n_results,
+                Config.MEMORY_MMR_LAMBDA
+            )
+            memories = [memories[i] for i in picked]
+        
+        memories = memories[:n_results]
+        
+        if access_tracking_enabled() and memories:
+            self._record_access(collection, memories)
+        
+        if self.hot_tier is not None:
+            promoted = [m for m in memories if m["id"] not in hot_ids]
+            if promoted:
+                self.hot_tier.add(
+                    collection.name,
+                    [m["id"] for m in promoted],
+                    [embeddings[m["id"]] for m in promoted],
+                    [m["content"] for m in promoted],
+                    [m["metadata"] for m in promoted]
+                )
+            self.hot_tier.record(
+                hot_seconds, cold_seconds, sum(1 for m in memories if m["id"] in hot_ids), len(memories)
+            )
+        
         # Return top n_results
-        return memories[:n_results]
+        return memories
     
-    def get_conversation_history(self, n_recent: int = 10) -> List[Dict[str, Any]]:
+    def _record_access(self, collection, memories: List[Dict[str, Any]]):
+        """Count one access on each returned memory (access_count, last_accessed)."""
+        now = time.time()
+        updates = []
+        for memory in memories:
+            update = {"access_count": int(memory["metadata"].get("access_count", 0)) + 1, "last_accessed": now}
+            memory["metadata"] = {**memory["metadata"], **update}
+            updates.append(update)
+        try:
+            with span("memory.access", count=len(memories)):
+                # Metadata-only update: both engines merge it into the stored metadata
+                collection.update(ids=[m["id"] for m in memories], metadatas=updates)
+        except Exception as e:
+            print(f"⚠️  Access count update failed: {e}")
+            return
+        if self.hot_tier is not None:
+            self.hot_tier.update_metadata(
+                collection.name, [m["id"] for m in memories], [m["metadata"] for m in memories]
+            )
+    
+    @traced("memory.history")
+    def get_conversation_history(
+        self,
+        n_recent: int = 10,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
         Get recent conversation history sorted by timestamp.
         
         Args:
             n_recent: Number of recent conversations to retrieve
+            user_id: Only include this user's conversation
+            session_id: Only include this session's conversation
             
         Returns:
             List of recent conversation memories (oldest first for context)
         """
         # Get all conversation memories (ChromaDB doesn't support ordering in get())
-        results = self.collection.get(
-            where={"type": "conversation"}
+        results = self._collection_for(user_id).get(
+            where=self._build_where("conversation", user_id, session_id)
         )
         
         # Build and sort by timestamp
@@ -243,24 +715,171 @@ class MemoryStore:
         # Return in chronological order (oldest first) for proper context flow
         return list(reversed(recent))
     
+    @traced("memory.history")
+    async def aget_conversation_history(
+        self,
+        n_recent: int = 10,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Async counterpart of get_conversation_history()."""
+        return await run_io_call(self.get_conversation_history, n_recent, user_id, session_id)
+    
+    def _build_where(
+        self,
+        memory_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        role: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Build a ChromaDB where clause from optional type, user, session and role filters."""
+        conditions = []
+        if memory_type:
+            conditions.append({"type": memory_type})
+        # A per-user collection already contains only that user's memories
+        if user_id is not None and self.namespace_layout != "per_user":
+            conditions.append({"user_id": user_id})
+        if session_id is not None:
+            conditions.append({"session_id": session_id})
+        if role is not None:
+            conditions.append({"role": role})
+        
+        if not conditions:
+            return None
+        if len(conditions) == 1:
+            return conditions[0]
+        return {"$and": conditions}
+    
+    @staticmethod
+    def _hot_filters(
+        memory_type: Optional[str] = None,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        role: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """The hot tier equivalent of _build_where (the hot tier holds every namespace)."""
+        filters = {}
+        if memory_type:
+            filters["type"] = memory_type
+        if user_id is not None:
+            filters["user_id"] = user_id
+        if session_id is not None:
+            filters["session_id"] = session_id
+        if role is not None:
+            filters["role"] = role
+        return filters
+    
+    def _collection_for(self, user_id: Optional[str] = None):
+        """
+        Get the collection holding a user's memories.
+        
+        In the "shared" layout every user lives in the main collection. In the
+        "per_user" layout each user gets their own collection, so query cost
+        scales with that user's data; handles are kept in an LRU so thousands
+        of tenants don't all stay open.
+        """
+        if user_id is None or self.namespace_layout != "per_user":
+            return self.collection
+        
+        name = self._tenant_collection_name(user_id)
+        with self._tenant_lock:
+            collection = self._tenant_collections.get(name)
+            if collection is not None:
+                self._tenant_collections.move_to_end(name)
+                return collection
+        
+        collection = self.backend.get_or_create_collection(
+            name=name,
+            metadata={
+                "description": "AI Brain persistent memory (per-user namespace)",
+                "user_id": user_id,
+                EMBEDDING_MODEL_KEY: Config.EMBEDDING_MODEL,
+                **hnsw_metadata()
+            }
+        )
+        self._check_index_params(collection, quiet=True)
+        self._check_embedding_model(collection)
+        
+        with self._tenant_lock:
+            self._tenant_collections[name] = collection
+            self._tenant_collections.move_to_end(name)
+            while len(self._tenant_collections) > Config.MEMORY_COLLECTION_CACHE_SIZE:
+                self._tenant_collections.popitem(last=False)
+        
+        return collection
+    
+    @staticmethod
+    def _tenant_collection_name(user_id: str) -> str:
+        """Chroma-safe collection name for a user (names allow only [a-zA-Z0-9._-])."""
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()[:16]
+        return f"{Config.CHROMA_COLLECTION_NAME}_user_{digest}"
+    
+    def delete_namespace(self, user_id: str, session_id: Optional[str] = None):
+        """
+        Delete all memories of a user, or of one of their sessions.
+        
+        Args:
+            user_id: User whose memories to delete
+            session_id: If given, only delete this session's memories
+        """
+        if session_id is None and self.namespace_layout == "per_user":
+            name = self._tenant_collection_name(user_id)
+            with self._tenant_lock:
+                self._tenant_collections.pop(name, None)
+            try:
+                self.backend.delete_collection(name)
+            except Exception:
+                pass  # Namespace was never created
+            if self.hot_tier is not None:
+                self.hot_tier.remove(namespace=name)
+            return
+        
+        collection = self._collection_for(user_id)
+        collection.delete(
+            where=self._build_where(user_id=user_id, session_id=session_id)
+        )
+        if self.hot_tier is not None:
+            self.hot_tier.remove(namespace=collection.name, filters=self._hot_filters(user_id=user_id, session_id=session_id))
+    
     def clear_all_memories(self):
         """Clear all memories from the store."""
         # Delete and recreate collection
-        self.client.delete_collection(Config.CHROMA_COLLECTION_NAME)
-        self.collection = self.client.get_or_create_collection(
+        self.backend.delete_collection(Config.CHROMA_COLLECTION_NAME)
+        self.collection = self.backend.get_or_create_collection(
             name=Config.CHROMA_COLLECTION_NAME,
-            metadata={"description": "AI Brain persistent memory"}
+            metadata={
+                "description": "AI Brain persistent memory",
+                EMBEDDING_MODEL_KEY: Config.EMBEDDING_MODEL,
+                **hnsw_metadata()
+            }
         )
+        if self.hot_tier is not None:
+            self.hot_tier.clear()
         print("🗑️  All memories cleared")
     
-    def get_stats(self) -> Dict[str, Any]:
-        """Get memory store statistics."""
-        total_count = self.collection.count()
+    def get_stats(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get memory store statistics.
+        
+        Args:
+            user_id: If given, count only this user's memories
+        """
+        collection = self._collection_for(user_id)
+        
+        if user_id is not None and self.namespace_layout != "per_user":
+            total_count = len(collection.get(where={"user_id": user_id}, include=[])["ids"])
+        else:
+            total_count = collection.count()
         
         return {
             "total_memories": total_count,
-            "collection_name": Config.CHROMA_COLLECTION_NAME,
-            "persist_dir": str(Config.CHROMA_PERSIST_DIR)
+            "collection_name": collection.name,
+            "persist_dir": str(Config.CHROMA_PERSIST_DIR),
+            "namespace_layout": self.namespace_layout,
+            "hot_tier": self.hot_tier.stats() if self.hot_tier is not None else None,
+            "duplicates_merged": self.duplicates_merged,
+            "embedding_model": Config.EMBEDDING_MODEL,
+            "reembedding": self.reembedder.status() if self.reembedder is not None else None
         }
     
     def get_topic_statistics(self) -> Dict[str, Any]:
@@ -0,0 +1,371 @@
+"""
+Streaming, resumable collection migrations.
+
+migrate_collection() rebuilds a collection with new collection metadata
+(distance metric, HNSW parameters) and optionally rewritten records
+(schema/metadata upgrades), without ever holding the whole store in memory
+and without a window where a crash loses memories:
+
+1. copy: the source is read in pages of get(limit, offset) and written into
+   a "<name>_migration" collection. A checkpoint file in the persist
+   directory records the next offset after every page, so an interrupted
+   run resumes where it stopped (add() skips ids that are already there, so
+   a page written twice is harmless).
+2. verify: the new collection must hold as many records as the source, and
+   a sample of pages spread over the source must match record for record.
+3. swap: the source is renamed to "<name>_backup_<time>" and the new
+   collection to <name>. The checkpoint records the swap first, so a crash
+   between the two renames is finished by the next run.
+4. cleanup: the backup is deleted unless keep_backup is set, then the
+   checkpoint.
+
+The source must not be written to while it is copied: run migrations with
+the application stopped. Live migrations (live=True, used to re-embed
+memories while the application keeps serving) instead copy until they
+reach the end of the source and then reconcile by id the records written,
+changed or deleted meanwhile; the swap itself still needs a quiet source.
+"""
+
+import json
+import math
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .config import Config
+from .scoring import parse_timestamp
+
+# Pages compared record for record during verification (spread over the source)
+_VERIFY_PAGES = 8
+_VERIFY_PAGE_SIZE = 128
+
+# A batch: {"ids", "documents", "embeddings", "metadatas"} as returned by get()
+Batch = Dict[str, Any]
+
+
+class MigrationError(RuntimeError):
+    """A migration can't continue safely (source changed, verification failed)."""
+
+
+def backfill_created_at(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Add the numeric created_at used for recency scoring to memories written before it existed."""
+    if "created_at" not in metadata:
+        seconds = parse_timestamp(metadata.get("timestamp"))
+        if not math.isnan(seconds):
+            metadata["created_at"] = seconds
+    return metadata
+
+
+# Metadata upgrades selectable by name (scripts/migrate_to_cosine.py --upgrade)
+UPGRADES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "created_at": backfill_created_at,
+}
+
+
+def upgrade_metadata(names: List[str]) -> Callable[[Batch], Batch]:
+    """A batch transform applying the named UPGRADES to every record's metadata."""
+    upgrades = [UPGRADES[name] for name in names]
+
+    def transform(batch: Batch) -> Batch:
+        metadatas = []
+        for metadata in batch["metadatas"]:
+            metadata = dict(metadata or {})
+            for upgrade in upgrades:
+                metadata = upgrade(metadata)
+            metadatas.append(metadata or None)
+        return {**batch, "metadatas": metadatas}
+
+    return transform
+
+
+def checkpoint_path(name: str) -> Path:
+    """Checkpoint file of a collection's migration."""
+    return Path(Config.CHROMA_PERSIST_DIR) / f"migration_{name}.json"
+
+
+def _write_checkpoint(path: Path, state: Dict[str, Any]):
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_checkpoint(name: str) -> Optional[Dict[str, Any]]:
+    """State of an unfinished migration of a collection, if there is one."""
+    path = checkpoint_path(name)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def pending_migrations() -> List[Dict[str, Any]]:
+    """States of every unfinished migration in the persist directory."""
+    return [json.loads(path.read_text(encoding="utf-8"))
+            for path in sorted(Path(Config.CHROMA_PERSIST_DIR).glob("migration_*.json"))]
+
+
+def abort_migration(backend, name: str) -> bool:
+    """
+    Drop an unfinished migration (its new collection and checkpoint).
+
+    A migration that already started swapping can't be aborted: run it
+    again to finish the swap.
+
+    Returns:
+        True if there was a migration to abort
+    """
+    state = read_checkpoint(name)
+    if state is None:
+        return False
+    if state["phase"] != "copy":
+        raise MigrationError(f"Migration of {name} is swapping collections: run it again to finish")
+    if state["target"] in backend.list_collections():
+        backend.delete_collection(state["target"])
+    checkpoint_path(name).unlink()
+    return True
+
+
+def _read_page(collection, offset: int, limit: int, embeddings: bool = True) -> Batch:
+    include = ["documents", "embeddings", "metadatas"] if embeddings else ["documents", "metadatas"]
+    return collection.get(limit=limit, offset=offset, include=include)
+
+
+def _prepare(batch: Batch, transform: Optional[Callable[[Batch], Batch]],
+             embed: Optional[Callable[[List[str]], np.ndarray]]) -> Batch:
+    """Apply the record transform, then compute embeddings from the documents if re-embedding."""
+    if transform is not None:
+        batch = transform(batch)
+    if embed is not None:
+        batch = {**batch, "embeddings": embed([document or "" for document in batch["documents"]])}
+    return batch
+
+
+def _select(batch: Batch, rows: List[int]) -> Batch:
+    return {key: [batch[key][i] for i in rows] for key in ("ids", "documents", "embeddings", "metadatas")
+            if batch.get(key) is not None}
+
+
+def _check_unchanged(source, state: Dict[str, Any]):
+    if source.count() != state["count"]:
+        raise MigrationError(f"{state['source']} changed during the migration ({state['count']} -> {source.count()} "
+                             "records): stop the application, abort the migration and run it again")
+
+
+def _reconcile(source, target, transform, embed, page_size: int) -> int:
+    """
+    Apply records written, changed or deleted in the source after they were copied.
+
+    Compares documents and metadata page by page (embeddings are only read
+    or computed for records that need rewriting).
+
+    Returns:
+        Number of records added, rewritten or deleted in the new collection
+    """
+    seen = set()
+    changes = offset = 0
+    while True:
+        page = _read_page(source, offset, page_size, embeddings=embed is None)
+        if not len(page["ids"]):
+            break
+        offset += len(page["ids"])
+        seen.update(page["ids"])
+        expected = transform(page) if transform is not None else page
+        found = target.get(ids=list(page["ids"]), include=["documents", "metadatas"])
+        copied = {memory_id: (document, metadata or None)
+                  for memory_id, document, metadata in zip(found["ids"], found["documents"], found["metadatas"])}
+        missing, rewritten, relabelled = [], [], []
+        for i, memory_id in enumerate(page["ids"]):
+            document, metadata = expected["documents"][i], expected["metadatas"][i] or None
+            if memory_id not in copied:
+                missing.append(i)
+            elif copied[memory_id][0] != document:
+                rewritten.append(i)
+            elif copied[memory_id][1] != metadata:
+                relabelled.append(i)
+        if missing or rewritten:
+            records = _prepare(_select(page, missing + rewritten), transform, embed)
+            split = len(missing)
+            if missing:
+                target.add(**{key: values[:split] for key, values in records.items()})
+            if rewritten:
+                target.update(**{key: values[split:] for key, values in records.items()})
+        if relabelled:
+            target.update(ids=[page["ids"][i] for i in relabelled],
+                          metadatas=[expected["metadatas"][i] for i in relabelled])
+        changes += len(missing) + len(rewritten) + len(relabelled)
+
+    offset = 0
+    while True:
+        page = target.get(limit=page_size, offset=offset, include=[])
+        if not page["ids"]:
+            break
+        deleted = [memory_id for memory_id in page["ids"] if memory_id not in seen]
+        if deleted:
+            target.delete(ids=deleted)
+            changes += len(deleted)
+        offset += len(page["ids"]) - len(deleted)
+    return changes
+
+
+def _verify(source, target, count: int, transform: Optional[Callable[[Batch], Batch]],
+            embed: Optional[Callable[[List[str]], np.ndarray]]):
+    """Compare the record count and a sample of pages of the source with the new collection."""
+    if target.count() != count:
+        raise MigrationError(f"New collection holds {target.count()} records, the source {count}")
+    offsets = sorted({int(o) for o in np.linspace(0, max(count - _VERIFY_PAGE_SIZE, 0), _VERIFY_PAGES)})
+    for offset in offsets if count else []:
+        expected = _prepare(_read_page(source, offset, _VERIFY_PAGE_SIZE, embeddings=embed is None), transform, embed)
+        found = target.get(ids=list(expected["ids"]), include=["documents", "embeddings", "metadatas"])
+        rows = {memory_id: i for i, memory_id in enumerate(found["ids"])}
+        if len(rows) != len(expected["ids"]):
+            raise MigrationError(f"{len(expected['ids']) - len(rows)} records near offset {offset} were not copied")
+        order = [rows[memory_id] for memory_id in expected["ids"]]
+        # Re-embedded vectors may differ in the last digits with the batch they were encoded in
+        if ([found["documents"][i] for i in order] != list(expected["documents"])
+                or [found["metadatas"][i] or None for i in order] != [m or None for m in expected["metadatas"]]
+                or not np.allclose(np.asarray(found["embeddings"])[order], np.asarray(expected["embeddings"]),
+                                   atol=1e-4)):
+            raise MigrationError(f"Records near offset {offset} differ from the source")
+
+
+def _swap(backend, state: Dict[str, Any]):
+    """Rename source -> backup and new collection -> source; safe to repeat after a crash."""
+    names = set(backend.list_collections())
+    if state["target"] not in names:
+        return  # Both renames happened
+    if state["source"] in names:
+        backend.rename_collection(state["source"], state["backup"])
+    backend.rename_collection(state["target"], state["source"])
+
+
+def migrate_collection(
+    backend,
+    name: str,
+    metadata: Dict[str, Any],
+    transform: Optional[Callable[[Batch], Batch]] = None,
+    settings: Optional[Dict[str, Any]] = None,
+    batch_size: Optional[int] = None,
+    keep_backup: bool = False,
+    progress: bool = True,
+    embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+    live: bool = False,
+    cutover: bool = True,
+    on_page: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Rebuild a collection with new metadata and optionally transformed records.
+
+    Resumes an interrupted migration of the same collection when its settings
+    match; otherwise the unfinished copy is discarded and started over.
+
+    Args:
+        backend: VectorBackend holding the collection
+        name: Collection to migrate
+        metadata: Metadata of the rebuilt collection (hnsw:* entries included)
+        transform: Applied to every batch before it is written
+        settings: JSON-serializable description of the transform, compared on resume
+        batch_size: Records per page (defaults to the backend's maximum batch size, at most 5000)
+        keep_backup: Keep the original collection as "<name>_backup_<time>"
+        progress: Print progress after every page
+        embed: Computes new embeddings from documents (re-embedding; stored
+            embeddings are then never read)
+        live: The source may be written to during the copy: pages are copied
+            until the end of the source, then later writes, changes and
+            deletions are reconciled by id
+        cutover: Verify and swap after the copy; with False the checkpoint is
+            kept so a later call (with cutover) catches up and swaps
+        on_page: Called with the checkpoint state after every page
+
+    Returns:
+        Report dict: collection, records, resumed_from, reconciled, swapped,
+        seconds, backup (if kept)
+    """
+    start = time.perf_counter()
+    path = checkpoint_path(name)
+    batch_size = batch_size or min(backend.get_max_batch_size(), 5000)
+    wanted = {"metadata": metadata, "settings": settings or {}}
+    state = read_checkpoint(name)
+
+    if state is not None and state["phase"] == "copy" and {k: state[k] for k in wanted} != wanted:
+        print("⚠️  Found an unfinished migration with other settings: starting over")
+        abort_migration(backend, name)
+        state = None
+    resumed_from = state["offset"] if state is not None and state["phase"] == "copy" else 0
+    reconciled = 0
+
+    if state is None:
+        source = backend.get_collection(name)
+        state = {
+            "source": name,
+            "target": f"{name}_migration",
+            "backup": f"{name}_backup_{int(time.time())}",
+            "phase": "copy",
+            "offset": 0,
+            "count": source.count(),
+            **wanted,
+        }
+        if state["target"] in backend.list_collections():
+            backend.delete_collection(state["target"])  # Left over from a run that died before its first checkpoint
+        _write_checkpoint(path, state)
+
+    if state["phase"] == "copy":
+        source = backend.get_collection(name)
+        if live:
+            state["count"] = source.count()
+        else:
+            _check_unchanged(source, state)
+        target = backend.get_or_create_collection(state["target"], metadata)
+        if resumed_from and progress:
+            print(f"🔁 Resuming at record {resumed_from:,} of {state['count']:,}")
+        while live or state["offset"] < state["count"]:
+            batch = _read_page(source, state["offset"], batch_size, embeddings=embed is None)
+            if not len(batch["ids"]):
+                break
+            batch = _prepare(batch, transform, embed)
+            target.add(ids=list(batch["ids"]), embeddings=batch["embeddings"],
+                       documents=list(batch["documents"]), metadatas=list(batch["metadatas"]))
+            state["offset"] += len(batch["ids"])
+            if live:
+                state["count"] = max(state["count"], state["offset"])
+            _write_checkpoint(path, state)
+            if on_page is not None:
+                on_page(state)
+            if progress:
+                rate = (state["offset"] - resumed_from) / max(time.perf_counter() - start, 1e-9)
+                print(f"   📤 {state['offset']:,}/{state['count']:,} records ({rate:,.0f}/s)")
+
+        if live:
+            reconciled = _reconcile(source, target, transform, embed, batch_size)
+            state["count"] = state["offset"] = source.count()
+            _write_checkpoint(path, state)
+        if not cutover:
+            return {
+                "collection": name,
+                "records": state["count"],
+                "resumed_from": resumed_from,
+                "reconciled": reconciled,
+                "swapped": False,
+                "seconds": round(time.perf_counter() - start, 2),
+                "backup": None,
+            }
+        _check_unchanged(source, state)
+        _verify(source, target, state["count"], transform, embed)
+        state["phase"] = "swap"
+        _write_checkpoint(path, state)
+
+    if state["phase"] == "swap":
+        _swap(backend, state)
+        state["phase"] = "cleanup"
+        _write_checkpoint(path, state)
+    if not keep_backup and state["backup"] in backend.list_collections():
+        backend.delete_collection(state["backup"])
+    path.unlink(missing_ok=True)
+    return {
+        "collection": name,
+        "records": state["count"],
+        "resumed_from": resumed_from,
+        "reconciled": reconciled,
+        "swapped": True,
+        "seconds": round(time.perf_counter() - start, 2),
+        "backup": state["backup"] if keep_backup else None,
+    }
@@ -17,6 +17,9 @@ import torch
 from collections import Counter
 from .device_utils import get_torch_device, get_device
 from .config import Config
+from .async_utils import run_model_call
+from . import condense
+from .tracing import span, traced
 
 
 class NLPAnalyzer:
@@ -85,7 +88,8 @@ class NLPAnalyzer:
             Dictionary with analysis results including entities, sentiment, keywords, etc.
         """
         # Process with spaCy
-        doc = self.nlp(text)
+        with span("nlp.spacy"):
+            doc = self.nlp(text)
         
         # Extract named entities
         entities = self._extract_entities(doc)
@@ -163,6 +167,7 @@ class NLPAnalyzer:
         topic_freq = Counter(topics)
         return [topic for topic, _ in topic_freq.most_common(5)]
     
+    @traced("nlp.emotion")
     def _analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
         Analyze emotions using Cardiff NLP RoBERTa multi-label model.
@@ -298,6 +303,7 @@ class NLPAnalyzer:
         
         return phrases[:5]  # Return top 5
     
+    @traced("nlp.enhance_query")
     def enhance_query(self, user_message: str) -> Dict[str, Any]:
         """
         Analyze incoming user message with spaCy to enhance memory retrieval.
@@ -472,6 +478,17 @@ class NLPAnalyzer:
         # Default to statement
         return "statement"
     
+    def needs_context(self, text: str) -> bool:
+        """
+        Whether a chat message needs the conversation to be understood.
+        
+        Pronoun and ellipsis detection on the parsed message (see
+        condense.needs_context()); RAG chat skips condensing messages that
+        don't need it.
+        """
+        return condense.needs_context(text, self.nlp(text))
+    
+    @traced("nlp.enrich")
     def enrich_conversation_entry(self, text: str, role: str = "user") -> Dict[str, Any]:
         """
         Create enriched conversation entry with full NLP analysis.
@@ -505,6 +522,19 @@ class NLPAnalyzer:
         
         return metadata
     
+    async def aenrich(self, text: str, role: str = "user") -> Dict[str, Any]:
+        """
+        Async counterpart of enrich_conversation_entry().
+        
+        spaCy and RoBERTa are CPU/GPU-bound, so the analysis runs on the
+        bounded model executor instead of blocking the event loop.
+        """
+        return await run_model_call(self.enrich_conversation_entry, text, role)
+    
+    async def aenhance_query(self, user_message: str) -> Dict[str, Any]:
+        """Async counterpart of enhance_query(), run on the bounded model executor."""
+        return await run_model_call(self.enhance_query, user_message)
+    
     def get_emotional_context_summary(self, recent_messages: List[Dict[str, Any]], n_recent: int = 10) -> str:
         """
         Generate emotional context summary from recent conversation history.
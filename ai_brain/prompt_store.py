@@ -0,0 +1,254 @@
+"""Content-addressed, deduplicating storage for logged system prompts."""
+
+import difflib
+import functools
+import hashlib
+import json
+import re
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .config import Config
+from .log_writer import RotatingLogFile, read_segment
+
+# Entry queued by ConversationLogger.log_system_prompt:
+# (timestamp, prompt, context_type, metadata)
+PromptEntry = Tuple[datetime, str, str, Optional[Dict[str, Any]]]
+
+
+# A word plus the whitespace after it (or a leading whitespace run)
+_WORD_RE = re.compile(r"\S+\s*|\s+")
+
+# A block ends after a word whose checksum hits this mask (~1 in 8 words),
+# or at a newline. Boundaries depend only on the words themselves, so an edit
+# (e.g. a changed similarity score) only changes the block it falls in.
+_BOUNDARY_MASK = 0x7
+
+# Words containing digits get a block of their own
+_VOLATILE_RE = re.compile(r"\d")
+
+
+def block_hash(text: str) -> str:
+    """Content address of a prompt block."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+_PLAIN, _BOUNDARY, _VOLATILE = 0, 1, 2
+
+
+@functools.lru_cache(maxsize=65536)
+def _word_kind(word: str) -> int:
+    """Classify a word for split_blocks (cached: prompts reuse most words)."""
+    if _VOLATILE_RE.search(word):
+        return _VOLATILE
+    if "\n" in word or zlib.crc32(word.rstrip().encode("utf-8")) & _BOUNDARY_MASK == 0:
+        return _BOUNDARY
+    return _PLAIN
+
+
+def split_blocks(prompt: str) -> List[str]:
+    """
+    Split a prompt into content-defined blocks whose concatenation is the prompt.
+
+    Blocks never span lines, long lines are cut at word boundaries chosen by
+    content, and words with digits are blocks of their own, so a line whose
+    prefix changes turn to turn (a memory with a new score) still shares its
+    remaining blocks with earlier turns.
+    """
+    blocks: List[str] = []
+    current: List[str] = []
+    for word in _WORD_RE.findall(prompt):
+        kind = _word_kind(word)
+        if kind == _VOLATILE:
+            # Scores, counts and dates change every turn: isolate them
+            if current:
+                blocks.append("".join(current))
+                current = []
+            blocks.append(word)
+            continue
+        current.append(word)
+        if kind == _BOUNDARY:
+            blocks.append("".join(current))
+            current = []
+    if current:
+        blocks.append("".join(current))
+    return blocks
+
+
+class PromptStore:
+    """
+    Store a session's system prompts as content-addressed blocks plus a
+    per-turn manifest.
+
+    Each prompt is split into content-defined blocks (see split_blocks)
+    addressed by their hash. A block's text is written once per segment under
+    a small segment-local ID; a turn's manifest lists the prompt's block IDs
+    as a diff against the previous turn (runs copied from the previous
+    manifest plus new IDs). Because consecutive prompts share the static
+    instructions, most memories and most of the recent conversation, a turn
+    typically costs a few new blocks and a short manifest instead of the
+    whole prompt.
+
+    Segments are JSONL files (``prompts_<session>_NNNN.jsonl``) that rotate,
+    compress and expire like the plain prompt logs. Every segment starts with
+    a full manifest so it can be decoded on its own. Records:
+
+        {"r": "blocks", "b": ["<text>", ...]}                  # next IDs in order
+        {"r": "prompt", "n": 3, "ts": "...", "ctx": "langchain", "meta": {...},
+         "ops": [[0, 12], {"i": [57, 58]}, [14, 40]]}          # diff manifest
+        {"r": "prompt", ..., "full": [0, 1, 2, ...]}           # keyframe
+
+    Block IDs are assigned in order of first appearance in the segment. In
+    ``ops``, ``[start, end]`` copies that slice of the previous manifest and
+    ``{"i": [...]}`` inserts those IDs.
+    """
+
+    SUFFIX = ".jsonl"
+
+    def __init__(self, directory: Path, session_id: str, keyframe_interval: Optional[int] = None):
+        """
+        Args:
+            directory: Directory holding the prompt log segments
+            session_id: Logger session ID (used in segment names)
+            keyframe_interval: Write a full manifest every N turns (bounds
+                how many diffs a reader replays). Defaults to
+                Config.PROMPT_STORE_KEYFRAME_INTERVAL.
+        """
+        self.log = RotatingLogFile(Path(directory), f"prompts_{session_id}", suffix=self.SUFFIX)
+        self.keyframe_interval = keyframe_interval or Config.PROMPT_STORE_KEYFRAME_INTERVAL
+        self._block_ids: Dict[str, int] = {}
+        self._previous: Optional[List[int]] = None
+        self._since_keyframe = 0
+        self.turns = 0
+        self.stats: Dict[str, int] = {"prompt_bytes": 0, "written_bytes": 0, "new_blocks": 0, "reused_blocks": 0}
+
+    def write_batch(self, entries: List[PromptEntry]):
+        """Encode and append prompt entries (called on the writer thread)."""
+        for entry in entries:
+            self.write(*entry)
+
+    def write(
+        self,
+        timestamp: datetime,
+        prompt: str,
+        context_type: str = "general",
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        """Append one prompt to the store."""
+        if self.log.rotate_if_due():
+            # New segment: it must be decodable on its own
+            self._block_ids.clear()
+            self._previous = None
+
+        blocks = split_blocks(prompt)
+        ids: List[int] = []
+        new_blocks: List[str] = []
+        for block in blocks:
+            h = block_hash(block)
+            block_id = self._block_ids.get(h)
+            if block_id is None:
+                block_id = self._block_ids[h] = len(self._block_ids)
+                new_blocks.append(block)
+            ids.append(block_id)
+        self.stats["new_blocks"] += len(new_blocks)
+        self.stats["reused_blocks"] += len(ids) - len(new_blocks)
+
+        record: Dict[str, Any] = {
+            "r": "prompt",
+            "n": self.turns,
+            "ts": timestamp.isoformat(),
+            "ctx": context_type
+        }
+        if metadata:
+            record["meta"] = metadata
+        if self._previous is None or self._since_keyframe >= self.keyframe_interval:
+            record["full"] = ids
+            self._since_keyframe = 0
+        else:
+            record["ops"] = diff_manifest(self._previous, ids)
+            self._since_keyframe += 1
+
+        out = ""
+        if new_blocks:
+            out += json.dumps({"r": "blocks", "b": new_blocks}, ensure_ascii=False, separators=(",", ":")) + "\n"
+        out += json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+        self.log.write(out)
+
+        self._previous = ids
+        self.turns += 1
+        self.stats["prompt_bytes"] += len(prompt.encode("utf-8"))
+        self.stats["written_bytes"] += len(out.encode("utf-8"))
+
+    def flush(self):
+        self.log.flush()
+
+    def close(self):
+        self.log.close()
+
+
+def diff_manifest(previous: List[int], current: List[int]) -> List[Union[List[int], Dict[str, List[int]]]]:
+    """Encode ``current`` as copy ranges from ``previous`` plus inserted IDs."""
+    ops: List[Union[List[int], Dict[str, List[int]]]] = []
+    matcher = difflib.SequenceMatcher(None, previous, current, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif tag in ("replace", "insert"):
+            ops.append({"i": current[j1:j2]})
+    return ops
+
+
+def apply_manifest(previous: List[int], ops: List[Any]) -> List[int]:
+    """Rebuild a manifest from the previous one and its diff ops."""
+    ids: List[int] = []
+    for op in ops:
+        if isinstance(op, dict):
+            ids.extend(op["i"])
+        else:
+            ids.extend(previous[op[0]:op[1]])
+    return ids
+
+
+def iter_prompts(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Reconstruct every prompt stored in a segment (``.jsonl`` or ``.jsonl.zst``).
+
+    Yields:
+        Dicts with turn, timestamp, context_type, metadata and the exact prompt text
+    """
+    blocks: List[str] = []
+    previous: List[int] = []
+    for line_number, line in enumerate(read_segment(Path(path)).splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            print(f"⚠️  Skipping corrupt line {line_number} in {Path(path).name}")
+            continue
+
+        if record.get("r") == "blocks":
+            blocks.extend(record["b"])
+            continue
+
+        ids = record["full"] if "full" in record else apply_manifest(previous, record["ops"])
+        previous = ids
+        yield {
+            "turn": record["n"],
+            "timestamp": record["ts"],
+            "context_type": record.get("ctx", "general"),
+            "metadata": record.get("meta", {}),
+            "prompt": "".join(blocks[i] for i in ids)
+        }
+
+
+def find_segments(directory: Union[str, Path], session_id: Optional[str] = None) -> List[Path]:
+    """List prompt store segments in order, optionally for a single session."""
+    pattern = f"prompts_{session_id}_*" if session_id else "prompts_*"
+    segments = [
+        p for p in Path(directory).glob(pattern)
+        if p.name.endswith(PromptStore.SUFFIX) or p.name.endswith(PromptStore.SUFFIX + ".zst")
+    ]
+    return sorted(segments, key=lambda p: p.name)
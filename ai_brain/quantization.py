@@ -0,0 +1,181 @@
+"""
+Compact vector codes for the local vector engine.
+
+A VectorCodec turns float32 embeddings into a smaller scan representation:
+
+- dimension reduction (optional): "pca" projects onto the top principal
+  directions of a sample (uncentered, so dot products and L2 distances are
+  approximately preserved); "prefix" keeps the first N dimensions, which is
+  only meaningful for Matryoshka-trained embedding models
+- scalar quantization: "float16", or "int8" with a per-dimension scale
+  (symmetric, clipped at the 99.9th percentile of the sample)
+
+Codes only rank candidates. The local engine keeps the float32 vectors on
+disk and rescores the best candidates exactly, so returned distances are
+always full precision.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+QUANTIZATIONS = ("none", "float16", "int8")
+REDUCTIONS = ("pca", "prefix")
+
+# Rows converted to float32 at a time while scoring codes (the buffer stays in cache)
+_SCORE_CHUNK = 1_024
+
+
+class VectorCodec:
+    """Dimension reduction plus scalar quantization, fitted on a sample."""
+
+    def __init__(
+        self,
+        dim: int,
+        quantization: str = "int8",
+        dims: int = 0,
+        reduction: str = "pca",
+        components: Optional[np.ndarray] = None,
+        scale: Optional[np.ndarray] = None
+    ):
+        """
+        Args:
+            dim: Dimension of the input vectors
+            quantization: "none", "float16" or "int8"
+            dims: Dimensions kept (0 or >= dim keeps all)
+            reduction: "pca" or "prefix"
+            components: PCA directions, shape (dims, dim)
+            scale: int8 step per (reduced) dimension
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization '{quantization}' (expected one of {QUANTIZATIONS})")
+        if reduction not in REDUCTIONS:
+            raise ValueError(f"Unknown reduction '{reduction}' (expected one of {REDUCTIONS})")
+        self.dim = dim
+        self.quantization = quantization
+        self.dims = dims if 0 < dims < dim else 0
+        self.reduction = reduction
+        self.components = components
+        self.scale = scale
+
+    @classmethod
+    def fit(cls, sample: np.ndarray, quantization: str = "int8", dims: int = 0, reduction: str = "pca") -> "VectorCodec":
+        """
+        Learn the projection and int8 scales from a sample of vectors.
+
+        Args:
+            sample: (n, dim) float32 vectors, a few thousand are plenty
+            quantization: "none", "float16" or "int8"
+            dims: Dimensions kept (0 keeps all)
+            reduction: "pca" or "prefix"
+        """
+        sample = np.asarray(sample, dtype=np.float32)
+        codec = cls(sample.shape[1], quantization, dims, reduction)
+        if codec.dims and reduction == "pca":
+            # Eigenvectors of the second-moment matrix, largest first
+            moments = (sample.T.astype(np.float64) @ sample) / max(len(sample), 1)
+            _, vectors = np.linalg.eigh(moments)
+            codec.components = np.ascontiguousarray(vectors[:, ::-1][:, :codec.dims].T, dtype=np.float32)
+        if quantization == "int8":
+            projected = codec.project(sample)
+            limit = np.quantile(np.abs(projected), 0.999, axis=0) if len(projected) else np.ones(projected.shape[1])
+            codec.scale = (np.maximum(limit, 1e-12) / 127.0).astype(np.float32)
+        return codec
+
+    @classmethod
+    def load(cls, path: Path) -> "VectorCodec":
+        """Read a codec written by save()."""
+        with np.load(path) as data:
+            return cls(
+                int(data["dim"]),
+                str(data["quantization"]),
+                int(data["dims"]),
+                str(data["reduction"]),
+                data["components"] if data["components"].size else None,
+                data["scale"] if data["scale"].size else None,
+            )
+
+    def save(self, path: Path):
+        """Write the codec (np.savez) so codes stay identical across restarts."""
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                dim=self.dim,
+                quantization=self.quantization,
+                dims=self.dims,
+                reduction=self.reduction,
+                components=self.components if self.components is not None else np.empty(0, dtype=np.float32),
+                scale=self.scale if self.scale is not None else np.empty(0, dtype=np.float32),
+            )
+
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """What the codec was configured with (compared against Config on open)."""
+        return {"dim": self.dim, "quantization": self.quantization, "dims": self.dims, "reduction": self.reduction}
+
+    @property
+    def out_dim(self) -> int:
+        """Dimension of projected vectors and codes."""
+        return self.dims or self.dim
+
+    @property
+    def dtype(self):
+        return {"none": np.float32, "float16": np.float16, "int8": np.int8}[self.quantization]
+
+    @property
+    def bytes_per_vector(self) -> int:
+        return self.out_dim * np.dtype(self.dtype).itemsize
+
+    def project(self, vectors: np.ndarray) -> np.ndarray:
+        """Reduce vectors (n, dim) to (n, out_dim) float32."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not self.dims:
+            return vectors
+        if self.reduction == "prefix":
+            return np.ascontiguousarray(vectors[:, :self.dims])
+        return vectors @ self.components.T
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """Codes for vectors (n, dim)."""
+        projected = self.project(vectors)
+        if self.quantization == "int8":
+            return np.clip(np.rint(projected / self.scale), -127, 127).astype(np.int8)
+        return projected.astype(self.dtype)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Approximate projected vectors (n, out_dim) float32 from codes."""
+        decoded = codes.astype(np.float32)
+        if self.quantization == "int8":
+            decoded *= self.scale
+        return decoded
+
+    def norms(self, codes: np.ndarray) -> np.ndarray:
+        """Norms of the decoded vectors."""
+        norms = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), _SCORE_CHUNK):
+            norms[start:start + _SCORE_CHUNK] = np.linalg.norm(self.decode(codes[start:start + _SCORE_CHUNK]), axis=1)
+        return norms
+
+    def dot(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """
+        Approximate dot products of projected queries with coded vectors.
+
+        Args:
+            codes: (n, out_dim) codes
+            queries: (q, out_dim) projected float32 queries
+
+        Returns:
+            (q, n) float32 dot products
+        """
+        # The int8 scale is folded into the queries instead of every row
+        weights = (queries * self.scale if self.quantization == "int8" else queries).T.astype(np.float32)
+        if self.quantization == "none":
+            return (codes @ weights).T
+        dots = np.empty((len(codes), len(queries)), dtype=np.float32)
+        buffer = np.empty((min(_SCORE_CHUNK, len(codes)), codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(codes), _SCORE_CHUNK):
+            chunk = buffer[:min(_SCORE_CHUNK, len(codes) - start)]
+            np.copyto(chunk, codes[start:start + _SCORE_CHUNK], casting="unsafe")
+            np.matmul(chunk, weights, out=dots[start:start + len(chunk)])
+        return dots.T
@@ -0,0 +1,195 @@
+"""
+Re-embedding memory collections when EMBEDDING_MODEL changes.
+
+Every memory collection records the model its vectors come from in its
+metadata ("embedding_model"), and MemoryStore refuses to open a collection
+embedded with another model than EMBEDDING_MODEL: query vectors from one
+model are meaningless against stored vectors from another.
+
+Switching models without downtime:
+
+1. Set REEMBED_MODEL to the new model and restart. The application keeps
+   serving from the current collections with EMBEDDING_MODEL while a
+   background thread (ReEmbedder) builds a shadow "<name>_migration"
+   collection per memory collection, reading documents page by page and
+   encoding them with the new model in EMBEDDING_BATCH_SIZE batches. Memories
+   written meanwhile are picked up by reconciling the shadow with the source
+   by id (see migration.py); progress is checkpointed, so a restart resumes
+   where it stopped, and reported in MemoryStore.get_stats()["reembedding"].
+2. Once it reports "ready", set EMBEDDING_MODEL to the new model (and clear
+   REEMBED_MODEL) and restart. On startup, before serving, MemoryStore
+   re-embeds the few memories written since, verifies each shadow and swaps
+   it in by renaming; the swapped-in collection records the new model.
+
+With the application stopped, scripts/reembed_memories.py does both steps
+in one run.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from .config import Config
+from .device_utils import get_torch_device
+from .index_params import hnsw_metadata, read_params
+from .migration import migrate_collection, pending_migrations, read_checkpoint
+
+# Collection metadata key holding the embedding model of its vectors
+EMBEDDING_MODEL_KEY = "embedding_model"
+
+
+class EmbeddingModelMismatch(RuntimeError):
+    """A collection's vectors come from another embedding model than the configured one."""
+
+
+def recorded_model(collection) -> Optional[str]:
+    """The embedding model recorded in a collection's metadata (None for collections that predate it)."""
+    return (collection.metadata or {}).get(EMBEDDING_MODEL_KEY)
+
+
+def record_model(collection, model_name: str):
+    """Record the embedding model in a collection's metadata."""
+    # Chroma rejects hnsw:* keys in modify(); the index keeps its configuration without them
+    metadata = {key: value for key, value in (collection.metadata or {}).items() if not key.startswith("hnsw:")}
+    metadata[EMBEDDING_MODEL_KEY] = model_name
+    collection.modify(metadata=metadata)
+
+
+def memory_collections(backend) -> List[str]:
+    """The main memory collection and every per-user one (migration shadows and backups excluded)."""
+    main = Config.CHROMA_COLLECTION_NAME
+    return [
+        name for name in backend.list_collections()
+        if (name == main or name.startswith(f"{main}_user_"))
+        and not name.endswith("_migration") and "_backup_" not in name
+    ]
+
+
+def encoder(model, batch_size: Optional[int] = None) -> Callable[[List[str]], np.ndarray]:
+    """Batch document encoder for migrate_collection(embed=...)."""
+    def embed(documents: List[str]) -> np.ndarray:
+        return np.asarray(model.encode(documents, batch_size=batch_size or Config.EMBEDDING_BATCH_SIZE,
+                                       show_progress_bar=False), dtype=np.float32)
+    return embed
+
+
+def reembed_collection(backend, name: str, model, model_name: str, cutover: bool,
+                       batch_size: Optional[int] = None, keep_backup: bool = False, progress: bool = False,
+                       on_page: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Re-embed one collection into its shadow, and optionally swap the shadow in.
+
+    Args:
+        backend: VectorBackend holding the collection
+        name: Collection to re-embed
+        model: Loaded SentenceTransformer of the new model
+        model_name: Name of the new model (recorded in the collection metadata)
+        cutover: Verify and swap once caught up (only with writes stopped)
+        batch_size: Documents read per page
+        keep_backup: Keep the collection embedded with the old model as a backup
+        progress: Print progress after every page
+        on_page: Called with the checkpoint state after every page
+
+    Returns:
+        migrate_collection() report
+    """
+    collection = backend.get_collection(name)
+    metadata = {key: value for key, value in (collection.metadata or {}).items() if not key.startswith("hnsw:")}
+    # Same distance metric and HNSW parameters as the collection being replaced
+    metadata.update({EMBEDDING_MODEL_KEY: model_name, **hnsw_metadata(read_params(collection))})
+    state = read_checkpoint(name)
+    if state is not None and state["settings"].get(EMBEDDING_MODEL_KEY) == model_name:
+        metadata = state["metadata"]  # Resume with the shadow's metadata even if the source's changed
+    return migrate_collection(
+        backend, name, metadata,
+        settings={EMBEDDING_MODEL_KEY: model_name},
+        batch_size=batch_size,
+        keep_backup=keep_backup,
+        progress=progress,
+        embed=encoder(model),
+        live=True,
+        cutover=cutover,
+        on_page=on_page
+    )
+
+
+def finish_pending(backend, model, model_name: str) -> List[str]:
+    """
+    Catch up and swap in every re-embedding shadow built for model_name.
+
+    Runs at startup, before anything is served, so no write can slip in
+    between the final catch-up and the swap.
+
+    Returns:
+        Names of the collections swapped
+    """
+    swapped = []
+    for state in pending_migrations():
+        if state["settings"].get(EMBEDDING_MODEL_KEY) != model_name:
+            continue
+        print(f"🔁 Finishing re-embedding of '{state['source']}' with {model_name}...")
+        report = reembed_collection(backend, state["source"], model, model_name, cutover=True)
+        print(f"✅ Swapped in '{state['source']}' ({report['records']} memories, "
+              f"{report['reconciled']} caught up)")
+        swapped.append(state["source"])
+    return swapped
+
+
+class ReEmbedder:
+    """Background re-embedding of every memory collection into shadow collections (see module docstring)."""
+
+    def __init__(self, backend, model_name: str, batch_size: Optional[int] = None):
+        self.backend = backend
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._status: Dict[str, Any] = {
+            "model": model_name, "phase": "starting", "collection": None,
+            "collections_done": 0, "collections_total": 0,
+            "copied": 0, "total": 0, "rate_per_s": 0.0, "error": None,
+        }
+        self._thread = threading.Thread(target=self._run, name="reembedder", daemon=True)
+
+    def start(self) -> "ReEmbedder":
+        self._thread.start()
+        return self
+
+    def join(self, timeout: Optional[float] = None):
+        self._thread.join(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        """Progress: phase ("starting", "copying", "ready" or "failed"), current collection and counts."""
+        with self._lock:
+            return dict(self._status)
+
+    def _update(self, **values):
+        with self._lock:
+            self._status.update(values)
+
+    def _run(self):
+        try:
+            model = SentenceTransformer(self.model_name, device=get_torch_device())
+            names = memory_collections(self.backend)
+            self._update(phase="copying", collections_total=len(names))
+            for done, name in enumerate(names):
+                start = time.perf_counter()
+                resumed_from = (read_checkpoint(name) or {}).get("offset", 0)
+
+                def on_page(state, name=name, start=start, resumed_from=resumed_from):
+                    rate = (state["offset"] - resumed_from) / max(time.perf_counter() - start, 1e-9)
+                    self._update(collection=name, copied=state["offset"], total=state["count"],
+                                 rate_per_s=round(rate, 1))
+
+                self._update(collection=name, copied=0, total=self.backend.get_collection(name).count())
+                reembed_collection(self.backend, name, model, self.model_name, cutover=False,
+                                   batch_size=self.batch_size, on_page=on_page)
+                self._update(collections_done=done + 1)
+            self._update(phase="ready")
+            print(f"✅ Re-embedding with {self.model_name} is ready: set EMBEDDING_MODEL={self.model_name} "
+                  "and restart to switch over")
+        except Exception as e:
+            self._update(phase="failed", error=str(e))
+            print(f"❌ Re-embedding with {self.model_name} failed: {e}")
@@ -0,0 +1,186 @@
+"""
+Routing retrieval between conversational memory and the document corpus.
+
+Memories (MemoryStore, CHROMA_COLLECTION_NAME) and documents loaded for
+RAG (LlamaIndexRAG, RAG_COLLECTION_NAME) live in separate collections.
+RetrievalRouter decides per query which of them to search (RETRIEVAL_ROUTING):
+questions about documents go to the document corpus, questions about the
+user or the conversation to memory, anything else to both. When both are
+searched the two queries run in parallel on the I/O executor and the results
+are fused on a normalized score:
+
+- each corpus' scores (memories: reranked boosted_score; documents: cosine
+  similarity) are divided by that corpus' top score, so the ranking inside a
+  corpus is kept whatever its scoring,
+- then scaled by the cosine similarity of that corpus' best hit, so a corpus
+  with only weak matches can't outrank one with a strong match (for
+  documents the fused score is simply their cosine similarity).
+"""
+
+import math
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .async_utils import submit_io_call
+from .config import Config
+from .tracing import span
+
+MEMORIES = "memories"
+DOCUMENTS = "documents"
+ROUTING_MODES = ("auto", "both", MEMORIES, DOCUMENTS)
+
+# Queries about loaded material
+_DOCUMENT_CUES = re.compile(
+    r"\b(documents?|docs?|files?|papers?|pdfs?|reports?|manuals?|articles?|books?|chapters?|sections?|pages?"
+    r"|readme|specs?|specifications?|according to|the text|the notes)\b",
+    re.IGNORECASE
+)
+# Queries about the user, the assistant or the conversation so far
+_MEMORY_CUES = re.compile(
+    r"\b(i|i'm|i've|i'd|me|my|mine|we|we've|our|us|you said|you told|told you|remember|remind me|earlier"
+    r"|last time|yesterday|before|previously|we talked|we discussed|our conversation)\b",
+    re.IGNORECASE
+)
+
+
+def route_query(query: str, mode: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Corpora to search for a query.
+
+    Args:
+        query: User query
+        mode: Routing mode (default: RETRIEVAL_ROUTING)
+
+    Returns:
+        (MEMORIES,), (DOCUMENTS,) or (MEMORIES, DOCUMENTS)
+    """
+    mode = (mode or Config.RETRIEVAL_ROUTING).lower()
+    if mode not in ROUTING_MODES:
+        raise ValueError(f"Unknown RETRIEVAL_ROUTING '{mode}' (expected one of {', '.join(ROUTING_MODES)})")
+    if mode == MEMORIES:
+        return (MEMORIES,)
+    if mode == DOCUMENTS:
+        return (DOCUMENTS,)
+    if mode == "auto":
+        about_documents = bool(_DOCUMENT_CUES.search(query))
+        about_memories = bool(_MEMORY_CUES.search(query))
+        if about_documents != about_memories:
+            return (DOCUMENTS,) if about_documents else (MEMORIES,)
+    return (MEMORIES, DOCUMENTS)
+
+
+def cosine_from_score(score: float, space: str) -> float:
+    """
+    Cosine similarity of a LlamaIndex Chroma hit.
+
+    ChromaVectorStore reports exp(-distance); the distance depends on the
+    collection's space (embeddings are normalized, so l2 = 2 - 2 cos).
+    """
+    distance = -math.log(max(score, 1e-12))
+    return 1 - distance / 2 if space == "l2" else 1 - distance
+
+
+def fuse(ranked: Dict[str, List[Dict[str, Any]]], n_results: int) -> List[Dict[str, Any]]:
+    """
+    Merge per-corpus results on a normalized score (see module docstring).
+
+    Args:
+        ranked: Results per corpus, each with "score" (ranking score within
+            the corpus) and "similarity" (cosine similarity)
+        n_results: Results to keep
+
+    Returns:
+        Results with "source" and "fused_score", best first
+    """
+    fused = []
+    for source, results in ranked.items():
+        if not results:
+            continue
+        top = max(r["score"] for r in results)
+        best = max(r["similarity"] for r in results)
+        for result in results:
+            relative = result["score"] / top if top > 0 else 1.0
+            fused.append({**result, "source": source, "fused_score": relative * best})
+    fused.sort(key=lambda r: r["fused_score"], reverse=True)
+    return fused[:n_results]
+
+
+class RetrievalRouter:
+    """Routes queries to memories, documents or both and fuses the results (see module docstring)."""
+
+    def __init__(self, memory, documents=None, mode: Optional[str] = None):
+        """
+        Args:
+            memory: MemoryStore
+            documents: LlamaIndexRAG over the document corpus (None: memories only)
+            mode: Routing mode (default: RETRIEVAL_ROUTING)
+        """
+        self.memory = memory
+        self.documents = documents
+        self.mode = mode or Config.RETRIEVAL_ROUTING
+        route_query("", self.mode)  # Fail fast on an unknown mode
+        self._lock = threading.Lock()
+        self._routes = {MEMORIES: 0, DOCUMENTS: 0, "both": 0}
+        # Fused results of the latest retrieve(), e.g. what the chat engine's context was built from
+        self.last_results: List[Dict[str, Any]] = []
+
+    def route(self, query: str) -> Tuple[str, ...]:
+        if self.documents is None:
+            return (MEMORIES,)
+        return route_query(query, self.mode)
+
+    def retrieve(self, query: str, n_results: Optional[int] = None, query_analysis: Optional[Dict] = None,
+                 **memory_kwargs) -> List[Dict[str, Any]]:
+        """
+        Retrieve from the routed corpora.
+
+        Args:
+            query: Query text (the enhanced query, if any)
+            n_results: Results to return (default: MEMORY_CONTEXT_SIZE)
+            query_analysis: NLP analysis for the memory store's hybrid boosts
+            **memory_kwargs: Passed to MemoryStore.retrieve_memories (user_id, session_id, ...)
+
+        Returns:
+            Memory-shaped results (id, content, metadata, similarity, boosted_score)
+            with "source" (MEMORIES or DOCUMENTS) and "fused_score", best first
+        """
+        n_results = n_results or Config.MEMORY_CONTEXT_SIZE
+        sources = self.route(query)
+        with self._lock:
+            self._routes["both" if len(sources) == 2 else sources[0]] += 1
+
+        calls = {
+            MEMORIES: lambda: self._memories(query, n_results, query_analysis, memory_kwargs),
+            DOCUMENTS: lambda: self._documents(query, n_results),
+        }
+        with span("retrieval.route", sources=",".join(sources)):
+            if len(sources) == 1:
+                ranked = {sources[0]: calls[sources[0]]()}
+            else:
+                # The document query runs on the I/O executor while memories are searched here
+                pending = submit_io_call(calls[DOCUMENTS])
+                ranked = {MEMORIES: calls[MEMORIES](), DOCUMENTS: pending.result()}
+        self.last_results = fuse(ranked, n_results)
+        return self.last_results
+
+    def _memories(self, query: str, n_results: int, query_analysis: Optional[Dict],
+                  memory_kwargs: Dict[str, Any]) -> List[Dict[str, Any]]:
+        results = self.memory.retrieve_memories(query, n_results=n_results, query_analysis=query_analysis,
+                                                **memory_kwargs)
+        return [{**m, "score": m.get("boosted_score", m["similarity"])} for m in results]
+
+    def _documents(self, query: str, n_results: int) -> List[Dict[str, Any]]:
+        space = self.documents.space
+        results = []
+        for hit in self.documents.retrieve_relevant_context(query, top_k=n_results):
+            similarity = cosine_from_score(hit["score"] or 0.0, space)
+            if similarity >= Config.MEMORY_RELEVANCE_THRESHOLD:
+                results.append({"id": hit["id"], "content": hit["content"], "metadata": hit["metadata"],
+                                "similarity": similarity, "boosted_score": similarity, "score": similarity})
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queries routed to memories only, documents only and both."""
+        with self._lock:
+            return {"mode": self.mode, "routes": dict(self._routes)}
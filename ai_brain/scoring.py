@@ -0,0 +1,141 @@
+"""
+Recency- and importance-weighted memory scoring.
+
+MemoryStore over-fetches candidates by similarity and reranks them with
+
+    score = min(similarity + entity/keyword boost, 1.0)
+            + MEMORY_RECENCY_WEIGHT * 0.5 ** (age_days / MEMORY_RECENCY_HALF_LIFE_DAYS)
+              (age since the last occurrence for merged duplicates)
+            + MEMORY_ACCESS_WEIGHT * log1p(access_count) / log1p(max access_count among candidates)
+            + MEMORY_EMOTION_WEIGHT * user_emotion_score (0 for neutral memories)
+
+Every term is computed with NumPy over the whole candidate list. Memories
+carry a numeric "created_at" (epoch seconds) written by MemoryStore, so
+nothing parses ISO timestamps while ranking; memories written before it
+existed fall back to their ISO "timestamp", parsed once per distinct value.
+
+With MEMORY_MMR the reranked candidates are then diversified with greedy
+Maximal Marginal Relevance (mmr_select), so restatements of the same fact
+don't take every retrieval slot.
+"""
+
+import math
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .config import Config
+
+# Emotion label that carries no emotional weight
+NEUTRAL_EMOTION = "neutral"
+
+
+def scoring_enabled() -> bool:
+    """Whether any recency/importance term is weighted (candidates then need reranking)."""
+    return any(w > 0 for w in (Config.MEMORY_RECENCY_WEIGHT, Config.MEMORY_ACCESS_WEIGHT, Config.MEMORY_EMOTION_WEIGHT))
+
+
+def access_tracking_enabled() -> bool:
+    """Whether retrievals should count accesses on the returned memories."""
+    return Config.MEMORY_ACCESS_WEIGHT > 0
+
+
+def parse_timestamp(timestamp: Any) -> float:
+    """Epoch seconds of an ISO timestamp (NaN if it cannot be parsed)."""
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return math.nan
+
+
+# Memories without created_at repeat few distinct timestamps per query
+_legacy_timestamp = lru_cache(maxsize=65_536)(parse_timestamp)
+
+
+def created_at(metadata: Dict[str, Any]) -> float:
+    """Write-time epoch seconds for a memory's metadata (its ISO timestamp if one was given)."""
+    seconds = parse_timestamp(metadata.get("timestamp"))
+    return time.time() if math.isnan(seconds) else seconds
+
+
+def importance_scores(metadatas: List[Dict[str, Any]], now: Optional[float] = None) -> Dict[str, np.ndarray]:
+    """
+    Weighted recency, access and emotion terms for a list of candidates.
+
+    Args:
+        metadatas: Candidate metadata, in ranking order
+        now: Reference time in epoch seconds (defaults to the current time)
+
+    Returns:
+        Dict of arrays: "recency", "access" and "emotion" (each in [0, 1],
+        unweighted) and "total" (their weighted sum)
+    """
+    now = time.time() if now is None else now
+    # A memory that was restated (merged duplicate) is as recent as its last occurrence
+    created = np.array([m.get("last_seen", m.get("created_at", math.nan)) for m in metadatas], dtype=np.float64)
+    missing = np.flatnonzero(np.isnan(created))
+    for i in missing.tolist():
+        timestamp = metadatas[i].get("timestamp")
+        created[i] = _legacy_timestamp(timestamp) if isinstance(timestamp, str) else math.nan
+
+    age_days = np.maximum(now - created, 0.0) / 86_400
+    half_life = max(Config.MEMORY_RECENCY_HALF_LIFE_DAYS, 1e-9)
+    recency = np.nan_to_num(0.5 ** (age_days / half_life), nan=0.0)
+
+    access = np.log1p(np.array([m.get("access_count", 0) for m in metadatas], dtype=np.float64))
+    top = access.max() if len(access) else 0.0
+    access = access / top if top > 0 else np.zeros(len(metadatas))
+
+    emotion = np.array([
+        0.0 if m.get("user_emotion") == NEUTRAL_EMOTION else m.get("user_emotion_score", 0.0)
+        for m in metadatas
+    ], dtype=np.float64)
+
+    total = (
+        Config.MEMORY_RECENCY_WEIGHT * recency
+        + Config.MEMORY_ACCESS_WEIGHT * access
+        + Config.MEMORY_EMOTION_WEIGHT * emotion
+    )
+    return {"recency": recency, "access": access, "emotion": emotion, "total": total}
+
+
+def mmr_select(embeddings: Sequence[Sequence[float]], relevance: Sequence[float], k: int, lambda_: float) -> List[int]:
+    """
+    Greedy Maximal Marginal Relevance over a candidate list.
+
+    Each step picks the candidate maximizing
+    lambda_ * relevance - (1 - lambda_) * (max cosine similarity to the picked ones).
+
+    Args:
+        embeddings: (n, dim) candidate embeddings
+        relevance: (n,) relevance scores (higher is better)
+        k: Number of candidates to pick
+        lambda_: 1.0 ranks by relevance only, lower values favour diversity
+
+    Returns:
+        Indices of the picked candidates, in pick order
+    """
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    n = len(vectors)
+    k = min(k, n)
+    if k <= 0:
+        return []
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms > 0, norms, 1.0)
+    similarity = vectors @ vectors.T
+    relevance = lambda_ * np.asarray(relevance, dtype=np.float32)
+
+    picked = [int(np.argmax(relevance))]
+    redundancy = similarity[picked[0]].copy()
+    available = np.ones(n, dtype=bool)
+    available[picked[0]] = False
+    for _ in range(k - 1):
+        scores = np.where(available, relevance - (1 - lambda_) * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        picked.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return picked
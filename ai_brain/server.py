@@ -0,0 +1,494 @@
+"""
+Multi-user HTTP/WebSocket chat server.
+
+Serves the chat pipeline as a plain ASGI application (run with uvicorn), so a
+single process loads the embedding, NLP and LLM clients once and shares them
+across every connection. Memories are scoped by ``user_id`` (and optionally
+``session_id``) using the MemoryStore namespaces.
+
+Endpoints:
+    GET  /health                               Liveness check
+    GET  /stats?user_id=                       Memory store + server counters
+    GET  /perf                                 Per-stage latency (p50/p95) since startup
+    GET  /memories/search?user_id=&q=&n=&session_id=
+                                               Search one user's memories
+    POST /chat          {"user_id", "message", "session_id"?}
+                                               Complete response as JSON
+    POST /chat/stream   {"user_id", "message", "session_id"?}
+                                               Server-Sent Events stream
+    WS   /ws/chat?user_id=&session_id=         Send {"message"}, receive chunk/done events
+"""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, AsyncGenerator, Dict, List, Optional
+from urllib.parse import parse_qs
+
+from .config import Config
+from .async_utils import run_io_call, shutdown_executors
+from .tracing import get_stage_stats, span
+
+
+class RequestRejected(Exception):
+    """Raised when a request cannot be admitted (bad input or over a concurrency limit)."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class BadRequest(RequestRejected):
+    """Raised for malformed input (bad JSON, missing or invalid fields): answered with 400."""
+
+    def __init__(self, message: str):
+        super().__init__(400, message)
+
+
+class ChatService:
+    """
+    Shared chat pipeline used by every connection.
+
+    Holds one MemoryStore and one brain, and enforces a global and a per-user
+    limit on concurrent turns.
+    """
+
+    def __init__(
+        self,
+        memory,
+        brain,
+        use_langchain: bool = True,
+        enable_nlp: bool = True,
+        max_concurrent: int = None,
+        max_per_user: int = None,
+        queue_timeout: float = None
+    ):
+        """
+        Initialize the service.
+
+        Args:
+            memory: Shared MemoryStore
+            brain: Shared LangChainBrain or AIBrain (anything with agenerate_response_streaming)
+            use_langchain: Whether the brain accepts query_analysis (LangChainBrain)
+            enable_nlp: Run query enhancement and NLP enrichment of stored memories
+            max_concurrent: Max turns processed at once across all users
+            max_per_user: Max turns in flight for a single user
+            queue_timeout: Seconds a request may wait for a free slot before being rejected
+        """
+        self.memory = memory
+        self.brain = brain
+        self.use_langchain = use_langchain
+        self.enable_nlp = enable_nlp
+        self.max_concurrent = max_concurrent or Config.SERVER_MAX_CONCURRENT_REQUESTS
+        self.max_per_user = max_per_user or Config.SERVER_MAX_REQUESTS_PER_USER
+        self.queue_timeout = queue_timeout if queue_timeout is not None else Config.SERVER_QUEUE_TIMEOUT
+
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._inflight_by_user: Dict[str, int] = {}
+        self.counters = {
+            "total_requests": 0,
+            "active_requests": 0,
+            "rejected_requests": 0,
+            "active_websockets": 0,
+        }
+
+    @classmethod
+    def from_config(cls) -> "ChatService":
+        """Load the shared models once, based on Config."""
+        from .memory import MemoryStore
+
+        Config.validate()
+        memory = MemoryStore()
+
+        use_langchain = Config.SERVER_BRAIN.lower() == "langchain"
+        if use_langchain:
+            from .langchain_brain import LangChainBrain
+            brain = LangChainBrain()
+        else:
+            from .inference import AIBrain
+            brain = AIBrain()
+
+        # Load spaCy/RoBERTa up front instead of on the first request
+        from .nlp_analyzer import get_analyzer
+        get_analyzer()
+
+        return cls(memory=memory, brain=brain, use_langchain=use_langchain)
+
+    @asynccontextmanager
+    async def limit(self, user_id: str):
+        """Admit one request for user_id, enforcing per-user and global limits."""
+        if self._inflight_by_user.get(user_id, 0) >= self.max_per_user:
+            self.counters["rejected_requests"] += 1
+            raise RequestRejected(429, f"Too many concurrent requests for user '{user_id}'")
+
+        self._inflight_by_user[user_id] = self._inflight_by_user.get(user_id, 0) + 1
+        try:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.counters["rejected_requests"] += 1
+                raise RequestRejected(503, "Server busy, try again later")
+
+            self.counters["total_requests"] += 1
+            self.counters["active_requests"] += 1
+            try:
+                yield
+            finally:
+                self.counters["active_requests"] -= 1
+                self._slots.release()
+        finally:
+            self._inflight_by_user[user_id] -= 1
+            if self._inflight_by_user[user_id] == 0:
+                del self._inflight_by_user[user_id]
+
+    async def stream_turn(
+        self,
+        user_id: str,
+        message: str,
+        session_id: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Run one conversation turn for a user, streaming the response.
+
+        Memories are searched across the user's namespace; recent history is
+        limited to session_id when given. The exchange is stored back into the
+        user's memory once the response completes.
+        """
+        # The span stays current across yields: the handler drives this
+        # generator from a single task, so context attach/detach match
+        with span("turn", user_id=user_id):
+            async for chunk in self._stream_turn(user_id, message, session_id):
+                yield chunk
+
+    async def _stream_turn(
+        self,
+        user_id: str,
+        message: str,
+        session_id: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        query_analysis = None
+        query = message
+        if self.enable_nlp:
+            from .nlp_analyzer import get_analyzer
+            query_analysis = await get_analyzer().aenhance_query(message)
+            query = query_analysis["enhanced_query"]
+
+        relevant_memories, conversation_history = await asyncio.gather(
+            self.memory.aretrieve_memories(
+                query=query,
+                n_results=Config.MEMORY_CONTEXT_SIZE,
+                query_analysis=query_analysis,
+                user_id=user_id
+            ),
+            self.memory.aget_conversation_history(n_recent=10, user_id=user_id, session_id=session_id)
+        )
+
+        kwargs = {
+            "message": message,
+            "relevant_memories": relevant_memories,
+            "conversation_history": conversation_history,
+        }
+        if self.use_langchain:
+            kwargs["query_analysis"] = query_analysis
+
+        response_parts: List[str] = []
+        async for chunk in self.brain.agenerate_response_streaming(**kwargs):
+            response_parts.append(chunk)
+            yield chunk
+
+        response_text = "".join(response_parts)
+        if response_text.strip():
+            timestamp = datetime.now().isoformat()
+            await asyncio.gather(
+                self.memory.aadd_memory(
+                    content=message,
+                    memory_type="conversation",
+                    metadata={"role": "user", "timestamp": timestamp},
+                    enable_nlp=self.enable_nlp,
+                    user_id=user_id,
+                    session_id=session_id
+                ),
+                self.memory.aadd_memory(
+                    content=response_text,
+                    memory_type="conversation",
+                    metadata={"role": "assistant", "timestamp": timestamp},
+                    enable_nlp=self.enable_nlp,
+                    user_id=user_id,
+                    session_id=session_id
+                )
+            )
+
+    async def chat(self, user_id: str, message: str, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """Run one conversation turn and return the complete response."""
+        start = time.perf_counter()
+        chunks = [chunk async for chunk in self.stream_turn(user_id, message, session_id)]
+        return {
+            "user_id": user_id,
+            "response": "".join(chunks),
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1)
+        }
+
+    async def search_memories(
+        self,
+        user_id: str,
+        query: str,
+        n_results: int = None,
+        session_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Semantic search over one user's memories (optionally one session)."""
+        memories = await self.memory.aretrieve_memories(
+            query=query,
+            n_results=n_results or Config.MEMORY_CONTEXT_SIZE,
+            user_id=user_id,
+            session_id=session_id
+        )
+        return [
+            {
+                "id": mem["id"],
+                "content": mem["content"],
+                "similarity": mem["similarity"],
+                "timestamp": mem["metadata"].get("timestamp")
+            }
+            for mem in memories
+        ]
+
+    async def stats(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Memory store statistics (for one user if given) plus server counters."""
+        memory_stats = await run_io_call(self.memory.get_stats, user_id)
+        return {
+            "memory": memory_stats,
+            "server": {
+                **self.counters,
+                "users_in_flight": len(self._inflight_by_user),
+                "max_concurrent_requests": self.max_concurrent,
+                "max_requests_per_user": self.max_per_user,
+            }
+        }
+
+
+class ChatServerApp:
+    """ASGI application routing HTTP and WebSocket requests to a ChatService."""
+
+    def __init__(self, service: Optional[ChatService] = None):
+        """
+        Args:
+            service: Preconfigured service (e.g. with a fake brain). If None,
+                one is built from Config at startup.
+        """
+        self.service = service
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._handle_http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._handle_websocket(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        """Load shared models on startup; release executors on shutdown."""
+        while True:
+            event = await receive()
+            if event["type"] == "lifespan.startup":
+                try:
+                    if self.service is None:
+                        # Model loading blocks; keep it off the event loop
+                        self.service = await asyncio.to_thread(ChatService.from_config)
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif event["type"] == "lifespan.shutdown":
+                shutdown_executors(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ------------------------------------------------------------------ HTTP
+
+    async def _handle_http(self, scope, receive, send):
+        method = scope["method"]
+        path = scope["path"].rstrip("/") or "/"
+        params = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+
+        try:
+            if method == "GET" and path == "/health":
+                await self._send_json(send, 200, {"status": "ok"})
+            elif method == "GET" and path == "/stats":
+                await self._send_json(send, 200, await self.service.stats(params.get("user_id")))
+            elif method == "GET" and path == "/perf":
+                await self._send_json(send, 200, {"stages": get_stage_stats().summary()})
+            elif method == "GET" and path == "/memories/search":
+                user_id = self._require(params, "user_id")
+                query = self._require(params, "q")
+                try:
+                    n_results = int(params.get("n", Config.MEMORY_CONTEXT_SIZE))
+                except ValueError:
+                    raise BadRequest("n must be an integer")
+                async with self.service.limit(user_id):
+                    results = await self.service.search_memories(
+                        user_id, query, n_results, params.get("session_id")
+                    )
+                await self._send_json(send, 200, {"user_id": user_id, "results": results})
+            elif method == "POST" and path == "/chat":
+                body = await self._read_json(receive)
+                user_id = self._require(body, "user_id")
+                message = self._require(body, "message")
+                async with self.service.limit(user_id):
+                    result = await self.service.chat(user_id, message, body.get("session_id"))
+                await self._send_json(send, 200, result)
+            elif method == "POST" and path == "/chat/stream":
+                body = await self._read_json(receive)
+                user_id = self._require(body, "user_id")
+                message = self._require(body, "message")
+                async with self.service.limit(user_id):
+                    await self._stream_sse(send, user_id, message, body.get("session_id"))
+            else:
+                await self._send_json(send, 404, {"error": f"Not found: {method} {path}"})
+        except RequestRejected as e:
+            await self._send_json(send, e.status, {"error": e.message})
+        except Exception as e:
+            await self._send_json(send, 500, {"error": str(e)})
+
+    async def _stream_sse(self, send, user_id: str, message: str, session_id: Optional[str] = None):
+        """Stream a turn as Server-Sent Events: chunk events, then done."""
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+            ],
+        })
+        start = time.perf_counter()
+        try:
+            async for chunk in self.service.stream_turn(user_id, message, session_id):
+                await send({
+                    "type": "http.response.body",
+                    "body": self._sse_event("chunk", {"content": chunk}),
+                    "more_body": True,
+                })
+            done = {"latency_ms": round((time.perf_counter() - start) * 1000, 1)}
+            await send({"type": "http.response.body", "body": self._sse_event("done", done)})
+        except Exception as e:
+            await send({"type": "http.response.body", "body": self._sse_event("error", {"error": str(e)})})
+
+    @staticmethod
+    def _sse_event(event: str, data: Dict[str, Any]) -> bytes:
+        return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n".encode("utf-8")
+
+    @staticmethod
+    async def _read_json(receive) -> Dict[str, Any]:
+        body = b""
+        while True:
+            event = await receive()
+            body += event.get("body", b"")
+            if not event.get("more_body"):
+                break
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise BadRequest("Request body must be valid JSON")
+        if not isinstance(data, dict):
+            raise BadRequest("Request body must be a JSON object")
+        return data
+
+    @staticmethod
+    def _require(data: Dict[str, Any], key: str) -> str:
+        value = data.get(key)
+        if not value or not isinstance(value, str):
+            raise BadRequest(f"Missing required field: {key}")
+        return value
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    # ------------------------------------------------------------- WebSocket
+
+    async def _handle_websocket(self, scope, receive, send):
+        """One WebSocket per user: each text frame {"message"} runs a streamed turn."""
+        if scope["path"].rstrip("/") != "/ws/chat":
+            await send({"type": "websocket.close", "code": 4404})
+            return
+
+        params = {k: v[-1] for k, v in parse_qs(scope.get("query_string", b"").decode()).items()}
+        user_id = params.get("user_id")
+        session_id = params.get("session_id")
+
+        event = await receive()
+        if event["type"] != "websocket.connect":
+            return
+        if not user_id:
+            await send({"type": "websocket.close", "code": 4400})
+            return
+        await send({"type": "websocket.accept"})
+
+        self.service.counters["active_websockets"] += 1
+        try:
+            while True:
+                event = await receive()
+                if event["type"] == "websocket.disconnect":
+                    break
+                if event["type"] != "websocket.receive":
+                    continue
+
+                try:
+                    data = json.loads(event.get("text") or event.get("bytes") or b"{}")
+                    message = self._require(data, "message")
+                except (ValueError, AttributeError, BadRequest) as e:
+                    await self._ws_send(send, {"type": "error", "error": f"Invalid message: {e}"})
+                    continue
+
+                try:
+                    async with self.service.limit(user_id):
+                        start = time.perf_counter()
+                        async for chunk in self.service.stream_turn(user_id, message, session_id):
+                            await self._ws_send(send, {"type": "chunk", "content": chunk})
+                        await self._ws_send(send, {
+                            "type": "done",
+                            "latency_ms": round((time.perf_counter() - start) * 1000, 1)
+                        })
+                except RequestRejected as e:
+                    await self._ws_send(send, {"type": "error", "status": e.status, "error": e.message})
+                except Exception as e:
+                    await self._ws_send(send, {"type": "error", "status": 500, "error": str(e)})
+        finally:
+            self.service.counters["active_websockets"] -= 1
+
+    @staticmethod
+    async def _ws_send(send, payload: Dict[str, Any]):
+        await send({"type": "websocket.send", "text": json.dumps(payload, ensure_ascii=False)})
+
+
+def create_app(service: Optional[ChatService] = None) -> ChatServerApp:
+    """Create the ASGI app. Models are loaded at startup unless a service is given."""
+    return ChatServerApp(service)
+
+
+def main():
+    """Run the chat server with uvicorn."""
+    import uvicorn
+
+    print(f"🌐 Starting AI Brain chat server on http://{Config.SERVER_HOST}:{Config.SERVER_PORT}")
+    uvicorn.run(
+        create_app(),
+        host=Config.SERVER_HOST,
+        port=Config.SERVER_PORT,
+        lifespan="on"
+    )
+
+
+if __name__ == "__main__":
+    main()
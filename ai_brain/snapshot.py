@@ -0,0 +1,344 @@
+"""
+Portable snapshots of memory collections.
+
+A snapshot is a directory of plain files, independent of the vector backend
+and of Chroma's on-disk format:
+
+- embeddings.npy: float32 (rows, dim) array, written and read as a memmap
+- records.parquet (Parquet, if pyarrow is installed) or records.jsonl.zst
+  (zstandard-compressed JSON lines): one record per embedding row, in the
+  same order, with id, document, the JSON metadata and the filterable
+  fields (type, user_id, session_id, created_at) as their own columns
+- manifest.json: collection name and metadata (distance metric, HNSW
+  parameters, embedding model), row count, dimension, the export filters
+  and a SHA-256 checksum and size per file
+
+export_snapshot() streams a collection page by page, optionally filtered
+by type, user, session and created_at range; import_snapshot() verifies the
+checksums, applies the same filters and adds the records in batches of the
+backend's maximum batch size. The application may keep running during an
+export: the set of memories is fixed when the export starts.
+"""
+
+import io
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .file_utils import sha256_file
+from .index_params import hnsw_metadata, read_params
+from .reembedding import EMBEDDING_MODEL_KEY, recorded_model
+
+try:
+    import zstandard
+except ImportError:  # JSONL snapshots are written uncompressed without zstandard
+    zstandard = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.npy"
+# Metadata fields stored as their own columns so imports can filter without parsing the metadata
+FILTER_FIELDS = ("type", "user_id", "session_id", "created_at")
+_PAGE_SIZE = 5000
+
+
+class SnapshotError(ValueError):
+    """A snapshot is incomplete, corrupted or incompatible with the target collection."""
+
+
+def parse_date(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds of an ISO date or datetime (None passes through)."""
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+
+def build_filters(memory_type: Optional[str] = None, user_id: Optional[str] = None, session_id: Optional[str] = None,
+                  since: Optional[float] = None, until: Optional[float] = None) -> Dict[str, Any]:
+    """Snapshot filters (unset ones omitted); since/until bound created_at in epoch seconds."""
+    filters = {"type": memory_type, "user_id": user_id, "session_id": session_id, "since": since, "until": until}
+    return {key: value for key, value in filters.items() if value is not None}
+
+
+def _where(filters: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The Chroma where clause of snapshot filters."""
+    conditions = [{key: filters[key]} for key in ("type", "user_id", "session_id") if key in filters]
+    if "since" in filters:
+        conditions.append({"created_at": {"$gte": filters["since"]}})
+    if "until" in filters:
+        conditions.append({"created_at": {"$lt": filters["until"]}})
+    if not conditions:
+        return None
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
+
+
+def _matches(record: Dict[str, Any], filters: Dict[str, Any]) -> bool:
+    for key in ("type", "user_id", "session_id"):
+        if key in filters and record.get(key) != filters[key]:
+            return False
+    created = record.get("created_at")
+    if ("since" in filters or "until" in filters) and created is None:
+        return False
+    if "since" in filters and created < filters["since"]:
+        return False
+    return not ("until" in filters and created >= filters["until"])
+
+
+class _RecordWriter:
+    """Streams records to records.parquet or records.jsonl[.zst]."""
+
+    def __init__(self, directory: Path, fmt: str):
+        self.format = fmt
+        if fmt == "parquet":
+            if not PYARROW_AVAILABLE:
+                raise SnapshotError("Parquet snapshots need pyarrow (pip install pyarrow), or use format 'jsonl'")
+            self.path = directory / "records.parquet"
+            schema = pa.schema([("id", pa.string()), ("document", pa.string()), ("metadata", pa.string()),
+                                ("type", pa.string()), ("user_id", pa.string()), ("session_id", pa.string()),
+                                ("created_at", pa.float64())])
+            self._writer = pq.ParquetWriter(self.path, schema, compression="zstd")
+            self._schema = schema
+        else:
+            self.path = directory / ("records.jsonl.zst" if zstandard is not None else "records.jsonl")
+            self._file = open(self.path, "wb")
+            self._stream = zstandard.ZstdCompressor(level=3).stream_writer(self._file) if zstandard else self._file
+
+    def write(self, records: List[Dict[str, Any]]):
+        if self.format == "parquet":
+            columns = {name: [record[name] for record in records] for name in self._schema.names}
+            self._writer.write_table(pa.table(columns, schema=self._schema))
+        else:
+            self._stream.write("".join(json.dumps(record) + "\n" for record in records).encode("utf-8"))
+
+    def close(self):
+        if self.format == "parquet":
+            self._writer.close()
+        else:
+            if self._stream is not self._file:
+                self._stream.close()  # Also closes the file
+            else:
+                self._file.close()
+
+
+def _read_records(path: Path, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """Batches of records from a snapshot's record file, in row order."""
+    if path.suffix == ".parquet":
+        if not PYARROW_AVAILABLE:
+            raise SnapshotError("Reading a Parquet snapshot needs pyarrow (pip install pyarrow)")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+            yield batch.to_pylist()
+        return
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise SnapshotError("Reading a .zst snapshot needs zstandard (pip install zstandard)")
+        with open(path, "rb") as f, zstandard.ZstdDecompressor().stream_reader(f) as raw:
+            yield from _read_lines(raw, batch_size)
+        return
+    with open(path, "rb") as raw:
+        yield from _read_lines(raw, batch_size)
+
+
+def _read_lines(raw, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for line in io.TextIOWrapper(raw, encoding="utf-8"):
+        batch.append(json.loads(line))
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def export_snapshot(collection, directory: Path, filters: Optional[Dict[str, Any]] = None,
+                    fmt: Optional[str] = None, page_size: int = _PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Write a collection (or the memories matching filters) to a snapshot directory.
+
+    Args:
+        collection: Collection to export
+        directory: Snapshot directory (created; must not hold a snapshot yet)
+        filters: build_filters() output
+        fmt: "parquet" or "jsonl" (default: parquet if pyarrow is installed)
+        page_size: Records read per get() call
+
+    Returns:
+        The manifest
+    """
+    start = time.perf_counter()
+    directory = Path(directory)
+    if (directory / MANIFEST_FILE).exists():
+        raise SnapshotError(f"{directory} already holds a snapshot")
+    directory.mkdir(parents=True, exist_ok=True)
+    filters = filters or {}
+    fmt = fmt or ("parquet" if PYARROW_AVAILABLE else "jsonl")
+
+    # Fix the set of memories first, so concurrent writes can't change the row count mid-export
+    ids = collection.get(where=_where(filters), include=[])["ids"]
+    writer = _RecordWriter(directory, fmt)
+    embeddings = None
+    rows = 0
+    try:
+        for offset in range(0, len(ids), page_size):
+            page = collection.get(ids=ids[offset:offset + page_size],
+                                  include=["documents", "embeddings", "metadatas"])
+            if not len(page["ids"]):
+                continue
+            vectors = np.asarray(page["embeddings"], dtype=np.float32)
+            if embeddings is None:
+                embeddings = np.lib.format.open_memmap(directory / EMBEDDINGS_FILE, mode="w+", dtype=np.float32,
+                                                       shape=(len(ids), vectors.shape[1]))
+            embeddings[rows:rows + len(vectors)] = vectors
+            records = []
+            for memory_id, document, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                metadata = metadata or {}
+                record = {"id": memory_id, "document": document, "metadata": json.dumps(metadata)}
+                for field in FILTER_FIELDS[:-1]:
+                    record[field] = None if metadata.get(field) is None else str(metadata[field])
+                created = metadata.get("created_at")
+                record["created_at"] = float(created) if isinstance(created, (int, float)) else None
+                records.append(record)
+            writer.write(records)
+            rows += len(records)
+    finally:
+        writer.close()
+
+    dim = int(embeddings.shape[1]) if embeddings is not None else 0
+    if embeddings is None:
+        np.save(directory / EMBEDDINGS_FILE, np.empty((0, 0), dtype=np.float32))
+    else:
+        embeddings.flush()
+        del embeddings
+        if rows < len(ids):
+            # Memories deleted while exporting: keep only the rows written
+            written = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")[:rows]
+            np.save(directory / "embeddings.tmp.npy", written)
+            del written
+            os.replace(directory / "embeddings.tmp.npy", directory / EMBEDDINGS_FILE)
+
+    files = {}
+    for path in (directory / EMBEDDINGS_FILE, writer.path):
+        files[path.name] = {"sha256": sha256_file(path), "bytes": path.stat().st_size}
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "collection": collection.name,
+        "collection_metadata": _collection_metadata(collection),
+        EMBEDDING_MODEL_KEY: recorded_model(collection),
+        "rows": rows,
+        "dim": dim,
+        "format": fmt,
+        "records_file": writer.path.name,
+        "filters": filters,
+        "files": files,
+        "export_seconds": round(time.perf_counter() - start, 2),
+    }
+    (directory / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def _collection_metadata(collection) -> Dict[str, Any]:
+    """A collection's metadata with its actual index parameters (hnsw:* entries)."""
+    metadata = {key: value for key, value in (collection.metadata or {}).items() if not key.startswith("hnsw:")}
+    return {**metadata, **hnsw_metadata(read_params(collection))}
+
+
+def read_manifest(directory: Path) -> Dict[str, Any]:
+    path = Path(directory) / MANIFEST_FILE
+    if not path.exists():
+        raise SnapshotError(f"No snapshot manifest in {directory}")
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {manifest.get('version')}")
+    return manifest
+
+
+def verify_snapshot(directory: Path) -> Dict[str, Any]:
+    """
+    Check every file of a snapshot against the manifest's sizes and checksums.
+
+    Returns:
+        The manifest
+
+    Raises:
+        SnapshotError: A file is missing, truncated or corrupted
+    """
+    directory = Path(directory)
+    manifest = read_manifest(directory)
+    for name, expected in manifest["files"].items():
+        path = directory / name
+        if not path.exists():
+            raise SnapshotError(f"Snapshot file {name} is missing")
+        if path.stat().st_size != expected["bytes"] or sha256_file(path) != expected["sha256"]:
+            raise SnapshotError(f"Snapshot file {name} does not match its checksum")
+    return manifest
+
+
+def import_snapshot(backend, directory: Path, collection_name: Optional[str] = None,
+                    filters: Optional[Dict[str, Any]] = None, verify: bool = True,
+                    batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Load a snapshot (or the memories matching filters) into a collection.
+
+    The collection is created with the snapshot's collection metadata if it
+    doesn't exist. Memories whose id is already in the collection are left
+    as they are.
+
+    Args:
+        backend: VectorBackend to import into
+        directory: Snapshot directory
+        collection_name: Target collection (default: the exported one)
+        filters: build_filters() output
+        verify: Check the file checksums first
+        batch_size: Records per add() call (default: the backend's maximum batch size)
+
+    Returns:
+        Report dict: collection, rows_in_snapshot, matched, imported, seconds
+    """
+    start = time.perf_counter()
+    directory = Path(directory)
+    manifest = verify_snapshot(directory) if verify else read_manifest(directory)
+    filters = filters or {}
+    name = collection_name or manifest["collection"]
+    collection = backend.get_or_create_collection(name, manifest["collection_metadata"])
+    model = recorded_model(collection)
+    if model and manifest.get(EMBEDDING_MODEL_KEY) and model != manifest[EMBEDDING_MODEL_KEY] and collection.count():
+        raise SnapshotError(f"Snapshot vectors come from {manifest[EMBEDDING_MODEL_KEY]}, "
+                            f"collection '{name}' holds vectors from {model}")
+
+    embeddings = np.load(directory / EMBEDDINGS_FILE, mmap_mode="r")
+    if len(embeddings) != manifest["rows"]:
+        raise SnapshotError(f"{EMBEDDINGS_FILE} holds {len(embeddings)} rows, the manifest {manifest['rows']}")
+    batch_size = batch_size or backend.get_max_batch_size()
+    before = collection.count()
+    row = matched = 0
+    for records in _read_records(directory / manifest["records_file"], batch_size):
+        rows = [i for i, record in enumerate(records) if _matches(record, filters)] if filters else range(len(records))
+        if len(rows):
+            selected = [records[i] for i in rows]
+            collection.add(
+                ids=[record["id"] for record in selected],
+                embeddings=np.ascontiguousarray(embeddings[[row + i for i in rows]]),
+                documents=[record["document"] for record in selected],
+                metadatas=[json.loads(record["metadata"]) or None for record in selected]
+            )
+            matched += len(selected)
+        row += len(records)
+    if row != manifest["rows"]:
+        raise SnapshotError(f"Record file holds {row} records, the manifest {manifest['rows']}")
+    return {
+        "collection": name,
+        "rows_in_snapshot": manifest["rows"],
+        "matched": matched,
+        "imported": collection.count() - before,
+        "seconds": round(time.perf_counter() - start, 2),
+    }
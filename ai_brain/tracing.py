@@ -0,0 +1,340 @@
+"""Per-stage latency tracing for the conversation turn pipeline.
+
+Every instrumented stage is timed twice over: as an OpenTelemetry span
+(exported in the background to a local JSONL file, an OTLP collector or the
+console, per TRACING_EXPORTER) and as a sample in an in-process StageStats
+table that backs the CLI ``/perf`` command. With the default exporter
+("none"), without the OpenTelemetry SDK, or with tracing disabled, only the
+local stats are kept.
+
+Stage names:
+    turn                        Whole turn (CLI process_message / server stream_turn)
+    nlp.enhance_query           spaCy query analysis
+    nlp.enrich                  spaCy + RoBERTa enrichment of a stored message
+    nlp.spacy / nlp.emotion     The two models individually
+    memory.retrieve             Memory search (embed + Chroma query + boosting)
+    memory.embed                Sentence-transformer encode
+    memory.hot_tier             In-memory hot tier search (Chroma skipped on enough strong hits)
+    memory.query                Chroma vector query
+    memory.access               Access count update on returned memories (MEMORY_ACCESS_WEIGHT > 0)
+    memory.history              Recent conversation scan
+    memory.add                  Store one memory (embed + NLP + write)
+    memory.dedup                Near-duplicate lookup before a write (MEMORY_DEDUP)
+    brain.build_system_message  LangChain prompt assembly
+    brain.build_messages        Basic-mode prompt assembly
+    llm.summarize               Summarization of older history
+    llm.generate                LLM call, first request to last chunk
+    llm.ttft                    Time to first token (also a span event)
+"""
+
+import functools
+import inspect
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence
+
+from .config import Config
+from .log_writer import RotatingLogFile
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import (
+        BatchSpanProcessor,
+        ConsoleSpanExporter,
+        SpanExporter,
+        SpanExportResult,
+    )
+    OTEL_AVAILABLE = True
+except ImportError:
+    OTEL_AVAILABLE = False
+    SpanExporter = object
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class StageStats:
+    """Thread-safe rolling latency samples per stage."""
+
+    def __init__(self, max_samples: Optional[int] = None):
+        self.max_samples = max_samples or Config.TRACING_MAX_SAMPLES
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = self._samples[stage] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage count, p50, p95, mean and max in milliseconds."""
+        with self._lock:
+            snapshot = {stage: list(samples) for stage, samples in self._samples.items()}
+        return {
+            stage: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "mean_ms": round(sum(values) / len(values) * 1000, 2),
+                "max_ms": round(max(values) * 1000, 2),
+            }
+            for stage, values in snapshot.items() if values
+        }
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+class JsonlSpanExporter(SpanExporter):
+    """
+    Write finished spans as JSON lines under TRACING_DIR.
+
+    Files rotate, compress and expire like the other logs (see
+    RotatingLogFile), so this works as a local stand-in for an OTLP collector.
+    """
+
+    def __init__(self, directory: Optional[Path] = None, session_id: Optional[str] = None):
+        session_id = session_id or datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.log = RotatingLogFile(Path(directory or Config.TRACING_DIR), f"traces_{session_id}", suffix=".jsonl")
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> "SpanExportResult":
+        lines = []
+        for span in spans:
+            context = span.get_span_context()
+            lines.append(json.dumps({
+                "name": span.name,
+                "trace_id": f"{context.trace_id:032x}",
+                "span_id": f"{context.span_id:016x}",
+                "parent_id": f"{span.parent.span_id:016x}" if span.parent else None,
+                "start": span.start_time / 1e9,
+                "duration_ms": round((span.end_time - span.start_time) / 1e6, 3),
+                "status": span.status.status_code.name,
+                "attributes": dict(span.attributes or {}),
+                "events": [
+                    {"name": e.name, "offset_ms": round((e.timestamp - span.start_time) / 1e6, 3),
+                     "attributes": dict(e.attributes or {})}
+                    for e in span.events
+                ],
+            }, default=str))
+        with self._lock:
+            self.log.write("\n".join(lines) + "\n")
+            self.log.flush()
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self):
+        with self._lock:
+            self.log.close()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        with self._lock:
+            self.log.flush()
+        return True
+
+
+_stats = StageStats()
+_tracer = None
+_provider = None
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def init_tracing(exporter: Optional[str] = None):
+    """
+    Set up the OpenTelemetry tracer once (called lazily by the span helpers).
+
+    Args:
+        exporter: "file", "otlp", "console" or "none". Defaults to Config.TRACING_EXPORTER.
+
+    Returns:
+        The tracer, or None when tracing is disabled or OpenTelemetry is missing
+    """
+    global _tracer, _provider, _initialized
+    with _init_lock:
+        if _initialized:
+            return _tracer
+        _initialized = True
+
+        exporter = (exporter or Config.TRACING_EXPORTER).lower()
+        if not Config.TRACING_ENABLED or not OTEL_AVAILABLE or exporter == "none":
+            return None
+
+        try:
+            if exporter == "otlp":
+                from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+                span_exporter = OTLPSpanExporter(endpoint=Config.TRACING_OTLP_ENDPOINT, insecure=True)
+            elif exporter == "console":
+                span_exporter = ConsoleSpanExporter()
+            else:
+                span_exporter = JsonlSpanExporter()
+        except Exception as e:
+            print(f"⚠️  Tracing exporter '{exporter}' unavailable ({e}); keeping local stats only")
+            return None
+
+        _provider = TracerProvider(resource=Resource.create({"service.name": "ai-brain"}))
+        # Spans are exported from the processor's own thread, off the turn's path
+        _provider.add_span_processor(BatchSpanProcessor(span_exporter))
+        _tracer = _provider.get_tracer("ai_brain")
+        return _tracer
+
+
+def shutdown_tracing():
+    """Flush and close exporters (they are set up again on next use)."""
+    global _tracer, _provider, _initialized
+    with _init_lock:
+        if _provider is not None:
+            _provider.shutdown()
+        _tracer = None
+        _provider = None
+        _initialized = False
+
+
+def get_tracer():
+    """Get the OpenTelemetry tracer (None when only local stats are kept)."""
+    return _tracer if _initialized else init_tracing()
+
+
+def get_stage_stats() -> StageStats:
+    """Get the session's per-stage latency stats."""
+    return _stats
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Time a block as a pipeline stage.
+
+    Yields the OpenTelemetry span (or None) so callers can add attributes.
+    Do not hold one open across a ``yield`` in a generator that may be
+    resumed from another context; use LLMCallTrace there instead.
+    """
+    tracer = get_tracer()
+    start = time.perf_counter()
+    try:
+        if tracer is None:
+            yield None
+        else:
+            with tracer.start_as_current_span(name, attributes=attributes or None) as otel_span:
+                yield otel_span
+    finally:
+        _stats.record(name, time.perf_counter() - start)
+
+
+def traced(name: str) -> Callable:
+    """Decorator form of span() for sync and async functions."""
+    def decorator(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class LLMCallTrace:
+    """
+    Trace a streaming LLM call: the ``llm.generate`` span plus a
+    ``first_token`` event and ``llm.ttft`` sample.
+
+    The span is started under the current context but never made current,
+    so it is safe to keep open across the yields of a (async) generator.
+
+    Usage:
+        with LLMCallTrace(model=self.model) as call:
+            for chunk in stream:
+                call.chunk()
+                yield chunk
+    """
+
+    def __init__(self, name: str = "llm.generate", **attributes: Any):
+        self.name = name
+        self.attributes = attributes
+        self.chunks = 0
+        self.ttft: Optional[float] = None
+        self._span = None
+        self._start = 0.0
+
+    def __enter__(self) -> "LLMCallTrace":
+        tracer = get_tracer()
+        if tracer is not None:
+            self._span = tracer.start_span(self.name, attributes=self.attributes or None)
+        self._start = time.perf_counter()
+        return self
+
+    def chunk(self):
+        """Mark one streamed chunk; the first one records TTFT."""
+        self.chunks += 1
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._start
+            _stats.record("llm.ttft", self.ttft)
+            if self._span is not None:
+                self._span.add_event("first_token", {"ttft_ms": round(self.ttft * 1000, 3)})
+
+    def __exit__(self, exc_type, exc, tb):
+        _stats.record(self.name, time.perf_counter() - self._start)
+        if self._span is not None:
+            self._span.set_attribute("llm.chunks", self.chunks)
+            if exc is not None and not isinstance(exc, GeneratorExit):
+                self._span.record_exception(exc)
+                self._span.set_status(trace.Status(trace.StatusCode.ERROR, str(exc)))
+            self._span.end()
+        return False
+
+
+def format_perf_table(summary: Dict[str, Dict[str, float]]) -> List[List[str]]:
+    """Rows for the /perf command, in pipeline order."""
+    order = [
+        "turn", "nlp.enhance_query", "memory.retrieve", "memory.embed", "memory.hot_tier", "memory.query",
+        "memory.access", "memory.history", "llm.summarize", "brain.build_system_message", "brain.build_messages",
+        "llm.ttft", "llm.generate", "memory.add", "nlp.enrich", "nlp.spacy", "nlp.emotion", "memory.dedup",
+    ]
+    stages = [s for s in order if s in summary] + sorted(s for s in summary if s not in order)
+    return [
+        [stage, str(summary[stage]["count"]), f"{summary[stage]['p50_ms']:.1f}",
+         f"{summary[stage]['p95_ms']:.1f}", f"{summary[stage]['max_ms']:.1f}"]
+        for stage in stages
+    ]
+
+
+def format_perf_report() -> Optional[str]:
+    """
+    Markdown for the /perf command: this session's per-stage latency table.
+
+    Returns:
+        The report, or None before anything has been timed
+    """
+    summary = get_stage_stats().summary()
+    if not summary:
+        return None
+    lines = [
+        "## ⏱️ Pipeline Latency (this session)\n",
+        "| Stage | Calls | p50 (ms) | p95 (ms) | Max (ms) |",
+        "|-------|-------|----------|----------|----------|",
+    ]
+    lines.extend("| " + " | ".join(row) + " |" for row in format_perf_table(summary))
+    if Config.TRACING_ENABLED and Config.TRACING_EXPORTER != "none":
+        lines.append(f"\n*Spans exported via: {Config.TRACING_EXPORTER}*")
+    return "\n".join(lines)
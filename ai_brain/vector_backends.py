@@ -0,0 +1,1020 @@
+"""
+Vector storage backends for MemoryStore.
+
+MemoryStore talks to its collections through the subset of ChromaDB's
+collection API it needs (add / get / query / update / delete / count), so the
+storage engine can be chosen with VECTOR_BACKEND:
+
+- "chroma" (default): ChromaDB's PersistentClient
+- "local": an in-process engine for single-node deployments, without
+  SQLite or serialization around every call. Vectors live in a memory-mapped
+  float32 file, ids/documents/metadata in an append-only JSONL log replayed
+  on open, and queries are one NumPy matrix-vector product over the store.
+  Once a collection holds LOCAL_HNSW_THRESHOLD vectors an hnswlib HNSW index
+  (built with the same HNSW_* parameters as Chroma's) answers unfiltered and
+  broadly filtered queries, if hnswlib is installed. Optionally
+  (LOCAL_VECTOR_QUANTIZATION / LOCAL_VECTOR_DIMS) queries scan compact
+  float16/int8, PCA- or prefix-reduced codes instead and rescore the best
+  candidates exactly from the float32 file (see quantization.py).
+
+Both return Chroma-shaped results, distances included (cosine distance is
+1 - cosine similarity), so callers don't know which engine they run on.
+"""
+
+import atexit
+import json
+import mmap
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .config import Config
+from .quantization import VectorCodec
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+try:
+    # Replaying the record log on open is mostly JSON decoding
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+_COLLECTION_NAME_RE = re.compile(r"^[a-zA-Z0-9._-]{3,512}$")
+_COLLECTION_FILE = "collection.json"
+_HNSW_FILE = "hnsw.bin"
+_HNSW_STATE_FILE = "hnsw.json"
+_CODEC_FILE = "codec.npz"
+_LOCAL_MAX_BATCH = 50_000
+# Save the in-memory HNSW index after this many unsaved changes
+_HNSW_SAVE_EVERY = 10_000
+# Rewrite the files once deleted rows outnumber live ones (and exceed this)
+_COMPACT_MIN_DEAD = 1_000
+# Filters matching fewer rows than this are answered exactly by brute force
+# over just those rows, even when an HNSW index exists
+_FILTERED_BRUTE_FORCE_ROWS = 20_000
+# Compact codes are fitted once a collection has this many vectors, on a
+# sample of at most _CODEC_SAMPLE of them (smaller collections scan float32)
+_CODEC_MIN_ROWS = 1_000
+_CODEC_SAMPLE = 20_000
+
+# Chroma's defaults for collections created without hnsw:* metadata
+_DEFAULT_PARAMS = {"space": "l2", "M": 16, "construction_ef": 100, "search_ef": 10}
+
+_QUERY_INCLUDE = ("metadatas", "documents", "distances")
+_GET_INCLUDE = ("metadatas", "documents")
+
+
+class VectorBackend:
+    """
+    A store of named vector collections.
+
+    Collections returned by a backend follow ChromaDB's Collection API for
+    add(), get(), query(), update(), delete(), count(), modify(), name,
+    metadata and configuration_json.
+    """
+
+    name = "base"
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        """Open a collection, creating it with the given metadata if it doesn't exist."""
+        raise NotImplementedError
+
+    def get_collection(self, name: str):
+        """Open an existing collection (ValueError if it doesn't exist)."""
+        raise NotImplementedError
+
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        """Create a new collection (ValueError if it already exists)."""
+        raise NotImplementedError
+
+    def delete_collection(self, name: str):
+        """Delete a collection and all its data (ValueError if it doesn't exist)."""
+        raise NotImplementedError
+
+    def rename_collection(self, name: str, new_name: str):
+        """Rename a collection in one step (ValueError if it doesn't exist or new_name is taken)."""
+        raise NotImplementedError
+
+    def list_collections(self) -> List[str]:
+        """Names of all collections."""
+        raise NotImplementedError
+
+    def get_max_batch_size(self) -> int:
+        """Largest number of records one add() call accepts."""
+        raise NotImplementedError
+
+    def chroma_client(self):
+        """A ChromaDB client on the same directory (used by the document RAG)."""
+        raise NotImplementedError
+
+
+class ChromaBackend(VectorBackend):
+    """ChromaDB PersistentClient."""
+
+    name = "chroma"
+
+    def __init__(self, path: Path):
+        import chromadb
+        from chromadb.config import Settings
+
+        self.client = chromadb.PersistentClient(
+            path=str(path),
+            settings=Settings(
+                anonymized_telemetry=False,
+                allow_reset=True
+            )
+        )
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        return self.client.get_or_create_collection(name=name, metadata=metadata)
+
+    def get_collection(self, name: str):
+        import chromadb.errors
+        try:
+            return self.client.get_collection(name=name)
+        except chromadb.errors.NotFoundError as e:
+            raise ValueError(str(e)) from e
+
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        return self.client.create_collection(name=name, metadata=metadata)
+
+    def delete_collection(self, name: str):
+        import chromadb.errors
+        try:
+            self.client.delete_collection(name)
+        except chromadb.errors.NotFoundError as e:
+            raise ValueError(str(e)) from e
+
+    def rename_collection(self, name: str, new_name: str):
+        if new_name in self.list_collections():
+            raise ValueError(f"Collection {new_name} already exists")
+        self.get_collection(name).modify(name=new_name)
+
+    def list_collections(self) -> List[str]:
+        return [collection.name for collection in self.client.list_collections()]
+
+    def get_max_batch_size(self) -> int:
+        return self.client.get_max_batch_size()
+
+    def chroma_client(self):
+        return self.client
+
+
+class LocalBackend(VectorBackend):
+    """
+    In-process vector engine: one directory per collection under <path>/local.
+
+    Collections are shared by every LocalBackend on the same directory in
+    this process (like Chroma's client cache), so two MemoryStores never hold
+    diverging copies of one collection.
+    """
+
+    name = "local"
+
+    _open: Dict[Path, "LocalCollection"] = {}
+    _open_lock = threading.Lock()
+
+    def __init__(self, path: Path):
+        self.root = Path(path)
+        self.path = self.root / "local"
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._chroma_client = None
+
+    def _collection_dir(self, name: str) -> Path:
+        if not _COLLECTION_NAME_RE.match(name):
+            raise ValueError(f"Invalid collection name '{name}': use 3-512 characters from [a-zA-Z0-9._-]")
+        return (self.path / name).resolve()
+
+    def _open_collection(self, name: str, metadata: Optional[Dict[str, Any]], create: bool, must_create: bool = False):
+        directory = self._collection_dir(name)
+        with self._open_lock:
+            collection = self._open.get(directory)
+            exists = collection is not None or (directory / _COLLECTION_FILE).exists()
+            if must_create and exists:
+                raise ValueError(f"Collection {name} already exists")
+            if not exists and not create:
+                raise ValueError(f"Collection {name} does not exist")
+            if collection is None:
+                collection = LocalCollection(directory, name, metadata)
+                self._open[directory] = collection
+            return collection
+
+    def get_or_create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        return self._open_collection(name, metadata, create=True)
+
+    def get_collection(self, name: str):
+        return self._open_collection(name, None, create=False)
+
+    def create_collection(self, name: str, metadata: Optional[Dict[str, Any]] = None):
+        return self._open_collection(name, metadata, create=True, must_create=True)
+
+    def delete_collection(self, name: str):
+        directory = self._collection_dir(name)
+        with self._open_lock:
+            collection = self._open.pop(directory, None)
+            if collection is None and not (directory / _COLLECTION_FILE).exists():
+                raise ValueError(f"Collection {name} does not exist")
+            if collection is not None:
+                collection._close()
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def rename_collection(self, name: str, new_name: str):
+        directory, new_directory = self._collection_dir(name), self._collection_dir(new_name)
+        with self._open_lock:
+            if not (directory / _COLLECTION_FILE).exists():
+                raise ValueError(f"Collection {name} does not exist")
+            if new_directory.exists():
+                raise ValueError(f"Collection {new_name} already exists")
+            collection = self._open.pop(directory, None)
+            if collection is not None:
+                collection.flush()
+                collection._close()
+            # A directory rename is atomic: the collection is found under one name or the other
+            os.rename(directory, new_directory)
+            state = json.loads((new_directory / _COLLECTION_FILE).read_text(encoding="utf-8"))
+            state["name"] = new_name
+            _write_json(new_directory / _COLLECTION_FILE, state)
+
+    def list_collections(self) -> List[str]:
+        return sorted(p.parent.name for p in self.path.glob(f"*/{_COLLECTION_FILE}"))
+
+    def get_max_batch_size(self) -> int:
+        return _LOCAL_MAX_BATCH
+
+    def chroma_client(self):
+        if self._chroma_client is None:
+            self._chroma_client = ChromaBackend(self.root).client
+        return self._chroma_client
+
+    @classmethod
+    def flush_all(cls):
+        """Persist the HNSW index of every open collection (runs at exit)."""
+        with cls._open_lock:
+            collections = list(cls._open.values())
+        for collection in collections:
+            collection.flush()
+
+
+atexit.register(LocalBackend.flush_all)
+
+
+def create_backend(kind: Optional[str] = None, path: Optional[Path] = None) -> VectorBackend:
+    """
+    Open the configured vector backend.
+
+    Args:
+        kind: "chroma" or "local" (defaults to Config.VECTOR_BACKEND)
+        path: Storage directory (defaults to Config.CHROMA_PERSIST_DIR)
+    """
+    kind = (kind or Config.VECTOR_BACKEND).lower()
+    path = Path(path or Config.CHROMA_PERSIST_DIR)
+    if kind == "chroma":
+        return ChromaBackend(path)
+    if kind == "local":
+        return LocalBackend(path)
+    raise ValueError(f"Unknown VECTOR_BACKEND '{kind}' (expected 'chroma' or 'local')")
+
+
+def _write_json(path: Path, data: Dict[str, Any]):
+    """Atomically replace a small JSON file."""
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _codec_settings() -> Optional[Dict[str, Any]]:
+    """Compact code settings requested by Config, or None for plain float32."""
+    quantization = Config.LOCAL_VECTOR_QUANTIZATION.lower()
+    if quantization == "none" and Config.LOCAL_VECTOR_DIMS <= 0:
+        return None
+    return {"quantization": quantization, "dims": Config.LOCAL_VECTOR_DIMS,
+            "reduction": Config.LOCAL_VECTOR_REDUCTION.lower()}
+
+
+def _value_key(value: Any):
+    """Vocabulary key for a metadata value (True and 1 are different values)."""
+    return (isinstance(value, bool), value)
+
+
+class _Column:
+    """One metadata key encoded for vectorized where filters."""
+
+    def __init__(self):
+        self.size = 0
+        self.codes = np.empty(0, dtype=np.int32)  # -1 where the key is missing
+        self.numbers = np.empty(0, dtype=np.float64)  # NaN unless int/float
+        self.vocab: Dict[Any, int] = {}
+
+    def encode(self, value: Any) -> int:
+        return self.vocab.setdefault(_value_key(value), len(self.vocab))
+
+    def set(self, slot: int, metadata: Optional[Dict[str, Any]], key: str):
+        value = (metadata or {}).get(key)
+        if value is None:
+            self.codes[slot], self.numbers[slot] = -1, np.nan
+            return
+        self.codes[slot] = self.encode(value)
+        is_number = isinstance(value, (int, float)) and not isinstance(value, bool)
+        self.numbers[slot] = value if is_number else np.nan
+
+    def extend(self, metadatas: List[Optional[Dict[str, Any]]], key: str):
+        start = self.size
+        self.size += len(metadatas)
+        self.codes = np.concatenate([self.codes, np.empty(len(metadatas), dtype=np.int32)])
+        self.numbers = np.concatenate([self.numbers, np.empty(len(metadatas), dtype=np.float64)])
+        for offset, metadata in enumerate(metadatas):
+            self.set(start + offset, metadata, key)
+
+
+class LocalCollection:
+    """
+    A collection of the local engine.
+
+    Files in the collection directory:
+    - collection.json: name, metadata, index parameters, dimension, generation
+    - vectors.<gen>.f32: float32 rows, memory-mapped, grown by doubling
+    - records.<gen>.jsonl: add/update/delete log of ids, documents, metadata
+    - hnsw.bin / hnsw.json: saved HNSW index and how many rows it covers
+    - codec.npz: fitted compact code parameters (when quantization is on);
+      the codes themselves are rebuilt in memory on open
+
+    Rows are addressed by slot (position in the vector file); deleted slots
+    stay dead until the files are compacted into the next generation.
+    """
+
+    def __init__(self, directory: Path, name: str, metadata: Optional[Dict[str, Any]] = None):
+        self.path = directory
+        self.name = name
+        self._lock = threading.RLock()
+
+        state_path = directory / _COLLECTION_FILE
+        if state_path.exists():
+            self._state = json.loads(state_path.read_text(encoding="utf-8"))
+        else:
+            directory.mkdir(parents=True, exist_ok=True)
+            params = {
+                param: (metadata or {}).get(f"hnsw:{param}", default)
+                for param, default in _DEFAULT_PARAMS.items()
+            }
+            if params["space"] not in ("cosine", "l2", "ip"):
+                raise ValueError(f"Unsupported distance space '{params['space']}'")
+            self._state = {"name": name, "metadata": dict(metadata) if metadata else None, "params": params,
+                           "dim": None, "generation": 0}
+            _write_json(state_path, self._state)
+
+        self._load()
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        metadata = self._state["metadata"]
+        return dict(metadata) if metadata is not None else None
+
+    @property
+    def configuration_json(self) -> Dict[str, Any]:
+        params = self._state["params"]
+        return {"hnsw": {
+            "space": params["space"],
+            "max_neighbors": params["M"],
+            "ef_construction": params["construction_ef"],
+            "ef_search": params["search_ef"],
+        }}
+
+    def count(self) -> int:
+        return self._live
+
+    def modify(self, name: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
+               configuration: Optional[Dict[str, Any]] = None):
+        """Replace the metadata and/or change search_ef (applied immediately)."""
+        if name is not None and name != self.name:
+            raise ValueError("Renaming local collections is not supported")
+        with self._lock:
+            if metadata is not None:
+                self._state["metadata"] = dict(metadata)
+            search_ef = ((configuration or {}).get("hnsw") or {}).get("ef_search")
+            if search_ef is not None:
+                self._state["params"]["search_ef"] = int(search_ef)
+                if self._hnsw is not None:
+                    self._hnsw.set_ef(int(search_ef))
+            _write_json(self.path / _COLLECTION_FILE, self._state)
+
+    def add(self, ids: Sequence[str], embeddings: Sequence[Sequence[float]],
+            documents: Optional[Sequence[Optional[str]]] = None,
+            metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None):
+        """Add records; ids that already exist are skipped, as in Chroma."""
+        ids = list(ids)
+        if embeddings is None:
+            raise ValueError("The local vector backend needs precomputed embeddings")
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2 or len(vectors) != len(ids):
+            raise ValueError("embeddings must have one vector per id")
+        if documents is not None and len(documents) != len(ids):
+            raise ValueError("documents must have one entry per id")
+        if metadatas is not None and len(metadatas) != len(ids):
+            raise ValueError("metadatas must have one entry per id")
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate ids in add()")
+        if not ids:
+            return
+
+        with self._lock:
+            if self._state["dim"] is None:
+                self._state["dim"] = int(vectors.shape[1])
+                _write_json(self.path / _COLLECTION_FILE, self._state)
+                self._open_vectors()
+            elif vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimensionality {self._dim}")
+
+            keep = [i for i, memory_id in enumerate(ids) if memory_id not in self._slots]
+            if not keep:
+                return
+            if len(keep) != len(ids):
+                vectors = vectors[keep]
+
+            start = self._size
+            end = start + len(keep)
+            self._reserve(end)
+            self._vectors[start:end] = vectors
+            self._norms[start:end] = np.linalg.norm(vectors, axis=1)
+            self._alive[start:end] = True
+
+            lines = []
+            for offset, i in enumerate(keep):
+                slot = start + offset
+                document = documents[i] if documents is not None else None
+                metadata = dict(metadatas[i]) if metadatas is not None and metadatas[i] is not None else None
+                self._ids.append(ids[i])
+                self._documents.append(document)
+                self._metadatas.append(metadata)
+                self._slots[ids[i]] = slot
+                lines.append(json.dumps({"op": "add", "slot": slot, "id": ids[i],
+                                         "document": document, "metadata": metadata}))
+            self._size = end
+            self._live += len(keep)
+            self._append_log(lines)
+
+            if self._codec is not None:
+                self._encode(np.arange(start, end))
+            else:
+                self._maybe_build_codec()
+            if self._hnsw is not None:
+                self._hnsw_add(np.arange(start, end))
+            else:
+                self._maybe_build_hnsw()
+
+    def get(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None,
+            limit: Optional[int] = None, offset: Optional[int] = None,
+            include: Sequence[str] = _GET_INCLUDE) -> Dict[str, Any]:
+        """Records by id and/or where filter, in insertion order."""
+        with self._lock:
+            mask = self._alive[:self._size].copy()
+            if where is not None:
+                mask &= self._where_mask(where)
+            if ids is not None:
+                wanted = np.zeros(self._size, dtype=bool)
+                wanted[[self._slots[i] for i in ids if i in self._slots]] = True
+                mask &= wanted
+            slots = np.flatnonzero(mask)
+            start = offset or 0
+            slots = slots[start:start + limit if limit is not None else None]
+
+            result = self._rows(slots.tolist(), include)
+            if "embeddings" in include:
+                result["embeddings"] = np.array(self._vectors[slots]) if len(slots) else np.empty((0, self._dim or 0), dtype=np.float32)
+            return result
+
+    def query(self, query_embeddings: Sequence[Sequence[float]], n_results: int = 10,
+              where: Optional[Dict[str, Any]] = None,
+              include: Sequence[str] = _QUERY_INCLUDE) -> Dict[str, Any]:
+        """Nearest neighbours of each query embedding, closest first."""
+        if n_results <= 0:
+            raise ValueError(f"Number of requested results {n_results}, cannot be negative, or zero.")
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        with self._lock:
+            if self._dim is not None and queries.shape[1] != self._dim:
+                raise ValueError(f"Query embedding dimension {queries.shape[1]} does not match collection dimensionality {self._dim}")
+
+            result = {key: [] for key in ("ids", "embeddings", "documents", "metadatas", "distances")}
+            if self._live == 0:
+                slots_per_query = [[] for _ in queries]
+                distances_per_query = [[] for _ in queries]
+            else:
+                mask = self._alive[:self._size]
+                if where is not None:
+                    mask = mask & self._where_mask(where)
+                slots_per_query, distances_per_query = self._search(queries, n_results, mask, where is not None)
+
+            for slots, distances in zip(slots_per_query, distances_per_query):
+                rows = self._rows(slots, include)
+                for key in ("ids", "documents", "metadatas"):
+                    result[key].append(rows[key])
+                result["distances"].append(distances)
+                if "embeddings" in include:
+                    result["embeddings"].append(np.array(self._vectors[slots]) if len(slots)
+                                                else np.empty((0, self._dim or 0), dtype=np.float32))
+                else:
+                    result["embeddings"].append(None)
+
+            for key in ("embeddings", "documents", "metadatas", "distances"):
+                if key not in include:
+                    result[key] = None
+            result["uris"] = result["data"] = None
+            result["included"] = list(include)
+            return result
+
+    def update(self, ids: Sequence[str], embeddings: Optional[Sequence[Sequence[float]]] = None,
+               documents: Optional[Sequence[Optional[str]]] = None,
+               metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None):
+        """
+        Update existing records; unknown ids are skipped.
+
+        Metadata is merged into the stored metadata, as in Chroma (a None
+        value removes the key).
+        """
+        ids = list(ids)
+        vectors = np.asarray(embeddings, dtype=np.float32) if embeddings is not None else None
+        with self._lock:
+            if vectors is not None and vectors.shape[1] != self._dim:
+                raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match collection dimensionality {self._dim}")
+            lines, moved = [], []
+            for i, memory_id in enumerate(ids):
+                slot = self._slots.get(memory_id)
+                if slot is None:
+                    continue
+                record = {"op": "update", "slot": slot}
+                if documents is not None:
+                    self._documents[slot] = record["document"] = documents[i]
+                if metadatas is not None and metadatas[i] is not None:
+                    merged = dict(self._metadatas[slot] or {})
+                    for key, value in metadatas[i].items():
+                        if value is None:
+                            merged.pop(key, None)
+                        else:
+                            merged[key] = value
+                    self._metadatas[slot] = record["metadata"] = merged
+                    for key, column in self._columns.items():
+                        if slot < column.size:
+                            column.set(slot, merged, key)
+                if vectors is not None:
+                    self._vectors[slot] = vectors[i]
+                    self._norms[slot] = np.linalg.norm(vectors[i])
+                    moved.append(slot)
+                lines.append(json.dumps(record))
+            self._append_log(lines)
+            if moved and self._codec is not None:
+                self._encode(np.asarray(moved))
+            if moved and self._hnsw is not None:
+                # The saved index no longer matches these rows; it is saved
+                # again with the next batch of changes or at exit
+                self._remove_saved_hnsw()
+                self._hnsw_add(np.asarray(moved))
+
+    def delete(self, ids: Optional[Sequence[str]] = None, where: Optional[Dict[str, Any]] = None):
+        """Delete records by id and/or where filter."""
+        if ids is None and where is None:
+            raise ValueError("delete() needs ids or a where filter")
+        with self._lock:
+            mask = self._alive[:self._size].copy()
+            if where is not None:
+                mask &= self._where_mask(where)
+            if ids is not None:
+                wanted = np.zeros(self._size, dtype=bool)
+                wanted[[self._slots[i] for i in ids if i in self._slots]] = True
+                mask &= wanted
+            slots = np.flatnonzero(mask).tolist()
+            if not slots:
+                return
+
+            self._append_log([json.dumps({"op": "delete", "slots": slots})])
+            self._kill(slots)
+            if self._hnsw is not None:
+                for slot in slots:
+                    self._hnsw.mark_deleted(slot)
+                self._hnsw_unsaved += len(slots)
+
+            dead = self._size - self._live
+            if dead >= _COMPACT_MIN_DEAD and dead > self._live:
+                self._compact()
+
+    def flush(self):
+        """Write pending vector pages and the HNSW index to disk."""
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+            if self._hnsw is not None and self._hnsw_unsaved:
+                self._save_hnsw()
+
+    @property
+    def _dim(self) -> Optional[int]:
+        return self._state["dim"]
+
+    def _file(self, kind: str) -> Path:
+        suffix = {"vectors": "f32", "records": "jsonl"}[kind]
+        return self.path / f"{kind}.{self._state['generation']}.{suffix}"
+
+    def _load(self):
+        """Replay the record log and map the vector file."""
+        self._ids: List[Optional[str]] = []
+        self._documents: List[Optional[str]] = []
+        self._metadatas: List[Optional[Dict[str, Any]]] = []
+        self._slots: Dict[str, int] = {}
+        self._columns: Dict[str, _Column] = {}
+        self._vectors = None
+        self._codec: Optional[VectorCodec] = None
+        self._codes: Optional[np.ndarray] = None
+        self._code_norms: Optional[np.ndarray] = None
+        self._hnsw = None
+        self._hnsw_unsaved = 0
+        self._size = 0
+        self._live = 0
+
+        dead: List[int] = []
+        records = self._file("records")
+        if records.exists():
+            valid_bytes = 0
+            with open(records, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        record = _json_loads(line)
+                    except ValueError:
+                        break  # Torn final line after a crash
+                    valid_bytes += len(line)
+                    op = record["op"]
+                    if op == "add":
+                        self._ids.append(record["id"])
+                        self._documents.append(record["document"])
+                        self._metadatas.append(record["metadata"])
+                        self._slots[record["id"]] = record["slot"]
+                    elif op == "update":
+                        slot = record["slot"]
+                        if "document" in record:
+                            self._documents[slot] = record["document"]
+                        if "metadata" in record:
+                            self._metadatas[slot] = record["metadata"]
+                    elif op == "delete":
+                        dead += record["slots"]
+            if valid_bytes < records.stat().st_size:
+                # Drop the torn tail so later appends start on a clean line
+                with open(records, "r+b") as f:
+                    f.truncate(valid_bytes)
+        self._size = len(self._ids)
+        self._live = self._size
+
+        self._norms = np.empty(0, dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+        if self._dim is not None:
+            self._open_vectors()
+            self._reserve(self._size)
+            for start in range(0, self._size, 100_000):
+                end = min(start + 100_000, self._size)
+                self._norms[start:end] = np.linalg.norm(self._vectors[start:end], axis=1)
+            self._alive[:self._size] = True
+        self._kill(dead)
+        self._log = open(records, "a", encoding="utf-8")
+
+        self._maybe_build_codec()
+        self._maybe_build_hnsw()
+
+    def _open_vectors(self):
+        path = self._file("vectors")
+        rows = path.stat().st_size // (4 * self._dim) if path.exists() else 0
+        if rows == 0:
+            rows = 1024
+            with open(path, "wb") as f:
+                f.truncate(rows * self._dim * 4)
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(rows, self._dim))
+        self._norms = np.zeros(rows, dtype=np.float32)
+        self._alive = np.zeros(rows, dtype=bool)
+
+    def _reserve(self, rows: int):
+        """Grow the vector file (doubling) so it holds at least ``rows`` rows."""
+        capacity = len(self._vectors)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        self._vectors.flush()
+        path = self._file("vectors")
+        with open(path, "r+b") as f:
+            f.truncate(capacity * self._dim * 4)
+        self._vectors = np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self._dim))
+        norms = np.zeros(capacity, dtype=np.float32)
+        norms[:len(self._norms)] = self._norms
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._alive)] = self._alive
+        self._norms, self._alive = norms, alive
+        if self._codes is not None:
+            codes = np.zeros((capacity, self._codes.shape[1]), dtype=self._codes.dtype)
+            codes[:len(self._codes)] = self._codes
+            code_norms = np.zeros(capacity, dtype=np.float32)
+            code_norms[:len(self._code_norms)] = self._code_norms
+            self._codes, self._code_norms = codes, code_norms
+        if self._hnsw is not None and self._hnsw.get_max_elements() < capacity:
+            self._hnsw.resize_index(capacity)
+
+    def _append_log(self, lines: List[str]):
+        if lines:
+            self._log.write("\n".join(lines) + "\n")
+            self._log.flush()
+
+    def _kill(self, slots: Iterable[int]):
+        """Mark slots deleted and free their documents and metadata."""
+        for slot in slots:
+            if not self._alive[slot]:
+                continue
+            self._alive[slot] = False
+            self._slots.pop(self._ids[slot], None)
+            self._ids[slot] = self._documents[slot] = self._metadatas[slot] = None
+            self._live -= 1
+
+    def _compact(self):
+        """Rewrite live rows into the next generation of files."""
+        slots = np.flatnonzero(self._alive[:self._size])
+        old_files = [self._file("vectors"), self._file("records")]
+        self._state["generation"] += 1
+
+        vectors = np.memmap(self._file("vectors"), dtype=np.float32, mode="w+",
+                            shape=(max(len(slots), 1024), self._dim))
+        for start in range(0, len(slots), 100_000):
+            chunk = slots[start:start + 100_000]
+            vectors[start:start + len(chunk)] = self._vectors[chunk]
+        vectors.flush()
+        del vectors
+        with open(self._file("records"), "w", encoding="utf-8") as f:
+            for new_slot, slot in enumerate(slots.tolist()):
+                f.write(json.dumps({"op": "add", "slot": new_slot, "id": self._ids[slot],
+                                    "document": self._documents[slot], "metadata": self._metadatas[slot]}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        # Switching collection.json to the new generation is the commit point
+        _write_json(self.path / _COLLECTION_FILE, self._state)
+        self._close()
+        self._remove_saved_hnsw()
+        for path in old_files:
+            path.unlink(missing_ok=True)
+        self._load()
+
+    def _close(self):
+        self._log.close()
+        self._vectors = None
+        self._codes = self._code_norms = None
+        self._hnsw = None
+
+    def _search(self, queries: np.ndarray, k: int, mask: np.ndarray, filtered: bool):
+        """Top-k slots and distances per query among the rows in ``mask``."""
+        candidates = None
+        if filtered:
+            candidates = np.flatnonzero(mask)
+            available = len(candidates)
+        else:
+            available = self._live
+        k = min(k, available)
+        if k == 0:
+            return [[] for _ in queries], [[] for _ in queries]
+        # With compact codes, rank more candidates approximately and rescore them exactly
+        fetch = min(k * max(Config.LOCAL_RESCORE_FACTOR, 1), available) if self._codec is not None else k
+
+        use_hnsw = self._hnsw is not None and (candidates is None or len(candidates) > _FILTERED_BRUTE_FORCE_ROWS)
+        if use_hnsw:
+            # The index holds reduced vectors only when the codec reduces dimensions
+            approximate = self._codec is not None and self._codec.dims > 0
+            try:
+                self._hnsw.set_ef(max(self._state["params"]["search_ef"], fetch if approximate else k))
+                labels, distances = self._hnsw.knn_query(
+                    self._codec.project(queries) if approximate else queries,
+                    k=fetch if approximate else k,
+                    filter=(lambda slot: bool(mask[slot])) if filtered else None
+                )
+                if approximate:
+                    return self._rescore(queries, labels, k)
+                return labels.tolist(), distances.tolist()
+            except RuntimeError:
+                pass  # Too few reachable rows for k: fall back to the exact scan
+
+        selective = candidates is not None and len(candidates) * 4 < self._size
+        rows = candidates if selective else slice(0, self._size)
+        if self._codec is not None:
+            projected = self._codec.project(queries)
+            distances = self._dots_to_distances(projected, self._codec.dot(self._codes[rows], projected),
+                                                self._code_norms[rows])
+        else:
+            distances = self._distances(queries, self._vectors[rows], self._norms[rows])
+        if not selective:
+            if self._live < self._size or filtered:
+                distances[:, ~mask] = np.inf
+            candidates = None
+
+        top, top_distances = self._top(distances, fetch)
+        slots = top if candidates is None else candidates[top]
+        if self._codec is not None:
+            return self._rescore(queries, slots, k)
+        return slots.tolist(), top_distances.tolist()
+
+    @staticmethod
+    def _top(distances: np.ndarray, k: int):
+        """Column indices and values of the k smallest distances per row, sorted."""
+        if k < distances.shape[1]:
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(distances.shape[1]), (len(distances), distances.shape[1]))
+        top_distances = np.take_along_axis(distances, top, axis=1)
+        order = np.argsort(top_distances, axis=1, kind="stable")
+        return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_distances, order, axis=1)
+
+    def _rescore(self, queries: np.ndarray, slots: np.ndarray, k: int):
+        """Exact float32 distances for each query's approximate candidates, best k kept."""
+        slots_per_query, distances_per_query = [], []
+        for query, candidates in zip(queries, np.asarray(slots)):
+            candidates = np.sort(candidates)  # Sequential reads from the vector file
+            distances = self._distances(query[None, :], self._vectors[candidates], self._norms[candidates])
+            top, top_distances = self._top(distances, k)
+            slots_per_query.append(candidates[top[0]].tolist())
+            distances_per_query.append(top_distances[0].tolist())
+        return slots_per_query, distances_per_query
+
+    def _distances(self, queries: np.ndarray, vectors: np.ndarray, norms: np.ndarray) -> np.ndarray:
+        """Distances in Chroma's (hnswlib's) definition for the collection's space."""
+        return self._dots_to_distances(queries, queries @ np.asarray(vectors).T, norms)
+
+    def _dots_to_distances(self, queries: np.ndarray, dots: np.ndarray, norms: np.ndarray) -> np.ndarray:
+        """Distances from query/row dot products and row norms."""
+        space = self._state["params"]["space"]
+        if space == "cosine":
+            query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+            return 1.0 - dots / np.maximum(query_norms * norms[None, :], 1e-30)
+        if space == "ip":
+            return 1.0 - dots
+        # Squared L2
+        return np.maximum((queries ** 2).sum(axis=1, keepdims=True) + (norms ** 2)[None, :] - 2 * dots, 0.0)
+
+    def _rows(self, slots: List[int], include: Sequence[str]) -> Dict[str, Any]:
+        return {
+            "ids": [self._ids[slot] for slot in slots],
+            "embeddings": None,
+            "documents": [self._documents[slot] for slot in slots] if "documents" in include else None,
+            "metadatas": [
+                dict(self._metadatas[slot]) if self._metadatas[slot] is not None else None
+                for slot in slots
+            ] if "metadatas" in include else None,
+            "uris": None,
+            "data": None,
+            "included": list(include),
+        }
+
+    def _column(self, key: str) -> _Column:
+        column = self._columns.get(key)
+        if column is None:
+            column = self._columns[key] = _Column()
+        if column.size < self._size:
+            column.extend(self._metadatas[column.size:self._size], key)
+        return column
+
+    def _where_mask(self, where: Dict[str, Any]) -> np.ndarray:
+        """Rows matching a Chroma where filter."""
+        if not isinstance(where, dict) or len(where) != 1:
+            raise ValueError(f"Expected where to have exactly one operator, got {where}")
+        key, value = next(iter(where.items()))
+
+        if key in ("$and", "$or"):
+            if not isinstance(value, list) or len(value) < 2:
+                raise ValueError(f"Expected where value for {key} to be a list with at least two where expressions, got {value}")
+            masks = [self._where_mask(clause) for clause in value]
+            return np.logical_and.reduce(masks) if key == "$and" else np.logical_or.reduce(masks)
+
+        if isinstance(value, dict):
+            if len(value) != 1:
+                raise ValueError(f"Expected operator expression to have exactly one operator, got {value}")
+            op, operand = next(iter(value.items()))
+        else:
+            op, operand = "$eq", value
+
+        column = self._column(key)
+        if op in ("$eq", "$ne"):
+            code = column.vocab.get(_value_key(operand))
+            matches = column.codes == code if code is not None else np.zeros(self._size, dtype=bool)
+            return matches if op == "$eq" else ~matches
+        if op in ("$in", "$nin"):
+            codes = [column.vocab[_value_key(v)] for v in operand if _value_key(v) in column.vocab]
+            matches = np.isin(column.codes, codes)
+            return matches if op == "$in" else ~matches
+        if op in ("$gt", "$gte", "$lt", "$lte"):
+            if isinstance(operand, bool) or not isinstance(operand, (int, float)):
+                raise ValueError(f"Expected operand value to be an int or a float for operator {op}, got {operand}")
+            with np.errstate(invalid="ignore"):
+                return {
+                    "$gt": np.greater, "$gte": np.greater_equal, "$lt": np.less, "$lte": np.less_equal
+                }[op](column.numbers, operand)
+        raise ValueError(f"Unsupported where operator {op}")
+
+    def _maybe_build_codec(self):
+        """Encode the vectors as compact codes once the collection is large enough to fit them."""
+        settings = _codec_settings()
+        if self._codec is not None or settings is None or self._live < _CODEC_MIN_ROWS:
+            return
+        path = self.path / _CODEC_FILE
+        codec = VectorCodec.load(path) if path.exists() else None
+        if codec is None or codec.settings != VectorCodec(self._dim, **settings).settings:
+            alive = np.flatnonzero(self._alive[:self._size])
+            if len(alive) > _CODEC_SAMPLE:
+                alive = np.sort(np.random.default_rng(0).choice(alive, _CODEC_SAMPLE, replace=False))
+            codec = VectorCodec.fit(np.asarray(self._vectors[alive]), **settings)
+            tmp = path.with_suffix(".tmp")
+            codec.save(tmp)
+            os.replace(tmp, path)
+            if codec.dims and self._hnsw is not None:
+                # The graph has to hold reduced vectors from now on
+                self._hnsw = None
+        self._codec = codec
+        self._codes = np.zeros((len(self._vectors), codec.out_dim), dtype=codec.dtype)
+        self._code_norms = np.zeros(len(self._vectors), dtype=np.float32)
+        self._encode(np.arange(self._size))
+        if hasattr(mmap, "MADV_DONTNEED"):
+            # Scans read the codes from now on: let the kernel drop the float32
+            # pages, rescoring maps back only the rows it reads
+            self._vectors.flush()
+            self._vectors._mmap.madvise(mmap.MADV_DONTNEED)
+
+    def _encode(self, slots: np.ndarray):
+        for start in range(0, len(slots), 50_000):
+            chunk = slots[start:start + 50_000]
+            self._codes[chunk] = self._codec.encode(self._vectors[chunk])
+            self._code_norms[chunk] = self._codec.norms(self._codes[chunk])
+
+    def _maybe_build_hnsw(self):
+        """Switch to an HNSW index once the collection is large enough."""
+        if self._hnsw is not None or not HNSWLIB_AVAILABLE or self._live < Config.LOCAL_HNSW_THRESHOLD:
+            return
+        params = self._state["params"]
+        # With dimension reduction the graph is built over the reduced vectors
+        reduced = self._codec is not None and self._codec.dims > 0
+        index = hnswlib.Index(space=params["space"], dim=self._codec.out_dim if reduced else self._dim)
+
+        saved_path, state_path = self.path / _HNSW_FILE, self.path / _HNSW_STATE_FILE
+        saved = json.loads(state_path.read_text(encoding="utf-8")) if state_path.exists() else None
+        wanted = {"generation": self._state["generation"], "M": params["M"],
+                  "construction_ef": params["construction_ef"],
+                  "codec": self._codec.settings if reduced else None}
+        if saved and saved_path.exists() and {k: saved.get(k) for k in wanted} == wanted:
+            index.load_index(str(saved_path), max_elements=len(self._vectors))
+            self._hnsw = index
+            covered = min(saved["size"], self._size)
+            for slot in np.flatnonzero(~self._alive[:covered]).tolist():
+                try:
+                    index.mark_deleted(slot)
+                except RuntimeError:
+                    pass  # Deleted before the index was saved
+            # Rows added since the index was last saved
+            self._hnsw_add(covered + np.flatnonzero(self._alive[covered:self._size]))
+        else:
+            print(f"🧭 Building HNSW index for {self._live:,} vectors in '{self.name}'...")
+            index.init_index(max_elements=len(self._vectors), M=params["M"],
+                             ef_construction=params["construction_ef"], random_seed=100)
+            self._hnsw = index
+            self._hnsw_add(np.flatnonzero(self._alive[:self._size]))
+        index.set_ef(params["search_ef"])
+        if self._hnsw_unsaved:
+            self._save_hnsw()
+
+    def _hnsw_add(self, slots: np.ndarray):
+        for start in range(0, len(slots), 50_000):
+            chunk = slots[start:start + 50_000]
+            vectors = np.asarray(self._vectors[chunk])
+            if self._codec is not None and self._codec.dims:
+                vectors = self._codec.project(vectors)
+            self._hnsw.add_items(vectors, chunk)
+        self._hnsw_unsaved += len(slots)
+        if self._hnsw_unsaved >= _HNSW_SAVE_EVERY:
+            self._save_hnsw()
+
+    def _save_hnsw(self):
+        params = self._state["params"]
+        tmp = self.path / (_HNSW_FILE + ".tmp")
+        self._hnsw.save_index(str(tmp))
+        os.replace(tmp, self.path / _HNSW_FILE)
+        _write_json(self.path / _HNSW_STATE_FILE, {
+            "generation": self._state["generation"], "size": self._size,
+            "M": params["M"], "construction_ef": params["construction_ef"],
+            "codec": self._codec.settings if self._codec is not None and self._codec.dims else None,
+        })
+        self._hnsw_unsaved = 0
+
+    def _remove_saved_hnsw(self):
+        (self.path / _HNSW_STATE_FILE).unlink(missing_ok=True)
+        (self.path / _HNSW_FILE).unlink(missing_ok=True)
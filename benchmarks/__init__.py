@@ -0,0 +1,22 @@
+"""
+Benchmarks for AI Brain/Mind with Memory.
+
+Each benchmark runs against a scratch ChromaDB directory and prints a JSON
+report that can be saved and diffed between commits:
+- bench_namespaces.py: Per-tenant retrieval cost, shared vs per-user layout
+- bench_prompt_store.py: Prompt log size, plain text vs deduplicating store
+- bench_turn_latency.py: End-to-end and per-stage turn latency through the CLIs
+- bench_retrieval.py: Retrieval latency, recall@k and memory at 10k/100k/1M memories
+- bench_vector_backends.py: ChromaDB vs the local vector engine (brute force / HNSW)
+- bench_hot_tier.py: Retrieval latency, store queries skipped and result agreement with the hot tier
+- bench_quantization.py: Code size, RSS, latency and recall@k of the local engine's compact codes
+- bench_mmr.py: MMR selection cost, diversity of the results and retrieval overhead
+- bench_ingestion.py: Document ingestion files/sec and chunks/sec, per-document inserts vs the pipeline
+- bench_rag_engines.py: LlamaIndexRAG engine construction cost and per-turn latency, rebuilt vs reused
+- bench_streaming_ingestion.py: Peak RSS of streamed vs whole-file ingestion on generated multi-GB files
+
+fake_llm.py is a local OpenAI-compatible server (configurable TTFT and
+tokens/sec) the brains can be pointed at via OLLAMA_BASE_URL. memory_corpus.py
+generates synthetic memory corpora (metadata shaped like the NLP enrichment).
+stats.py holds the latency summary the reports share.
+"""
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory store's in-memory hot tier.
+
+A synthetic corpus (benchmarks/memory_corpus.py) is opened once without a
+hot tier and once with one, and both answer the same query mix through
+MemoryStore._retrieve_by_embedding:
+
+- recent: paraphrases of one of the newest --recent-window memories (the
+  memory's embedding plus noise), the common "what did we just talk about"
+  case
+- fresh: new queries from the corpus distribution
+
+The hot tier runs once per --min-hits value (MEMORY_HOT_TIER_MIN_HITS: strong
+hits needed to skip the store query). The report gives per configuration
+p50/p95 latency for all, recent and fresh queries, the hot tier's own stats
+(store queries skipped, share of results served from memory, estimated time
+saved) and how many of the top-k results agree with the run without a hot
+tier.
+
+Query embeddings are precomputed, so no embedding model time is included.
+
+Usage:
+    python -m benchmarks.bench_hot_tier --scale 100000
+    python -m benchmarks.bench_hot_tier --scale 100000 --engine local --corpus-root /data/corpora --output hot_tier.json
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ai_brain.config import Config
+
+from .bench_vector_backends import configure, open_corpus
+from .memory_corpus import CorpusGenerator, load_vectors
+from .stats import summarize
+
+
+def build_workload(persist_dir: Path, args) -> List[Dict[str, Any]]:
+    """Shuffled mix of recent-memory paraphrases and fresh queries."""
+    rng = np.random.default_rng(args.seed)
+    vectors = load_vectors(persist_dir)
+    n_recent = int(round(args.queries * args.recent_share))
+
+    rows = rng.integers(max(0, len(vectors) - args.recent_window), len(vectors), n_recent)
+    noise = rng.standard_normal((n_recent, vectors.shape[1]))
+    noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+    recent = vectors[rows] + args.paraphrase_noise * noise
+    recent /= np.linalg.norm(recent, axis=1, keepdims=True)
+
+    _, fresh, _ = CorpusGenerator(seed=args.seed).queries(args.queries - n_recent)
+    workload = [{"kind": "recent", "embedding": v.tolist()} for v in recent]
+    workload += [{"kind": "fresh", "embedding": v.tolist()} for v in fresh]
+    rng.shuffle(workload)
+    return workload
+
+
+def run_config(hot_tier_size: int, min_hits: int, workload: List[Dict[str, Any]], args) -> Tuple[Dict[str, Any], List[List[str]]]:
+    """Answer the workload with the given hot tier size (0 = no hot tier) and skip rule."""
+    from ai_brain.memory import MemoryStore
+
+    Config.MEMORY_HOT_TIER_SIZE = hot_tier_size
+    Config.MEMORY_HOT_TIER_MIN_HITS = min_hits
+    start = time.perf_counter()
+    memory = MemoryStore()
+    open_s = time.perf_counter() - start
+
+    timings: Dict[str, List[float]] = {"all": [], "recent": [], "fresh": []}
+    found: List[List[str]] = []
+    for query in workload:
+        start = time.perf_counter()
+        results = memory._retrieve_by_embedding(query["embedding"], n_results=args.k)
+        elapsed = time.perf_counter() - start
+        timings["all"].append(elapsed)
+        timings[query["kind"]].append(elapsed)
+        found.append([m["id"] for m in results])
+
+    report = {
+        "hot_tier_size": hot_tier_size,
+        "min_hits": min_hits,
+        "open_s": round(open_s, 2),
+        **{name: summarize(values) for name, values in timings.items()},
+        "hot_tier": memory.get_stats()["hot_tier"],
+    }
+    del memory
+    return report, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory store's hot tier")
+    parser.add_argument("--scale", type=int, default=100000, help="Corpus size")
+    parser.add_argument("--engine", choices=["chroma", "local", "local_hnsw"], default="chroma")
+    parser.add_argument("--hot-tier-size", type=int, default=Config.MEMORY_HOT_TIER_SIZE or 2048)
+    parser.add_argument("--min-hits", type=str, default="5,1", help="Comma-separated MEMORY_HOT_TIER_MIN_HITS values")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--recent-share", type=float, default=0.7, help="Share of queries about recent memories")
+    parser.add_argument("--recent-window", type=int, default=500, help="Newest memories the recent queries target")
+    parser.add_argument("--paraphrase-noise", type=float, default=0.5, help="Noise weight of recent queries")
+    parser.add_argument("--k", type=int, default=Config.MEMORY_CONTEXT_SIZE, help="Results per query")
+    parser.add_argument("--corpus-root", type=str, help="Keep/reuse generated corpora under this directory")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+    args.corpus_root = args.corpus_root or tempfile.mkdtemp(prefix="ai_brain_hot_tier_")
+
+    persist_dir = open_corpus(args.scale, args.engine, args)
+    workload = build_workload(persist_dir, args)
+
+    print("🚀 Without hot tier")
+    baseline, baseline_found = run_config(0, 0, workload, args)
+    configure(args.engine, persist_dir)
+
+    report = {
+        "benchmark": "hot_tier",
+        "engine": args.engine,
+        "size": args.scale,
+        "k": args.k,
+        "queries": args.queries,
+        "recent_share": args.recent_share,
+        "skip_similarity": Config.MEMORY_HOT_TIER_SKIP_SIMILARITY,
+        "without_hot_tier": baseline,
+        "with_hot_tier": [],
+    }
+    for min_hits in [int(m) for m in args.min_hits.split(",") if m.strip()]:
+        print(f"🚀 Hot tier of {args.hot_tier_size:,}, min_hits={min_hits}")
+        hot, hot_found = run_config(args.hot_tier_size, min_hits, workload, args)
+        configure(args.engine, persist_dir)
+
+        overlap = [len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(hot_found, baseline_found)]
+        hot["p50_speedup"] = {
+            name: round(baseline[name]["p50_ms"] / max(hot[name]["p50_ms"], 1e-6), 2)
+            for name in ("all", "recent", "fresh")
+        }
+        hot["top_k_agreement"] = {
+            "mean": round(statistics.mean(overlap), 4),
+            "top1": round(statistics.mean(float(a[:1] == b[:1]) for a, b in zip(hot_found, baseline_found)), 4),
+            "exact_share": round(statistics.mean(float(a == b) for a, b in zip(hot_found, baseline_found)), 4),
+        }
+        report["with_hot_tier"].append(hot)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark document ingestion into the RAG collection.
+
+Generates --files markdown files of --paragraphs paragraphs each, then
+times, each on a fresh store:
+
+- serial: the previous loader, SimpleDirectoryReader per file and
+  index.insert() per document (per-document embedding and writes)
+- pipeline: LlamaIndexRAG.ingest() with --workers parser processes,
+  batched embedding and bulk writes
+- rerun: ingest() again with nothing changed
+- incremental: ingest() after changing --changed files
+
+and reports files/sec and chunks/sec for each.
+
+Usage:
+    python -m benchmarks.bench_ingestion
+    python -m benchmarks.bench_ingestion --files 500 --workers 8 --output ingestion.json
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from chromadb.api.client import SharedSystemClient
+
+from ai_brain.config import Config
+
+WORDS = ("memory vector index retrieval embedding document chunk model query answer context river mountain "
+         "energy light cell protein market price contract engine signal network").split()
+
+
+def generate(directory: Path, files: int, paragraphs: int, seed: int):
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(files):
+        text = "\n\n".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(60, 160))).capitalize() + "."
+            for _ in range(paragraphs)
+        )
+        (directory / f"doc_{i:05d}.md").write_text(f"# Document {i}\n\n{text}\n", encoding="utf-8")
+
+
+def open_rag(store: Path):
+    from ai_brain.llamaindex_rag import LlamaIndexRAG
+    import chromadb
+
+    Config.CHROMA_PERSIST_DIR = store
+    SharedSystemClient.clear_system_cache()
+    return LlamaIndexRAG(chromadb.PersistentClient(path=str(store)))
+
+
+def rates(files: int, chunks: int, seconds: float) -> Dict[str, Any]:
+    return {"files": files, "chunks": chunks, "seconds": round(seconds, 2),
+            "files_per_s": round(files / seconds, 1), "chunks_per_s": round(chunks / seconds, 1)}
+
+
+def bench_serial(directory: Path, store: Path) -> Dict[str, Any]:
+    from llama_index.core import SimpleDirectoryReader
+
+    rag = open_rag(store)
+    start = time.perf_counter()
+    files = sorted(directory.iterdir())
+    for path in files:
+        for document in SimpleDirectoryReader(input_files=[str(path)]).load_data():
+            rag.index.insert(document)
+    return rates(len(files), rag.chroma_collection.count(), time.perf_counter() - start)
+
+
+def bench_pipeline(directory: Path, store: Path, workers: int, changed: int, seed: int) -> Dict[str, Any]:
+    rag = open_rag(store)
+    report = {}
+    for phase in ("pipeline", "rerun", "incremental"):
+        if phase == "incremental":
+            generate_changes(directory, changed, seed)
+        result = rag.ingest([str(directory)], workers=workers, progress=False)
+        processed = result["files_new"] + result["files_changed"]
+        report[phase] = {**rates(processed, result["chunks_added"], result["seconds"]),
+                         "files_unchanged": result["files_unchanged"], "chunks_removed": result["chunks_removed"]}
+    report["chunks_in_store"] = rag.chroma_collection.count()
+    return report
+
+
+def generate_changes(directory: Path, changed: int, seed: int):
+    rng = random.Random(seed + 1)
+    for path in rng.sample(sorted(directory.iterdir()), changed):
+        path.write_text(path.read_text(encoding="utf-8") + "\n\nAn appended paragraph.\n", encoding="utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark document ingestion into the RAG collection")
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--paragraphs", type=int, default=40, help="Paragraphs per file")
+    parser.add_argument("--workers", type=int, default=Config.RAG_INGEST_WORKERS)
+    parser.add_argument("--changed", type=int, default=10, help="Files changed before the incremental run")
+    parser.add_argument("--skip-serial", action="store_true", help="Skip the per-document baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    original = Config.CHROMA_PERSIST_DIR
+    with tempfile.TemporaryDirectory(prefix="ai_brain_ingestion_") as tmp:
+        tmp = Path(tmp)
+        print(f"📄 Generating {args.files} files...")
+        generate(tmp / "docs", args.files, args.paragraphs, args.seed)
+        report = {
+            "benchmark": "ingestion",
+            "files": args.files,
+            "megabytes": round(sum(p.stat().st_size for p in (tmp / "docs").iterdir()) / 1024 / 1024, 1),
+            "workers": args.workers,
+            "chunk_size": Config.RAG_CHUNK_SIZE,
+            "embedding_model": Config.EMBEDDING_MODEL,
+        }
+        try:
+            if not args.skip_serial:
+                print("🚀 Serial baseline (insert per document)")
+                report["serial"] = bench_serial(tmp / "docs", tmp / "serial")
+            print("🚀 Ingestion pipeline")
+            report.update(bench_pipeline(tmp / "docs", tmp / "pipeline", args.workers, args.changed, args.seed))
+        finally:
+            Config.CHROMA_PERSIST_DIR = original
+            SharedSystemClient.clear_system_cache()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark MMR diversification of retrieved memories.
+
+Three parts:
+
+- cost: ai_brain.scoring.mmr_select on --candidates candidate lists
+  (default 25/50/100/200) of 384-dim embeddings for k = --k values,
+  p50/p95 in microseconds, plus whether 100 candidates stay under 1 ms
+- diversity: candidates drawn from clusters of restatements (one fact
+  repeated with small variations) around a query; the report compares
+  plain top-k with MMR at each --lambdas value: distinct facts among the
+  k results, mean pairwise similarity and mean relevance
+- retrieval (--scale > 0): MemoryStore._retrieve_by_embedding on a
+  synthetic corpus (benchmarks/memory_corpus.py) with MEMORY_MMR off and
+  on, which includes fetching the candidates' embeddings from the store
+
+Usage:
+    python -m benchmarks.bench_mmr
+    python -m benchmarks.bench_mmr --scale 100000 --corpus-root /data/corpora --output mmr.json
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.scoring import mmr_select
+
+from .bench_vector_backends import configure, open_corpus
+from .memory_corpus import CorpusGenerator
+from .stats import summarize
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def clustered_candidates(rng: np.random.Generator, n: int, dim: int, per_fact: int):
+    """Query plus n candidates: restatements (small noise) of n / per_fact facts."""
+    query = unit(rng.standard_normal(dim))
+    facts = unit(query + 1.2 * unit(rng.standard_normal((max(n // per_fact, 1), dim))))
+    labels = np.arange(n) % len(facts)
+    candidates = unit(facts[labels] + 0.15 * unit(rng.standard_normal((n, dim))))
+    order = np.argsort(-(candidates @ query))
+    return query, candidates[order], labels[order]
+
+
+def bench_cost(args) -> Dict[str, Any]:
+    """mmr_select latency per candidate count and k."""
+    rng = np.random.default_rng(args.seed)
+    report = {}
+    for n in [int(c) for c in args.candidates.split(",") if c.strip()]:
+        query, candidates, _ = clustered_candidates(rng, n, args.dim, args.per_fact)
+        relevance = (candidates @ query).tolist()
+        embeddings = list(candidates.astype(np.float32))  # Rows of the array the vector store returns
+        for k in [int(k) for k in args.k.split(",") if k.strip()]:
+            timings = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                mmr_select(embeddings, relevance, k, Config.MEMORY_MMR_LAMBDA)
+                timings.append(time.perf_counter() - start)
+            report[f"n{n}_k{k}"] = summarize(timings, 1e6, "us")
+    at_100 = [v["p95_us"] for key, v in report.items() if key.startswith("n100_")]
+    report["under_1ms_at_100_candidates"] = bool(at_100) and max(at_100) < 1000
+    return report
+
+
+def bench_diversity(args) -> Dict[str, Any]:
+    """Distinct facts, redundancy and relevance of top-k vs MMR results."""
+    rng = np.random.default_rng(args.seed)
+    k = int(args.k.split(",")[0])
+    lambdas = [float(v) for v in args.lambdas.split(",") if v.strip()]
+    stats: Dict[str, Dict[str, List[float]]] = {
+        name: {"distinct": [], "pairwise": [], "relevance": []}
+        for name in ["top_k"] + [f"mmr_{v}" for v in lambdas]
+    }
+    for _ in range(args.trials):
+        query, candidates, labels = clustered_candidates(rng, 3 * k, args.dim, args.per_fact)
+        relevance = candidates @ query
+        picks = {"top_k": list(range(k))}
+        picks.update({f"mmr_{v}": mmr_select(candidates, relevance, k, v) for v in lambdas})
+        for name, picked in picks.items():
+            chosen = candidates[picked]
+            similarity = chosen @ chosen.T
+            stats[name]["distinct"].append(len(set(labels[picked].tolist())))
+            stats[name]["pairwise"].append(float(similarity[np.triu_indices(len(picked), 1)].mean()))
+            stats[name]["relevance"].append(float(relevance[picked].mean()))
+    return {
+        name: {
+            "distinct_facts": round(statistics.mean(values["distinct"]), 2),
+            "mean_pairwise_similarity": round(statistics.mean(values["pairwise"]), 4),
+            "mean_relevance": round(statistics.mean(values["relevance"]), 4),
+        }
+        for name, values in stats.items()
+    }
+
+
+def bench_retrieval(args) -> Dict[str, Any]:
+    """_retrieve_by_embedding latency with MEMORY_MMR off and on."""
+    from ai_brain.memory import MemoryStore
+
+    persist_dir = open_corpus(args.scale, args.engine, args)
+    _, queries, _ = CorpusGenerator(seed=args.seed).queries(args.queries)
+    original = (Config.MEMORY_MMR, Config.MEMORY_HOT_TIER_SIZE)
+    report = {"engine": args.engine, "size": args.scale}
+    try:
+        Config.MEMORY_HOT_TIER_SIZE = 0  # Measure the store path on every query
+        for enabled in (False, True):
+            Config.MEMORY_MMR = enabled
+            memory = MemoryStore()
+            timings = []
+            for query in queries:
+                start = time.perf_counter()
+                memory._retrieve_by_embedding(query.tolist(), n_results=Config.MEMORY_CONTEXT_SIZE)
+                timings.append(time.perf_counter() - start)
+            report["mmr" if enabled else "plain"] = summarize(timings)
+            del memory
+            configure(args.engine, persist_dir)
+    finally:
+        Config.MEMORY_MMR, Config.MEMORY_HOT_TIER_SIZE = original
+    report["mmr_overhead_p50_ms"] = round(report["mmr"]["p50_ms"] - report["plain"]["p50_ms"], 3)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MMR diversification of retrieved memories")
+    parser.add_argument("--candidates", type=str, default="25,50,100,200", help="Comma-separated candidate counts")
+    parser.add_argument("--k", type=str, default="5,10", help="Comma-separated results per query")
+    parser.add_argument("--lambdas", type=str, default="0.5,0.7,0.9", help="Comma-separated MMR lambdas")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--per-fact", type=int, default=4, help="Restatements per fact in the candidate lists")
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--trials", type=int, default=500)
+    parser.add_argument("--scale", type=int, default=0, help="Also time retrieval on a corpus this size")
+    parser.add_argument("--engine", choices=["chroma", "local", "local_hnsw"], default="chroma")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--corpus-root", type=str, help="Keep/reuse generated corpora under this directory")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "mmr",
+        "dim": args.dim,
+        "lambda": Config.MEMORY_MMR_LAMBDA,
+        "cost": bench_cost(args),
+        "diversity": bench_diversity(args),
+    }
+    if args.scale:
+        args.corpus_root = args.corpus_root or tempfile.mkdtemp(prefix="ai_brain_mmr_")
+        print(f"🚀 Retrieval at {args.scale:,} memories")
+        report["retrieval"] = bench_retrieval(args)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
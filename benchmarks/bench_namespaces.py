@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-tenant retrieval cost for the two namespace layouts.
+
+Populates a scratch store with many tenants (synthetic unit vectors, so no
+embedding model calls are timed), then measures retrieve and history latency
+for random tenants under the "shared" (where pushdown) and "per_user"
+(collection per tenant + LRU) layouts.
+
+Usage:
+    python -m benchmarks.bench_namespaces --tenants 10000 --per-tenant 20
+    python -m benchmarks.bench_namespaces --tenants 1000 --layouts shared --output ns.json
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from ai_brain.config import Config
+
+from .stats import summarize
+
+
+def random_unit_vectors(rng: np.random.Generator, n: int, dim: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def populate(memory, tenants: int, per_tenant: int, dim: int, batch_size: int, seed: int) -> float:
+    """Bulk-load synthetic conversation memories for every tenant. Returns seconds taken."""
+    rng = np.random.default_rng(seed)
+    base_time = datetime.now() - timedelta(days=30)
+    start = time.perf_counter()
+
+    pending: Dict[str, Dict[str, list]] = {}
+
+    def flush():
+        for user_id, batch in pending.items():
+            memory._collection_for(user_id).add(**batch)
+        pending.clear()
+
+    buffered = 0
+    for t in range(tenants):
+        user_id = f"tenant_{t}"
+        vectors = random_unit_vectors(rng, per_tenant, dim)
+        key = user_id if memory.namespace_layout == "per_user" else "__shared__"
+        batch = pending.setdefault(key, {"ids": [], "embeddings": [], "documents": [], "metadatas": []})
+        for i in range(per_tenant):
+            batch["ids"].append(f"{user_id}_{i}")
+            batch["embeddings"].append(vectors[i].tolist())
+            batch["documents"].append(f"Synthetic memory {i} of {user_id}")
+            batch["metadatas"].append({
+                "type": "conversation",
+                "role": "user" if i % 2 == 0 else "assistant",
+                "user_id": user_id,
+                "session_id": f"{user_id}_s{i // 10}",
+                "timestamp": (base_time + timedelta(minutes=t + i)).isoformat(),
+            })
+        buffered += per_tenant
+        if buffered >= batch_size:
+            if key == "__shared__":
+                memory.collection.add(**pending.pop(key))
+            else:
+                flush()
+            buffered = 0
+
+    if "__shared__" in pending:
+        memory.collection.add(**pending.pop("__shared__"))
+    flush()
+    return time.perf_counter() - start
+
+
+def run_layout(layout: str, args) -> Dict:
+    """Populate a fresh store with the given layout and time per-tenant queries."""
+    from ai_brain.memory import MemoryStore
+
+    Config.CHROMA_PERSIST_DIR = Path(tempfile.mkdtemp(prefix=f"ai_brain_bench_ns_{layout}_"))
+    Config.MEMORY_NAMESPACE_LAYOUT = layout
+    Config.MEMORY_COLLECTION_CACHE_SIZE = args.cache_size
+    memory = MemoryStore()
+    dim = memory.embedding_model.get_sentence_embedding_dimension()
+
+    print(f"📥 [{layout}] Loading {args.tenants} tenants x {args.per_tenant} memories...")
+    load_seconds = populate(memory, args.tenants, args.per_tenant, dim, args.batch_size, args.seed)
+
+    rng = np.random.default_rng(args.seed + 1)
+    sample = random.Random(args.seed).sample(range(args.tenants), min(args.queries, args.tenants))
+    retrieve_times, history_times = [], []
+
+    for t in sample:
+        user_id = f"tenant_{t}"
+        query_embedding = random_unit_vectors(rng, 1, dim)[0].tolist()
+
+        start = time.perf_counter()
+        memory._retrieve_by_embedding(query_embedding, n_results=5, user_id=user_id)
+        retrieve_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        memory.get_conversation_history(n_recent=10, user_id=user_id)
+        history_times.append(time.perf_counter() - start)
+
+    return {
+        "layout": layout,
+        "load_seconds": round(load_seconds, 2),
+        "retrieve": summarize(retrieve_times),
+        "history": summarize(history_times),
+        "persist_dir": str(Config.CHROMA_PERSIST_DIR),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory namespace layouts")
+    parser.add_argument("--tenants", type=int, default=10000)
+    parser.add_argument("--per-tenant", type=int, default=20, help="Memories per tenant")
+    parser.add_argument("--queries", type=int, default=500, help="Tenants sampled for timing")
+    parser.add_argument("--layouts", nargs="+", default=["shared", "per_user"], choices=["shared", "per_user"])
+    parser.add_argument("--cache-size", type=int, default=Config.MEMORY_COLLECTION_CACHE_SIZE)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Memories per bulk add")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {
+        "benchmark": "namespaces",
+        "tenants": args.tenants,
+        "per_tenant": args.per_tenant,
+        "total_memories": args.tenants * args.per_tenant,
+        "results": [run_layout(layout, args) for layout in args.layouts],
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark prompt-log disk usage: plain text log vs the deduplicating prompt store.
+
+Generates a session of synthetic system prompts with the same layout as
+LangChainBrain._build_system_message (static instructions, query
+enhancement, top-5 memories drawn from a small pool, emotional context and a
+rolling window of the last 10 messages), writes them through both prompt log
+formats and reports bytes on disk before and after zstd compression, plus
+the per-prompt encode cost. Every stored prompt is reconstructed and checked.
+
+Usage:
+    python -m benchmarks.bench_prompt_store --turns 500
+    python -m benchmarks.bench_prompt_store --turns 2000 --output prompts.json
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from ai_brain.config import Config
+from ai_brain.log_writer import RotatingLogFile
+from ai_brain.logger import ConversationLogger
+from ai_brain.prompt_store import PromptStore, find_segments, iter_prompts
+
+STATIC_HEADER = [
+    "You are an advanced AI assistant with persistent memory capabilities.",
+    "",
+    "CORE CAPABILITIES:",
+    "- You have access to long-term memory from previous conversations",
+    "- You can recall facts, preferences, and context from past interactions",
+    "- You maintain conversation continuity across sessions",
+    "- You provide thoughtful, contextual, and personalized responses",
+    "",
+    "INSTRUCTIONS:",
+    "1. When relevant memories are provided, use them to enhance your responses",
+    "2. Reference past conversations naturally when appropriate",
+    "3. If you remember something about the user, mention it contextually",
+    "4. Be helpful, accurate, and maintain a consistent personality",
+    "5. If you're unsure about a memory, ask for clarification",
+    "",
+]
+
+# Same shape as NLPAnalyzer.get_emotional_adaptation_prompt for a few emotions
+ADAPTATION = {
+    "joy": [
+        "• User is feeling joyful and happy",
+        "• Response style: Match their positive energy",
+        "• Tone: Upbeat, warm, celebratory",
+        "• Actions: Share in their happiness, build on positive momentum",
+    ],
+    "optimism": [
+        "• User is feeling optimistic and hopeful",
+        "• Response style: Support their positive outlook",
+        "• Tone: Encouraging, forward-looking",
+        "• Actions: Reinforce their optimism, discuss positive possibilities",
+    ],
+    "neutral": [
+        "• User's emotional state is neutral or calm",
+        "• Response style: Clear, informative and friendly",
+        "• Tone: Balanced, conversational",
+        "• Actions: Focus on the topic, invite them to share more",
+    ],
+}
+
+WORDS = (
+    "project garden cello Paris deadline sister music recipe weekend travel python "
+    "database memory coffee running book meeting design story planning idea"
+).split()
+
+
+def sentence(rng: random.Random, n_words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(n_words)).capitalize() + "."
+
+
+def generate_prompts(turns: int, seed: int) -> List[str]:
+    """Synthetic prompts whose turn-to-turn overlap mirrors real sessions."""
+    rng = random.Random(seed)
+    memory_pool = [sentence(rng, rng.randint(12, 30)) for _ in range(40)]
+    history: List[str] = []
+    prompts = []
+    for _ in range(turns):
+        history.append(f"User: {sentence(rng, rng.randint(8, 40))}")
+        history.append(f"Assistant: {sentence(rng, rng.randint(20, 50))}")
+
+        parts = list(STATIC_HEADER)
+        parts += [
+            "=== QUERY ENHANCEMENT ===",
+            f"🎯 Entities: {', '.join(rng.sample(WORDS, 2))}",
+            f"🔑 Keywords: {', '.join(rng.sample(WORDS, 5))}",
+            "",
+            "=== RELEVANT MEMORIES (Hybrid Search) ===",
+        ]
+        # Retrieval tends to return the same handful of memories turn after turn
+        hot = memory_pool[:8] if rng.random() < 0.8 else memory_pool
+        for i, memory in enumerate(rng.sample(hot, 5), 1):
+            parts.append(f"{i}. [{rng.uniform(0.3, 0.9):.2f}] {memory}")
+        emotion = rng.choice(list(ADAPTATION))
+        parts += [
+            "",
+            f"=== EMOTIONAL CONTEXT (Analyzing last {min(len(history), 10)} messages) ===",
+            f"Recent emotional trajectory: {rng.choice(list(ADAPTATION))} → {emotion}",
+            "",
+            "=== EMOTIONAL ADAPTATION ===",
+            "EMOTIONAL ADAPTATION GUIDANCE:",
+            f"• User's current state: {emotion.upper()} (confidence: {rng.randint(40, 95)}%)",
+            *ADAPTATION[emotion],
+            "",
+            "=== RECENT CONVERSATION (Last 5 Turns) ===",
+            *history[-10:],
+            "",
+            "Remember: Be natural, helpful, and make the user feel remembered and understood.",
+        ]
+        prompts.append("\n".join(parts))
+    return prompts
+
+
+def disk_usage(paths: List[Path]) -> int:
+    return sum(p.stat().st_size for p in paths)
+
+
+def run_text(prompts: List[str], directory: Path) -> dict:
+    """Write prompts in the plain-text layout (uncompressed, then compressed)."""
+    logger = ConversationLogger(logs_dir=str(directory), background=False)
+    logger.prompt_log_format = "text"
+    start = time.perf_counter()
+    for prompt in prompts:
+        logger.log_system_prompt(prompt, context_type="langchain", metadata={"num_memories": 5})
+    elapsed = time.perf_counter() - start
+    raw = disk_usage(list(logger.prompts_dir.glob("*.log")))
+    logger.close()
+    return {
+        "bytes": raw,
+        "bytes_zstd": disk_usage(list(logger.prompts_dir.glob("*.zst"))),
+        "encode_us_per_prompt": round(elapsed / len(prompts) * 1e6, 1),
+    }
+
+
+def run_dedup(prompts: List[str], directory: Path, keyframe_interval: int) -> dict:
+    """Write prompts through the PromptStore and verify exact reconstruction."""
+    directory.mkdir(parents=True, exist_ok=True)
+    store = PromptStore(directory, "bench", keyframe_interval=keyframe_interval)
+    store.log = RotatingLogFile(directory, "prompts_bench", suffix=PromptStore.SUFFIX, max_bytes=0, max_age=0)
+    start = time.perf_counter()
+    for prompt in prompts:
+        store.write(datetime.now(), prompt, "langchain", {"num_memories": 5})
+    elapsed = time.perf_counter() - start
+    store.flush()
+    raw = disk_usage(find_segments(directory, "bench"))
+    store.close()
+
+    segments = find_segments(directory, "bench")
+    rebuilt = [entry["prompt"] for segment in segments for entry in iter_prompts(segment)]
+    assert rebuilt == prompts, "Prompt store must reconstruct every prompt exactly"
+
+    return {
+        "bytes": raw,
+        "bytes_zstd": disk_usage(segments),
+        "encode_us_per_prompt": round(elapsed / len(prompts) * 1e6, 1),
+        "new_blocks": store.stats["new_blocks"],
+        "reused_blocks": store.stats["reused_blocks"],
+        "verified": True,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt log formats")
+    parser.add_argument("--turns", type=int, default=500)
+    parser.add_argument("--keyframe-interval", type=int, default=Config.PROMPT_STORE_KEYFRAME_INTERVAL)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    prompts = generate_prompts(args.turns, args.seed)
+    prompt_bytes = sum(len(p.encode("utf-8")) for p in prompts)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        text = run_text(prompts, Path(tmp) / "text")
+        dedup = run_dedup(prompts, Path(tmp) / "dedup", args.keyframe_interval)
+
+    report = {
+        "benchmark": "prompt_store",
+        "turns": args.turns,
+        "prompt_bytes": prompt_bytes,
+        "text": text,
+        "dedup": dedup,
+        "reduction_uncompressed": round(text["bytes"] / dedup["bytes"], 1),
+        "reduction_compressed": round(text["bytes_zstd"] / dedup["bytes_zstd"], 1),
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark compact vector codes in the local vector engine.
+
+A synthetic corpus (benchmarks/memory_corpus.py) is copied to a scratch
+directory and opened once per code configuration
+(LOCAL_VECTOR_QUANTIZATION / LOCAL_VECTOR_DIMS / LOCAL_VECTOR_REDUCTION):
+
+- float32: the plain float32 scan (no codes)
+- float16 / int8: scalar quantized codes
+- int8-pca128: int8 codes of the top 128 PCA directions
+- int8-prefix128: int8 codes of the first 128 dimensions (Matryoshka style;
+  only meaningful for models trained for it)
+
+and, per configuration, once per --rescore-factors value
+(LOCAL_RESCORE_FACTOR: candidates rescored in float32 per result; 1 means
+the codes alone decide the ranking).
+
+The report gives per run:
+
+- codes_mb: size of the in-memory codes (what a scan reads)
+- rss_delta_mb: RSS added by opening the store and answering the queries
+- codec_fit_s: fitting and encoding when the collection is opened
+- query_k / query_session_filter: p50/p95 collection.query latency,
+  unfiltered and filtered to one session (~40 memories)
+- recall_at_k against the exact float32 top-k
+
+With --hnsw the runs use the engine's HNSW index instead of the exact scan
+(reduced configurations build the graph over reduced vectors).
+
+Usage:
+    python -m benchmarks.bench_quantization --scale 100000
+    python -m benchmarks.bench_quantization --scale 100000 --corpus-root /data/corpora --output quantization.json
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.index_params import hnsw_metadata
+from ai_brain.vector_backends import create_backend
+
+from .bench_retrieval import brute_force_topk, rss_mb
+from .bench_vector_backends import configure, open_corpus
+from .memory_corpus import CorpusGenerator, load_vectors
+from .stats import summarize
+
+CONFIGS = ["float32", "float16", "int8", "int8-pca128", "int8-prefix128"]
+
+
+def parse_config(name: str) -> Dict[str, Any]:
+    """Config settings for a name like "int8", "float16-pca128" or "int8-prefix256"."""
+    quantization, _, reduction = name.partition("-")
+    settings = {"LOCAL_VECTOR_QUANTIZATION": "none" if quantization == "float32" else quantization,
+                "LOCAL_VECTOR_DIMS": 0, "LOCAL_VECTOR_REDUCTION": "pca"}
+    if reduction:
+        kind = reduction.rstrip("0123456789")
+        settings["LOCAL_VECTOR_REDUCTION"] = kind
+        settings["LOCAL_VECTOR_DIMS"] = int(reduction[len(kind):])
+    return settings
+
+
+def run_config(name: str, rescore_factor: int, scratch: Path, queries: np.ndarray,
+               exact: np.ndarray, sessions: List[str], args) -> Dict[str, Any]:
+    """Open the scratch corpus with one code configuration and answer every query."""
+    configure("local_hnsw" if args.hnsw else "local", scratch)
+    for key, value in parse_config(name).items():
+        setattr(Config, key, value)
+    Config.LOCAL_RESCORE_FACTOR = rescore_factor
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    collection = create_backend().get_or_create_collection(Config.CHROMA_COLLECTION_NAME, hnsw_metadata())
+    open_s = time.perf_counter() - start
+
+    timings: Dict[str, List[float]] = {"query_k": [], "query_session_filter": []}
+    recalls = []
+    for query, truth, session in zip(queries, exact, sessions):
+        embedding = query.tolist()
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=[embedding], n_results=args.k, include=["metadatas"])
+        timings["query_k"].append(time.perf_counter() - start)
+        found = [meta["corpus_row"] for meta in results["metadatas"][0]]
+        recalls.append(len(set(found) & set(truth.tolist())) / args.k)
+
+        start = time.perf_counter()
+        collection.query(query_embeddings=[embedding], n_results=args.k, where={"session_id": session})
+        timings["query_session_filter"].append(time.perf_counter() - start)
+
+    codes = collection._codes
+    report = {
+        "config": name,
+        "rescore_factor": rescore_factor if codes is not None else None,
+        "bytes_per_vector": collection._codec.bytes_per_vector if codes is not None else 4 * collection._dim,
+        "codes_mb": round(codes[:collection.count()].nbytes / 1e6, 1) if codes is not None else None,
+        "rss_delta_mb": round(rss_mb() - rss_before, 1),
+        "codec_fit_s": round(open_s, 2),
+        **{key: summarize(values) for key, values in timings.items()},
+        "recall_at_k": {"k": args.k, "mean": round(statistics.mean(recalls), 4), "min": round(min(recalls), 4)},
+    }
+    del collection
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark compact vector codes in the local engine")
+    parser.add_argument("--scale", type=int, default=100000, help="Corpus size")
+    parser.add_argument("--configs", type=str, default=",".join(CONFIGS), help="Comma-separated code configurations")
+    parser.add_argument("--rescore-factors", type=str, default="1,4", help="Comma-separated LOCAL_RESCORE_FACTOR values")
+    parser.add_argument("--hnsw", action="store_true", help="Query through the HNSW index instead of the exact scan")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=Config.MEMORY_CONTEXT_SIZE, help="Results per query")
+    parser.add_argument("--corpus-root", type=str, help="Keep/reuse generated corpora under this directory")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+    args.corpus_root = args.corpus_root or tempfile.mkdtemp(prefix="ai_brain_quantization_")
+
+    persist_dir = open_corpus(args.scale, "local", args)
+    _, queries, _ = CorpusGenerator(seed=args.seed).queries(args.queries)
+    exact = brute_force_topk(load_vectors(persist_dir), queries, args.k)
+    rng = np.random.default_rng(args.seed)
+    sessions = [f"session_{row // 40}" for row in rng.integers(0, args.scale, len(queries))]
+
+    report = {
+        "benchmark": "quantization",
+        "engine": "local_hnsw" if args.hnsw else "local",
+        "size": args.scale,
+        "k": args.k,
+        "queries": args.queries,
+        "runs": [],
+    }
+    # Codes, codec and HNSW files are written next to the vectors; keep the shared corpus untouched
+    with tempfile.TemporaryDirectory(prefix="ai_brain_quantization_run_") as tmp:
+        scratch = Path(tmp) / persist_dir.name
+        shutil.copytree(persist_dir, scratch, ignore=shutil.ignore_patterns("hnsw.*", "codec.*"))
+        original = {key: getattr(Config, key) for key in parse_config("float32")}
+        try:
+            for name in [c.strip() for c in args.configs.split(",") if c.strip()]:
+                factors = [1] if name == "float32" else [int(f) for f in args.rescore_factors.split(",") if f.strip()]
+                for factor in factors:
+                    print(f"🚀 {name}, rescore factor {factor}")
+                    report["runs"].append(run_config(name, factor, scratch, queries, exact, sessions, args))
+        finally:
+            for key, value in original.items():
+                setattr(Config, key, value)
+            configure("local", persist_dir)
+
+    baseline = report["runs"][0] if report["runs"] and report["runs"][0]["config"] == "float32" else None
+    if baseline:
+        for run in report["runs"]:
+            run["p50_speedup"] = round(baseline["query_k"]["p50_ms"] / max(run["query_k"]["p50_ms"], 1e-6), 2)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
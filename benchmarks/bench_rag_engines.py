@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-turn cost of building LlamaIndexRAG engines.
+
+LlamaIndexRAG used to build a new retriever, query engine or chat engine
+on every call; it now builds each once and reuses it until its
+configuration changes. Two parts:
+
+- build: time to construct each engine (as_retriever, as_query_engine,
+  as_chat_engine, and the routed CondensePlusContextChatEngine)
+- turns: retrieve_relevant_context(), query() and chat() per call, with
+  the engines rebuilt before every call (the previous behaviour) and
+  reused, over a --docs document corpus. The LLM is LlamaIndex's MockLLM,
+  so the numbers are retrieval plus engine overhead, without network
+  time; "saved_ms" is the p50 difference per turn
+
+Usage:
+    python -m benchmarks.bench_rag_engines
+    python -m benchmarks.bench_rag_engines --docs 500 --turns 200 --output rag_engines.json
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from chromadb.api.client import SharedSystemClient
+from llama_index.core import Settings
+from llama_index.core.chat_engine import CondensePlusContextChatEngine
+from llama_index.core.llms import MockLLM
+
+from ai_brain.config import Config
+
+from .stats import summarize
+
+WORDS = ("harbour ferry lighthouse lamp keeper tide island cliff storm boat anchor rope market bread "
+         "school bell garden river bridge mill").split()
+
+
+def timed(call: Callable[[], Any], turns: int, before: Callable[[], None] = None) -> List[float]:
+    samples = []
+    for _ in range(turns):
+        if before:
+            before()
+        start = time.perf_counter()
+        call()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_build(rag, router_retriever, turns: int) -> Dict[str, Any]:
+    builders = {
+        "retriever": lambda: rag.index.as_retriever(similarity_top_k=Config.MEMORY_CONTEXT_SIZE),
+        "query_engine": lambda: rag.index.as_query_engine(
+            similarity_top_k=Config.MEMORY_CONTEXT_SIZE, text_qa_template=rag.context_prompt),
+        "chat_engine": lambda: rag.index.as_chat_engine(
+            chat_mode="condense_plus_context", memory=rag.chat_memory, context_prompt=rag.context_prompt,
+            condense_prompt=rag.condense_prompt, similarity_top_k=Config.MEMORY_CONTEXT_SIZE),
+        "routed_chat_engine": lambda: CondensePlusContextChatEngine.from_defaults(
+            retriever=router_retriever, llm=Settings.llm, memory=rag.chat_memory,
+            context_prompt=rag.context_prompt, condense_prompt=rag.condense_prompt),
+    }
+    return {name: summarize(timed(build, turns)) for name, build in builders.items()}
+
+
+def bench_turns(rag, queries: List[str], turns: int) -> Dict[str, Any]:
+    rng = random.Random(0)
+    calls = {
+        "retrieve": lambda: rag.retrieve_relevant_context(rng.choice(queries)),
+        "query": lambda: rag.query(rng.choice(queries)),
+        "chat": lambda: "".join(rag.chat(rng.choice(queries))),
+    }
+    report = {}
+    for name, call in calls.items():
+        call()  # Warm up
+        rebuilt = summarize(timed(call, turns, before=rag._engines.clear))
+        rag.clear_chat_history()
+        builds = rag.engine_builds
+        reused = summarize(timed(call, turns))
+        rag.clear_chat_history()
+        report[name] = {
+            "rebuilt": rebuilt,
+            "reused": reused,
+            "builds_while_reused": rag.engine_builds - builds,
+            "saved_ms": round(rebuilt["p50_ms"] - reused["p50_ms"], 3),
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LlamaIndexRAG engine reuse")
+    parser.add_argument("--docs", type=int, default=200, help="Documents in the corpus")
+    parser.add_argument("--turns", type=int, default=100, help="Calls per measurement")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    from ai_brain.llamaindex_rag import LlamaIndexRAG, RouterRetriever
+    from ai_brain.memory import MemoryStore
+    from ai_brain.retrieval_router import RetrievalRouter
+
+    rng = random.Random(args.seed)
+    original = Config.CHROMA_PERSIST_DIR
+    with tempfile.TemporaryDirectory(prefix="ai_brain_rag_engines_") as tmp:
+        Config.CHROMA_PERSIST_DIR = Path(tmp)
+        try:
+            SharedSystemClient.clear_system_cache()
+            memory = MemoryStore()
+            rag = LlamaIndexRAG(memory.chroma_client)
+            Settings.llm = MockLLM(max_tokens=16)
+            print(f"📄 Adding {args.docs} documents...")
+            for _ in range(args.docs):
+                rag.add_memory(" ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))) + ".")
+            queries = [f"What about the {rng.choice(WORDS)} and the {rng.choice(WORDS)}?" for _ in range(50)]
+            router = RetrievalRouter(memory, rag, mode="documents")
+
+            print("🚀 Engine construction")
+            report = {
+                "benchmark": "rag_engines",
+                "docs": args.docs,
+                "turns": args.turns,
+                "top_k": Config.MEMORY_CONTEXT_SIZE,
+                "build": bench_build(rag, RouterRetriever(router), args.turns),
+            }
+            print("🚀 Turns with engines rebuilt vs reused")
+            report["turns_per_call"] = bench_turns(rag, queries, args.turns)
+        finally:
+            Config.CHROMA_PERSIST_DIR = original
+            SharedSystemClient.clear_system_cache()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
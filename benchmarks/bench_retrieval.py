@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Benchmark memory retrieval at increasing corpus sizes.
+
+For each scale (10k, 100k and 1M memories by default) a synthetic corpus is
+generated with benchmarks/memory_corpus.py into a scratch ChromaDB directory
+(or reused from --corpus-root), then fresh queries from the same distribution
+are run and the report gives:
+
+- ingest: bulk write throughput of MemoryStore.add_memories
+- query_k / query_overfetch: raw collection.query latency for k and 3k results
+  (the 3x over-fetch retrieve_memories does when query_analysis is passed)
+- retrieve / retrieve_hybrid: MemoryStore._retrieve_by_embedding latency
+  without and with query_analysis (over-fetch + entity/keyword boosting)
+- recall_at_k: share of the exact brute-force cosine top-k that Chroma's HNSW
+  index returns, plus the brute-force scan cost itself
+- memory: process RSS after opening the store and after the queries, peak
+  RSS, and on-disk size of the collection
+
+Query embeddings are precomputed, so no embedding model time is included.
+
+Usage:
+    python -m benchmarks.bench_retrieval --scales 10000,100000
+    python -m benchmarks.bench_retrieval --scales 1000000 --corpus-root /data/corpora --output retrieval.json
+"""
+
+import argparse
+import gc
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.tracing import percentile
+
+from .memory_corpus import CorpusGenerator, build_corpus, load_manifest, load_vectors
+from .stats import summarize
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * resource.getpagesize() / 2**20, 1)
+    except OSError:
+        return peak_rss_mb()
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def dir_size_mb(path: Path) -> float:
+    return round(sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / 2**20, 1)
+
+
+def brute_force_topk(vectors: np.ndarray, queries: np.ndarray, k: int, chunk: int = 100_000) -> np.ndarray:
+    """Exact cosine top-k rows for each query (vectors are unit-normalized)."""
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_rows = np.zeros((len(queries), 0), dtype=np.int64)
+    for start in range(0, len(vectors), chunk):
+        scores = queries @ np.asarray(vectors[start:start + chunk]).T
+        top = np.argpartition(-scores, min(k, scores.shape[1] - 1), axis=1)[:, :k]
+        best_scores = np.hstack([best_scores, np.take_along_axis(scores, top, axis=1)])
+        best_rows = np.hstack([best_rows, top + start])
+        keep = np.argsort(-best_scores, axis=1)[:, :k]
+        best_scores = np.take_along_axis(best_scores, keep, axis=1)
+        best_rows = np.take_along_axis(best_rows, keep, axis=1)
+    return best_rows
+
+
+def open_corpus(scale: int, args) -> Path:
+    """Reuse a matching corpus under --corpus-root or generate a new one."""
+    from ai_brain.memory import MemoryStore
+
+    root = Path(args.corpus_root) if args.corpus_root else Path(tempfile.mkdtemp(prefix="ai_brain_retrieval_"))
+    persist_dir = root / f"corpus_{scale}_{args.embeddings}_{args.seed}"
+    manifest = load_manifest(persist_dir)
+    Config.CHROMA_PERSIST_DIR = persist_dir
+    if manifest and manifest["size"] == scale:
+        print(f"📁 Reusing corpus at {persist_dir}")
+        return persist_dir
+
+    print(f"🏗️  Generating {scale:,} memories into {persist_dir}")
+    memory = MemoryStore()
+    build_corpus(scale, embeddings=args.embeddings, seed=args.seed, batch_size=args.batch_size, memory=memory)
+    del memory
+    gc.collect()
+    return persist_dir
+
+
+def run_scale(scale: int, args) -> Dict:
+    """Benchmark one corpus size."""
+    from ai_brain.memory import MemoryStore
+
+    persist_dir = open_corpus(scale, args)
+    manifest = load_manifest(persist_dir)
+    k = args.k
+
+    rss_before = rss_mb()
+    memory = MemoryStore()
+    collection = memory.collection
+    generator = CorpusGenerator(seed=args.seed, dim=manifest["dim"])
+    _, queries, analyses = generator.queries(args.queries)
+    if manifest["embeddings"] == "model":
+        texts = [a["original_query"] for a in analyses]
+        queries = memory.embedding_model.encode(texts, normalize_embeddings=True).astype(np.float32)
+
+    # First query loads the HNSW index from disk
+    start = time.perf_counter()
+    collection.query(query_embeddings=[queries[0].tolist()], n_results=k)
+    cold_ms = round((time.perf_counter() - start) * 1000, 2)
+    rss_opened = rss_mb()
+
+    timings: Dict[str, List[float]] = {"query_k": [], "query_overfetch": [], "retrieve": [], "retrieve_hybrid": []}
+    found_rows: List[List[int]] = []
+    for query, analysis in zip(queries, analyses):
+        embedding = query.tolist()
+
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=[embedding], n_results=k, include=["metadatas"])
+        timings["query_k"].append(time.perf_counter() - start)
+        found_rows.append([meta["corpus_row"] for meta in results["metadatas"][0]])
+
+        start = time.perf_counter()
+        collection.query(query_embeddings=[embedding], n_results=k * 3)
+        timings["query_overfetch"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        memory._retrieve_by_embedding(embedding, n_results=k)
+        timings["retrieve"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        memory._retrieve_by_embedding(embedding, n_results=k, query_analysis=analysis)
+        timings["retrieve_hybrid"].append(time.perf_counter() - start)
+
+    vectors = load_vectors(persist_dir)
+    start = time.perf_counter()
+    exact = brute_force_topk(vectors, queries, k)
+    brute_force_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    recalls = [len(set(found) & set(truth.tolist())) / k for found, truth in zip(found_rows, exact)]
+
+    summary = {name: summarize(values, percentiles=(50, 95, 99)) for name, values in timings.items()}
+    report = {
+        "size": scale,
+        "embeddings": manifest["embeddings"],
+        "ingest": {
+            "seconds": manifest["ingest_seconds"],
+            "memories_per_sec": manifest["ingest_per_sec"],
+        },
+        "cold_first_query_ms": cold_ms,
+        **summary,
+        "overfetch_cost_ms": {
+            "query_p50": round(summary["query_overfetch"]["p50_ms"] - summary["query_k"]["p50_ms"], 3),
+            "retrieve_p50": round(summary["retrieve_hybrid"]["p50_ms"] - summary["retrieve"]["p50_ms"], 3),
+        },
+        "recall_at_k": {
+            "k": k,
+            "mean": round(statistics.mean(recalls), 4),
+            "min": round(min(recalls), 4),
+            "p5": round(percentile(recalls, 5), 4),
+        },
+        "brute_force_ms_per_query": round(brute_force_ms, 3),
+        "memory": {
+            "rss_before_mb": rss_before,
+            "rss_opened_mb": rss_opened,
+            "rss_after_queries_mb": rss_mb(),
+            "peak_rss_mb": peak_rss_mb(),
+            "disk_mb": dir_size_mb(persist_dir),
+        },
+    }
+    del memory, collection, vectors
+    gc.collect()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark memory retrieval at 10k/100k/1M scale")
+    parser.add_argument("--scales", type=str, default="10000,100000,1000000",
+                        help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per scale")
+    parser.add_argument("--k", type=int, default=Config.MEMORY_CONTEXT_SIZE, help="Results per query")
+    parser.add_argument("--embeddings", choices=["synthetic", "model"], default="synthetic")
+    parser.add_argument("--corpus-root", type=str, help="Keep/reuse generated corpora under this directory")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    scales = [int(s) for s in args.scales.split(",") if s.strip()]
+    report = {
+        "benchmark": "retrieval",
+        "k": args.k,
+        "queries": args.queries,
+        "scales": [],
+    }
+    for scale in scales:
+        print(f"🚀 Scale {scale:,}")
+        report["scales"].append(run_scale(scale, args))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
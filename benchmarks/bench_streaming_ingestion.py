@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of streamed vs whole-file document ingestion.
+
+Generates one text file, grown to each --sizes-mb value in turn, and runs
+ingest_paths() on it in a fresh process per size and mode, reporting the
+process' peak RSS, the RSS after imports, seconds, MB/s and chunks:
+
+- stream: stream_file() reads the file a window at a time (what files of
+  RAG_STREAM_MIN_MB or more get)
+- load: SimpleDirectoryReader loads the whole file before chunking (only
+  up to --load-max-mb, as it needs several times the file size in memory)
+
+Embeddings come from LlamaIndex's MockEmbedding and chunks go to a store
+that only counts them: the number is the reading, chunking and batching
+pipeline's memory, not the vector index's, which grows with the number of
+chunks stored whatever the reader.
+
+Usage:
+    python -m benchmarks.bench_streaming_ingestion
+    python -m benchmarks.bench_streaming_ingestion --sizes-mb 512,2048,4096 --output streaming.json
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from ai_brain.config import Config
+
+WORDS = ("memory vector index retrieval embedding document chunk model query answer context river mountain "
+         "energy light cell protein market price contract engine signal network").split()
+
+
+class CountingStore:
+    """Vector store stand-in that counts the chunks written."""
+
+    def __init__(self):
+        self.client = self  # delete_chunks() deletes through vector_store.client
+        self.chunks = 0
+
+    def delete(self, **kwargs):
+        pass
+
+    def add(self, nodes) -> List[str]:
+        self.chunks += len(nodes)
+        return [node.node_id for node in nodes]
+
+
+def peak_rss_mb() -> float:
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # KiB on Linux
+
+
+def grow(path: Path, megabytes: int, seed: int):
+    """Append paragraphs to the file until it is `megabytes` large."""
+    rng = random.Random(seed)
+    paragraphs = [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(40, 160))).capitalize() + "."
+        for _ in range(256)
+    ]
+    target = megabytes * 1024 * 1024
+    size = path.stat().st_size if path.exists() else 0
+    with open(path, "a", encoding="utf-8") as f:
+        while size < target:
+            block = "\n\n".join(rng.sample(paragraphs, 64)) + "\n\n"
+            f.write(block)
+            size += len(block)
+
+
+def run_child(path: str, mode: str):
+    """Ingest one file in this process and print the measurements as JSON."""
+    from llama_index.core.embeddings import MockEmbedding
+
+    from ai_brain.document_ingestion import ingest_paths
+
+    Config.RAG_STREAM_MIN_MB = 0 if mode == "stream" else float("inf")
+    rss_before = peak_rss_mb()
+    store = CountingStore()
+    with tempfile.TemporaryDirectory() as tmp:
+        report = ingest_paths(store, MockEmbedding(embed_dim=384), [path], Path(tmp) / "manifest.json",
+                              workers=1, progress=False)
+    print(json.dumps({
+        "rss_after_imports_mb": rss_before,
+        "peak_rss_mb": peak_rss_mb(),
+        "seconds": report["seconds"],
+        "chunks": store.chunks,
+        "streamed": report["files_streamed"],
+        "failed": report["files_failed"],
+    }))
+
+
+def measure(path: Path, mode: str) -> Dict[str, Any]:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_streaming_ingestion", "--child", str(path), "--mode", mode],
+        capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    megabytes = path.stat().st_size / 1024 / 1024
+    result["mb_per_s"] = round(megabytes / result["seconds"], 1) if result["seconds"] else 0.0
+    result["wall_seconds"] = round(time.perf_counter() - start, 1)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed vs whole-file document ingestion memory")
+    parser.add_argument("--sizes-mb", type=str, default="256,1024,2048", help="File sizes, comma-separated")
+    parser.add_argument("--load-max-mb", type=int, default=128, help="Largest size also run with whole-file loading")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    parser.add_argument("--child", type=str, help=argparse.SUPPRESS)
+    parser.add_argument("--mode", choices=["stream", "load"], default="stream", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.mode)
+        return
+
+    sizes = sorted(int(size) for size in args.sizes_mb.split(","))
+    report = {
+        "benchmark": "streaming_ingestion",
+        "chunk_size": Config.RAG_CHUNK_SIZE,
+        "chunk_overlap": Config.RAG_CHUNK_OVERLAP,
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="ai_brain_streaming_") as tmp:
+        path = Path(tmp) / "large.txt"
+        for size in sorted(set(sizes + [s for s in (64, args.load_max_mb) if s < sizes[0]])):
+            print(f"📄 Growing the file to {size} MB...")
+            grow(path, size, args.seed)
+            modes = ["stream"] + (["load"] if size <= args.load_max_mb else [])
+            for mode in modes:
+                print(f"🚀 {mode} {size} MB")
+                report["runs"].append({"size_mb": size, "mode": mode, **measure(path, mode)})
+
+    streamed = [run for run in report["runs"] if run["mode"] == "stream"]
+    report["stream_peak_rss_spread_mb"] = round(
+        max(run["peak_rss_mb"] for run in streamed) - min(run["peak_rss_mb"] for run in streamed), 1)
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Benchmark end-to-end turn latency through the real chat interfaces.
+
+Starts the fake OpenAI-compatible server (benchmarks/fake_llm.py) with a
+configurable time to first token and tokens/sec, points the brains at it via
+LLM_BACKEND=ollama / OLLAMA_BASE_URL, and drives scripted multi-turn
+conversations through ChatInterface.process_message (basic mode) and
+EnhancedChatInterface.process_message (LangChain and basic brains) against a
+scratch ChromaDB directory. Embedding and NLP models are the real ones, so
+the report shows what the pipeline adds on top of the LLM.
+
+For every interface the report has:
+- turn: end-to-end process_message latency
+- first_chunk: turn start to the first streamed chunk (user-visible TTFT)
+- stages: p50/p95 per traced stage (see ai_brain/tracing.py)
+- llm: requests made to the fake server and the mean prompt size
+
+Usage:
+    python -m benchmarks.bench_turn_latency --conversations 3 --turns 8
+    python -m benchmarks.bench_turn_latency --ttft 0.3 --tps 40 --output turns.json
+    python -m benchmarks.bench_turn_latency --interfaces enhanced --ttft 0 --tps 0
+"""
+
+import argparse
+import io
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from rich.console import Console
+
+from ai_brain.config import Config
+from ai_brain.tracing import get_stage_stats, shutdown_tracing
+
+from .fake_llm import FakeLLMServer
+from .stats import summarize
+
+INTERFACES = ["basic", "enhanced", "enhanced_basic"]
+
+SCRIPTS = [
+    [
+        "Hi! My name is Maya and I live in Lisbon.",
+        "I've been learning to play the cello for about six months.",
+        "My teacher says I rush the tempo when I get nervous.",
+        "We have a recital in Porto next month and I'm a bit anxious about it.",
+        "Do you remember where I live?",
+        "What instrument am I learning again?",
+        "Any tips for staying calm before the recital?",
+        "Thanks, that really helps. I'm feeling more confident now!",
+    ],
+    [
+        "I started a new job at a robotics startup in Berlin this week.",
+        "The team is great but the codebase is huge and mostly written in Rust.",
+        "My manager, Jonas, wants me to own the motion planning module.",
+        "I'm worried I won't ramp up fast enough.",
+        "What did I say my manager's name was?",
+        "Can you suggest a plan for my first month?",
+        "I also want to keep running three times a week.",
+        "How can I fit running around the new job?",
+    ],
+    [
+        "My sister Ana is getting married in September in Seville.",
+        "I'm supposed to give a speech and I have no idea where to start.",
+        "We grew up in a small town near Granada and used to ride bikes everywhere.",
+        "She's a marine biologist and loves octopuses.",
+        "What do you know about my sister so far?",
+        "Help me outline a funny but heartfelt speech.",
+        "Should I mention the octopus thing?",
+        "Great, I'll start drafting it this weekend.",
+    ],
+]
+
+
+class FirstChunkTimer:
+    """Wrap a brain's streaming methods to record when the first chunk reaches the interface."""
+
+    def __init__(self, brain, method_names: List[str]):
+        self.turn_start = 0.0
+        self.first_chunk: Optional[float] = None
+        for name in method_names:
+            setattr(brain, name, self._wrap(getattr(brain, name)))
+
+    def _wrap(self, method: Callable) -> Callable:
+        def wrapper(*args, **kwargs):
+            for chunk in method(*args, **kwargs):
+                if self.first_chunk is None:
+                    self.first_chunk = time.perf_counter() - self.turn_start
+                yield chunk
+        return wrapper
+
+    def start_turn(self):
+        self.turn_start = time.perf_counter()
+        self.first_chunk = None
+
+
+def build_interface(name: str, logs_dir: Path):
+    """Create an initialized interface without the interactive prompt session."""
+    from ai_brain.logger import ConversationLogger
+    from ai_brain.memory import MemoryStore
+
+    if name == "basic":
+        from ai_brain.cli import ChatInterface
+        from ai_brain.inference import AIBrain
+        chat = ChatInterface()
+        chat.brain = AIBrain()
+    else:
+        from ai_brain.enhanced_cli import EnhancedChatInterface
+        chat = EnhancedChatInterface(use_langchain=(name == "enhanced"))
+        if chat.use_langchain:
+            from ai_brain.langchain_brain import LangChainBrain
+            chat.brain = LangChainBrain()
+        else:
+            from ai_brain.inference import AIBrain
+            chat.brain = AIBrain()
+
+    chat.memory = MemoryStore()
+    chat.logger = ConversationLogger(logs_dir=str(logs_dir))
+    # Keep the streamed output off the terminal (it still goes through rich)
+    chat.console = Console(file=io.StringIO(), force_terminal=False)
+    return chat
+
+
+def run_interface(name: str, server: FakeLLMServer, scratch: Path, args) -> Dict:
+    """Drive every scripted conversation through one interface."""
+    Config.CHROMA_PERSIST_DIR = scratch / name / "chroma_db"
+    chat = build_interface(name, scratch / name / "logs")
+    timer = FirstChunkTimer(chat.brain, ["generate_response", "generate_response_streaming"]
+                            if hasattr(chat.brain, "generate_response_streaming") else ["generate_response"])
+
+    # Warm-up turn: loads the embedding and NLP models outside the measurement
+    chat.process_message("Hello there!")
+    chat.memory.clear_all_memories()
+    get_stage_stats().reset()
+    requests_before = server.app.stats["requests"]
+    prompts_before = len(server.app.stats["prompt_chars"])
+
+    turns: List[float] = []
+    first_chunks: List[float] = []
+    errors = 0
+    for c in range(args.conversations):
+        script = SCRIPTS[c % len(SCRIPTS)]
+        for message in script[:args.turns]:
+            timer.start_turn()
+            start = time.perf_counter()
+            chat.process_message(message)
+            turns.append(time.perf_counter() - start)
+            if timer.first_chunk is None:
+                errors += 1  # process_message reports LLM errors on the console instead of raising
+            else:
+                first_chunks.append(timer.first_chunk)
+
+    chat.logger.close()
+    prompt_chars = server.app.stats["prompt_chars"][prompts_before:]
+    return {
+        "turns": len(turns),
+        "errors": errors,
+        "turn": summarize(turns),
+        "first_chunk": summarize(first_chunks),
+        "stages": get_stage_stats().summary(),
+        "llm": {
+            "requests": server.app.stats["requests"] - requests_before,
+            "mean_prompt_chars": round(statistics.mean(prompt_chars)) if prompt_chars else 0,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark end-to-end turn latency with a fake LLM")
+    parser.add_argument("--interfaces", type=str, default=",".join(INTERFACES),
+                        help=f"Comma-separated subset of: {', '.join(INTERFACES)}")
+    parser.add_argument("--conversations", type=int, default=3, help="Scripted conversations per interface")
+    parser.add_argument("--turns", type=int, default=8, help="Turns per conversation (max 8)")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Fake LLM time to first token (s)")
+    parser.add_argument("--tps", type=float, default=50.0, help="Fake LLM tokens per second (0 = instant)")
+    parser.add_argument("--tokens", type=int, default=60, help="Tokens per fake response")
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    interfaces = [name.strip() for name in args.interfaces.split(",") if name.strip()]
+    unknown = set(interfaces) - set(INTERFACES)
+    if unknown:
+        parser.error(f"Unknown interfaces: {', '.join(sorted(unknown))}")
+
+    scratch = Path(tempfile.mkdtemp(prefix="ai_brain_turns_"))
+    Config.LLM_BACKEND = "ollama"
+    Config.TRACING_DIR = scratch / "traces"
+    Config.validate()  # Loads SYSTEM_PROMPT
+    print(f"📁 Scratch dir: {scratch}")
+
+    report = {
+        "benchmark": "turn_latency",
+        "fake_llm": {"ttft_s": args.ttft, "tokens_per_sec": args.tps, "tokens": args.tokens},
+        "conversations": args.conversations,
+        "turns_per_conversation": min(args.turns, len(SCRIPTS[0])),
+        "interfaces": {},
+    }
+    with FakeLLMServer(ttft=args.ttft, tokens_per_sec=args.tps, n_tokens=args.tokens) as server:
+        Config.OLLAMA_BASE_URL = server.base_url
+        for name in interfaces:
+            print(f"🚀 {name}: {args.conversations} conversations x {report['turns_per_conversation']} turns")
+            report["interfaces"][name] = run_interface(name, server, scratch, args)
+    shutdown_tracing()
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
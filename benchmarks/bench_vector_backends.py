@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Head-to-head benchmark of the vector backends under MemoryStore.
+
+For each scale the same synthetic corpus (benchmarks/memory_corpus.py) is
+loaded into ChromaDB and into the local engine, then every engine answers
+the same queries:
+
+- chroma: ChromaDB PersistentClient (HNSW)
+- local: in-process engine, exact NumPy brute force
+- local_hnsw: in-process engine with its hnswlib index (needs hnswlib)
+
+The report gives per engine:
+
+- ingest: bulk write throughput of MemoryStore.add_memories
+- open_ms: opening the collection plus the first (cold) query
+- query_k: unfiltered collection.query for k results
+- query_broad_filter / query_session_filter: query with a where filter
+  matching half the store (role) or one session (~40 memories)
+- retrieve_hybrid: MemoryStore._retrieve_by_embedding with query_analysis
+- history: get_conversation_history for one session (a filtered get)
+- get_ids: collection.get for 10 ids
+- write: single-memory MemoryStore._store calls (removed again afterwards)
+- recall_at_k against the exact brute-force top-k
+- memory: RSS added by opening the store and on-disk size
+
+ChromaDB corpora use the same directory names as bench_retrieval, so
+--corpus-root can share them; local corpora get a "_local" suffix.
+
+Usage:
+    python -m benchmarks.bench_vector_backends --scales 10000,100000
+    python -m benchmarks.bench_vector_backends --scales 100000 --corpus-root /data/corpora --output backends.json
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+
+from ai_brain.config import Config
+from ai_brain.index_params import hnsw_metadata
+from ai_brain.vector_backends import HNSWLIB_AVAILABLE, LocalBackend, create_backend
+
+from .bench_retrieval import brute_force_topk, dir_size_mb, rss_mb
+from .memory_corpus import CorpusGenerator, build_corpus, load_manifest, load_vectors
+from .stats import summarize
+
+ENGINES = ["chroma", "local", "local_hnsw"]
+
+
+def configure(engine: str, persist_dir: Path):
+    """Point Config at an engine's corpus and drop every cached handle."""
+    Config.CHROMA_PERSIST_DIR = persist_dir
+    Config.VECTOR_BACKEND = "chroma" if engine == "chroma" else "local"
+    Config.LOCAL_HNSW_THRESHOLD = 0 if engine == "local_hnsw" else 10**12
+    SharedSystemClient.clear_system_cache()
+    LocalBackend.flush_all()
+    LocalBackend._open.clear()
+    gc.collect()
+
+
+def open_corpus(scale: int, engine: str, args) -> Path:
+    """Reuse a matching corpus under --corpus-root or generate a new one."""
+    from ai_brain.memory import MemoryStore
+
+    suffix = "" if engine == "chroma" else "_local"
+    persist_dir = Path(args.corpus_root) / f"corpus_{scale}_synthetic_{args.seed}{suffix}"
+    manifest = load_manifest(persist_dir)
+    configure(engine, persist_dir)
+    if manifest and manifest["size"] == scale:
+        return persist_dir
+
+    print(f"🏗️  Generating {scale:,} memories into {persist_dir}")
+    memory = MemoryStore()
+    build_corpus(scale, seed=args.seed, batch_size=args.batch_size, memory=memory)
+    del memory
+    configure(engine, persist_dir)
+    return persist_dir
+
+
+def run_engine(engine: str, scale: int, queries: np.ndarray, analyses: List[Dict[str, Any]], args) -> Dict[str, Any]:
+    """Benchmark one engine on one corpus size."""
+    from ai_brain.memory import MemoryStore
+
+    persist_dir = open_corpus(scale, engine, args)
+    manifest = load_manifest(persist_dir)
+    k = args.k
+
+    build_s = None
+    if engine == "local_hnsw" and not (persist_dir / "local" / Config.CHROMA_COLLECTION_NAME / "hnsw.bin").exists():
+        # One-time index build, saved next to the vectors; not part of open_ms
+        start = time.perf_counter()
+        create_backend().get_or_create_collection(Config.CHROMA_COLLECTION_NAME, hnsw_metadata())
+        build_s = round(time.perf_counter() - start, 2)
+        configure(engine, persist_dir)
+
+    rss_before = rss_mb()
+    start = time.perf_counter()
+    collection = create_backend().get_or_create_collection(Config.CHROMA_COLLECTION_NAME, hnsw_metadata())
+    collection.count()
+    collection.query(query_embeddings=[queries[0].tolist()], n_results=k)
+    open_ms = round((time.perf_counter() - start) * 1000, 2)
+    rss_opened = rss_mb()
+    memory = MemoryStore()
+
+    rng = np.random.default_rng(args.seed)
+    sample_ids = collection.get(limit=1000, include=[])["ids"]
+    sessions = [f"session_{row // 40}" for row in rng.integers(0, scale, len(queries))]
+
+    timings: Dict[str, List[float]] = {
+        name: [] for name in
+        ("query_k", "query_broad_filter", "query_session_filter", "retrieve_hybrid", "history", "get_ids", "write")
+    }
+    found_rows: List[List[int]] = []
+    written: List[str] = []
+    for i, (query, analysis) in enumerate(zip(queries, analyses)):
+        embedding = query.tolist()
+
+        start = time.perf_counter()
+        results = collection.query(query_embeddings=[embedding], n_results=k, include=["metadatas"])
+        timings["query_k"].append(time.perf_counter() - start)
+        found_rows.append([meta["corpus_row"] for meta in results["metadatas"][0]])
+
+        start = time.perf_counter()
+        collection.query(query_embeddings=[embedding], n_results=k, where={"role": "user"})
+        timings["query_broad_filter"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        collection.query(query_embeddings=[embedding], n_results=k, where={"session_id": sessions[i]})
+        timings["query_session_filter"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        memory._retrieve_by_embedding(embedding, n_results=k, query_analysis=analysis)
+        timings["retrieve_hybrid"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        memory.get_conversation_history(n_recent=10, session_id=sessions[i])
+        timings["history"].append(time.perf_counter() - start)
+
+        ids = [sample_ids[j] for j in rng.choice(len(sample_ids), 10, replace=False)]
+        start = time.perf_counter()
+        collection.get(ids=ids)
+        timings["get_ids"].append(time.perf_counter() - start)
+
+    try:
+        for query, analysis in list(zip(queries, analyses))[:args.writes]:
+            meta = memory._build_metadata("conversation", {"role": "user", "benchmark": True})
+            start = time.perf_counter()
+            written.append(memory._store(analysis["original_query"], query.tolist(), meta))
+            timings["write"].append(time.perf_counter() - start)
+    finally:
+        if written:
+            collection.delete(ids=written)
+
+    exact = brute_force_topk(load_vectors(persist_dir), queries, k)
+    recalls = [len(set(found) & set(truth.tolist())) / k for found, truth in zip(found_rows, exact)]
+
+    report = {
+        "ingest": {
+            "seconds": manifest["ingest_seconds"],
+            "memories_per_sec": manifest["ingest_per_sec"],
+        },
+        "hnsw_build_s": build_s,
+        "open_ms": open_ms,
+        **{name: summarize(values) for name, values in timings.items()},
+        "recall_at_k": {
+            "k": k,
+            "mean": round(statistics.mean(recalls), 4),
+            "min": round(min(recalls), 4),
+        },
+        "memory": {
+            "rss_opened_delta_mb": round(rss_opened - rss_before, 1),
+            "disk_mb": dir_size_mb(persist_dir),
+        },
+    }
+    del memory, collection
+    configure(engine, persist_dir)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ChromaDB against the local vector engine")
+    parser.add_argument("--scales", type=str, default="10000,100000", help="Comma-separated corpus sizes")
+    parser.add_argument("--engines", type=str, default=",".join(ENGINES), help="Comma-separated engines")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per engine and scale")
+    parser.add_argument("--writes", type=int, default=50, help="Single-memory writes timed per engine")
+    parser.add_argument("--k", type=int, default=Config.MEMORY_CONTEXT_SIZE, help="Results per query")
+    parser.add_argument("--corpus-root", type=str, help="Keep/reuse generated corpora under this directory")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+    args.corpus_root = args.corpus_root or tempfile.mkdtemp(prefix="ai_brain_backends_")
+
+    engines = [e for e in args.engines.split(",") if e.strip()]
+    if "local_hnsw" in engines and not HNSWLIB_AVAILABLE:
+        print("⚠️  hnswlib not installed, skipping local_hnsw")
+        engines.remove("local_hnsw")
+
+    report = {
+        "benchmark": "vector_backends",
+        "k": args.k,
+        "queries": args.queries,
+        "hnswlib": HNSWLIB_AVAILABLE,
+        "scales": [],
+    }
+    for scale in [int(s) for s in args.scales.split(",") if s.strip()]:
+        print(f"🚀 Scale {scale:,}")
+        _, queries, analyses = CorpusGenerator(seed=args.seed).queries(args.queries)
+        results = {}
+        for engine in engines:
+            print(f"   {engine}")
+            results[engine] = run_engine(engine, scale, queries, analyses, args)
+
+        speedup = {}
+        if "chroma" in results:
+            for engine, result in results.items():
+                if engine != "chroma":
+                    speedup[engine] = {
+                        name: round(results["chroma"][name]["p50_ms"] / max(result[name]["p50_ms"], 1e-6), 2)
+                        for name in ("query_k", "query_broad_filter", "query_session_filter",
+                                     "retrieve_hybrid", "history", "get_ids", "write")
+                    }
+        report["scales"].append({"size": scale, "engines": results, "p50_speedup_vs_chroma": speedup})
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Local OpenAI-compatible stand-in for benchmarks.
+
+Serves ``POST /v1/chat/completions`` (plain JSON and SSE streaming) and
+``GET /v1/models`` as a plain ASGI app, with a configurable time to first
+token and tokens/sec, so AIBrain and LangChainBrain can be pointed at it
+through OLLAMA_BASE_URL and timed without a real model.
+
+Usage:
+    with FakeLLMServer(ttft=0.2, tokens_per_sec=50) as server:
+        Config.LLM_BACKEND = "ollama"
+        Config.OLLAMA_BASE_URL = server.base_url
+        ...
+
+    python -m benchmarks.fake_llm --port 11500 --ttft 0.3 --tps 40
+"""
+
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import uvicorn
+
+WORDS = (
+    "that sounds wonderful and I remember you mentioned it before so tell me "
+    "more about how it went and what you would like to do next"
+).split()
+
+
+class FakeLLMApp:
+    """ASGI app answering chat completions with canned tokens at a fixed pace."""
+
+    def __init__(self, ttft: float = 0.2, tokens_per_sec: float = 50.0, n_tokens: int = 60):
+        """
+        Args:
+            ttft: Seconds before the first token
+            tokens_per_sec: Pace of the following tokens (0 = as fast as possible)
+            n_tokens: Tokens per response
+        """
+        self.ttft = ttft
+        self.token_delay = 1.0 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+        self.n_tokens = n_tokens
+        self.stats: Dict[str, Any] = {"requests": 0, "streaming_requests": 0, "prompt_chars": []}
+        self._lock = threading.Lock()
+
+    def tokens(self) -> List[str]:
+        return [WORDS[i % len(WORDS)] + " " for i in range(self.n_tokens)]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            while True:
+                message = await receive()
+                if message["type"] == "lifespan.startup":
+                    await send({"type": "lifespan.startup.complete"})
+                elif message["type"] == "lifespan.shutdown":
+                    await send({"type": "lifespan.shutdown.complete"})
+                    return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"].rstrip("/")
+        if scope["method"] == "GET" and path.endswith("/models"):
+            await self._send_json(send, 200, {"object": "list", "data": [{"id": "fake", "object": "model"}]})
+        elif scope["method"] == "POST" and path.endswith("/chat/completions"):
+            body = b""
+            while True:
+                message = await receive()
+                body += message.get("body", b"")
+                if not message.get("more_body"):
+                    break
+            request = json.loads(body or b"{}")
+            prompt_chars = sum(len(str(m.get("content") or "")) for m in request.get("messages", []))
+            with self._lock:
+                self.stats["requests"] += 1
+                self.stats["streaming_requests"] += bool(request.get("stream"))
+                self.stats["prompt_chars"].append(prompt_chars)
+            if request.get("stream"):
+                await self._stream(send, request.get("model", "fake"))
+            else:
+                await self._complete(send, request.get("model", "fake"))
+        else:
+            await self._send_json(send, 404, {"error": {"message": f"Not found: {path}"}})
+
+    async def _complete(self, send, model: str):
+        await asyncio.sleep(self.ttft + self.token_delay * max(0, self.n_tokens - 1))
+        text = "".join(self.tokens())
+        await self._send_json(send, 200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": self.n_tokens, "total_tokens": self.n_tokens},
+        })
+
+    async def _stream(self, send, model: str):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+        })
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        def event(delta: Dict[str, str], finish_reason: Optional[str] = None) -> bytes:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+
+        await asyncio.sleep(self.ttft)
+        for i, token in enumerate(self.tokens()):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            delta = {"role": "assistant", "content": token} if i == 0 else {"content": token}
+            await send({"type": "http.response.body", "body": event(delta), "more_body": True})
+        await send({"type": "http.response.body", "body": event({}, "stop"), "more_body": True})
+        await send({"type": "http.response.body", "body": b"data: [DONE]\n\n", "more_body": False})
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Dict[str, Any]):
+        body = json.dumps(payload).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+class FakeLLMServer:
+    """Run a FakeLLMApp on a background thread (uvicorn) for the duration of a with-block."""
+
+    def __init__(self, ttft: float = 0.2, tokens_per_sec: float = 50.0, n_tokens: int = 60,
+                 host: str = "127.0.0.1", port: int = 0):
+        """
+        Args:
+            ttft, tokens_per_sec, n_tokens: See FakeLLMApp
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+        """
+        self.app = FakeLLMApp(ttft=ttft, tokens_per_sec=tokens_per_sec, n_tokens=n_tokens)
+        self.host = host
+        self.port = port or self._free_port(host)
+        self._server = uvicorn.Server(uvicorn.Config(
+            self.app, host=self.host, port=self.port, log_level="warning", lifespan="on"
+        ))
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _free_port(host: str) -> int:
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            return sock.getsockname()[1]
+
+    @property
+    def base_url(self) -> str:
+        """Value for OLLAMA_BASE_URL (the brains append /v1)."""
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.run, name="fake_llm_server", daemon=True)
+        self._thread.start()
+        deadline = time.time() + 10
+        while not self._server.started:
+            if time.time() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake LLM server failed to start")
+            time.sleep(0.02)
+
+    def stop(self):
+        self._server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "FakeLLMServer":
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--ttft", type=float, default=0.2, help="Time to first token (s)")
+    parser.add_argument("--tps", type=float, default=50.0, help="Tokens per second")
+    parser.add_argument("--tokens", type=int, default=60, help="Tokens per response")
+    args = parser.parse_args()
+
+    print(f"🤖 Fake LLM on http://{args.host}:{args.port}/v1 (ttft={args.ttft}s, {args.tps} tok/s)")
+    print(f"   Use: LLM_BACKEND=ollama OLLAMA_BASE_URL=http://{args.host}:{args.port}")
+    app = FakeLLMApp(ttft=args.ttft, tokens_per_sec=args.tps, n_tokens=args.tokens)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
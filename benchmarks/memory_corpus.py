@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""
+Synthetic memory corpus generator for retrieval benchmarks.
+
+Writes realistic conversation memories into a scratch ChromaDB directory via
+MemoryStore.add_memories: alternating user/assistant turns about a few dozen
+topics, mentioning recurring people, places, organisations and products, with
+the same metadata NLPAnalyzer.enrich_conversation_entry produces
+(``entities_*``, ``keywords``, ``topics``, sentiment and emotion scores) and
+timestamps spread over the past year.
+
+Embeddings are either:
+- synthetic (default): topic-clustered unit vectors built from the memory's
+  topic, entities and keywords plus noise, so neighbours are semantically
+  meaningful without paying for the embedding model at 1M scale
+- model: the real EMBEDDING_MODEL applied to the generated text
+
+Every memory stores its row number as ``corpus_row`` and the vectors are also
+saved to ``corpus_vectors.npy`` next to the Chroma files, so benchmarks can
+compute exact brute-force neighbours without reading them back from Chroma.
+
+Usage:
+    python -m benchmarks.memory_corpus --size 100000 --persist-dir /tmp/corpus_100k
+    python -m benchmarks.memory_corpus --size 10000 --embeddings model
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ai_brain.config import Config
+
+MANIFEST = "corpus.json"
+VECTORS = "corpus_vectors.npy"
+
+TOPICS = {
+    "music": ["cello", "recital", "tempo", "orchestra", "practice", "concert", "teacher", "piano"],
+    "work": ["deadline", "manager", "project", "meeting", "promotion", "codebase", "team", "review"],
+    "travel": ["flight", "hotel", "itinerary", "passport", "museum", "beach", "train", "luggage"],
+    "cooking": ["recipe", "oven", "sourdough", "spices", "dinner", "garlic", "pasta", "bakery"],
+    "fitness": ["running", "marathon", "gym", "stretching", "injury", "pace", "workout", "yoga"],
+    "family": ["sister", "wedding", "parents", "birthday", "nephew", "holiday", "speech", "grandma"],
+    "health": ["doctor", "sleep", "headache", "therapy", "medication", "appointment", "stress", "diet"],
+    "programming": ["python", "bug", "database", "refactor", "tests", "deploy", "rust", "api"],
+    "reading": ["novel", "author", "chapter", "library", "poetry", "bookclub", "fantasy", "biography"],
+    "gardening": ["tomatoes", "compost", "seeds", "garden", "roses", "soil", "watering", "greenhouse"],
+    "finance": ["budget", "savings", "mortgage", "taxes", "investment", "rent", "salary", "loan"],
+    "pets": ["dog", "cat", "vet", "walks", "puppy", "training", "adoption", "leash"],
+    "movies": ["film", "director", "trailer", "cinema", "sequel", "documentary", "actor", "screenplay"],
+    "education": ["exam", "thesis", "course", "professor", "lecture", "scholarship", "homework", "degree"],
+    "friends": ["party", "dinner", "roommate", "argument", "reunion", "gift", "weekend", "advice"],
+    "home": ["apartment", "renovation", "furniture", "neighbors", "cleaning", "plumber", "move", "kitchen"],
+    "gaming": ["console", "quest", "multiplayer", "level", "strategy", "tournament", "controller", "indie"],
+    "photography": ["camera", "lens", "portrait", "lighting", "editing", "sunset", "tripod", "exhibition"],
+    "language": ["spanish", "vocabulary", "grammar", "accent", "tutor", "fluency", "immersion", "duolingo"],
+    "volunteering": ["shelter", "charity", "fundraiser", "community", "donation", "mentoring", "cleanup", "event"],
+    "cars": ["engine", "mechanic", "roadtrip", "insurance", "electric", "tires", "license", "parking"],
+    "art": ["painting", "sketch", "gallery", "watercolor", "canvas", "sculpture", "studio", "portfolio"],
+    "weather": ["storm", "heatwave", "snow", "rain", "forecast", "umbrella", "humidity", "winter"],
+    "career": ["interview", "resume", "startup", "mentor", "negotiation", "offer", "networking", "skills"],
+}
+
+PERSONS = [
+    "Maya", "Jonas", "Ana", "Liam", "Sofia", "Noah", "Priya", "Mateo", "Aiko", "Omar", "Elena", "Lucas",
+    "Fatima", "Ethan", "Chloe", "Ravi", "Ingrid", "Diego", "Hana", "Samuel", "Nadia", "Oliver", "Leila", "Tomas",
+]
+PLACES = [
+    "Lisbon", "Berlin", "Seville", "Tokyo", "Porto", "Granada", "Toronto", "Nairobi", "Melbourne", "Oslo",
+    "Austin", "Kyoto", "Barcelona", "Dublin", "Prague", "Seoul", "Lima", "Cape Town", "Boston", "Vienna",
+]
+ORGS = [
+    "Google", "the hospital", "Red Cross", "MIT", "the orchestra", "Spotify", "the library", "Airbnb",
+    "the city council", "NASA", "the bakery", "IKEA",
+]
+PRODUCTS = ["iPhone", "Kindle", "PlayStation", "Tesla", "Peloton", "MacBook", "Fitbit", "Roomba"]
+
+EMOTIONS = ["joy", "optimism", "love", "trust", "anticipation", "surprise", "neutral",
+            "sadness", "fear", "anger", "disgust"]
+SENTIMENTS = {"joy": "positive", "optimism": "positive", "love": "positive", "trust": "positive",
+              "anticipation": "positive", "surprise": "neutral", "neutral": "neutral",
+              "sadness": "negative", "fear": "negative", "anger": "negative", "disgust": "negative"}
+
+USER_TEMPLATES = [
+    "I've been thinking about {k0} a lot lately, especially since {person} brought up {k1}.",
+    "Today in {place} I finally sorted out the {k0} and the {k1} with {person}.",
+    "Do you remember what I told you about {k0}? {person} thinks I should focus on {k1}.",
+    "I'm not sure the {k0} will work out, {org} still hasn't replied about the {k1}.",
+    "My {k0} is going better than expected and I want to spend more time on {k1}.",
+    "{person} and I argued about {k0} again, I don't know how to handle the {k1} part.",
+    "I bought a new {product} to help with {k0}, now I need to figure out {k1}.",
+]
+ASSISTANT_TEMPLATES = [
+    "That sounds like real progress with {k0}. How did {person} react to the {k1} idea?",
+    "It makes sense to feel that way about {k0}. Maybe start small with {k1} this week.",
+    "Last time you mentioned {k0} in {place}. Is the {k1} still the main concern?",
+    "Since {org} is involved, it might help to plan the {k0} and {k1} separately.",
+    "Great that the {product} helps with {k0}. What would make {k1} easier?",
+]
+
+
+class CorpusGenerator:
+    """Deterministic generator of synthetic memories, metadata and embeddings."""
+
+    def __init__(self, seed: int = 42, dim: int = 384, days: int = 365, noise: float = 0.6):
+        """
+        Args:
+            seed: Random seed (same seed, same corpus)
+            dim: Embedding dimension for synthetic vectors
+            days: Timestamps are spread over this many past days
+            noise: Weight of the per-memory noise vector (higher = harder recall)
+        """
+        self.seed = seed
+        self.dim = dim
+        self.days = days
+        self.noise = noise
+        self.topics = list(TOPICS)
+        self.keywords = sorted({k for words in TOPICS.values() for k in words})
+        self.entities = PERSONS + PLACES + ORGS + PRODUCTS
+
+        basis = np.random.default_rng(seed)
+        self.topic_vectors = self._unit(basis.standard_normal((len(self.topics), dim)))
+        self.keyword_vectors = self._unit(basis.standard_normal((len(self.keywords), dim)))
+        # Extra zero row: "no entity" padding
+        self.entity_vectors = np.vstack([
+            self._unit(basis.standard_normal((len(self.entities), dim))),
+            np.zeros((1, dim)),
+        ]).astype(np.float32)
+        self._keyword_index = {k: i for i, k in enumerate(self.keywords)}
+        self._entity_index = {e: i for i, e in enumerate(self.entities)}
+        # A handful of topics dominate real conversations
+        weights = 1.0 / np.arange(1, len(self.topics) + 1) ** 0.8
+        self.topic_weights = weights / weights.sum()
+
+    @staticmethod
+    def _unit(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+    def batches(self, size: int, batch_size: int = 5000, start_row: int = 0,
+                stream: int = 0) -> Iterator[Tuple[List[str], List[Dict[str, Any]], np.ndarray]]:
+        """
+        Yield (documents, metadatas, synthetic embeddings) batches.
+
+        Args:
+            size: Total number of memories
+            batch_size: Memories per batch
+            start_row: Value of corpus_row for the first memory
+            stream: Independent random stream (0 = corpus, others for queries)
+        """
+        rng = np.random.default_rng([self.seed, stream])
+        now = datetime.now()
+        for offset in range(0, size, batch_size):
+            n = min(batch_size, size - offset)
+            topic_idx = rng.choice(len(self.topics), size=n, p=self.topic_weights)
+            documents: List[str] = []
+            metadatas: List[Dict[str, Any]] = []
+            keyword_rows = np.zeros((n, 2), dtype=np.int64)
+            entity_rows = np.full((n, 3), len(self.entities), dtype=np.int64)
+            ages = np.sort(rng.uniform(0, self.days * 86400, size=n))[::-1]
+
+            for i in range(n):
+                row = start_row + offset + i
+                topic = self.topics[topic_idx[i]]
+                words = list(rng.choice(TOPICS[topic], size=2, replace=False))
+                role = "user" if row % 2 == 0 else "assistant"
+                fills = {
+                    "k0": words[0], "k1": words[1],
+                    "person": PERSONS[rng.integers(len(PERSONS))],
+                    "place": PLACES[rng.integers(len(PLACES))],
+                    "org": ORGS[rng.integers(len(ORGS))],
+                    "product": PRODUCTS[rng.integers(len(PRODUCTS))],
+                }
+                templates = USER_TEMPLATES if role == "user" else ASSISTANT_TEMPLATES
+                template = templates[rng.integers(len(templates))]
+                text = template.format(**fills)
+                documents.append(text)
+
+                mentioned = {
+                    "person": [fills["person"]] if "{person}" in template else [],
+                    "gpe": [fills["place"]] if "{place}" in template else [],
+                    "org": [fills["org"]] if "{org}" in template else [],
+                    "product": [fills["product"]] if "{product}" in template else [],
+                }
+                keyword_rows[i] = [self._keyword_index[w] for w in words]
+                for j, entity in enumerate(v[0] for v in mentioned.values() if v):
+                    entity_rows[i, j] = self._entity_index[entity]
+
+                emotion = EMOTIONS[min(int(rng.exponential(2.5)), len(EMOTIONS) - 1)]
+                score = float(np.round(rng.uniform(0.35, 0.98), 3))
+                timestamp = (now - timedelta(seconds=float(ages[i]))).isoformat()
+                meta: Dict[str, Any] = {
+                    "role": role,
+                    "timestamp": timestamp,
+                    "session_id": f"session_{row // 40}",
+                    "corpus_row": row,
+                    "sentiment": SENTIMENTS[emotion],
+                    "sentiment_score": score,
+                    "has_question": "?" in text,
+                    "has_negation": "not" in text or "n't" in text,
+                    "word_count": len(text.split()),
+                    "sentence_count": text.count(".") + text.count("?") or 1,
+                    "keywords": ", ".join(words),
+                    "topics": topic,
+                    "entity_count": sum(len(v) for v in mentioned.values()),
+                }
+                for entity_type, values in mentioned.items():
+                    if values:
+                        meta[f"entities_{entity_type}"] = ", ".join(values)
+                if role == "user":
+                    meta["intent"] = "question" if "?" in text else "statement"
+                    meta["user_emotion"] = emotion
+                    meta["user_emotion_score"] = score
+                    meta["user_emotion_is_mixed"] = bool(rng.random() < 0.1)
+                else:
+                    meta["bot_emotion"] = emotion
+                    meta["bot_emotion_score"] = score
+                metadatas.append(meta)
+
+            vectors = (
+                self.topic_vectors[topic_idx]
+                + 0.45 * self.keyword_vectors[keyword_rows].sum(axis=1)
+                + 0.35 * self.entity_vectors[entity_rows].sum(axis=1)
+                + self.noise * self._unit(rng.standard_normal((n, self.dim)))
+            )
+            yield documents, metadatas, self._unit(vectors)
+
+    def queries(self, n: int) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
+        """
+        Fresh query memories from the same distribution (not in the corpus).
+
+        Returns:
+            (texts, synthetic embeddings, query_analysis dicts shaped like
+            NLPAnalyzer.enhance_query output)
+        """
+        texts, vectors, analyses = [], [], []
+        for documents, metadatas, batch_vectors in self.batches(n, batch_size=n, stream=1):
+            texts += documents
+            vectors.append(batch_vectors)
+            for meta, text in zip(metadatas, documents):
+                entities = [
+                    value for key, value in meta.items() if key.startswith("entities_")
+                ]
+                analyses.append({
+                    "original_query": text,
+                    "enhanced_query": text,
+                    "entity_values": entities,
+                    "top_keywords": meta["keywords"].split(", "),
+                })
+        return texts, np.vstack(vectors), analyses
+
+
+def build_corpus(
+    size: int,
+    persist_dir: Optional[Path] = None,
+    embeddings: str = "synthetic",
+    seed: int = 42,
+    batch_size: int = 5000,
+    memory=None
+) -> Dict[str, Any]:
+    """
+    Generate a corpus into a (scratch) ChromaDB directory.
+
+    Args:
+        size: Number of memories
+        persist_dir: Target CHROMA_PERSIST_DIR (a new temp dir if None)
+        embeddings: "synthetic" or "model"
+        seed: Random seed
+        batch_size: Memories generated and written per batch
+        memory: Existing MemoryStore to write into (persist_dir is then ignored)
+
+    Returns:
+        The corpus manifest (also written to corpus.json in persist_dir)
+    """
+    from ai_brain.memory import MemoryStore
+
+    if memory is None:
+        persist_dir = Path(persist_dir or tempfile.mkdtemp(prefix="ai_brain_corpus_"))
+        Config.CHROMA_PERSIST_DIR = persist_dir
+        memory = MemoryStore()
+    persist_dir = Path(Config.CHROMA_PERSIST_DIR)
+
+    if embeddings == "model":
+        dim = memory.embedding_model.get_sentence_embedding_dimension()
+    else:
+        dim = 384
+    generator = CorpusGenerator(seed=seed, dim=dim)
+    vectors_out = np.lib.format.open_memmap(persist_dir / VECTORS, mode="w+", dtype=np.float32, shape=(size, dim))
+
+    start = time.perf_counter()
+    written = 0
+    for documents, metadatas, vectors in generator.batches(size, batch_size=batch_size):
+        if embeddings == "model":
+            vectors = memory.embedding_model.encode(
+                documents, batch_size=Config.EMBEDDING_BATCH_SIZE,
+                normalize_embeddings=True, show_progress_bar=False
+            ).astype(np.float32)
+        memory.add_memories(documents, metadatas=metadatas, embeddings=vectors)
+        vectors_out[written:written + len(documents)] = vectors
+        written += len(documents)
+        if written % (batch_size * 10) == 0 or written == size:
+            rate = written / (time.perf_counter() - start)
+            print(f"   {written:,}/{size:,} memories ({rate:,.0f}/s)")
+    vectors_out.flush()
+    del vectors_out
+
+    elapsed = time.perf_counter() - start
+    manifest = {
+        "size": size,
+        "embeddings": embeddings,
+        "dim": dim,
+        "seed": seed,
+        "collection": Config.CHROMA_COLLECTION_NAME,
+        "created": datetime.now().isoformat(),
+        "ingest_seconds": round(elapsed, 2),
+        "ingest_per_sec": round(size / elapsed, 1) if elapsed else 0.0,
+    }
+    (persist_dir / MANIFEST).write_text(json.dumps(manifest, indent=2) + "\n", encoding="utf-8")
+    return manifest
+
+
+def load_manifest(persist_dir: Path) -> Optional[Dict[str, Any]]:
+    """Read corpus.json from a corpus directory (None if it is not one)."""
+    path = Path(persist_dir) / MANIFEST
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def load_vectors(persist_dir: Path) -> np.ndarray:
+    """Memory-map the corpus vectors (row i is the memory with corpus_row == i)."""
+    return np.load(Path(persist_dir) / VECTORS, mmap_mode="r")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic memory corpus")
+    parser.add_argument("--size", type=int, default=10000, help="Number of memories")
+    parser.add_argument("--persist-dir", type=str, help="Scratch CHROMA_PERSIST_DIR (default: new temp dir)")
+    parser.add_argument("--embeddings", choices=["synthetic", "model"], default="synthetic")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    persist_dir = Path(args.persist_dir) if args.persist_dir else None
+    if persist_dir is not None and load_manifest(persist_dir):
+        parser.error(f"{persist_dir} already holds a corpus; pick an empty directory")
+
+    manifest = build_corpus(args.size, persist_dir, args.embeddings, args.seed, args.batch_size)
+    print(f"✅ Corpus written to {Config.CHROMA_PERSIST_DIR}")
+    print(json.dumps(manifest, indent=2))
+
+
+if __name__ == "__main__":
+    main()
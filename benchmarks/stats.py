@@ -0,0 +1,28 @@
+"""Latency summaries shared by the benchmarks."""
+
+import statistics
+from typing import Dict, Iterable, Sequence
+
+from ai_brain.tracing import percentile
+
+
+def summarize(values: Sequence[float], unit: float = 1000, suffix: str = "ms",
+              percentiles: Iterable[int] = (50, 95)) -> Dict[str, float]:
+    """
+    Latency summary (milliseconds by default).
+
+    Args:
+        values: Samples in seconds
+        unit: Factor applied to every statistic (1e6 for microseconds)
+        suffix: Unit in the keys ("p50_ms", "mean_us", ...)
+        percentiles: Nearest-rank percentiles to report
+
+    Returns:
+        count, then p<pct>_<suffix> for each percentile, mean_<suffix> and max_<suffix>
+    """
+    summary: Dict[str, float] = {"count": len(values)}
+    for pct in percentiles:
+        summary[f"p{pct}_{suffix}"] = round(percentile(values, pct) * unit, 3)
+    summary[f"mean_{suffix}"] = round(statistics.mean(values) * unit, 3) if values else 0.0
+    summary[f"max_{suffix}"] = round(max(values) * unit, 3) if values else 0.0
+    return summary
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""Main entry point for AI Brain - multi-user HTTP/WebSocket chat server."""
+
+from ai_brain.server import main
+from ai_brain.device_utils import print_device_info
+
+if __name__ == "__main__":
+    # Show device information on startup
+    print_device_info()
+    print()
+    
+    # Run server (models are loaded once and shared by all connections)
+    main()
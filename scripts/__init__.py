@@ -4,5 +4,14 @@ Utility scripts for AI Brain/Mind with Memory.
 This directory contains helper scripts:
 - inspect_metadata.py: Inspect ChromaDB memory metadata
 - load_documents.py: Load documents for RAG/LlamaIndex
-- migrate_to_cosine.py: Migrate ChromaDB to cosine similarity
+- watch_documents.py: Keep watched directories indexed in the RAG collection as files change
+- migrate_to_cosine.py: Migrate a collection to cosine similarity, the configured HNSW parameters and upgraded metadata (resumable)
+- load_test_server.py: Load test the chat server with a fake LLM
+- convert_conversation_logs.py: Convert legacy conversation_*.json logs to JSONL
+- reconstruct_prompts.py: Rebuild logged system prompts from the prompt store
+- tune_hnsw.py: Recommend HNSW parameters for a target recall and latency budget
+- dedup_memories.py: Merge near-duplicate memories in an existing store
+- reembed_memories.py: Re-embed every memory collection with a new embedding model
+- snapshot.py: Export a memory collection to a portable snapshot, or import one
+- separate_rag_documents.py: Move document chunks loaded into the memory collection to the RAG collection
 """
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Convert legacy conversation logs (conversation_<session>.json) to the
+append-only JSONL format (conversation_<session>.jsonl).
+
+Usage:
+    python scripts/convert_conversation_logs.py                 # logs/conversations
+    python scripts/convert_conversation_logs.py path/to/logs --remove-original
+"""
+
+import argparse
+from pathlib import Path
+
+from ai_brain.logger import convert_legacy_log, read_conversation_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert legacy JSON conversation logs to JSONL")
+    parser.add_argument("logs_dir", nargs="?", default="logs", help="Logs directory (default: logs)")
+    parser.add_argument("--remove-original", action="store_true", help="Delete .json files after converting")
+    args = parser.parse_args()
+
+    conversations_dir = Path(args.logs_dir) / "conversations"
+    legacy_logs = sorted(conversations_dir.glob("conversation_*.json"))
+
+    if not legacy_logs:
+        print(f"ℹ️  No legacy conversation logs found in {conversations_dir}")
+        return
+
+    print(f"📄 Converting {len(legacy_logs)} conversation log(s) in {conversations_dir}...")
+    converted = 0
+    for json_path in legacy_logs:
+        try:
+            jsonl_path = convert_legacy_log(json_path, remove_original=False)
+
+            # Verify the round trip before touching the original
+            original = read_conversation_log(json_path)
+            rebuilt = read_conversation_log(jsonl_path)
+            if rebuilt["turns"] != original.get("turns", []):
+                print(f"❌ {json_path.name}: verification failed, keeping original")
+                jsonl_path.unlink()
+                continue
+
+            if args.remove_original:
+                json_path.unlink()
+            converted += 1
+            print(f"✅ {json_path.name} → {jsonl_path.name} ({len(rebuilt['turns'])} turns)")
+        except Exception as e:
+            print(f"❌ Failed to convert {json_path.name}: {e}")
+
+    print(f"\n✅ Converted {converted}/{len(legacy_logs)} log(s)")
+
+
+if __name__ == "__main__":
+    main()
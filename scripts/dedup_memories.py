@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Merge near-duplicate memories in an existing store.
+
+The bulk counterpart of MEMORY_DEDUP: memories are grouped by the scope the
+write-time check uses (type, user, session, role), and within each group a
+memory at least --similarity (cosine) close to an earlier kept one is merged
+into it: the kept memory's "occurrences" becomes the sum of both and its
+"last_seen" the latest occurrence, and the duplicate is deleted. Groups are
+compared block-wise with NumPy, so the cost is one matrix product per block
+rather than one vector query per memory.
+
+Prints a JSON report with the memory count before/after, the share of the
+index removed, the vector bytes freed and the on-disk size before/after
+(ChromaDB reuses the freed space rather than shrinking its files; the local
+engine compacts once deleted rows outnumber live ones).
+
+Run it while the application is stopped. Works on whichever VECTOR_BACKEND
+is configured.
+
+Usage:
+    python -m scripts.dedup_memories --dry-run
+    python -m scripts.dedup_memories --similarity 0.95 --output dedup.json
+    python -m scripts.dedup_memories --collection ai_brain_memory_user_<hash>
+"""
+
+import argparse
+import json
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.scoring import parse_timestamp
+from ai_brain.vector_backends import LocalBackend, create_backend
+
+# Metadata keys that define a dedup scope (same as MemoryStore._find_duplicate)
+SCOPE_KEYS = ("type", "user_id", "session_id", "role")
+_BLOCK = 1024
+
+
+def dir_size_mb(path: Path) -> float:
+    return round(sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) / 2**20, 1)
+
+
+def read_collection(collection, page_size: int) -> Tuple[List[str], np.ndarray, List[Dict[str, Any]]]:
+    """IDs, unit embeddings and the metadata fields dedup needs, in storage order."""
+    ids: List[str] = []
+    chunks: List[np.ndarray] = []
+    fields: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = collection.get(limit=page_size, offset=offset, include=["embeddings", "metadatas"])
+        if not page["ids"]:
+            break
+        ids.extend(page["ids"])
+        chunks.append(np.asarray(page["embeddings"], dtype=np.float32))
+        for metadata in page["metadatas"]:
+            metadata = metadata or {}
+            fields.append({key: metadata.get(key) for key in SCOPE_KEYS + (
+                "occurrences", "last_seen", "created_at", "timestamp")})
+        offset += len(page["ids"])
+    if not chunks:
+        return ids, np.empty((0, 0), dtype=np.float32), fields
+    vectors = np.vstack(chunks)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return ids, vectors / np.where(norms > 0, norms, 1.0), fields
+
+
+def find_duplicates(vectors: np.ndarray, similarity: float) -> np.ndarray:
+    """
+    Greedy near-duplicate assignment within one scope group.
+
+    Rows are visited in order; a row at least `similarity` close to an
+    earlier kept row is assigned to the closest such row, otherwise it is
+    kept.
+
+    Returns:
+        For each row, the index of the kept row it duplicates, or -1 if kept
+    """
+    n = len(vectors)
+    representative = np.full(n, -1, dtype=np.int64)
+    kept_rows: List[int] = []
+    kept = np.empty((0, vectors.shape[1]), dtype=np.float32)
+    for start in range(0, n, _BLOCK):
+        block = vectors[start:start + _BLOCK]
+        to_kept = block @ kept.T
+        within = block @ block.T
+        block_kept: List[int] = []
+        for j in range(len(block)):
+            best, match = -math.inf, -1
+            if len(kept_rows):
+                i = int(np.argmax(to_kept[j]))
+                best, match = to_kept[j, i], kept_rows[i]
+            if block_kept:
+                sims = within[j, block_kept]
+                i = int(np.argmax(sims))
+                if sims[i] > best:
+                    best, match = sims[i], start + block_kept[i]
+            if best >= similarity:
+                representative[start + j] = match
+            else:
+                block_kept.append(j)
+        kept_rows.extend(start + j for j in block_kept)
+        kept = np.vstack([kept, block[block_kept]])
+    return representative
+
+
+def last_seen(fields: Dict[str, Any]) -> float:
+    """Latest occurrence time of a memory in epoch seconds (NaN if unknown)."""
+    for key in ("last_seen", "created_at"):
+        if isinstance(fields.get(key), (int, float)):
+            return float(fields[key])
+    return parse_timestamp(fields.get("timestamp"))
+
+
+def dedup_collection(collection, similarity: float, dry_run: bool = False, page_size: int = 5000) -> Dict[str, Any]:
+    """
+    Merge near-duplicates in one collection.
+
+    Args:
+        collection: Collection to clean up
+        similarity: Cosine similarity at or above which two memories are duplicates
+        dry_run: Only report what would be merged
+        page_size: Rows read per get() call
+
+    Returns:
+        Report dict (see module docstring)
+    """
+    start = time.perf_counter()
+    ids, vectors, fields = read_collection(collection, page_size)
+
+    groups: Dict[Tuple, List[int]] = defaultdict(list)
+    for row, row_fields in enumerate(fields):
+        groups[tuple(row_fields[key] for key in SCOPE_KEYS)].append(row)
+
+    merged: Dict[int, List[int]] = defaultdict(list)
+    for rows in groups.values():
+        if len(rows) < 2:
+            continue
+        representative = find_duplicates(vectors[rows], similarity)
+        for offset in np.flatnonzero(representative >= 0).tolist():
+            merged[rows[representative[offset]]].append(rows[offset])
+
+    duplicates = [row for rows in merged.values() for row in rows]
+    if not dry_run and duplicates:
+        updates_ids, updates = [], []
+        for kept, rows in merged.items():
+            members = [kept] + rows
+            seen = [last_seen(fields[row]) for row in members]
+            update = {"occurrences": sum(int(fields[row].get("occurrences") or 1) for row in members)}
+            if not all(math.isnan(s) for s in seen):
+                update["last_seen"] = max(s for s in seen if not math.isnan(s))
+            updates_ids.append(ids[kept])
+            updates.append(update)
+        # Metadata-only updates are merged into the stored metadata by both engines
+        for offset in range(0, len(updates_ids), page_size):
+            collection.update(ids=updates_ids[offset:offset + page_size], metadatas=updates[offset:offset + page_size])
+        for offset in range(0, len(duplicates), page_size):
+            collection.delete(ids=[ids[row] for row in duplicates[offset:offset + page_size]])
+
+    dim = vectors.shape[1] if vectors.size else 0
+    return {
+        "collection": collection.name,
+        "similarity": similarity,
+        "dry_run": dry_run,
+        "scope_groups": len(groups),
+        "memories_before": len(ids),
+        "duplicates": len(duplicates),
+        "memories_after": len(ids) - len(duplicates),
+        "merged_into": len(merged),
+        "reduction_pct": round(100 * len(duplicates) / len(ids), 2) if ids else 0.0,
+        "vector_mb_freed": round(len(duplicates) * dim * 4 / 2**20, 2),
+        "seconds": round(time.perf_counter() - start, 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Merge near-duplicate memories in an existing store")
+    parser.add_argument("--collection", type=str,
+                        help=f"Collection to clean up (default: {Config.CHROMA_COLLECTION_NAME})")
+    parser.add_argument("--similarity", type=float, default=Config.MEMORY_DEDUP_SIMILARITY,
+                        help="Cosine similarity at or above which memories are merged")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be merged")
+    parser.add_argument("--page-size", type=int, default=5000)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    backend = create_backend()
+    name = args.collection or Config.CHROMA_COLLECTION_NAME
+    try:
+        collection = backend.get_collection(name=name)
+    except Exception as e:
+        print(f"❌ Collection '{name}' not found: {e}")
+        return
+
+    disk_before = dir_size_mb(Config.CHROMA_PERSIST_DIR)
+    print(f"🔍 Looking for near-duplicates in '{name}' "
+          f"({collection.count():,} memories, similarity >= {args.similarity})")
+    report = dedup_collection(collection, args.similarity, args.dry_run, args.page_size)
+    LocalBackend.flush_all()
+    report["disk_mb_before"] = disk_before
+    report["disk_mb_after"] = dir_size_mb(Config.CHROMA_PERSIST_DIR)
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    if args.dry_run:
+        print("⚠️  Dry run: nothing was changed")
+    else:
+        print(f"✅ Merged {report['duplicates']:,} duplicates into {report['merged_into']:,} memories "
+              f"({report['reduction_pct']}% of the index)")
+
+
+if __name__ == "__main__":
+    main()
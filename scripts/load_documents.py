@@ -1,50 +1,62 @@
 #!/usr/bin/env python3
-"""Load documents into LlamaIndex RAG for Q&A."""
+"""
+Load documents into LlamaIndex RAG for Q&A.
 
+Loading is incremental: files already loaded and unchanged are skipped,
+changed files have their chunks replaced, and files deleted from a loaded
+directory have their chunks removed (see ai_brain/document_ingestion.py).
+
+Usage:
+    python scripts/load_documents.py research_paper.pdf notes.txt
+    python scripts/load_documents.py documents/  # Load all files in directory
+    python scripts/load_documents.py documents/ --recursive --workers 8
+"""
+
+import argparse
 import sys
-from pathlib import Path
 from ai_brain.config import Config
 from ai_brain.llamaindex_rag import LlamaIndexRAG
 import chromadb
 
 def main():
     """Load documents from command line arguments."""
-    if len(sys.argv) < 2:
-        print("Usage: python load_documents.py <file1> <file2> ... <fileN>")
-        print("\nSupported formats: .txt, .md, .pdf, .docx")
-        print("\nExample:")
-        print("  python load_documents.py research_paper.pdf notes.txt")
-        print("  python load_documents.py documents/  # Load all files in directory")
-        sys.exit(1)
-    
+    parser = argparse.ArgumentParser(
+        description="Load documents into LlamaIndex RAG (supported formats: .txt, .md, .pdf, .docx)"
+    )
+    parser.add_argument("paths", nargs="+", help="Files or directories to load")
+    parser.add_argument("--recursive", "-r", action="store_true", help="Include subdirectories")
+    parser.add_argument("--workers", type=int, help=f"Parser processes (default: {Config.RAG_INGEST_WORKERS})")
+    args = parser.parse_args()
+
     # Validate config
     if not Config.validate():
         print("❌ Configuration error. Please check your .env file.")
         sys.exit(1)
-    
-    # Get file paths from arguments
-    file_paths = sys.argv[1:]
-    
-    print(f"📁 Loading {len(file_paths)} file(s) into LlamaIndex RAG...")
+
+    print(f"📁 Loading {len(args.paths)} path(s) into LlamaIndex RAG...")
     print()
-    
+
     # Initialize ChromaDB
     print("🧠 Initializing ChromaDB...")
     chroma_client = chromadb.PersistentClient(path=Config.CHROMA_PERSIST_DIR)
-    
+
     # Initialize RAG
     rag = LlamaIndexRAG(
         chroma_client=chroma_client,
-        collection_name=Config.CHROMA_COLLECTION_NAME
+        collection_name=Config.RAG_COLLECTION_NAME
     )
     print()
-    
+
     # Load documents
     print("📄 Loading documents...")
-    count = rag.load_documents_from_files(file_paths)
-    
+    report = rag.ingest(args.paths, recursive=args.recursive, workers=args.workers)
+
     print()
-    print(f"✅ Successfully loaded {count} document(s)")
+    print(f"✅ {report['files_new']} new, {report['files_changed']} changed, "
+          f"{report['files_unchanged']} unchanged, {report['files_removed']} removed file(s)"
+          + (f", {report['files_failed']} failed" if report["files_failed"] else ""))
+    print(f"   {report['chunks_added']} chunks written, {report['chunks_removed']} stale chunks removed "
+          f"in {report['seconds']}s ({report['files_per_s']} files/s, {report['chunks_per_s']} chunks/s)")
     print()
     print("💡 Now you can run:")
     print("   python main_enhanced.py --llamaindex")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Load test for the multi-user chat server using a fake LLM.
+
+Starts the ASGI server in-process with a fake streaming brain (configurable
+time-to-first-token and tokens/sec), a real MemoryStore in a scratch
+directory, and drives concurrent users through /chat, /chat/stream and
+/memories/search with httpx.
+
+Usage:
+    python -m scripts.load_test_server --users 50 --turns 5
+    python -m scripts.load_test_server --users 200 --turns 3 --ttft 0.3 --tps 40 --nlp
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import httpx
+import uvicorn
+
+from ai_brain.config import Config
+from ai_brain.tracing import percentile
+
+
+class FakeBrain:
+    """Stand-in for LangChainBrain/AIBrain that streams canned tokens with realistic timing."""
+
+    def __init__(self, ttft: float = 0.2, tokens_per_sec: float = 50.0, n_tokens: int = 40):
+        self.ttft = ttft
+        self.token_delay = 1.0 / tokens_per_sec if tokens_per_sec > 0 else 0.0
+        self.n_tokens = n_tokens
+
+    async def agenerate_response_streaming(self, message: str, **kwargs):
+        await asyncio.sleep(self.ttft)
+        for i in range(self.n_tokens):
+            if i:
+                await asyncio.sleep(self.token_delay)
+            yield f"tok{i} "
+
+
+async def run_user(client: httpx.AsyncClient, user_id: str, turns: int, results: Dict[str, List[float]]):
+    """One simulated user alternating plain and streaming chat turns."""
+    for turn in range(turns):
+        message = f"Hello, this is {user_id}, turn {turn}. I like hiking and astronomy."
+        start = time.perf_counter()
+
+        if turn % 2 == 0:
+            response = await client.post("/chat", json={"user_id": user_id, "message": message})
+            if response.status_code != 200:
+                results["errors"].append(response.status_code)
+                continue
+            results["chat"].append(time.perf_counter() - start)
+        else:
+            first_chunk = None
+            async with client.stream("POST", "/chat/stream", json={"user_id": user_id, "message": message}) as response:
+                if response.status_code != 200:
+                    results["errors"].append(response.status_code)
+                    continue
+                async for line in response.aiter_lines():
+                    if line.startswith("event: chunk") and first_chunk is None:
+                        first_chunk = time.perf_counter() - start
+            results["stream"].append(time.perf_counter() - start)
+            if first_chunk is not None:
+                results["stream_ttfb"].append(first_chunk)
+
+    start = time.perf_counter()
+    response = await client.get("/memories/search", params={"user_id": user_id, "q": "astronomy"})
+    if response.status_code == 200:
+        results["search"].append(time.perf_counter() - start)
+    else:
+        results["errors"].append(response.status_code)
+
+
+async def run_load_test(args):
+    from ai_brain.memory import MemoryStore
+    from ai_brain.server import ChatService, create_app
+
+    scratch = tempfile.mkdtemp(prefix="ai_brain_loadtest_")
+    Config.CHROMA_PERSIST_DIR = Path(scratch)
+    print(f"📁 Scratch store: {scratch}")
+
+    service = ChatService(
+        memory=MemoryStore(),
+        brain=FakeBrain(ttft=args.ttft, tokens_per_sec=args.tps, n_tokens=args.tokens),
+        use_langchain=False,
+        enable_nlp=args.nlp,
+        max_concurrent=args.max_concurrent,
+        max_per_user=2
+    )
+
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(service), host="127.0.0.1", port=args.port, log_level="warning", lifespan="on"
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    results: Dict[str, List[float]] = {"chat": [], "stream": [], "stream_ttfb": [], "search": [], "errors": []}
+    limits = httpx.Limits(max_connections=args.users * 2)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=120, limits=limits) as client:
+        print(f"🚀 {args.users} users x {args.turns} turns (fake LLM: ttft={args.ttft}s, {args.tps} tok/s)")
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            run_user(client, f"user_{i}", args.turns, results) for i in range(args.users)
+        ))
+        elapsed = time.perf_counter() - start
+        stats = (await client.get("/stats")).json()
+
+    server.should_exit = True
+    await server_task
+
+    total_turns = len(results["chat"]) + len(results["stream"])
+    report = {
+        "users": args.users,
+        "turns_per_user": args.turns,
+        "elapsed_s": round(elapsed, 2),
+        "turns_per_sec": round(total_turns / elapsed, 2) if elapsed else 0.0,
+        "errors": len(results["errors"]),
+        "server": stats["server"],
+    }
+    for name in ("chat", "stream", "stream_ttfb", "search"):
+        values = results[name]
+        if values:
+            report[name] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "mean_ms": round(statistics.mean(values) * 1000, 1),
+            }
+
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the AI Brain chat server with a fake LLM")
+    parser.add_argument("--users", type=int, default=50, help="Concurrent simulated users")
+    parser.add_argument("--turns", type=int, default=4, help="Chat turns per user")
+    parser.add_argument("--ttft", type=float, default=0.2, help="Fake LLM time to first token (s)")
+    parser.add_argument("--tps", type=float, default=50.0, help="Fake LLM tokens per second")
+    parser.add_argument("--tokens", type=int, default=40, help="Tokens per fake response")
+    parser.add_argument("--max-concurrent", type=int, default=Config.SERVER_MAX_CONCURRENT_REQUESTS)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--nlp", action="store_true", help="Enable spaCy/RoBERTa enrichment (slower)")
+    asyncio.run(run_load_test(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,27 +2,83 @@
 """
 Migrate ChromaDB collection to use cosine distance instead of l2.
 This will preserve all memories while updating the distance metric.
+
+Also rebuilds the index when the collection was built with HNSW parameters
+(M, construction_ef) other than the configured HNSW_M / HNSW_CONSTRUCTION_EF,
+and can upgrade the stored metadata on the way (--upgrade created_at
+backfills the numeric created_at of memories written before it existed).
+A search_ef change alone is applied in place without a rebuild. Works on
+whichever VECTOR_BACKEND is configured.
+
+The rebuild streams the memories page by page into a new collection,
+checkpointing its progress, verifies the copy and only then swaps it in
+(see ai_brain/migration.py): an interrupted run is resumed by running the
+same command again, and the original collection is untouched until the
+copy is verified. Stop the application while migrating.
+
+Usage:
+    python -m scripts.migrate_to_cosine
+    python -m scripts.migrate_to_cosine --dry-run
+    python -m scripts.migrate_to_cosine --collection ai_brain_memory_user_<hash>
+    python -m scripts.migrate_to_cosine --upgrade created_at --keep-backup
+    python -m scripts.migrate_to_cosine --abort
 """
-import chromadb
-from chromadb.config import Settings
-from pathlib import Path
+import argparse
+from typing import List, Optional
+
 from ai_brain.config import Config
+from ai_brain.index_params import REBUILD_PARAMS, hnsw_metadata, param_drift, set_search_ef, wanted_params
+from ai_brain.migration import (
+    UPGRADES, MigrationError, abort_migration, checkpoint_path, migrate_collection, read_checkpoint, upgrade_metadata
+)
+from ai_brain.vector_backends import create_backend
 
-def migrate_to_cosine():
+def migrate_to_cosine(
+    collection_name: str = None,
+    dry_run: bool = False,
+    space: str = "cosine",
+    upgrades: Optional[List[str]] = None,
+    batch_size: Optional[int] = None,
+    keep_backup: bool = False,
+    abort: bool = False
+):
     print("=" * 80)
-    print("MIGRATING CHROMADB TO COSINE DISTANCE")
+    print(f"MIGRATING CHROMADB TO {space.upper()} DISTANCE + CONFIGURED HNSW PARAMETERS")
     print("=" * 80)
     print()
     
-    # Connect to existing DB
-    client = chromadb.PersistentClient(
-        path=str(Config.CHROMA_PERSIST_DIR),
-        settings=Settings(anonymized_telemetry=False, allow_reset=True)
-    )
+    # Connect to existing DB (ChromaDB or the local engine, per VECTOR_BACKEND)
+    client = create_backend()
     
-    collection_name = Config.CHROMA_COLLECTION_NAME
+    collection_name = collection_name or Config.CHROMA_COLLECTION_NAME
+    upgrades = list(upgrades or [])
+    wanted = {**wanted_params(), "space": space}
     
     try:
+        checkpoint = read_checkpoint(collection_name)
+        if abort:
+            if abort_migration(client, collection_name):
+                print("✅ Dropped the unfinished migration; the original collection is unchanged.")
+            else:
+                print("ℹ️  No unfinished migration to abort.")
+            return
+        if checkpoint is not None and "embedding_model" in checkpoint["settings"]:
+            print(f"❌ '{collection_name}' is being re-embedded with {checkpoint['settings']['embedding_model']}: "
+                  "finish that first (python -m scripts.reembed_memories)")
+            return
+        if checkpoint is not None and not dry_run:
+            # Finish an interrupted run with the settings it started with
+            print(f"🔁 Found an unfinished migration ({checkpoint['phase']} phase, "
+                  f"{checkpoint['offset']}/{checkpoint['count']} memories copied)")
+            if checkpoint["phase"] != "copy" or checkpoint["settings"].get("upgrades") == upgrades:
+                resumed_upgrades = checkpoint["settings"].get("upgrades")
+                report = migrate_collection(client, collection_name, checkpoint["metadata"],
+                                            transform=upgrade_metadata(resumed_upgrades) if resumed_upgrades else None,
+                                            settings=checkpoint["settings"], batch_size=batch_size,
+                                            keep_backup=keep_backup)
+                print(f"✅ Migration finished: {report['records']} memories")
+                return
+        
         # Get existing collection
         old_collection = client.get_collection(name=collection_name)
         count = old_collection.count()
@@ -31,72 +87,90 @@ def migrate_to_cosine():
         print(f"   Memories: {count}")
         print()
         
-        if count == 0:
-            print("⚠️  Collection is empty, just updating metadata...")
-            client.delete_collection(name=collection_name)
-            new_collection = client.create_collection(
-                name=collection_name,
-                metadata={
-                    "description": "AI Brain persistent memory",
-                    "hnsw:space": "cosine"
-                }
-            )
-            print("✅ Created new collection with cosine distance")
+        drift = param_drift(old_collection, wanted)
+        if not drift and not upgrades:
+            print(f"✅ Collection already uses {space} distance and the configured HNSW parameters.")
             return
         
-        # Get all data
-        print("📥 Retrieving all memories...")
-        all_data = old_collection.get()
-        
-        ids = all_data['ids']
-        documents = all_data['documents']
-        embeddings = all_data['embeddings']
-        metadatas = all_data['metadatas']
-        
-        print(f"✅ Retrieved {len(ids)} memories")
+        for name, (current, value) in drift.items():
+            print(f"   {name}: {current} → {value}")
+        for name in upgrades:
+            print(f"   metadata upgrade: {name}")
         print()
         
-        # Delete old collection
-        print("🗑️  Deleting old collection...")
-        client.delete_collection(name=collection_name)
-        print("✅ Deleted")
-        print()
+        needs_rebuild = bool(upgrades) or any(name in REBUILD_PARAMS for name in drift)
+        if dry_run:
+            print(f"ℹ️  Dry run: would {'rebuild the index' if needs_rebuild else 'update search_ef in place'}.")
+            return
         
-        # Create new collection with cosine distance
-        print("🆕 Creating new collection with cosine distance...")
-        new_collection = client.create_collection(
-            name=collection_name,
-            metadata={
-                "description": "AI Brain persistent memory",
-                "hnsw:space": "cosine"
-            }
-        )
-        print("✅ Created")
-        print()
+        if not needs_rebuild:
+            if set_search_ef(old_collection, drift["search_ef"][1]):
+                print("✅ Updated search_ef in place (no rebuild needed)")
+            else:
+                print("❌ This ChromaDB version can't change search_ef in place")
+            return
         
-        # Re-add all data
-        print("📤 Re-adding all memories...")
-        new_collection.add(
-            ids=ids,
-            documents=documents,
-            embeddings=embeddings,
-            metadatas=metadatas
+        # Keep descriptive metadata, replace the index settings
+        new_metadata = {
+            key: value for key, value in (old_collection.metadata or {}).items()
+            if not key.startswith("hnsw:")
+        }
+        new_metadata.setdefault("description", "AI Brain persistent memory")
+        new_metadata.update(hnsw_metadata(wanted))
+        
+        # Stream the memories into a new collection, verify it, then swap it in
+        print(f"📤 Copying {count} memories into a new collection...")
+        print(f"   Checkpoint: {checkpoint_path(collection_name)} (run again to resume if interrupted)")
+        report = migrate_collection(
+            client,
+            collection_name,
+            new_metadata,
+            transform=upgrade_metadata(upgrades) if upgrades else None,
+            settings={"upgrades": upgrades},
+            batch_size=batch_size,
+            keep_backup=keep_backup
         )
-        print(f"✅ Added {len(ids)} memories")
+        print(f"✅ Copied, verified and swapped in {report['records']} memories in {report['seconds']}s")
+        if report["backup"]:
+            print(f"   Original kept as '{report['backup']}'")
         print()
         
         print("=" * 80)
         print("✅ MIGRATION COMPLETE!")
         print("=" * 80)
         print()
-        print("The collection now uses cosine distance for better semantic similarity.")
-        print("Similarities will now range from -1 (opposite) to 1 (identical).")
+        print(f"The collection now uses {wanted['space']} distance.")
+        if wanted["space"] == "cosine":
+            print("Similarities will now range from -1 (opposite) to 1 (identical).")
+        print(f"HNSW: M={Config.HNSW_M}, construction_ef={Config.HNSW_CONSTRUCTION_EF}, "
+              f"search_ef={Config.HNSW_SEARCH_EF}")
+        if upgrades:
+            print(f"Metadata upgrades: {', '.join(upgrades)}")
         print()
-        
+    
+    except MigrationError as e:
+        print(f"❌ Migration stopped: {e}")
+        print("   The original collection is unchanged.")
     except ValueError:
         # Collection doesn't exist yet
         print(f"ℹ️  Collection doesn't exist yet, will be created with cosine distance.")
         print("✅ No migration needed - run the app to create the collection.")
 
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild a memory collection with cosine distance and the configured HNSW parameters")
+    parser.add_argument("--collection", type=str, help=f"Collection to migrate (default: {Config.CHROMA_COLLECTION_NAME})")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would change")
+    parser.add_argument("--space", choices=["cosine", "l2", "ip"], default="cosine",
+                        help="Distance metric to rebuild with")
+    parser.add_argument("--upgrade", action="append", choices=sorted(UPGRADES), default=[],
+                        help="Metadata upgrade to apply to every memory (repeatable)")
+    parser.add_argument("--batch-size", type=int, help="Memories per page (default: 5000)")
+    parser.add_argument("--keep-backup", action="store_true",
+                        help="Keep the original collection as <name>_backup_<time>")
+    parser.add_argument("--abort", action="store_true", help="Drop an unfinished migration instead of resuming it")
+    args = parser.parse_args()
+    migrate_to_cosine(args.collection, args.dry_run, args.space, args.upgrade, args.batch_size,
+                      args.keep_backup, args.abort)
+
 if __name__ == "__main__":
-    migrate_to_cosine()
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Reconstruct system prompts from the deduplicating prompt store
+(logs/prompts/prompts_<session>_NNNN.jsonl[.zst]).
+
+Usage:
+    python scripts/reconstruct_prompts.py --list                       # sessions and turn counts
+    python scripts/reconstruct_prompts.py 20251024_101500              # every prompt in a session
+    python scripts/reconstruct_prompts.py 20251024_101500 --turn 12    # one prompt, exactly
+    python scripts/reconstruct_prompts.py 20251024_101500 --stats      # storage savings
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from ai_brain.prompt_store import find_segments, iter_prompts
+
+
+def session_of(segment: Path) -> str:
+    """prompts_<session>_NNNN.jsonl[.zst] → <session>"""
+    stem = segment.name.split(".", 1)[0]
+    return stem[len("prompts_"):].rsplit("_", 1)[0]
+
+
+def format_prompt(entry: dict) -> str:
+    """Render an entry in the same layout as the plain-text prompt log."""
+    parts = [
+        f"\n{'='*80}\n",
+        f"Timestamp: {entry['timestamp']}\n",
+        f"Context Type: {entry['context_type']}\n"
+    ]
+    if entry["metadata"]:
+        parts.append(f"Metadata: {json.dumps(entry['metadata'], indent=2)}\n")
+    parts.extend([
+        f"{'-'*80}\n",
+        "SYSTEM PROMPT:\n",
+        f"{'-'*80}\n",
+        entry["prompt"],
+        f"\n{'='*80}\n\n"
+    ])
+    return "".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruct logged system prompts")
+    parser.add_argument("session_id", nargs="?", help="Session ID (omit with --list)")
+    parser.add_argument("--logs-dir", default="logs", help="Logs directory (default: logs)")
+    parser.add_argument("--turn", type=int, help="Only print this turn (0-based)")
+    parser.add_argument("--raw", action="store_true", help="Print only the prompt text, no header")
+    parser.add_argument("--list", action="store_true", help="List sessions in the store")
+    parser.add_argument("--stats", action="store_true", help="Compare stored size with the raw prompts")
+    args = parser.parse_args()
+
+    prompts_dir = Path(args.logs_dir) / "prompts"
+
+    if args.list or not args.session_id:
+        sessions = defaultdict(list)
+        for segment in find_segments(prompts_dir):
+            sessions[session_of(segment)].append(segment)
+        if not sessions:
+            print(f"ℹ️  No prompt store segments found in {prompts_dir}")
+            return
+        for session_id, segments in sessions.items():
+            turns = sum(1 for segment in segments for _ in iter_prompts(segment))
+            print(f"{session_id}: {turns} prompts in {len(segments)} segment(s)")
+        return
+
+    segments = find_segments(prompts_dir, args.session_id)
+    if not segments:
+        print(f"❌ No prompt store segments for session {args.session_id} in {prompts_dir}")
+        sys.exit(1)
+
+    if args.stats:
+        raw_bytes = sum(
+            len(entry["prompt"].encode("utf-8"))
+            for segment in segments for entry in iter_prompts(segment)
+        )
+        stored_bytes = sum(segment.stat().st_size for segment in segments)
+        ratio = raw_bytes / stored_bytes if stored_bytes else 0
+        print(f"📊 Session {args.session_id}")
+        print(f"   Raw prompt bytes:    {raw_bytes:,}")
+        print(f"   Stored bytes:        {stored_bytes:,} ({len(segments)} segment(s))")
+        print(f"   Reduction:           {ratio:.1f}x")
+        return
+
+    found = False
+    for segment in segments:
+        for entry in iter_prompts(segment):
+            if args.turn is not None and entry["turn"] != args.turn:
+                continue
+            found = True
+            sys.stdout.write(entry["prompt"] + "\n" if args.raw else format_prompt(entry))
+
+    if args.turn is not None and not found:
+        print(f"❌ Turn {args.turn} not found in session {args.session_id}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
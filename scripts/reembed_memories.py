@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Re-embed every memory collection with a new embedding model (offline).
+
+Each memory collection (the main one and every per-user one) is streamed
+page by page into a shadow collection, its documents encoded with --model
+in EMBEDDING_BATCH_SIZE batches, then verified and swapped in by renaming,
+with the model recorded in the collection metadata (see
+ai_brain/reembedding.py). Progress is checkpointed: an interrupted run
+resumes where it stopped, including shadows built in the background by a
+running application (REEMBED_MODEL).
+
+Stop the application first, and set EMBEDDING_MODEL to the new model
+afterwards: MemoryStore refuses to start on vectors from another model.
+To switch without stopping, use REEMBED_MODEL instead (see .env.example).
+
+Usage:
+    python -m scripts.reembed_memories --model BAAI/bge-small-en-v1.5
+    python -m scripts.reembed_memories --model BAAI/bge-small-en-v1.5 --collection ai_brain_memory --keep-backup
+    python -m scripts.reembed_memories --status
+"""
+
+import argparse
+from typing import List, Optional
+
+from sentence_transformers import SentenceTransformer
+
+from ai_brain.config import Config
+from ai_brain.device_utils import get_torch_device
+from ai_brain.migration import pending_migrations
+from ai_brain.reembedding import EMBEDDING_MODEL_KEY, memory_collections, recorded_model, reembed_collection
+from ai_brain.vector_backends import create_backend
+
+
+def print_status(backend):
+    """Recorded model of every memory collection and unfinished re-embeddings."""
+    for name in memory_collections(backend):
+        collection = backend.get_collection(name)
+        print(f"📁 {name}: {collection.count():,} memories, model {recorded_model(collection) or 'not recorded'}")
+    for state in pending_migrations():
+        model = state["settings"].get(EMBEDDING_MODEL_KEY)
+        if model:
+            print(f"🔁 {state['source']}: re-embedding with {model}, {state['offset']:,}/{state['count']:,} copied")
+
+
+def reembed_memories(model_name: str, collections: Optional[List[str]] = None, batch_size: Optional[int] = None,
+                     keep_backup: bool = False) -> List[dict]:
+    """
+    Re-embed and swap in the given collections (default: every memory collection).
+
+    Returns:
+        One migrate_collection() report per collection
+    """
+    backend = create_backend()
+    print(f"🔮 Loading embedding model: {model_name}...")
+    model = SentenceTransformer(model_name, device=get_torch_device())
+    reports = []
+    for name in collections or memory_collections(backend):
+        collection = backend.get_collection(name)
+        if recorded_model(collection) == model_name:
+            print(f"✅ {name} is already embedded with {model_name}")
+            continue
+        print(f"🚀 Re-embedding {name} ({collection.count():,} memories)...")
+        report = reembed_collection(backend, name, model, model_name, cutover=True, batch_size=batch_size,
+                                    keep_backup=keep_backup, progress=True)
+        print(f"✅ Swapped in {name}: {report['records']:,} memories in {report['seconds']}s")
+        if report["backup"]:
+            print(f"   Old vectors kept as '{report['backup']}'")
+        reports.append(report)
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-embed memory collections with a new embedding model")
+    parser.add_argument("--model", type=str, help="Embedding model to re-embed with")
+    parser.add_argument("--collection", action="append", help="Collection to re-embed (repeatable; default: all)")
+    parser.add_argument("--batch-size", type=int, help="Memories read per page (default: 5000)")
+    parser.add_argument("--keep-backup", action="store_true", help="Keep the old vectors as <name>_backup_<time>")
+    parser.add_argument("--status", action="store_true", help="Show recorded models and unfinished re-embeddings")
+    args = parser.parse_args()
+
+    if args.status or not args.model:
+        print_status(create_backend())
+        if not args.status:
+            parser.error("--model is required")
+        return
+
+    reembed_memories(args.model, args.collection, args.batch_size, args.keep_backup)
+    if Config.EMBEDDING_MODEL != args.model:
+        print(f"\n⚠️  Set EMBEDDING_MODEL={args.model} before starting the application")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Move document chunks out of the conversational memory collection.
+
+scripts/load_documents.py used to load documents into CHROMA_COLLECTION_NAME,
+the collection MemoryStore retrieves memories from, so document chunks were
+returned as memories and counted in every memory scan. This moves every
+LlamaIndex chunk (recognised by its "_node_content" metadata) from that
+collection into RAG_COLLECTION_NAME, with its embedding, page by page, and
+deletes it from the memory collection.
+
+Usage:
+    python -m scripts.separate_rag_documents --dry-run
+    python -m scripts.separate_rag_documents
+"""
+
+import argparse
+
+import chromadb
+
+from ai_brain.config import Config
+from ai_brain.index_params import hnsw_metadata
+
+# Metadata key LlamaIndex's ChromaVectorStore writes on every chunk
+NODE_CONTENT_KEY = "_node_content"
+
+
+def find_chunks(collection, page_size: int = 5000):
+    """Ids of the LlamaIndex chunks in a collection."""
+    ids = []
+    offset = 0
+    while True:
+        page = collection.get(offset=offset, limit=page_size, include=["metadatas"])
+        if not page["ids"]:
+            return ids
+        ids.extend(i for i, metadata in zip(page["ids"], page["metadatas"]) if NODE_CONTENT_KEY in (metadata or {}))
+        offset += len(page["ids"])
+
+
+def separate_documents(client, dry_run: bool = False, batch_size: int = 1000) -> int:
+    """
+    Move LlamaIndex chunks from the memory collection to the RAG collection.
+
+    Returns:
+        Number of chunks found (moved unless dry_run)
+    """
+    names = [collection.name for collection in client.list_collections()]
+    if Config.CHROMA_COLLECTION_NAME not in names:
+        print(f"✅ No '{Config.CHROMA_COLLECTION_NAME}' collection in {Config.CHROMA_PERSIST_DIR}")
+        return 0
+    memories = client.get_collection(Config.CHROMA_COLLECTION_NAME)
+    chunk_ids = find_chunks(memories)
+    print(f"🔍 {len(chunk_ids):,} document chunks among {memories.count():,} records in '{memories.name}'")
+    if dry_run or not chunk_ids:
+        return len(chunk_ids)
+
+    documents = client.get_or_create_collection(
+        Config.RAG_COLLECTION_NAME, metadata={"description": "Documents for RAG", **hnsw_metadata()}
+    )
+    for start in range(0, len(chunk_ids), batch_size):
+        batch = memories.get(ids=chunk_ids[start:start + batch_size],
+                             include=["embeddings", "documents", "metadatas"])
+        # Copied before deleting: an interrupted run leaves chunks in both, and rerunning finishes it
+        documents.upsert(ids=batch["ids"], embeddings=batch["embeddings"], documents=batch["documents"],
+                         metadatas=batch["metadatas"])
+        memories.delete(ids=batch["ids"])
+        print(f"📤 Moved {min(start + batch_size, len(chunk_ids)):,}/{len(chunk_ids):,}")
+    print(f"✅ '{documents.name}' now holds {documents.count():,} chunks, "
+          f"'{memories.name}' {memories.count():,} memories")
+    return len(chunk_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move document chunks out of the memory collection")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the chunks")
+    args = parser.parse_args()
+
+    client = chromadb.PersistentClient(path=str(Config.CHROMA_PERSIST_DIR))
+    separate_documents(client, args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Export a memory collection to a portable snapshot, or import one.
+
+A snapshot is a directory holding the embeddings as a .npy array, the
+documents and metadata as Parquet (with pyarrow) or zstd-compressed JSON
+lines, and a manifest with the collection settings and file checksums (see
+ai_brain/snapshot.py). Export streams the collection page by page; import
+verifies the checksums and bulk-loads in the backend's maximum batch size,
+so moving a store between machines or backends (VECTOR_BACKEND) doesn't
+mean copying or re-embedding it. Both take the same filters.
+
+Usage:
+    python -m scripts.snapshot export snapshots/2024-06-01
+    python -m scripts.snapshot export snapshots/alice --user alice --since 2024-01-01 --format jsonl
+    python -m scripts.snapshot import snapshots/2024-06-01
+    python -m scripts.snapshot import snapshots/2024-06-01 --collection restored --type conversation
+    python -m scripts.snapshot verify snapshots/2024-06-01
+"""
+
+import argparse
+from pathlib import Path
+
+from ai_brain.config import Config
+from ai_brain.snapshot import (SnapshotError, build_filters, export_snapshot, import_snapshot, parse_date,
+                               verify_snapshot)
+from ai_brain.vector_backends import create_backend
+
+
+def _mb(directory: Path) -> float:
+    return sum(path.stat().st_size for path in directory.iterdir()) / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import memory snapshots")
+    parser.add_argument("command", choices=["export", "import", "verify"])
+    parser.add_argument("directory", type=Path, help="Snapshot directory")
+    parser.add_argument("--collection", type=str, help=f"Collection (default: {Config.CHROMA_COLLECTION_NAME} "
+                                                       "for export, the exported one for import)")
+    parser.add_argument("--format", choices=["parquet", "jsonl"], help="Record file format for export "
+                                                                       "(default: parquet if pyarrow is installed)")
+    parser.add_argument("--type", type=str, help="Only memories of this type")
+    parser.add_argument("--user", type=str, help="Only memories of this user_id")
+    parser.add_argument("--session", type=str, help="Only memories of this session_id")
+    parser.add_argument("--since", type=str, help="Only memories created on or after this ISO date")
+    parser.add_argument("--until", type=str, help="Only memories created before this ISO date")
+    parser.add_argument("--no-verify", action="store_true", help="Import without checking file checksums")
+    args = parser.parse_args()
+
+    filters = build_filters(args.type, args.user, args.session, parse_date(args.since), parse_date(args.until))
+    try:
+        if args.command == "verify":
+            manifest = verify_snapshot(args.directory)
+            print(f"✅ Snapshot of '{manifest['collection']}' is intact: {manifest['rows']:,} memories")
+            return
+
+        backend = create_backend()
+        if args.command == "export":
+            name = args.collection or Config.CHROMA_COLLECTION_NAME
+            print(f"📤 Exporting '{name}' to {args.directory}...")
+            manifest = export_snapshot(backend.get_collection(name), args.directory, filters, args.format)
+            rate = manifest["rows"] / max(manifest["export_seconds"], 1e-9)
+            print(f"✅ Exported {manifest['rows']:,} memories in {manifest['export_seconds']}s "
+                  f"({rate:,.0f}/s, {_mb(args.directory):.1f} MB, {manifest['format']})")
+        else:
+            print(f"📁 Importing {args.directory}...")
+            report = import_snapshot(backend, args.directory, args.collection, filters, verify=not args.no_verify)
+            rate = report["matched"] / max(report["seconds"], 1e-9)
+            print(f"✅ Imported {report['imported']:,} of {report['matched']:,} matching memories into "
+                  f"'{report['collection']}' in {report['seconds']}s ({rate:,.0f}/s)")
+            if report["imported"] < report["matched"]:
+                print(f"   {report['matched'] - report['imported']:,} were already in the collection")
+    except SnapshotError as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Tune HNSW index parameters on a sample of the real memory store.
+
+Samples embeddings from the configured collection, holds some out as
+queries, computes their exact cosine top-k by brute force, then builds
+scratch indexes for every (M, construction_ef) pair and sweeps search_ef,
+measuring recall@k, query latency, build time and index size. Prints the
+cheapest setting that meets the target recall within the latency budget,
+plus the .env lines to apply it.
+
+Recall drops as the index grows, so tune on as large a sample as is
+practical (or the whole store) and leave some headroom over the target.
+
+The scratch indexes are Chroma's; the local backend's hnswlib index takes the
+same parameters, so the recommendation applies to VECTOR_BACKEND=local too.
+
+Usage:
+    python -m scripts.tune_hnsw --target-recall 0.95 --latency-budget-ms 10
+    python -m scripts.tune_hnsw --sample 50000 --m 16,32 --search-ef 50,100,200 --output tune.json
+"""
+
+import argparse
+import json
+import shutil
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import chromadb
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+from chromadb.config import Settings
+
+from ai_brain.config import Config
+from ai_brain.index_params import hnsw_metadata, read_params, set_search_ef
+from ai_brain.tracing import percentile
+from ai_brain.vector_backends import create_backend
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def sample_embeddings(collection, size: int, seed: int, page_size: int = 5000) -> np.ndarray:
+    """Read up to ``size`` embeddings from random pages of the collection."""
+    count = collection.count()
+    pages = list(range(0, count, page_size))
+    rng = np.random.default_rng(seed)
+    rng.shuffle(pages)
+
+    chunks, total = [], 0
+    for offset in pages:
+        batch = collection.get(limit=page_size, offset=offset, include=["embeddings"])["embeddings"]
+        if batch is None or len(batch) == 0:
+            continue
+        chunks.append(np.asarray(batch, dtype=np.float32))
+        total += len(batch)
+        if total >= size:
+            break
+    vectors = np.vstack(chunks)[:size]
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def exact_topk(vectors: np.ndarray, queries: np.ndarray, k: int) -> List[set]:
+    """Exact cosine top-k row indices per query."""
+    scores = queries @ vectors.T
+    top = np.argpartition(-scores, k, axis=1)[:, :k]
+    return [set(row.tolist()) for row in top]
+
+
+def dir_size_mb(path: Path) -> float:
+    return round(sum(p.stat().st_size for p in path.rglob("*") if p.is_file()) / 2**20, 1)
+
+
+def reopen(path: Path):
+    """Open a fresh client on a scratch store (drops the indexes cached in this process)."""
+    SharedSystemClient.clear_system_cache()
+    client = chromadb.PersistentClient(path=str(path), settings=Settings(anonymized_telemetry=False))
+    return client, client.get_collection("hnsw_tuning")
+
+
+def evaluate(vectors: np.ndarray, queries: np.ndarray, truth: List[set], m: int, construction_ef: int,
+             search_efs: List[int], k: int) -> List[Dict[str, Any]]:
+    """Build one scratch index and sweep search_ef over it."""
+    scratch = Path(tempfile.mkdtemp(prefix="ai_brain_hnsw_"))
+    try:
+        client = chromadb.PersistentClient(path=str(scratch), settings=Settings(anonymized_telemetry=False))
+        params = {"space": "cosine", "M": m, "construction_ef": construction_ef, "search_ef": search_efs[0]}
+        collection = client.create_collection("hnsw_tuning", metadata=hnsw_metadata(params))
+
+        ids = [str(i) for i in range(len(vectors))]
+        batch_size = client.get_max_batch_size()
+        start = time.perf_counter()
+        for offset in range(0, len(vectors), batch_size):
+            collection.add(
+                ids=ids[offset:offset + batch_size],
+                embeddings=vectors[offset:offset + batch_size].tolist()
+            )
+        # Force the index to be fully built before timing queries
+        collection.query(query_embeddings=[queries[0].tolist()], n_results=k)
+        build_s = time.perf_counter() - start
+        size_mb = dir_size_mb(scratch)
+
+        results = []
+        for search_ef in search_efs:
+            if not set_search_ef(collection, search_ef):
+                print(f"⚠️  Could not set search_ef={search_ef}, skipping")
+                continue
+            # Chroma applies the new search_ef when the index is next loaded
+            client, collection = reopen(scratch)
+            collection.query(query_embeddings=[queries[0].tolist()], n_results=k, include=[])
+            latencies, recalls = [], []
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                found = collection.query(query_embeddings=[query.tolist()], n_results=k, include=[])["ids"][0]
+                latencies.append(time.perf_counter() - start)
+                recalls.append(len(expected & {int(i) for i in found}) / k)
+            results.append({
+                "M": m,
+                "construction_ef": construction_ef,
+                "search_ef": search_ef,
+                "recall": round(statistics.mean(recalls), 4),
+                "recall_p5": round(percentile(recalls, 5), 4),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+                "build_s": round(build_s, 2),
+                "index_mb": size_mb,
+            })
+            print(f"   M={m:<3} construction_ef={construction_ef:<4} search_ef={search_ef:<4} "
+                  f"recall@{k}={results[-1]['recall']:.3f}  p95={results[-1]['p95_ms']:.2f}ms")
+        return results
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def recommend(results: List[Dict[str, Any]], target_recall: float, latency_budget_ms: float) -> Optional[Dict[str, Any]]:
+    """
+    Pick a setting from the sweep.
+
+    Among settings that meet the recall target within the latency budget,
+    those within 10% of the fastest p95 count as equally fast (timing noise);
+    of these the smallest M, search_ef and construction_ef wins (less memory,
+    faster builds). If none qualifies, the best recall within budget is
+    returned, or failing that the best recall overall.
+    """
+    if not results:
+        return None
+    qualifying = [r for r in results if r["recall"] >= target_recall and r["p95_ms"] <= latency_budget_ms]
+    if qualifying:
+        fastest = min(r["p95_ms"] for r in qualifying)
+        near = [r for r in qualifying if r["p95_ms"] <= fastest * 1.1]
+        return min(near, key=lambda r: (r["M"], r["search_ef"], r["construction_ef"]))
+    within_budget = [r for r in results if r["p95_ms"] <= latency_budget_ms]
+    pool = within_budget or results
+    return max(pool, key=lambda r: (r["recall"], -r["p95_ms"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune HNSW parameters on a sample of the memory store")
+    parser.add_argument("--collection", type=str, default=Config.CHROMA_COLLECTION_NAME)
+    parser.add_argument("--sample", type=int, default=20000, help="Embeddings to index (max: whole store)")
+    parser.add_argument("--queries", type=int, default=200, help="Held-out query embeddings")
+    parser.add_argument("--k", type=int, default=Config.MEMORY_CONTEXT_SIZE * 3,
+                        help="Results per query (default: the hybrid-search over-fetch)")
+    parser.add_argument("--m", type=str, default="8,16,32", help="Comma-separated M values")
+    parser.add_argument("--construction-ef", type=str, default="100,200", help="Comma-separated construction_ef values")
+    parser.add_argument("--search-ef", type=str, default="10,25,50,100,200,400", help="Comma-separated search_ef values")
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--latency-budget-ms", type=float, default=10.0, help="p95 query latency budget")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    try:
+        collection = create_backend().get_collection(args.collection)
+    except ValueError:
+        print(f"❌ Collection '{args.collection}' not found in {Config.CHROMA_PERSIST_DIR}")
+        return
+    count = collection.count()
+    if count < args.queries + args.k * 2:
+        print(f"❌ Only {count} memories; too few to tune on")
+        return
+
+    print(f"🔍 Sampling {min(args.sample + args.queries, count):,} of {count:,} memories from '{args.collection}'")
+    vectors = sample_embeddings(collection, args.sample + args.queries, args.seed)
+    queries, vectors = vectors[:args.queries], vectors[args.queries:]
+    truth = exact_topk(vectors, queries, args.k)
+    current = read_params(collection)
+
+    results: List[Dict[str, Any]] = []
+    for m in parse_ints(args.m):
+        for construction_ef in parse_ints(args.construction_ef):
+            results += evaluate(vectors, queries, truth, m, construction_ef, parse_ints(args.search_ef), args.k)
+
+    best = recommend(results, args.target_recall, args.latency_budget_ms)
+    report = {
+        "collection": args.collection,
+        "store_size": count,
+        "sample_size": len(vectors),
+        "k": args.k,
+        "target_recall": args.target_recall,
+        "latency_budget_ms": args.latency_budget_ms,
+        "current": current,
+        "results": results,
+        "recommended": best,
+    }
+
+    print()
+    if best is None:
+        print("❌ No results")
+    else:
+        meets = best["recall"] >= args.target_recall and best["p95_ms"] <= args.latency_budget_ms
+        print(("✅ Recommended" if meets else "⚠️  No setting met both targets; closest") +
+              f": M={best['M']}, construction_ef={best['construction_ef']}, search_ef={best['search_ef']} "
+              f"(recall@{args.k}={best['recall']:.3f}, p95={best['p95_ms']:.2f}ms on {len(vectors):,} memories)")
+        print("\nAdd to .env:")
+        print(f"HNSW_M={best['M']}")
+        print(f"HNSW_CONSTRUCTION_EF={best['construction_ef']}")
+        print(f"HNSW_SEARCH_EF={best['search_ef']}")
+        if (best["M"], best["construction_ef"]) != (current["M"], current["construction_ef"]):
+            print("\nM / construction_ef differ from the current index; rebuild it with:")
+            print("python -m scripts.migrate_to_cosine")
+        else:
+            print("\nsearch_ef is applied to the existing index on next startup.")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\n📄 Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
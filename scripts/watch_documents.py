@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Keep the RAG corpus indexed as files change in watched directories.
+
+Runs until interrupted: the directories are ingested once on start (only
+what changed since the last run is processed), then every file created,
+changed or deleted is re-indexed once it has been quiet for
+RAG_WATCH_DEBOUNCE_MS (see ai_brain/document_watcher.py).
+
+--status prints the queue depth, lag and totals of a running watcher.
+
+Usage:
+    python -m scripts.watch_documents                    # Directories in RAG_WATCH_DIRS
+    python -m scripts.watch_documents documents/ notes/ --recursive
+    python -m scripts.watch_documents --status
+"""
+
+import argparse
+import sys
+
+from ai_brain.config import Config
+from ai_brain.document_watcher import DocumentWatcher, read_status
+
+
+def print_status(collection_name: str) -> bool:
+    """Print the watcher status of a collection; returns whether a watcher is running."""
+    status = read_status(collection_name)
+    if status is None:
+        print(f"📁 No watcher has run for '{collection_name}'")
+        return False
+    state = status["state"] if status["running"] else f"not running (last: {status['state']})"
+    print(f"📁 {collection_name}: {state}, pid {status['pid']}, updated {status['age_s']}s ago")
+    print(f"   Watching: {', '.join(status['directories'])}" + (" (recursive)" if status["recursive"] else ""))
+    print(f"   Queue: {status['queue_depth']} waiting, {status['in_progress']} in progress, "
+          f"lag {status['lag_s']}s")
+    print(f"   Since {status['started_at']}: {status['batches']} batches, {status['files_indexed']} files indexed, "
+          f"{status['files_removed']} removed, {status['chunks_added']} chunks written, {status['errors']} errors")
+    last = status["last_batch"]
+    if last:
+        print(f"   Last batch: {last['files_indexed']} indexed, {last['files_removed']} removed in "
+              f"{last['seconds']}s, {last['lag_s']}s after the first change ({last['finished_at']})")
+    if status["last_error"]:
+        print(f"   ⚠️  Last error: {status['last_error']}")
+    return status["running"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Watch directories and keep the RAG corpus indexed")
+    parser.add_argument("directories", nargs="*", help="Directories to watch (default: RAG_WATCH_DIRS)")
+    parser.add_argument("--recursive", "-r", action="store_true", help="Include subdirectories")
+    parser.add_argument("--debounce-ms", type=int,
+                        help=f"Quiet time before a file is indexed (default: {Config.RAG_WATCH_DEBOUNCE_MS})")
+    parser.add_argument("--batch-files", type=int,
+                        help=f"Files per ingestion run (default: {Config.RAG_WATCH_BATCH_FILES})")
+    parser.add_argument("--workers", type=int, help=f"Parser processes (default: {Config.RAG_INGEST_WORKERS})")
+    parser.add_argument("--no-initial-scan", action="store_true", help="Don't ingest the directories on start")
+    parser.add_argument("--quiet", "-q", action="store_true", help="Only print batch summaries and errors")
+    parser.add_argument("--status", action="store_true", help="Show the status of a running watcher and exit")
+    args = parser.parse_args()
+
+    if args.status:
+        sys.exit(0 if print_status(Config.RAG_COLLECTION_NAME) else 1)
+
+    if not Config.validate():
+        print("❌ Configuration error. Please check your .env file.")
+        sys.exit(1)
+
+    import chromadb
+    from ai_brain.llamaindex_rag import LlamaIndexRAG
+
+    print("🧠 Initializing ChromaDB...")
+    rag = LlamaIndexRAG(chromadb.PersistentClient(path=str(Config.CHROMA_PERSIST_DIR)), Config.RAG_COLLECTION_NAME)
+    try:
+        watcher = DocumentWatcher(
+            rag,
+            args.directories or None,
+            recursive=args.recursive,
+            debounce_ms=args.debounce_ms,
+            batch_files=args.batch_files,
+            workers=args.workers,
+            initial_scan=not args.no_initial_scan,
+            progress=not args.quiet
+        )
+    except (ImportError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"👀 Watching {', '.join(watcher.directories)} (Ctrl+C to stop)")
+    watcher.run()
+    print("✅ Stopped watching")
+
+
+if __name__ == "__main__":
+    main()
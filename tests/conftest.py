@@ -0,0 +1,12 @@
+"""Pytest fixtures shared by the tests."""
+
+import pytest
+
+from helpers import temp_store_dir
+
+
+@pytest.fixture
+def temp_store():
+    """Config.CHROMA_PERSIST_DIR on a temporary directory for one test."""
+    with temp_store_dir() as path:
+        yield path
@@ -0,0 +1,56 @@
+"""
+Helpers shared by the tests.
+
+Imported as `helpers`: the script runs (python tests/test_*.py) have tests/ on
+sys.path, and pytest gets it from pythonpath in pyproject.toml.
+"""
+
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+from chromadb.api.client import SharedSystemClient
+
+from ai_brain.config import Config
+from ai_brain.document_ingestion import SOURCE_KEY
+from ai_brain.memory import MemoryStore
+
+
+@contextmanager
+def temp_store_dir() -> Iterator[Path]:
+    """
+    Point Config.CHROMA_PERSIST_DIR at a fresh temporary directory.
+
+    Chroma caches one client per path, so the cache is cleared on the way in
+    and out. The original directory is restored even if the test changed it.
+
+    Yields:
+        The temporary persist directory
+    """
+    original = Config.CHROMA_PERSIST_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        Config.CHROMA_PERSIST_DIR = Path(tmp)
+        SharedSystemClient.clear_system_cache()
+        try:
+            yield Path(tmp)
+        finally:
+            Config.CHROMA_PERSIST_DIR = original
+            SharedSystemClient.clear_system_cache()
+
+
+def reopen_store() -> MemoryStore:
+    """A MemoryStore on a fresh client, as after an application restart."""
+    SharedSystemClient.clear_system_cache()
+    return MemoryStore()
+
+
+def write(path: Path, topic: str, paragraphs: int = 6):
+    """Write a document of `paragraphs` paragraphs about `topic`."""
+    path.write_text("\n\n".join(f"Paragraph {i} about {topic}. " + f"{topic} matters. " * 40
+                                for i in range(paragraphs)), encoding="utf-8")
+
+
+def chunks_of(rag, path: Path) -> list:
+    """Chunk texts a LlamaIndexRAG holds for one ingested file."""
+    return rag.chroma_collection.get(where={SOURCE_KEY: str(path.resolve())}, include=["documents"])["documents"]
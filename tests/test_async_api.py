@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test the asyncio-native API surface.
+
+Tests that:
+1. aretrieve_memories / aadd_memory / aget_conversation_history match their sync counterparts
+2. aenrich runs NLP enrichment off the event loop
+3. agenerate_response_streaming streams chunks from LangChain's astream
+4. Many concurrent turns can be driven from a single event loop
+"""
+
+import asyncio
+import time
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from ai_brain.memory import MemoryStore
+from ai_brain.nlp_analyzer import get_analyzer
+from ai_brain.langchain_brain import LangChainBrain
+
+from helpers import temp_store_dir
+
+
+async def run_async_memory_roundtrip(memory: MemoryStore):
+    """Store and retrieve a memory through the async API."""
+    memory_id = await memory.aadd_memory(
+        content="My sister Alice is learning to play the cello",
+        memory_type="conversation",
+        metadata={"role": "user"},
+        enable_nlp=True
+    )
+    assert memory_id, "aadd_memory should return an ID"
+    print(f"✓ aadd_memory stored {memory_id}")
+
+    results = await memory.aretrieve_memories("What instrument does Alice play?", n_results=3)
+    assert any(r["id"] == memory_id for r in results), "Stored memory should be retrievable"
+    print(f"✓ aretrieve_memories returned {len(results)} memories")
+
+    sync_results = memory.retrieve_memories("What instrument does Alice play?", n_results=3)
+    assert [r["id"] for r in results] == [r["id"] for r in sync_results], \
+        "Async and sync retrieval should agree"
+    print("✓ Async and sync retrieval agree")
+
+    history = await memory.aget_conversation_history(n_recent=5)
+    assert history, "aget_conversation_history should return recent turns"
+    print(f"✓ aget_conversation_history returned {len(history)} messages")
+
+
+async def run_aenrich():
+    """Enrich text with the async NLP API."""
+    analyzer = get_analyzer()
+    metadata = await analyzer.aenrich("I'm so excited about my trip to Paris!", role="user")
+    assert metadata["role"] == "user"
+    assert "user_emotion" in metadata
+    print(f"✓ aenrich detected emotion: {metadata['user_emotion']}")
+
+
+async def run_streaming():
+    """Stream a response through agenerate_response_streaming."""
+    brain = LangChainBrain()
+    brain.llm = FakeListChatModel(responses=["Hello from the async brain"])
+
+    chunks = [chunk async for chunk in brain.agenerate_response_streaming(message="Hi!")]
+    assert "".join(chunks) == "Hello from the async brain"
+    assert len(brain.get_session_history()) == 2, "Exchange should be stored in session history"
+    print(f"✓ agenerate_response_streaming yielded {len(chunks)} chunks")
+
+
+async def run_concurrent_turns(memory: MemoryStore, n_turns: int = 50):
+    """Drive many retrieval + streaming turns concurrently on one loop."""
+    brain = LangChainBrain()
+    brain.llm = FakeListChatModel(responses=["ok"] * n_turns)
+
+    async def turn(i: int) -> str:
+        memories = await memory.aretrieve_memories(f"question number {i}")
+        chunks = [c async for c in brain.agenerate_response_streaming(f"question {i}", memories)]
+        return "".join(chunks)
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(turn(i) for i in range(n_turns)))
+    elapsed = time.perf_counter() - start
+
+    assert all(r == "ok" for r in responses)
+    print(f"✓ {n_turns} concurrent turns completed in {elapsed:.2f}s")
+
+
+def test_async_api(temp_store: Path):
+    """Run all async API checks."""
+    print("=" * 60)
+    print("ASYNC API TEST")
+    print("=" * 60)
+
+    memory = MemoryStore()
+
+    asyncio.run(run_async_memory_roundtrip(memory))
+    asyncio.run(run_aenrich())
+    asyncio.run(run_streaming())
+    asyncio.run(run_concurrent_turns(memory))
+
+    print("\n✅ All async API tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_async_api(store)
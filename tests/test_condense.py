@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Test skipping the condense LLM call for standalone questions.
+
+Tests that:
+1. Follow-ups with unresolved pronouns, continuations and fragments need
+   context; self-contained questions and greetings don't
+2. With part-of-speech tags, expletive "there" and nouns inside the message
+   are taken into account
+3. RAG chat only makes the condense LLM call for follow-ups that need it,
+   counts the first turn, skipped and condensed calls and the latency saved
+4. RAG_CONDENSE=always/never and use_analyzer() change the decision
+"""
+
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from llama_index.core import Settings
+from llama_index.core.llms import MockLLM
+
+from ai_brain.condense import needs_context
+from ai_brain.config import Config
+from ai_brain.llamaindex_rag import LlamaIndexRAG
+from ai_brain.memory import MemoryStore
+
+from helpers import temp_store_dir
+
+Token = namedtuple("Token", "text pos_ dep_")
+CONDENSE_CALLS = []
+
+
+class CountingLLM(MockLLM):
+    """MockLLM whose condense calls are recorded and take 50ms."""
+
+    def complete(self, prompt, formatted=False, **kwargs):
+        if prompt.startswith("Given the conversation history"):
+            CONDENSE_CALLS.append(prompt)
+            time.sleep(0.05)
+        return super().complete(prompt, formatted=formatted, **kwargs)
+
+
+def test_classifier():
+    """needs_context() on words alone."""
+    follow_ups = ["What does it mean?", "and the lamp?", "What about Berlin?", "Tell me more", "why?",
+                  "Explain that.", "Thanks. What did they find?", "the second one", "Can I reset it?"]
+    standalone = ["What is photosynthesis?", "What does the paper say about photosynthesis?", "hello",
+                  "How do I reset my router?", "Define entropy", "Is Paris big and is it old?",
+                  "Who wrote that book about whales?"]
+    for message in follow_ups:
+        assert needs_context(message), message
+    for message in standalone:
+        assert not needs_context(message), message
+    print(f"✓ {len(follow_ups)} follow-ups need context, {len(standalone)} standalone questions don't")
+
+
+def test_tagged():
+    """needs_context() with part-of-speech tags."""
+    doc = [Token("There", "PRON", "expl"), Token("is", "VERB", "ROOT"), Token("a", "DET", "det"),
+           Token("storm", "NOUN", "attr"), Token(",", "PUNCT", "punct"), Token("is", "AUX", "ROOT"),
+           Token("it", "PRON", "nsubj"), Token("dangerous", "ADJ", "acomp"), Token("?", "PUNCT", "punct")]
+    assert not needs_context("There is a storm, is it dangerous?", doc)
+    doc = [Token("Is", "AUX", "ROOT"), Token("it", "PRON", "nsubj"), Token("dangerous", "ADJ", "acomp"),
+           Token("?", "PUNCT", "punct")]
+    assert needs_context("Is it dangerous?", doc)
+    doc = [Token("The", "DET", "det"), Token("blue", "ADJ", "amod"), Token("one", "NOUN", "ROOT"),
+           Token("?", "PUNCT", "punct")]
+    assert needs_context("The blue one?", doc)
+    print("✓ Tagged: expletive 'there' and in-message nouns resolve; verbless fragments need context")
+
+
+def test_rag_condense(temp_store: Path):
+    """Condense calls made and skipped by RAG chat."""
+    original = Config.RAG_CONDENSE
+    try:
+        rag = LlamaIndexRAG(MemoryStore().chroma_client)
+        Settings.llm = CountingLLM(max_tokens=8)
+        rag.add_memory("photosynthesis converts light into chemical energy in chloroplasts")
+        rag.add_memory("the mitochondria produce energy for the cell")
+
+        turns = [
+            ("What is photosynthesis?", False),  # First turn
+            ("What does the paper say about chloroplasts?", False),
+            ("What does it produce?", True),
+            ("and the mitochondria?", True),
+            ("How do cells make energy?", False),
+        ]
+        for message, condensed in turns:
+            calls = len(CONDENSE_CALLS)
+            assert "".join(rag.chat(message, stream=True))
+            assert len(CONDENSE_CALLS) == calls + condensed, message
+        stats = rag.get_stats()["condense"]
+        assert (stats["first_turns"], stats["skipped"], stats["condensed"]) == (1, 2, 2), stats
+        assert stats["mean_condense_ms"] >= 50 and stats["saved_ms"] >= 2 * 50, stats
+        print(f"✓ 2 of 4 follow-ups condensed, 2 skipped (~{stats['saved_ms']:.0f}ms saved), first turn counted")
+
+        Config.RAG_CONDENSE = "always"
+        calls = len(CONDENSE_CALLS)
+        "".join(rag.chat("How do cells make energy?"))
+        assert len(CONDENSE_CALLS) == calls + 1
+        Config.RAG_CONDENSE = "never"
+        "".join(rag.chat("and what does it produce?"))
+        assert len(CONDENSE_CALLS) == calls + 1
+        print("✓ RAG_CONDENSE=always condenses every follow-up, never none")
+
+        Config.RAG_CONDENSE = "auto"
+        rag.use_analyzer(type("Analyzer", (), {"needs_context": lambda self, text: True})())
+        "".join(rag.chat("How do cells make energy?"))
+        assert len(CONDENSE_CALLS) == calls + 2
+        print("✓ use_analyzer() takes over the decision")
+    finally:
+        Config.RAG_CONDENSE = original
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("CONDENSE SKIPPING TEST")
+    print("=" * 60)
+    test_classifier()
+    test_tagged()
+    with temp_store_dir() as store:
+        test_rag_condense(store)
+    print("\n✅ All condense skipping tests passed!")
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Test script to verify context in all modes."""
 
+from ai_brain.config import Config
 from ai_brain.inference import AIBrain
 from ai_brain.langchain_brain import LangChainBrain
 from ai_brain.memory import MemoryStore
@@ -88,7 +89,7 @@ def test_llamaindex_mode():
     
     # Initialize
     client = chromadb.PersistentClient(path="./chroma_db")
-    rag = LlamaIndexRAG(client, "ai_brain_memory")
+    rag = LlamaIndexRAG(client, Config.RAG_COLLECTION_NAME)
     
     # Check context prompt
     context_prompt_str = str(rag.context_prompt.template)
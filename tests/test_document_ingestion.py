@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test incremental document ingestion.
+
+Tests that:
+1. A directory is parsed in parallel worker processes, embedded and written
+   to the RAG collection, with one manifest entry per file
+2. Re-ingesting an unchanged directory processes nothing, even after the
+   files are touched
+3. A changed file has its old chunks replaced, a deleted one has its chunks
+   removed, and a new one is added, all in one run
+4. Subdirectories are only included with recursive=True
+5. Large text files are streamed in windows: all of their text is chunked,
+   their old chunks are replaced, and a failed stream leaves no chunks behind
+"""
+
+import os
+from pathlib import Path
+
+from ai_brain import document_ingestion
+from ai_brain.config import Config
+from ai_brain.document_ingestion import iter_text_windows, load_manifest, manifest_path, shutdown_parse_pool
+from ai_brain.llamaindex_rag import LlamaIndexRAG
+from ai_brain.memory import MemoryStore
+
+from helpers import chunks_of, temp_store_dir, write
+
+
+def test_document_ingestion(temp_store: Path):
+    """Run all ingestion checks."""
+    print("=" * 60)
+    print("DOCUMENT INGESTION TEST")
+    print("=" * 60)
+
+    original = (Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP)
+    Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP = 128, 16
+    min_bytes = document_ingestion._PARALLEL_MIN_BYTES
+    document_ingestion._PARALLEL_MIN_BYTES = 0  # Small test files still go through the worker processes
+    try:
+        rag = LlamaIndexRAG(MemoryStore().chroma_client)
+        docs = temp_store / "docs"
+        (docs / "nested").mkdir(parents=True)
+        topics = ["volcanoes", "glaciers", "tides", "deserts", "forests"]
+        for topic in topics:
+            write(docs / f"{topic}.md", topic)
+        write(docs / "nested" / "caves.txt", "caves")
+        (docs / ".hidden.md").write_text("hidden", encoding="utf-8")
+
+        report = rag.ingest([str(docs)], workers=2, progress=False)
+        assert report["files_seen"] == report["files_new"] == 5 and report["files_failed"] == 0, report
+        total = rag.chroma_collection.count()
+        assert report["chunks_added"] == total and total > 5
+        assert report["files_per_s"] > 0 and report["chunks_per_s"] > 0
+        manifest = load_manifest(manifest_path(Config.RAG_COLLECTION_NAME))
+        assert sorted(Path(p).name for p in manifest) == sorted(f"{t}.md" for t in topics)
+        assert sum(entry["chunks"] for entry in manifest.values()) == total
+        hits = rag.retrieve_relevant_context("glaciers matters", top_k=1)
+        assert "glaciers" in hits[0]["content"]
+        print(f"✓ 5 files ingested in worker processes ({total} chunks, {report['chunks_per_s']} chunks/s)")
+
+        for topic in topics:
+            os.utime(docs / f"{topic}.md")  # Touched, content unchanged
+        report = rag.ingest([str(docs)], workers=2, progress=False)
+        assert report["files_unchanged"] == 5 and report["chunks_added"] == 0, report
+        assert rag.chroma_collection.count() == total
+        print("✓ Re-ingesting unchanged (even touched) files processes nothing")
+
+        old_tides = len(chunks_of(rag, docs / "tides.md"))
+        write(docs / "tides.md", "moonlight", paragraphs=2)
+        (docs / "deserts.md").unlink()
+        write(docs / "reefs.md", "reefs")
+        deserts = manifest[str((docs / "deserts.md").resolve())]["chunks"]
+        report = rag.ingest([str(docs)], workers=2, progress=False)
+        assert (report["files_new"], report["files_changed"], report["files_removed"]) == (1, 1, 1), report
+        assert report["chunks_removed"] == old_tides + deserts
+        tides = chunks_of(rag, docs / "tides.md")
+        assert tides and all("moonlight" in chunk and "tides" not in chunk for chunk in tides)
+        assert not chunks_of(rag, docs / "deserts.md") and chunks_of(rag, docs / "reefs.md")
+        assert rag.chroma_collection.count() == total - report["chunks_removed"] + report["chunks_added"]
+        print("✓ Changed file replaced, deleted file removed, new file added in one run")
+
+        report = rag.ingest([str(docs)], recursive=True, workers=1, progress=False)
+        assert report["files_new"] == 1 and chunks_of(rag, docs / "nested" / "caves.txt")
+        print("✓ recursive=True picks up subdirectories (hidden files skipped)")
+    finally:
+        Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP = original
+        document_ingestion._PARALLEL_MIN_BYTES = min_bytes
+        shutdown_parse_pool()
+
+
+def test_streaming(temp_store: Path):
+    """Streamed ingestion of files of RAG_STREAM_MIN_MB or more."""
+    original = (Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP, Config.RAG_STREAM_MIN_MB)
+    patched = (document_ingestion._STREAM_WINDOW_CHARS, document_ingestion._FLUSH_CHUNKS,
+               document_ingestion.stream_file)
+    Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP = 128, 16
+    Config.RAG_STREAM_MIN_MB = 0  # Every file is streamed
+    document_ingestion._STREAM_WINDOW_CHARS, document_ingestion._FLUSH_CHUNKS = 2000, 8
+    try:
+        rag = LlamaIndexRAG(MemoryStore().chroma_client)
+        big = temp_store / "big.md"
+        text = "\n\n".join(f"Marker{i} opens paragraph {i}. " + "Lava cools into basalt. " * 12
+                           for i in range(60))
+        big.write_text(text, encoding="utf-8")
+        windows = list(iter_text_windows(str(big)))
+        assert "".join(windows) == text and len(windows) > 5
+        assert all(len(window) <= 2000 for window in windows)
+        assert all(window.endswith("\n\n") for window in windows[:-1])
+        print(f"✓ The file is read in {len(windows)} windows cut at paragraph breaks")
+
+        report = rag.ingest([str(big)], workers=1, progress=False)
+        assert report["files_streamed"] == report["files_new"] == 1 and report["files_failed"] == 0, report
+        chunks = chunks_of(rag, big)
+        manifest = load_manifest(manifest_path(Config.RAG_COLLECTION_NAME))
+        assert report["chunks_added"] == len(chunks) == manifest[str(big.resolve())]["chunks"] > 8
+        assert all(f"Marker{i} " in " ".join(chunks) for i in range(60))
+        report = rag.ingest([str(big)], workers=1, progress=False)
+        assert report["files_unchanged"] == 1 and report["chunks_added"] == 0, report
+        print(f"✓ Streamed file ingested in full ({len(chunks)} chunks), unchanged on re-run")
+
+        big.write_text(text.replace("basalt", "obsidian"), encoding="utf-8")
+        report = rag.ingest([str(big)], workers=1, progress=False)
+        assert report["files_changed"] == 1 and report["chunks_removed"] == len(chunks), report
+        chunks = chunks_of(rag, big)
+        assert len(chunks) == report["chunks_added"] and all("basalt" not in chunk for chunk in chunks)
+        print("✓ A changed streamed file has its old chunks replaced")
+
+        def failing(path, chunk_size, chunk_overlap):
+            for i, nodes in enumerate(patched[2](path, chunk_size, chunk_overlap)):
+                if i == 3:
+                    raise OSError("disk went away")
+                yield nodes
+
+        document_ingestion.stream_file = failing
+        big.write_text(text, encoding="utf-8")
+        report = rag.ingest([str(big)], workers=1, progress=False)
+        assert report["files_failed"] == 1 and report["chunks_added"] == 0, report
+        assert not chunks_of(rag, big) and rag.chroma_collection.count() == 0
+        assert str(big.resolve()) not in load_manifest(manifest_path(Config.RAG_COLLECTION_NAME))
+        document_ingestion.stream_file = patched[2]
+        report = rag.ingest([str(big)], workers=1, progress=False)
+        assert report["files_new"] == 1 and rag.chroma_collection.count() == report["chunks_added"], report
+        print("✓ A failed stream leaves no partial chunks, and the file is ingested on the next run")
+    finally:
+        Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP, Config.RAG_STREAM_MIN_MB = original
+        (document_ingestion._STREAM_WINDOW_CHARS, document_ingestion._FLUSH_CHUNKS,
+         document_ingestion.stream_file) = patched
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_document_ingestion(store)
+    with temp_store_dir() as store:
+        test_streaming(store)
+    print("\n✅ All document ingestion tests passed!")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test the watch-folder document indexer.
+
+Tests that:
+1. Paths changed again while queued wait for the debounce window, and at
+   most batch_files are taken per run, oldest change first
+2. On start, the watched directory is ingested once
+3. A file written several times in a row is indexed once, in its final state
+4. A burst of new files is indexed in bounded batches, and the status file
+   reports queue depth, lag and totals
+5. Deleting a file or a directory removes their chunks
+"""
+
+import shutil
+import time
+from pathlib import Path
+
+from ai_brain.config import Config
+from ai_brain.document_watcher import DocumentWatcher, read_status
+from ai_brain.llamaindex_rag import LlamaIndexRAG
+from ai_brain.memory import MemoryStore
+
+from helpers import chunks_of, temp_store_dir, write
+
+
+def wait_until(condition, timeout: float = 20.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the watcher"
+        time.sleep(0.1)
+
+
+def settled(watcher: DocumentWatcher, batches: int):
+    """Wait for at least `batches` batches and an empty queue."""
+    def done():
+        status = watcher.status()
+        return (status["batches"] >= batches and status["queue_depth"] == 0 and status["in_progress"] == 0
+                and status["state"] == "idle")
+    wait_until(done)
+    return watcher.status()
+
+
+def check_debounce(rag: LlamaIndexRAG, docs: Path):
+    """Queue handling without a running watcher."""
+    watcher = DocumentWatcher(rag, [str(docs)], debounce_ms=1000, batch_files=2, progress=False)
+    watcher.notify(["/a"])
+    watcher.notify(["/b", "/c"])
+    first_a = watcher._pending["/a"][0]
+    watcher.notify(["/a"])  # Changed again: same first change, later last change
+    assert watcher._pending["/a"][0] == first_a and watcher.status()["queue_depth"] == 3
+    batch, wait = watcher._take_ready(now=watcher._pending["/a"][1] + 0.5)
+    assert batch == {} and 0 < wait <= 0.5
+    now = max(last for _, last in watcher._pending.values()) + 1.0
+    batch, _ = watcher._take_ready(now=now)
+    assert list(batch) == ["/a", "/b"] and watcher.status()["queue_depth"] == 1
+    assert watcher.status()["in_progress"] == 2
+    batch, wait = watcher._take_ready(now=now)
+    assert list(batch) == ["/c"] and watcher.status()["queue_depth"] == 0
+    print("✓ Re-changed paths wait out the debounce; batches are bounded, oldest change first")
+
+
+def test_document_watcher(temp_store: Path):
+    """Run all watcher checks."""
+    print("=" * 60)
+    print("DOCUMENT WATCHER TEST")
+    print("=" * 60)
+
+    original = (Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP)
+    Config.CHROMA_PERSIST_DIR = temp_store / "store"  # The watcher ignores paths under the store
+    Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP = 128, 16
+    watcher = None
+    try:
+        rag = LlamaIndexRAG(MemoryStore().chroma_client)
+        docs = temp_store / "docs"
+        docs.mkdir()
+        write(docs / "volcanoes.md", "volcanoes")
+        write(docs / "glaciers.md", "glaciers")
+        check_debounce(rag, docs)
+
+        watcher = DocumentWatcher(rag, [str(docs)], recursive=True, debounce_ms=300, batch_files=2,
+                                  workers=1, progress=False).start()
+        status = settled(watcher, 1)
+        assert status["files_indexed"] == 2 and status["last_batch"]["scan"]
+        assert chunks_of(rag, docs / "volcanoes.md") and chunks_of(rag, docs / "glaciers.md")
+        print("✓ Watched directory ingested on start")
+
+        batches = status["batches"]
+        for i in range(5):  # Saved over and over, faster than the debounce
+            write(docs / "tides.md", f"draft{i}")
+            time.sleep(0.05)
+        status = settled(watcher, batches + 1)
+        assert status["batches"] == batches + 1 and status["last_batch"]["files_indexed"] == 1, status
+        tides = chunks_of(rag, docs / "tides.md")
+        assert tides and all("draft4" in chunk for chunk in tides)
+        print("✓ A file written five times in a row is indexed once, in its final state")
+
+        batches = status["batches"]
+        topics = ["deserts", "forests", "reefs", "caves", "dunes"]
+        for topic in topics:
+            write(docs / f"{topic}.md", topic)
+        status = settled(watcher, batches + 3)
+        assert status["files_indexed"] == 2 + 1 + 5 and status["errors"] == 0, status
+        assert status["last_batch"]["files_indexed"] <= 2
+        assert all(chunks_of(rag, docs / f"{topic}.md") for topic in topics)
+        time.sleep(2.5)  # Idle status refresh
+        written = read_status(rag.chroma_collection.name)
+        assert written["running"] and written["queue_depth"] == 0 and written["lag_s"] == 0.0
+        assert written["files_indexed"] == status["files_indexed"] and written["last_batch"]["lag_s"] >= 0.3
+        print(f"✓ 5 new files indexed in batches of at most 2 ({status['batches'] - batches} batches); "
+              "status file reports queue depth and lag")
+
+        nested = docs / "nested"
+        nested.mkdir()
+        write(nested / "moons.md", "moons")
+        wait_until(lambda: chunks_of(rag, nested / "moons.md"))
+        (docs / "reefs.md").unlink()
+        shutil.rmtree(nested)
+        wait_until(lambda: not chunks_of(rag, docs / "reefs.md") and not chunks_of(rag, nested / "moons.md"))
+        settled(watcher, 0)
+        assert watcher.status()["files_removed"] == 2
+        print("✓ Deleted file and directory have their chunks removed")
+
+        watcher.stop()
+        assert not read_status(rag.chroma_collection.name)["running"]
+        print("✓ Stopped watcher reported as not running")
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        Config.RAG_CHUNK_SIZE, Config.RAG_CHUNK_OVERLAP = original
+
+    print("\n✅ All document watcher tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_document_watcher(store)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Test the in-memory hot tier of the memory store.
+
+Tests that:
+1. HotTier search matches an exact cosine scan, honours filters and evicts
+   the least recently used memory, pruning the filter values it no longer holds
+2. MemoryStore answers from the hot tier alone when it has enough strong
+   hits, and otherwise returns the same memories as without a hot tier
+3. Memories retrieved from the collection are promoted into the hot tier
+4. Deletes reach the hot tier, and a restarted store warms it with the
+   newest memories
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.hot_tier import HotTier
+
+from helpers import reopen_store, temp_store_dir
+
+
+def test_hot_tier(temp_store: Path):
+    """Run all hot tier checks."""
+    print("=" * 60)
+    print("HOT TIER TEST")
+    print("=" * 60)
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(300, 16)).astype(np.float32)
+    tier = HotTier(256)
+    tier.add("memories", [f"m{i}" for i in range(300)], vectors, [f"doc {i}" for i in range(300)],
+             [{"type": "fact" if i % 2 else "conversation", "user_id": f"u{i % 3}"} for i in range(300)])
+    assert len(tier) == 256 and "m0" not in tier._slots, "Oldest memories should be evicted"
+
+    query = rng.normal(size=16).astype(np.float32)
+    units = vectors[44:] / np.linalg.norm(vectors[44:], axis=1, keepdims=True)
+    similarities = units @ (query / np.linalg.norm(query))
+    expected = [f"m{44 + i}" for i in np.argsort(-similarities)[:5]]
+    hits = tier.search("memories", query, 5)
+    assert [hit["id"] for hit in hits] == expected
+    assert np.isclose(hits[0]["distance"], 1 - similarities.max(), atol=1e-5)
+    filtered = tier.search("memories", query, 50, {"type": "fact", "user_id": "u1"})
+    assert filtered and all(h["metadata"]["type"] == "fact" and h["metadata"]["user_id"] == "u1" for h in filtered)
+    assert not tier.search("other_collection", query, 5)
+    print("✓ Search matches an exact cosine scan and honours filters")
+
+    tier.search("memories", vectors[44], 1)  # m44 is now recently used
+    tier.add("memories", ["new"], [vectors[0]], ["new doc"], [{}])
+    assert "m44" in tier._slots and "m45" not in tier._slots, "LRU should evict m45, not the recalled m44"
+    tier.remove(namespace="memories", filters={"user_id": "u0"})
+    tier.remove(ids=["new"])
+    assert not tier.search("memories", query, 300, {"user_id": "u0"}) and "new" not in tier._slots
+    print("✓ LRU eviction keeps recalled memories; removes by filter and ID")
+
+    small = HotTier(8)
+    for i in range(200):
+        small.add("memories", [f"s{i}"], [vectors[i]], [f"doc {i}"], [{"session_id": f"session{i}"}])
+    assert len(small._vocab["session_id"]) <= 2 * small.capacity, "Evicted values should be pruned"
+    hits = small.search("memories", vectors[199], 8, {"session_id": "session199"})
+    assert [hit["id"] for hit in hits] == ["s199"]
+    assert not small.search("memories", vectors[0], 8, {"session_id": "session0"})
+    print("✓ Filter values of evicted memories are pruned")
+
+    original = (Config.MEMORY_HOT_TIER_SIZE, Config.MEMORY_HOT_TIER_SKIP_SIMILARITY)
+    try:
+        Config.MEMORY_HOT_TIER_SIZE, Config.MEMORY_HOT_TIER_SKIP_SIMILARITY = 20, 0.95
+        memory = reopen_store()
+        contents = [f"Note {i}: the {word} grows in the garden" for i, word in
+                    enumerate(["tomato", "basil", "rose", "tulip", "pepper", "mint"] * 10)]
+        memory.add_memories(contents[:40], user_id="alice")
+        for content in contents[40:]:
+            memory.add_memory(content, enable_nlp=False, user_id="bob")
+        assert len(memory.hot_tier) == 20
+
+        results = memory.retrieve_memories(contents[55], n_results=1, user_id="bob")
+        assert results[0]["content"] == contents[55]
+        stats = memory.get_stats()["hot_tier"]
+        assert stats["lookups"] == 1 and stats["cold_skipped"] == 1 and stats["result_hit_ratio"] == 1.0
+        print("✓ Exact recent match served from the hot tier without querying the store")
+
+        hot = memory.retrieve_memories("tomato garden", n_results=5, user_id="alice")
+        Config.MEMORY_HOT_TIER_SIZE = 0
+        cold = reopen_store().retrieve_memories("tomato garden", n_results=5, user_id="alice")
+        assert len(hot) == len(cold) == 5
+        assert np.allclose([m["similarity"] for m in hot], [m["similarity"] for m in cold], atol=1e-5)
+        assert all(m["metadata"]["user_id"] == "alice" for m in hot)
+        print("✓ Merged results match a store without a hot tier")
+
+        assert contents[3] not in {memory.hot_tier._documents[s] for s in memory.hot_tier._slots.values()}
+        memory.retrieve_memories(contents[3], n_results=1, user_id="alice")
+        assert contents[3] in {memory.hot_tier._documents[s] for s in memory.hot_tier._slots.values()}
+        assert memory.retrieve_memories(contents[3], n_results=1, user_id="alice")[0]["content"] == contents[3]
+        assert memory.get_stats()["hot_tier"]["cold_skipped"] == 2
+        print("✓ Memories recalled from the store are promoted into the hot tier")
+
+        memory.delete_namespace("bob")
+        assert not memory.retrieve_memories(contents[55], n_results=3, user_id="bob")
+        Config.MEMORY_HOT_TIER_SIZE = 20
+        restarted = reopen_store()
+        newest = set(restarted.collection.get(include=[])["ids"][-20:])
+        assert set(restarted.hot_tier._slots) == newest
+        print("✓ Deletes reach the hot tier; restart warms it with the newest memories")
+    finally:
+        Config.MEMORY_HOT_TIER_SIZE, Config.MEMORY_HOT_TIER_SKIP_SIMILARITY = original
+
+    print("\n✅ All hot tier tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_hot_tier(store)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test configurable HNSW index parameters.
+
+Tests that:
+1. New collections are built with the configured M / construction_ef / search_ef
+2. A search_ef change is applied to an existing collection on startup
+3. The migration rebuilds a collection whose M differs, keeping every memory
+4. The tuning tool's recommendation honours the recall target and latency budget
+"""
+
+from pathlib import Path
+
+from ai_brain.config import Config
+from ai_brain.index_params import param_drift, read_params
+from scripts.migrate_to_cosine import migrate_to_cosine
+from scripts.tune_hnsw import recommend
+
+from helpers import reopen_store, temp_store_dir
+
+
+def test_index_params(temp_store: Path):
+    """Run all HNSW parameter checks."""
+    print("=" * 60)
+    print("HNSW INDEX PARAMETERS TEST")
+    print("=" * 60)
+
+    original = (Config.HNSW_M, Config.HNSW_CONSTRUCTION_EF, Config.HNSW_SEARCH_EF)
+    Config.HNSW_M, Config.HNSW_CONSTRUCTION_EF, Config.HNSW_SEARCH_EF = 24, 150, 80
+    try:
+        memory = reopen_store()
+        params = read_params(memory.collection)
+        assert params == {"space": "cosine", "M": 24, "construction_ef": 150, "search_ef": 80}, params
+        memory.add_memories([f"Memory number {i} about gardening" for i in range(50)])
+        print(f"✓ New collection built with {params}")
+
+        Config.HNSW_SEARCH_EF = 40
+        memory = reopen_store()
+        assert read_params(memory.collection)["search_ef"] == 40
+        assert not param_drift(memory.collection)
+        print("✓ search_ef updated in place on startup")
+
+        Config.HNSW_M = 32
+        memory = reopen_store()
+        assert set(param_drift(memory.collection)) == {"M"}
+        migrate_to_cosine()
+        memory = reopen_store()
+        assert read_params(memory.collection)["M"] == 32
+        assert memory.collection.count() == 50
+        assert memory.retrieve_memories("gardening", n_results=3)
+        print("✓ Migration rebuilt the index with M=32 and kept all 50 memories")
+
+        memory.clear_all_memories()
+        assert read_params(memory.collection)["space"] == "cosine", "Cleared store must keep cosine"
+        print("✓ clear_all_memories keeps cosine space and HNSW parameters")
+    finally:
+        Config.HNSW_M, Config.HNSW_CONSTRUCTION_EF, Config.HNSW_SEARCH_EF = original
+
+    results = [
+        {"M": 8, "construction_ef": 100, "search_ef": 10, "recall": 0.90, "p95_ms": 0.8},
+        {"M": 16, "construction_ef": 100, "search_ef": 50, "recall": 0.97, "p95_ms": 1.2},
+        {"M": 16, "construction_ef": 200, "search_ef": 50, "recall": 0.97, "p95_ms": 1.25},
+        {"M": 32, "construction_ef": 200, "search_ef": 200, "recall": 0.995, "p95_ms": 3.0},
+    ]
+    assert recommend(results, 0.95, 10)["construction_ef"] == 100
+    assert recommend(results, 0.99, 10)["M"] == 32
+    assert recommend(results, 0.99, 2)["recall"] == 0.97, "Best recall within budget when no setting qualifies"
+    print("✓ Tuning recommendation honours recall target and latency budget")
+
+    print("\n✅ All HNSW index parameter tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_index_params(store)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Test the background log writer.
+
+Tests that:
+1. Records are written in batches off the caller's thread
+2. Prompt segments rotate by size and are compressed with zstandard
+3. Retention removes the oldest closed segments
+4. A full queue drops records instead of blocking
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from ai_brain.log_writer import BackgroundLogWriter, CallbackSink, RotatingLogFile, read_segment
+from ai_brain.logger import ConversationLogger, read_conversation_log
+from ai_brain.prompt_store import find_segments, iter_prompts
+
+
+def check_batching():
+    """Records submitted from the caller are written in batches by the writer thread."""
+    written = []
+    threads = set()
+
+    def write_batch(records):
+        threads.add(threading.current_thread().name)
+        written.append(list(records))
+
+    writer = BackgroundLogWriter(batch_size=50, flush_interval=0.05)
+    sink = CallbackSink(write_batch=write_batch)
+    for i in range(200):
+        assert writer.submit(sink, i)
+    assert writer.flush(timeout=5)
+
+    assert [r for batch in written for r in batch] == list(range(200)), "Order must be preserved"
+    assert len(written) < 200, "Records should be batched"
+    assert threads == {"ai_brain_log_writer"}, "Writes must happen on the writer thread"
+    writer.close()
+    print(f"✓ 200 records written in {len(written)} batches on the writer thread")
+
+
+def check_rotation_and_compression(tmp: Path):
+    """Segments rotate by size, closed ones are compressed and readable."""
+    log = RotatingLogFile(tmp, "prompts_test", max_bytes=1000, max_age=0,
+                          compress=True, retention_days=0, retention_max_bytes=0)
+    entry = "x" * 300 + "\n"
+    for _ in range(10):
+        log.write(entry)
+    log.close()
+
+    segments = sorted(tmp.glob("prompts_test_*"))
+    assert len(segments) == 3, f"Expected 3 segments, got {[p.name for p in segments]}"
+    assert all(p.name.endswith(".log.zst") for p in segments), "Closed segments should be compressed"
+    text = "".join(read_segment(p) for p in segments)
+    assert text == entry * 10, "Compressed segments should round-trip"
+    print(f"✓ Rotated into {len(segments)} compressed segments")
+
+
+def check_retention(tmp: Path):
+    """Segments beyond the size cap or age limit are deleted oldest-first."""
+    old = tmp / "prompts_old_0001.log.zst"
+    old.write_bytes(b"0" * 100)
+    past = time.time() - 10 * 86400
+    os.utime(old, (past, past))
+
+    log = RotatingLogFile(tmp, "prompts_ret", max_bytes=500, max_age=0,
+                          compress=True, retention_days=7, retention_max_bytes=10_000)
+    for _ in range(20):
+        log.write("y" * 200 + "\n")
+    log.close()
+
+    assert not old.exists(), "Segment older than retention_days should be removed"
+    total = sum(p.stat().st_size for p in tmp.glob("*.zst"))
+    assert total <= 10_000
+    print(f"✓ Retention pruned old segments ({total} bytes kept)")
+
+
+def check_drop_when_full():
+    """submit() never blocks: a full queue drops the record."""
+    release = threading.Event()
+    writer = BackgroundLogWriter(queue_size=5, batch_size=1, flush_interval=0)
+    sink = CallbackSink(write_batch=lambda records: release.wait(5))
+
+    start = time.perf_counter()
+    results = [writer.submit(sink, i) for i in range(50)]
+    elapsed = time.perf_counter() - start
+    release.set()
+
+    assert not all(results) and writer.stats["dropped"] > 0
+    assert elapsed < 0.5, "submit() must not block on a slow sink"
+    writer.close()
+    print(f"✓ Dropped {writer.stats['dropped']} records without blocking ({elapsed * 1000:.1f}ms)")
+
+
+def check_conversation_logger(tmp: Path):
+    """The logger writes turns and prompts through the background writer."""
+    logger = ConversationLogger(logs_dir=str(tmp))
+    for i in range(5):
+        logger.log_system_prompt(prompt=f"prompt {i}", context_type="test")
+        logger.log_conversation_turn(user_message=f"hi {i}", bot_response="hello")
+    logger.close()
+
+    log_data = read_conversation_log(tmp / "conversations" / f"conversation_{logger.get_session_id()}.jsonl")
+    assert len(log_data["turns"]) == 5
+    prompts = [e["prompt"] for p in find_segments(tmp / "prompts") for e in iter_prompts(p)]
+    assert prompts == [f"prompt {i}" for i in range(5)]
+    print(f"✓ Logger wrote {len(log_data['turns'])} turns and 5 prompts in the background")
+
+
+def test_log_writer():
+    """Run all background log writer checks."""
+    print("=" * 60)
+    print("BACKGROUND LOG WRITER TEST")
+    print("=" * 60)
+
+    check_batching()
+    with tempfile.TemporaryDirectory() as tmp:
+        check_rotation_and_compression(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        check_retention(Path(tmp))
+    check_drop_when_full()
+    with tempfile.TemporaryDirectory() as tmp:
+        check_conversation_logger(Path(tmp))
+
+    print("\n✅ All background log writer tests passed!")
+
+
+if __name__ == "__main__":
+    test_log_writer()
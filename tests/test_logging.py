@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Test the logging functionality."""
 
-from ai_brain.logger import ConversationLogger
+from ai_brain.logger import ConversationLogger, read_conversation_log
 
 def test_logger():
     """Test conversation and prompt logging."""
@@ -35,6 +35,16 @@ def test_logger():
     )
     print("✅ Second conversation turn logged")
     
+    # Test JSONL round-trip
+    print("\n📝 Testing JSONL conversation log...")
+    assert logger.flush(timeout=5), "Background writer should drain"
+    log_path = logger.conversations_dir / f"conversation_{logger.get_session_id()}.jsonl"
+    log_data = read_conversation_log(log_path)
+    assert log_data["session_id"] == logger.get_session_id()
+    assert len(log_data["turns"]) == 2, "Both turns should be on disk"
+    assert log_data["turns"][1]["user"] == "What's the weather like?"
+    print(f"✅ Read back {len(log_data['turns'])} turns from {log_path.name}")
+    
     # Test system prompt logging
     print("\n📝 Testing system prompt logging...")
     test_prompt = """You are a helpful AI assistant with memory.
@@ -70,15 +80,16 @@ Remember to maintain a friendly tone."""
         "notes": "Testing logging functionality"
     })
     print("✅ Session summary saved")
+    logger.close()
     
     # Show results
     print(f"\n📊 Session Results:")
     print(f"   Session ID: {logger.get_session_id()}")
     print(f"   Total turns: {len(logger.get_conversation_log())}")
     print(f"   Logs directory: logs/")
-    print(f"   - conversations/conversation_{logger.get_session_id()}.json")
+    print(f"   - conversations/conversation_{logger.get_session_id()}.jsonl")
     print(f"   - conversations/summary_{logger.get_session_id()}.json")
-    print(f"   - prompts/prompts_{logger.get_session_id()}.log")
+    print(f"   - prompts/prompts_{logger.get_session_id()}_0001.jsonl.zst")
     
     print("\n✅ All logging tests passed!")
     print("\n💡 Check the 'logs/' directory to see the generated files")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test near-duplicate suppression for memories.
+
+Tests that:
+1. With MEMORY_DEDUP a restated memory in the same session and role is merged
+   into the existing one (same ID, occurrences 2, last_seen set, no new row)
+2. The same text in another session or from another role is stored, and
+   nothing is merged with MEMORY_DEDUP off
+3. The bulk tool's dry run changes nothing, and a real run deletes the
+   duplicates and sums their occurrences into the kept memory
+"""
+
+from pathlib import Path
+
+
+from ai_brain.config import Config
+from ai_brain.memory import MemoryStore
+from scripts.dedup_memories import dedup_collection
+
+from helpers import temp_store_dir
+
+
+def test_memory_dedup(temp_store: Path):
+    """Run all near-duplicate suppression checks."""
+    print("=" * 60)
+    print("MEMORY DEDUP TEST")
+    print("=" * 60)
+
+    original = (Config.MEMORY_DEDUP, Config.MEMORY_DEDUP_SIMILARITY)
+    try:
+        memory = MemoryStore()
+        Config.MEMORY_DEDUP, Config.MEMORY_DEDUP_SIMILARITY = True, 0.95
+        user = {"role": "user"}
+
+        first = memory.add_memory("my cat is called Miso", enable_nlp=False, metadata=user, session_id="s1")
+        again = memory.add_memory("my cat is called Miso", enable_nlp=False, metadata=user, session_id="s1")
+        stored = memory.collection.get(ids=[first])["metadatas"][0]
+        assert again == first and memory.collection.count() == 1
+        assert stored["occurrences"] == 2 and stored["last_seen"] >= stored["created_at"]
+        assert stored["type"] == "conversation", "Merge must keep the other metadata"
+        assert memory.get_stats()["duplicates_merged"] == 1
+        print("✓ Restatement in the same session merged into the existing memory")
+
+        other_session = memory.add_memory("my cat is called Miso", enable_nlp=False, metadata=user,
+                                          session_id="s2")
+        other_role = memory.add_memory("my cat is called Miso", enable_nlp=False,
+                                       metadata={"role": "assistant"}, session_id="s1")
+        unrelated = memory.add_memory("the weather is rainy today", enable_nlp=False, metadata=user,
+                                      session_id="s1")
+        assert len({first, other_session, other_role, unrelated}) == 4 and memory.collection.count() == 4
+        Config.MEMORY_DEDUP = False
+        copy = memory.add_memory("my cat is called Miso", enable_nlp=False, metadata=user, session_id="s1")
+        assert copy != first and memory.collection.count() == 5
+        print("✓ Other sessions, other roles and MEMORY_DEDUP=false store a new memory")
+
+        memory.add_memory("my cat is called Miso", enable_nlp=False, metadata=user, session_id="s1")
+        report = dedup_collection(memory.collection, 0.95, dry_run=True)
+        assert report["duplicates"] == 2 and report["memories_after"] == 4
+        assert memory.collection.count() == 6
+        report = dedup_collection(memory.collection, 0.95)
+        assert report["duplicates"] == 2 and memory.collection.count() == 4
+        assert report["reduction_pct"] == round(100 * 2 / 6, 2)
+        kept = memory.collection.get(ids=[first])["metadatas"][0]
+        assert kept["occurrences"] == 4, "2 merged at write time + 2 merged by the tool"
+        assert sorted(memory.collection.get()["ids"]) == sorted([first, other_session, other_role, unrelated])
+        assert dedup_collection(memory.collection, 0.95)["duplicates"] == 0
+        print("✓ Bulk tool: dry run is read-only, real run merges occurrences and deletes duplicates")
+    finally:
+        Config.MEMORY_DEDUP, Config.MEMORY_DEDUP_SIMILARITY = original
+
+    print("\n✅ All memory dedup tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_memory_dedup(store)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test recency- and importance-weighted memory scoring.
+
+Tests that:
+1. Recency halves every half-life, access counts are log-scaled, neutral
+   memories get no emotion weight, and memories without created_at fall
+   back to their ISO timestamp
+2. New memories store a numeric created_at matching their timestamp
+3. retrieve_memories ranks a recent memory above a slightly more similar
+   stale one, and ranks by similarity alone with the weights at 0
+4. With MEMORY_ACCESS_WEIGHT > 0 retrievals count accesses in the store
+   and the hot tier
+5. MMR skips near-duplicates of picked memories, and with MEMORY_MMR
+   retrieval returns a distinct memory instead of a restatement
+"""
+
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.memory import MemoryStore
+from ai_brain.scoring import importance_scores, mmr_select
+
+from helpers import temp_store_dir
+
+
+def test_memory_scoring(temp_store: Path):
+    """Run all memory scoring checks."""
+    print("=" * 60)
+    print("MEMORY SCORING TEST")
+    print("=" * 60)
+
+    original = (Config.MEMORY_RECENCY_WEIGHT, Config.MEMORY_RECENCY_HALF_LIFE_DAYS,
+                Config.MEMORY_ACCESS_WEIGHT, Config.MEMORY_EMOTION_WEIGHT,
+                Config.MEMORY_MMR, Config.MEMORY_MMR_LAMBDA)
+    try:
+        Config.MEMORY_RECENCY_WEIGHT, Config.MEMORY_RECENCY_HALF_LIFE_DAYS = 0.1, 30
+        Config.MEMORY_ACCESS_WEIGHT, Config.MEMORY_EMOTION_WEIGHT = 0.2, 0.3
+        now = time.time()
+        month_ago = datetime.fromtimestamp(now - 30 * 86_400)
+        terms = importance_scores([
+            {"created_at": now, "access_count": 3, "user_emotion": "joy", "user_emotion_score": 0.8},
+            {"created_at": now - 30 * 86_400, "access_count": 0, "user_emotion": "neutral", "user_emotion_score": 0.9},
+            {"timestamp": month_ago.isoformat()},
+            {},
+        ], now=now)
+        assert np.allclose(terms["recency"], [1.0, 0.5, 0.5, 0.0])
+        assert np.allclose(terms["access"], [1.0, 0.0, 0.0, 0.0])
+        assert np.allclose(terms["emotion"], [0.8, 0.0, 0.0, 0.0])
+        assert np.isclose(terms["total"][0], 0.1 + 0.2 + 0.3 * 0.8)
+        print("✓ Recency decay, access and emotion terms (legacy ISO timestamps too)")
+
+        memory = MemoryStore()
+
+        year_ago = datetime.now() - timedelta(days=365)
+        old_id = memory.add_memory("the tomato grows in the garden", enable_nlp=False,
+                                   metadata={"timestamp": year_ago.isoformat()})
+        new_id = memory.add_memory("the tomato grows in the garden today", enable_nlp=False)
+        stored = memory.collection.get(ids=[old_id, new_id])["metadatas"]
+        assert abs(stored[0]["created_at"] - year_ago.timestamp()) < 1e-3
+        assert abs(stored[1]["created_at"] - time.time()) < 60
+        print("✓ Numeric created_at stored at write time")
+
+        Config.MEMORY_ACCESS_WEIGHT = Config.MEMORY_EMOTION_WEIGHT = 0.0
+        results = memory.retrieve_memories("the tomato grows in the garden", n_results=2)
+        assert [m["id"] for m in results] == [new_id, old_id]
+        assert results[0]["similarity"] < results[1]["similarity"]
+        assert results[0]["recency_score"] > 0.99 and results[1]["recency_score"] < 0.01
+        Config.MEMORY_RECENCY_WEIGHT = 0.0
+        results = memory.retrieve_memories("the tomato grows in the garden", n_results=2)
+        assert [m["id"] for m in results] == [old_id, new_id] and "recency_score" not in results[0]
+        print("✓ Recent memory outranks a slightly more similar stale one; weights at 0 rank by similarity")
+
+        Config.MEMORY_ACCESS_WEIGHT = 0.2
+        for _ in range(2):
+            memory.retrieve_memories("the tomato grows in the garden", n_results=1)
+        stored = memory.collection.get(ids=[old_id, new_id])["metadatas"]
+        assert stored[0]["access_count"] == 2 and "access_count" not in stored[1]
+        assert stored[0]["type"] == "conversation", "Access update must keep the other metadata"
+        if memory.hot_tier is not None:
+            assert memory.hot_tier.search(memory.collection.name, memory._encode("tomato garden"), 2)
+            cached = memory.hot_tier._metadatas[memory.hot_tier._slots[old_id]]
+            assert cached["access_count"] == 2
+        print("✓ Retrievals count accesses in the store and the hot tier")
+
+        duplicate = np.array([1.0, 0.0, 0.0])
+        embeddings = [duplicate, duplicate + [0, 0.01, 0], duplicate + [0, 0, 0.01], [0.6, 0.8, 0.0]]
+        relevance = [0.90, 0.89, 0.88, 0.80]
+        assert mmr_select(embeddings, relevance, 2, 1.0) == [0, 1]
+        assert mmr_select(embeddings, relevance, 2, 0.7) == [0, 3]
+        assert mmr_select(embeddings, relevance, 10, 0.7)[:2] == [0, 3] and not mmr_select([], [], 3, 0.7)
+
+        Config.MEMORY_ACCESS_WEIGHT = 0.0
+        memory.add_memories(["the tomato grows in the sunny garden", "the tomato grows in the garden again",
+                             "tomato seeds sprout in spring"])
+        Config.MEMORY_MMR = False
+        plain = memory.retrieve_memories("the tomato grows in the garden", n_results=2)
+        # The query restates the top memory, so relevance equals redundancy: favour diversity
+        Config.MEMORY_MMR, Config.MEMORY_MMR_LAMBDA = True, 0.3
+        diverse = memory.retrieve_memories("the tomato grows in the garden", n_results=2)
+        assert all("tomato grows" in m["content"] for m in plain)
+        assert diverse[0]["id"] == plain[0]["id"] and diverse[1]["content"] == "tomato seeds sprout in spring"
+        print("✓ MMR picks a distinct memory over restatements of the top one")
+    finally:
+        (Config.MEMORY_RECENCY_WEIGHT, Config.MEMORY_RECENCY_HALF_LIFE_DAYS,
+         Config.MEMORY_ACCESS_WEIGHT, Config.MEMORY_EMOTION_WEIGHT,
+         Config.MEMORY_MMR, Config.MEMORY_MMR_LAMBDA) = original
+
+    print("\n✅ All memory scoring tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_memory_scoring(store)
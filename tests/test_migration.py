@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test streaming, resumable collection migrations.
+
+Tests that:
+1. A migration interrupted mid-copy leaves the original collection untouched
+   and resumes from its checkpoint instead of starting over
+2. The resumed migration changes the distance metric, applies the metadata
+   upgrade to every memory and keeps every memory, embedding and document
+3. A crash between the two renames of the swap is finished by the next run
+4. A source that changed during the copy stops the migration
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+
+from ai_brain.index_params import hnsw_metadata, read_params, wanted_params
+from ai_brain.migration import MigrationError, abort_migration, migrate_collection, read_checkpoint, upgrade_metadata
+from ai_brain.vector_backends import create_backend
+
+from helpers import temp_store_dir
+
+NAME = "migration_test"
+
+
+def fill(backend, count: int):
+    """An l2 collection of memories written before created_at existed."""
+    collection = backend.create_collection(NAME, {"description": "test", "hnsw:space": "l2"})
+    rng = np.random.default_rng(0)
+    collection.add(
+        ids=[f"m{i}" for i in range(count)],
+        embeddings=rng.standard_normal((count, 16)).astype(np.float32),
+        documents=[f"memory {i}" for i in range(count)],
+        metadatas=[{"type": "conversation", "timestamp": f"2024-01-01T00:{i % 60:02d}:00"} for i in range(count)]
+    )
+    return collection
+
+
+def test_migration(temp_store: Path):
+    """Run all migration checks."""
+    print("=" * 60)
+    print("COLLECTION MIGRATION TEST")
+    print("=" * 60)
+
+    backend = create_backend()
+    source = fill(backend, 230)
+    before = source.get(include=["embeddings", "documents", "metadatas"])
+    metadata = {"description": "test", **hnsw_metadata()}
+    upgrade = upgrade_metadata(["created_at"])
+    pages = []
+
+    def crash_on_third_page(batch):
+        pages.append(len(batch["ids"]))
+        if len(pages) == 3:
+            raise KeyboardInterrupt
+        return upgrade(batch)
+
+    try:
+        migrate_collection(backend, NAME, metadata, crash_on_third_page, {"upgrades": ["created_at"]},
+                           batch_size=50, progress=False)
+        raise AssertionError("The migration should have been interrupted")
+    except KeyboardInterrupt:
+        pass
+    state = read_checkpoint(NAME)
+    assert state["phase"] == "copy" and state["offset"] == 100
+    assert read_params(backend.get_collection(NAME))["space"] == "l2"
+    assert backend.get_collection(NAME).count() == 230
+    print("✓ Interrupted copy leaves the original untouched and checkpoints its offset")
+
+    report = migrate_collection(backend, NAME, metadata, upgrade, {"upgrades": ["created_at"]},
+                                batch_size=50, progress=False)
+    assert report["resumed_from"] == 100 and report["records"] == 230
+    assert read_checkpoint(NAME) is None
+    assert sorted(backend.list_collections()) == [NAME], "Temporary and backup collections removed"
+    migrated = backend.get_collection(NAME)
+    assert read_params(migrated)["space"] == wanted_params()["space"] == "cosine"
+    after = migrated.get(ids=before["ids"], include=["embeddings", "documents", "metadatas"])
+    order = [after["ids"].index(i) for i in before["ids"]]
+    assert np.allclose(np.asarray(after["embeddings"])[order], before["embeddings"])
+    assert [after["documents"][i] for i in order] == before["documents"]
+    assert all(isinstance(m.get("created_at"), float) and m["type"] == "conversation"
+               for m in after["metadatas"])
+    print("✓ Resumed run rebuilt with cosine, upgraded metadata and kept all 230 memories")
+
+    state = {"source": NAME, "target": f"{NAME}_migration", "backup": f"{NAME}_backup_1",
+             "phase": "copy", "offset": 0, "count": 230, "metadata": metadata, "settings": {}}
+    backend.create_collection(state["target"], metadata).add(
+        ids=before["ids"], embeddings=before["embeddings"], documents=before["documents"])
+    backend.rename_collection(NAME, state["backup"])  # Crashed after the first rename
+    state["phase"] = "swap"
+    (temp_store / f"migration_{NAME}.json").write_text(json.dumps(state), encoding="utf-8")
+    migrate_collection(backend, NAME, metadata, keep_backup=True, progress=False)
+    assert sorted(backend.list_collections()) == sorted([NAME, state["backup"]])
+    assert backend.get_collection(NAME).count() == 230
+    print("✓ A crash in the middle of the swap is finished by the next run")
+
+    SharedSystemClient.clear_system_cache()
+    backend = create_backend()
+    backend.delete_collection(state["backup"])
+    try:
+        migrate_collection(backend, NAME, hnsw_metadata({**wanted_params(), "M": 8}),
+                           transform=lambda batch: backend.get_collection(NAME).delete(ids=["m0"]) or batch,
+                           batch_size=50, progress=False)
+        raise AssertionError("A changing source must stop the migration")
+    except MigrationError:
+        pass
+    assert abort_migration(backend, NAME) and read_checkpoint(NAME) is None
+    assert sorted(backend.list_collections()) == [NAME]
+    print("✓ A source written to during the copy stops the migration; abort cleans up")
+
+    print("\n✅ All migration tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_migration(store)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Test per-user / per-session memory namespaces.
+
+Tests that (for both the "shared" and "per_user" layouts):
+1. retrieve_memories only searches the requesting user's memories
+2. get_conversation_history is scoped to the user, and to a session when given
+3. delete_namespace removes a session or a whole user
+4. The per-user collection handle cache is bounded (LRU)
+"""
+
+from pathlib import Path
+
+from ai_brain.config import Config
+from ai_brain.memory import MemoryStore
+
+from helpers import temp_store_dir
+
+
+def check_layout(layout: str, directory: Path):
+    """Run namespace checks against a fresh store with the given layout."""
+    print(f"\n--- Layout: {layout} ---")
+    Config.CHROMA_PERSIST_DIR = directory
+    Config.MEMORY_NAMESPACE_LAYOUT = layout
+    Config.MEMORY_COLLECTION_CACHE_SIZE = 2
+    memory = MemoryStore()
+
+    memory.add_memory("Alice loves the cello", metadata={"role": "user"}, enable_nlp=False,
+                      user_id="alice", session_id="s1")
+    memory.add_memory("Alice started a pottery class", metadata={"role": "user"}, enable_nlp=False,
+                      user_id="alice", session_id="s2")
+    memory.add_memory("Bob loves the cello too", metadata={"role": "user"}, enable_nlp=False,
+                      user_id="bob", session_id="s1")
+
+    # 1. Retrieval isolation
+    results = memory.retrieve_memories("who loves the cello", n_results=5, user_id="alice")
+    contents = [r["content"] for r in results]
+    assert "Bob loves the cello too" not in contents, contents
+    assert "Alice loves the cello" in contents, contents
+    print(f"✓ Retrieval scoped to alice: {contents}")
+
+    # 2. History scoping
+    history = memory.get_conversation_history(n_recent=10, user_id="alice")
+    assert len(history) == 2, history
+    session_history = memory.get_conversation_history(n_recent=10, user_id="alice", session_id="s2")
+    assert [h["content"] for h in session_history] == ["Alice started a pottery class"]
+    print("✓ History scoped to user and session")
+
+    assert memory.get_stats(user_id="alice")["total_memories"] == 2
+    assert memory.get_stats(user_id="bob")["total_memories"] == 1
+    print("✓ Per-user stats")
+
+    # 3. Deletion
+    memory.delete_namespace("alice", session_id="s1")
+    assert memory.get_stats(user_id="alice")["total_memories"] == 1
+    memory.delete_namespace("bob")
+    assert memory.get_stats(user_id="bob")["total_memories"] == 0
+    print("✓ delete_namespace removes sessions and users")
+
+    # 4. LRU of collection handles
+    if layout == "per_user":
+        for i in range(5):
+            memory.add_memory(f"memory {i}", enable_nlp=False, user_id=f"user_{i}")
+        assert len(memory._tenant_collections) <= Config.MEMORY_COLLECTION_CACHE_SIZE
+        print(f"✓ Collection handle cache bounded at {len(memory._tenant_collections)}")
+
+
+def test_namespaces(temp_store: Path):
+    """Run namespace checks for both layouts."""
+    print("=" * 60)
+    print("MEMORY NAMESPACE TEST")
+    print("=" * 60)
+
+    original = (Config.MEMORY_NAMESPACE_LAYOUT, Config.MEMORY_COLLECTION_CACHE_SIZE)
+    try:
+        check_layout("shared", temp_store / "shared")
+        check_layout("per_user", temp_store / "per_user")
+    finally:
+        Config.MEMORY_NAMESPACE_LAYOUT, Config.MEMORY_COLLECTION_CACHE_SIZE = original
+
+    print("\n✅ All namespace tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_namespaces(store)
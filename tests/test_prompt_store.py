@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Test the deduplicating prompt store.
+
+Tests that:
+1. Every prompt is reconstructed exactly (whitespace, unicode, empty prompts)
+2. Repeated content is stored once per segment
+3. Keyframes and rotated, compressed segments decode on their own
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from ai_brain.log_writer import RotatingLogFile
+from ai_brain.prompt_store import PromptStore, find_segments, iter_prompts, split_blocks
+
+STATIC = "\n".join(f"Instruction {i}: be helpful, accurate and kind." for i in range(30))
+
+
+def make_prompts(n: int):
+    history = []
+    prompts = []
+    for i in range(n):
+        history.append(f"User: message number {i} about the garden 🌱")
+        prompts.append(
+            f"{STATIC}\n\n=== RELEVANT MEMORIES ===\n1. [0.{i % 10}5] Alice plays the cello\n"
+            + "\n".join(history[-10:]) + "\n\nRemember: be natural.  "
+        )
+    return prompts
+
+
+def write_all(directory: Path, prompts, **log_kwargs) -> PromptStore:
+    store = PromptStore(directory, "test", keyframe_interval=7)
+    store.log = RotatingLogFile(directory, "prompts_test", suffix=PromptStore.SUFFIX,
+                                max_age=0, retention_days=0, retention_max_bytes=0, **log_kwargs)
+    for prompt in prompts:
+        store.write(datetime.now(), prompt, "langchain", {"num_memories": 1})
+    store.close()
+    return store
+
+
+def check_split_blocks():
+    """Blocks always concatenate back to the original text."""
+    for text in ["", "\n", "  leading", "trailing  \n\n", "a\tb\r\nc", STATIC, "naïve café 🎉 [0.42]"]:
+        assert "".join(split_blocks(text)) == text, repr(text)
+    print("✓ split_blocks round-trips edge cases")
+
+
+def check_roundtrip(tmp: Path):
+    """Prompts decode exactly and repeated content is not rewritten."""
+    prompts = make_prompts(40) + ["", "\n", make_prompts(1)[0]]
+    store = write_all(tmp, prompts, max_bytes=0, compress=False)
+
+    segments = find_segments(tmp, "test")
+    entries = [e for segment in segments for e in iter_prompts(segment)]
+    assert [e["prompt"] for e in entries] == prompts
+    assert [e["turn"] for e in entries] == list(range(len(prompts)))
+    assert entries[0]["metadata"] == {"num_memories": 1}
+
+    raw = sum(len(p.encode("utf-8")) for p in prompts)
+    stored = sum(s.stat().st_size for s in segments)
+    assert stored * 3 < raw, f"Expected dedup, stored {stored} of {raw} bytes"
+    print(f"✓ {len(prompts)} prompts reconstructed exactly ({raw} → {stored} bytes, "
+          f"{store.stats['reused_blocks']} blocks reused)")
+
+
+def check_rotation(tmp: Path):
+    """Each rotated (compressed) segment decodes independently."""
+    prompts = make_prompts(60)
+    write_all(tmp, prompts, max_bytes=4000, compress=True)
+
+    segments = find_segments(tmp, "test")
+    assert len(segments) > 1 and all(s.name.endswith(".jsonl.zst") for s in segments)
+    rebuilt = [e["prompt"] for e in iter_prompts(segments[-1])]
+    assert rebuilt == prompts[-len(rebuilt):], "Last segment should decode on its own"
+    assert [e["prompt"] for s in segments for e in iter_prompts(s)] == prompts
+    print(f"✓ {len(segments)} compressed segments decode independently")
+
+
+def test_prompt_store():
+    """Run all prompt store checks."""
+    print("=" * 60)
+    print("PROMPT STORE TEST")
+    print("=" * 60)
+
+    check_split_blocks()
+    with tempfile.TemporaryDirectory() as tmp:
+        check_roundtrip(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        check_rotation(Path(tmp))
+
+    print("\n✅ All prompt store tests passed!")
+
+
+if __name__ == "__main__":
+    test_prompt_store()
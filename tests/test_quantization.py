@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test compact vector codes in the local vector engine.
+
+Tests that:
+1. VectorCodec int8/float16 codes decode close to the original vectors and
+   PCA keeps the dominant directions
+2. A quantized local collection returns the same neighbours as full
+   precision, with exact float32 distances, filtered or not
+3. The codec is saved and reused across a reopen, and refitted when the
+   settings change
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.index_params import hnsw_metadata
+from ai_brain.quantization import VectorCodec
+from ai_brain.vector_backends import LocalBackend, create_backend
+
+
+def embeddings(n: int, dim: int = 64, seed: int = 0) -> np.ndarray:
+    """Unit vectors with most of their energy in a few directions, like text embeddings."""
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, 16)) @ rng.normal(size=(16, dim)) + 0.3 * rng.normal(size=(n, dim))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def open_memories(path: Path):
+    """The local collection as a new process would see it."""
+    LocalBackend.flush_all()
+    LocalBackend._open.clear()
+    return create_backend("local", path).get_or_create_collection("memories", hnsw_metadata())
+
+
+def test_quantization():
+    """Run all quantization checks."""
+    print("=" * 60)
+    print("QUANTIZATION TEST")
+    print("=" * 60)
+
+    vectors = embeddings(3000)
+    for quantization, tolerance in (("float16", 1e-3), ("int8", 0.01)):
+        codec = VectorCodec.fit(vectors, quantization)
+        # int8 clips the rare values beyond the 99.9th percentile
+        assert np.quantile(np.abs(codec.decode(codec.encode(vectors)) - vectors), 0.999) < tolerance
+    pca = VectorCodec.fit(vectors, "none", dims=16)
+    kept = np.linalg.norm(pca.project(vectors), axis=1).mean()
+    assert pca.out_dim == 16 and kept > 0.9, f"PCA kept only {kept:.2f} of the norm"
+    assert VectorCodec.fit(vectors, "int8", dims=16).bytes_per_vector == 16
+    print("✓ Codes decode close to the originals; PCA keeps the dominant directions")
+
+    original = (Config.LOCAL_HNSW_THRESHOLD, Config.LOCAL_VECTOR_QUANTIZATION,
+                Config.LOCAL_VECTOR_DIMS, Config.LOCAL_VECTOR_REDUCTION)
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            Config.LOCAL_HNSW_THRESHOLD = 10**9
+            collections = {}
+            for name, quantization, dims in (("exact", "none", 0), ("compact", "int8", 24)):
+                Config.LOCAL_VECTOR_QUANTIZATION, Config.LOCAL_VECTOR_DIMS = quantization, dims
+                collections[name] = open_memories(Path(tmp) / name)
+                collections[name].add(ids=[f"m{i}" for i in range(3000)], embeddings=vectors.tolist(),
+                                      metadatas=[{"user_id": f"u{i % 4}"} for i in range(3000)])
+            exact, compact = collections["exact"], collections["compact"]
+            assert exact._codec is None and compact._codec.settings["dims"] == 24
+            assert compact._codes.dtype == np.int8 and compact._codes.shape[1] == 24
+
+            queries = embeddings(20, seed=1).tolist()
+            for where in (None, {"user_id": "u2"}):
+                want = exact.query(query_embeddings=queries, n_results=10, where=where)
+                got = compact.query(query_embeddings=queries, n_results=10, where=where)
+                recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(want["ids"], got["ids"])])
+                assert recall >= 0.95, f"recall@10 {recall:.2f} (where={where})"
+                for want_ids, want_distances, ids, distances in zip(want["ids"], want["distances"],
+                                                                    got["ids"], got["distances"]):
+                    exact_distances = dict(zip(want_ids, want_distances))
+                    assert all(np.isclose(exact_distances[i], d, atol=1e-5) for i, d in zip(ids, distances)
+                               if i in exact_distances)
+            print(f"✓ int8 + PCA-24 codes: recall@10 {recall:.2f} after rescoring, exact distances")
+
+            Config.LOCAL_VECTOR_QUANTIZATION, Config.LOCAL_VECTOR_DIMS = "int8", 24
+            saved = compact._codec.components.copy()
+            compact = open_memories(Path(tmp) / "compact")
+            assert np.array_equal(compact._codec.components, saved), "Codec should be reloaded, not refitted"
+            Config.LOCAL_VECTOR_QUANTIZATION, Config.LOCAL_VECTOR_DIMS = "float16", 0
+            compact = open_memories(Path(tmp) / "compact")
+            assert compact._codec.settings["quantization"] == "float16" and compact._codes.dtype == np.float16
+            assert compact.query(query_embeddings=queries[:1], n_results=1)["ids"][0] == \
+                exact.query(query_embeddings=queries[:1], n_results=1)["ids"][0]
+            print("✓ Codec persists across a reopen and is refitted when the settings change")
+        finally:
+            LocalBackend.flush_all()
+            LocalBackend._open.clear()
+            (Config.LOCAL_HNSW_THRESHOLD, Config.LOCAL_VECTOR_QUANTIZATION,
+             Config.LOCAL_VECTOR_DIMS, Config.LOCAL_VECTOR_REDUCTION) = original
+
+    print("\n✅ All quantization tests passed!")
+
+
+if __name__ == "__main__":
+    test_quantization()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test that LlamaIndexRAG reuses its retrievers and engines.
+
+Tests that:
+1. retrieve_relevant_context() reuses its retriever until top_k changes,
+   and the retriever sees documents added after it was built
+2. query() reuses its engine until top_k or streaming changes
+3. chat() keeps one engine across turns, streaming or not, with the
+   conversation carried over, and gets a new one when a router is set or the
+   LLM changes
+"""
+
+from pathlib import Path
+
+from llama_index.core import Settings
+from llama_index.core.llms import MockLLM
+
+from ai_brain.llamaindex_rag import LlamaIndexRAG
+from ai_brain.memory import MemoryStore
+from ai_brain.retrieval_router import RetrievalRouter
+
+from helpers import temp_store_dir
+
+
+def test_rag_engines(temp_store: Path):
+    """Run all engine reuse checks."""
+    print("=" * 60)
+    print("RAG ENGINE REUSE TEST")
+    print("=" * 60)
+
+    memory = MemoryStore()
+    rag = LlamaIndexRAG(memory.chroma_client)
+    Settings.llm = MockLLM(max_tokens=8)
+    rag.add_memory("the lighthouse keeper lit the lamp every evening")
+
+    assert rag.retrieve_relevant_context("lighthouse", top_k=2)
+    builds = rag.engine_builds
+    rag.add_memory("the ferry leaves the harbour at dawn")
+    hits = rag.retrieve_relevant_context("ferry harbour dawn", top_k=2)
+    assert rag.engine_builds == builds and len(hits) == 2
+    rag.retrieve_relevant_context("ferry", top_k=3)
+    rag.retrieve_relevant_context("lamp", top_k=3)
+    assert rag.engine_builds == builds + 1
+    print("✓ The retriever is reused, rebuilt when top_k changes, and sees newly added documents")
+
+    builds = rag.engine_builds
+    rag.query("When does the ferry leave?")
+    rag.query("Who lit the lamp?")
+    assert rag.engine_builds == builds + 1
+    list(rag.query("Who lit the lamp?", stream=True))
+    assert rag.engine_builds == builds + 2
+    print("✓ query() reuses its engine until top_k or streaming changes")
+
+    builds = rag.engine_builds
+    for message, stream in (("hello", True), ("tell me about the ferry", False), ("and the lamp?", True)):
+        assert "".join(rag.chat(message, stream=stream))
+    assert rag.engine_builds == builds + 1
+    assert len(rag.chat_memory.get_all()) == 6
+    rag.clear_chat_history()
+    assert "".join(rag.chat("hello again")) and len(rag.chat_memory.get_all()) == 2
+    assert rag.engine_builds == builds + 1
+    print("✓ chat() keeps one engine across turns, streaming or not, with the conversation carried over")
+
+    chat_engine = lambda: rag._engines["chat"][1]
+    engine = chat_engine()
+    rag.use_router(RetrievalRouter(memory, rag, mode="both"))
+    assert "".join(rag.chat("the ferry?")) and chat_engine() is not engine
+    engine = chat_engine()
+    assert "".join(rag.chat("the lamp?")) and chat_engine() is engine
+    Settings.llm = MockLLM(max_tokens=4)
+    assert "".join(rag.chat("the harbour?")) and chat_engine() is not engine
+    assert rag.get_stats()["engine_builds"] == rag.engine_builds
+    print("✓ A new router or LLM gets a new chat engine")
+
+    print("\n✅ All RAG engine reuse tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_rag_engines(store)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test re-embedding memories for a new embedding model.
+
+Tests that:
+1. New collections record their embedding model in the collection metadata
+2. With REEMBED_MODEL a background job builds a shadow collection while the
+   store keeps serving from the current one, and reports its progress
+3. Restarting with the new EMBEDDING_MODEL catches up memories written and
+   deleted since, swaps the shadow in and records the new model
+4. The store refuses to open a collection embedded with another model
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.migration import read_checkpoint
+from ai_brain.reembedding import EmbeddingModelMismatch, recorded_model, reembed_collection
+
+from helpers import reopen_store, temp_store_dir
+
+# The same model under another name, so the test needs no second download
+NEW_MODEL = "all-MiniLM-L6-v2"
+
+
+class EightDimensions:
+    """Stand-in for a model with another embedding size."""
+
+    def encode(self, documents, batch_size=32, show_progress_bar=False):
+        return np.array([[len(doc) % 7 + 1.0, *[i + 1.0 for i in range(7)]] for doc in documents], dtype=np.float32)
+
+
+def test_reembedding(temp_store: Path):
+    """Run all re-embedding checks."""
+    print("=" * 60)
+    print("RE-EMBEDDING TEST")
+    print("=" * 60)
+
+    original = (Config.EMBEDDING_MODEL, Config.REEMBED_MODEL)
+    old_model = Config.EMBEDDING_MODEL
+    try:
+        memory = reopen_store()
+        ids = memory.add_memories([f"memory {i} about the garden" for i in range(120)])
+        assert recorded_model(memory.collection) == old_model
+        print(f"✓ Collection records its embedding model ({old_model})")
+
+        Config.REEMBED_MODEL = NEW_MODEL
+        memory = reopen_store()
+        late = memory.add_memory("written while re-embedding", enable_nlp=False)
+        memory.reembedder.join(timeout=120)
+        status = memory.get_stats()["reembedding"]
+        assert status["phase"] == "ready" and status["collections_done"] == status["collections_total"] == 1, status
+        assert f"{Config.CHROMA_COLLECTION_NAME}_migration" in memory.backend.list_collections()
+        assert recorded_model(memory.collection) == old_model, "Still serving from the current collection"
+        assert memory.retrieve_memories("garden", n_results=3)
+        print(f"✓ Background job built the shadow collection while serving ({status['copied']} memories)")
+
+        after = memory.add_memory("written after the shadow was ready", enable_nlp=False)
+        memory.collection.delete(ids=[ids[0]])
+        Config.EMBEDDING_MODEL, Config.REEMBED_MODEL = NEW_MODEL, ""
+        memory = reopen_store()
+        assert recorded_model(memory.collection) == NEW_MODEL
+        assert read_checkpoint(Config.CHROMA_COLLECTION_NAME) is None
+        assert memory.backend.list_collections() == [Config.CHROMA_COLLECTION_NAME]
+        stored = set(memory.collection.get(include=[])["ids"])
+        assert late in stored and after in stored and ids[0] not in stored and len(stored) == 121
+        assert memory.retrieve_memories("written after the shadow was ready", n_results=1)[0]["id"] == after
+        print("✓ Restart with the new model caught up, swapped the shadow in and recorded the model")
+
+        report = reembed_collection(memory.backend, Config.CHROMA_COLLECTION_NAME, EightDimensions(),
+                                    "test/eight-dimensions", cutover=True)
+        assert report["swapped"] and report["records"] == 121
+        collection = memory.backend.get_collection(Config.CHROMA_COLLECTION_NAME)
+        assert np.asarray(collection.get(limit=1, include=["embeddings"])["embeddings"]).shape == (1, 8)
+        try:
+            reopen_store()
+            raise AssertionError("A collection from another model must be refused")
+        except EmbeddingModelMismatch as e:
+            assert "test/eight-dimensions" in str(e)
+        print("✓ Store refuses a collection embedded with another model")
+    finally:
+        Config.EMBEDDING_MODEL, Config.REEMBED_MODEL = original
+
+    print("\n✅ All re-embedding tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_reembedding(store)
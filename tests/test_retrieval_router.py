@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test routed retrieval across memories and documents.
+
+Tests that:
+1. Document questions route to documents, personal ones to memories and
+   anything else to both
+2. Fusion keeps each corpus' ranking and lets a strong match from one corpus
+   outrank weak matches from the other
+3. Documents load into RAG_COLLECTION_NAME, never into the memory collection,
+   and routed queries (and the chat retriever) return hits from the right corpus
+   and the enhanced CLI searches memories once per LlamaIndex turn, through the router
+4. scripts/separate_rag_documents.py moves chunks loaded into the memory
+   collection by older versions to the RAG collection
+"""
+
+import io
+from pathlib import Path
+
+import chromadb
+from llama_index.core import Settings
+from llama_index.core.llms import MockLLM
+from rich.console import Console
+
+from ai_brain.config import Config
+from ai_brain.enhanced_cli import EnhancedChatInterface
+from ai_brain.llamaindex_rag import LlamaIndexRAG
+from ai_brain.logger import ConversationLogger
+from ai_brain.memory import MemoryStore
+from ai_brain.retrieval_router import DOCUMENTS, MEMORIES, RetrievalRouter, fuse, route_query
+from scripts.separate_rag_documents import separate_documents
+
+from helpers import temp_store_dir
+
+
+def test_routing():
+    """Per-query routing decisions."""
+    assert route_query("What does the paper say about photosynthesis?", "auto") == (DOCUMENTS,)
+    assert route_query("According to the manual, how do I reset it", "auto") == (MEMORIES, DOCUMENTS)
+    assert route_query("What did I tell you about my dog?", "auto") == (MEMORIES,)
+    assert route_query("photosynthesis", "auto") == (MEMORIES, DOCUMENTS)
+    assert route_query("What did I tell you about my dog?", "documents") == (DOCUMENTS,)
+    assert route_query("What does the paper say?", "both") == (MEMORIES, DOCUMENTS)
+    try:
+        route_query("anything", "everything")
+        raise AssertionError("An unknown routing mode must be refused")
+    except ValueError:
+        pass
+    print("✓ Queries route to documents, memories or both")
+
+
+def test_fusion():
+    """Normalized score fusion."""
+    memories = [
+        {"id": "m1", "score": 1.4, "similarity": 0.41},
+        {"id": "m2", "score": 1.1, "similarity": 0.45},
+        {"id": "m3", "score": 0.9, "similarity": 0.35},
+    ]
+    documents = [{"id": "d1", "score": 0.82, "similarity": 0.82}, {"id": "d2", "score": 0.40, "similarity": 0.40}]
+    fused = fuse({MEMORIES: memories, DOCUMENTS: documents}, 4)
+    assert [r["id"] for r in fused] == ["d1", "m1", "d2", "m2"], [r["id"] for r in fused]
+    assert fused[0]["source"] == DOCUMENTS and fused[0]["fused_score"] == 0.82
+    assert [r["id"] for r in fuse({MEMORIES: memories, DOCUMENTS: []}, 3)] == ["m1", "m2", "m3"]
+    print("✓ Fusion keeps each corpus' order and ranks a strong document above weak memories")
+
+
+def test_separate_corpora(temp_store: Path):
+    """Documents and memories in their own collections, retrieved through the router."""
+    memory = MemoryStore()
+    memory.add_memories(["my dog is called Biscuit", "my sister lives in Lisbon"])
+    rag = LlamaIndexRAG(memory.chroma_client)
+    rag.add_memory("photosynthesis converts light into chemical energy in chloroplasts")
+    rag.add_memory("the mitochondria produce energy for the cell")
+    assert rag.chroma_collection.name == Config.RAG_COLLECTION_NAME
+    assert memory.collection.count() == 2 and rag.chroma_collection.count() == 2
+    try:
+        LlamaIndexRAG(memory.chroma_client, Config.CHROMA_COLLECTION_NAME)
+        raise AssertionError("Loading documents into the memory collection must be refused")
+    except ValueError:
+        pass
+    print("✓ Documents load into their own collection, not the memory collection")
+
+    router = RetrievalRouter(memory, rag, mode="auto")
+    hits = router.retrieve("document: photosynthesis converts light into chemical energy", n_results=2)
+    assert hits and {h["source"] for h in hits} == {DOCUMENTS}
+    assert "photosynthesis" in hits[0]["content"] and 0 < hits[0]["similarity"] <= 1
+    hits = router.retrieve("my dog is called", n_results=2)
+    assert hits and {h["source"] for h in hits} == {MEMORIES} and "Biscuit" in hits[0]["content"]
+    hits = router.retrieve("sister lives in Lisbon, mitochondria produce energy", n_results=4)
+    assert {h["source"] for h in hits} == {MEMORIES, DOCUMENTS}
+    assert router.get_stats()["routes"] == {MEMORIES: 1, DOCUMENTS: 1, "both": 1}
+    print("✓ Routed queries hit the right corpus; mixed ones search both and fuse")
+
+    rag.use_router(router)
+    nodes = rag.router_retriever.retrieve("paper: photosynthesis converts light into chemical energy")
+    assert nodes and nodes[0].node.metadata["corpus"] == DOCUMENTS
+    print("✓ The chat engine's retriever goes through the router")
+
+    cli = EnhancedChatInterface(use_llamaindex=True)
+    cli.console = Console(file=io.StringIO(), width=200)
+    cli.logger = ConversationLogger(logs_dir=str(temp_store / "logs"), background=False)
+    cli.memory, cli.rag, cli.router = memory, rag, router
+    Settings.llm = MockLLM(max_tokens=8)
+    searches = []
+    retrieve = memory.retrieve_memories
+    memory.retrieve_memories = lambda *args, **kwargs: searches.append(args) or retrieve(*args, **kwargs)
+    try:
+        cli.process_message("Where does my sister live?")
+    finally:
+        memory.retrieve_memories = retrieve
+        cli.logger.close()
+    hits = [h for h in router.last_results if h["source"] == MEMORIES]
+    assert len(searches) == 1 and hits, searches
+    assert f"Used {len(hits)} relevant memories" in cli.console.file.getvalue()
+    print("✓ LlamaIndex turns in the enhanced CLI search memories once, through the router")
+
+
+def test_separate_legacy_chunks(temp_store: Path):
+    """Chunks loaded into the memory collection are moved out."""
+    client = chromadb.PersistentClient(path=str(temp_store))
+    mixed = client.create_collection(Config.CHROMA_COLLECTION_NAME)
+    mixed.add(
+        ids=["memory", "chunk1", "chunk2"],
+        embeddings=[[1.0, 0.0], [0.0, 1.0], [0.6, 0.8]],
+        documents=["a memory", "chunk one", "chunk two"],
+        metadatas=[{"type": "conversation"}, {"_node_content": "{}", "doc_id": "d"},
+                   {"_node_content": "{}", "doc_id": "d"}]
+    )
+    assert separate_documents(client, dry_run=True) == 2 and mixed.count() == 3
+    assert separate_documents(client) == 2
+    assert mixed.get()["ids"] == ["memory"]
+    moved = client.get_collection(Config.RAG_COLLECTION_NAME).get(include=["embeddings"])
+    assert sorted(moved["ids"]) == ["chunk1", "chunk2"] and len(moved["embeddings"][0]) == 2
+    print("✓ Chunks in the memory collection are moved to the RAG collection")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("RETRIEVAL ROUTER TEST")
+    print("=" * 60)
+    test_routing()
+    test_fusion()
+    with temp_store_dir() as store:
+        test_separate_corpora(store)
+    with temp_store_dir() as store:
+        test_separate_legacy_chunks(store)
+    print("\n✅ All retrieval router tests passed!")
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Test the multi-user chat server.
+
+Tests that:
+1. /chat returns a complete response and stores the turn in the user's namespace
+2. /memories/search only returns the requesting user's memories
+3. Per-user concurrency limits reject excess requests with 429
+4. /stats reports server counters
+5. Malformed requests are rejected with 400, while brain failures (even
+   a ValueError) return a JSON 500 on /chat and an error frame on the
+   WebSocket, which stays open for the next message
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+
+from ai_brain.memory import MemoryStore
+from ai_brain.server import ChatService, create_app
+from scripts.load_test_server import FakeBrain
+
+from helpers import temp_store_dir
+
+
+class FailingBrain:
+    """Brain whose LLM call fails, like an unreachable provider."""
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+    async def agenerate_response_streaming(self, message: str, **kwargs):
+        raise self.error
+        yield
+
+
+async def websocket_frames(app, user_id: str, messages: list) -> list:
+    """Send messages over /ws/chat (driving the ASGI app directly) and return the frames received."""
+    incoming = asyncio.Queue()
+    for event in ([{"type": "websocket.connect"}]
+                  + [{"type": "websocket.receive", "text": json.dumps({"message": m})} for m in messages]
+                  + [{"type": "websocket.disconnect"}]):
+        incoming.put_nowait(event)
+    sent = []
+
+    async def send(event):
+        sent.append(event)
+
+    scope = {"type": "websocket", "path": "/ws/chat", "query_string": f"user_id={user_id}".encode()}
+    await app(scope, incoming.get, send)
+    return [json.loads(event["text"]) for event in sent if event["type"] == "websocket.send"]
+
+
+async def run_server_checks():
+    service = ChatService(
+        memory=MemoryStore(),
+        brain=FakeBrain(ttft=0.05, tokens_per_sec=200, n_tokens=5),
+        use_langchain=False,
+        enable_nlp=False,
+        max_concurrent=8,
+        max_per_user=1,
+        queue_timeout=1.0
+    )
+    app = create_app(service)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # 1. Plain chat
+        response = await client.post("/chat", json={"user_id": "alice", "message": "I play the cello"})
+        assert response.status_code == 200, response.text
+        assert response.json()["response"].startswith("tok0")
+        print(f"✓ /chat responded in {response.json()['latency_ms']}ms")
+
+        await client.post("/chat", json={"user_id": "bob", "message": "I play the drums"})
+
+        # 2. Namespaced search
+        response = await client.get("/memories/search", params={"user_id": "alice", "q": "cello"})
+        assert response.status_code == 200
+        contents = [r["content"] for r in response.json()["results"]]
+        assert "I play the drums" not in contents, "Search leaked another user's memories"
+        print(f"✓ /memories/search returned {len(contents)} of alice's memories only")
+
+        # 3. Per-user limit
+        responses = await asyncio.gather(*(
+            client.post("/chat", json={"user_id": "carol", "message": f"message {i}"})
+            for i in range(4)
+        ))
+        statuses = sorted(r.status_code for r in responses)
+        assert 200 in statuses and 429 in statuses, statuses
+        print(f"✓ Per-user limit enforced: {statuses}")
+
+        # 4. Stats
+        stats = (await client.get("/stats")).json()
+        assert stats["server"]["rejected_requests"] >= 1
+        assert stats["server"]["active_requests"] == 0
+        print(f"✓ /stats: {stats['server']}")
+
+        # Validation
+        response = await client.post("/chat", json={"user_id": "alice"})
+        assert response.status_code == 400
+        response = await client.post("/chat", content=b"{not json")
+        assert response.status_code == 400 and "valid JSON" in response.json()["error"]
+        response = await client.get("/memories/search", params={"user_id": "alice", "q": "cello", "n": "many"})
+        assert response.status_code == 400
+        print("✓ Missing fields, invalid JSON and a non-integer n rejected with 400")
+
+        # 5. Brain failures
+        brain, service.brain = service.brain, FailingBrain(RuntimeError("LLM unavailable"))
+        response = await client.post("/chat", json={"user_id": "alice", "message": "hello"})
+        assert response.status_code == 500 and response.json()["error"] == "LLM unavailable", response.text
+        service.brain = FailingBrain(ValueError("bad response from the provider"))
+        response = await client.post("/chat", json={"user_id": "alice", "message": "hello"})
+        assert response.status_code == 500, "A ValueError from the brain is a server error, not bad input"
+        service.brain = FailingBrain(RuntimeError("LLM unavailable"))
+        frames = await websocket_frames(app, "alice", ["hello", "hello again"])
+        assert [f["type"] for f in frames] == ["error", "error"] and frames[0]["status"] == 500, frames
+        service.brain = brain
+        frames = await websocket_frames(app, "alice", ["hello"])
+        assert frames[-1]["type"] == "done" and frames[0]["type"] == "chunk", frames
+        assert service.counters["active_requests"] == service.counters["active_websockets"] == 0
+        print("✓ Brain failures return a JSON 500 on /chat and an error frame on an open WebSocket")
+
+
+def test_server(temp_store: Path):
+    """Run all server checks."""
+    print("=" * 60)
+    print("CHAT SERVER TEST")
+    print("=" * 60)
+    asyncio.run(run_server_checks())
+    print("\n✅ All server tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_server(store)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test memory snapshot export and import.
+
+Tests that:
+1. Export and import into an empty store roundtrip every id, document,
+   metadata and embedding, and the collection's index settings
+2. Type, user and created_at filters select the same memories on export
+   and on import
+3. Importing over existing memories leaves them as they are
+4. A corrupted or truncated snapshot file is refused
+"""
+
+from pathlib import Path
+
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+
+from ai_brain.config import Config
+from ai_brain.index_params import read_params
+from ai_brain.snapshot import (PYARROW_AVAILABLE, SnapshotError, build_filters, export_snapshot, import_snapshot,
+                               verify_snapshot)
+from ai_brain.vector_backends import create_backend
+
+from helpers import temp_store_dir
+
+NAME = "snapshot_test"
+DAY = 86400.0
+
+
+def fill(backend, count: int):
+    """A collection of memories from two users, one day apart."""
+    collection = backend.create_collection(NAME, {"description": "test", "hnsw:space": "cosine", "hnsw:M": 24})
+    rng = np.random.default_rng(0)
+    collection.add(
+        ids=[f"m{i}" for i in range(count)],
+        embeddings=rng.standard_normal((count, 16)).astype(np.float32),
+        documents=[f"memory {i}" for i in range(count)],
+        metadatas=[{"type": "conversation" if i % 3 else "fact", "user_id": f"user{i % 2}",
+                    "created_at": 1_700_000_000.0 + i * DAY, "importance": i % 5} for i in range(count)]
+    )
+    return collection
+
+
+def read_all(collection):
+    records = collection.get(include=["embeddings", "documents", "metadatas"])
+    order = np.argsort(records["ids"])
+    return ([records["ids"][i] for i in order], np.asarray(records["embeddings"])[order],
+            [records["documents"][i] for i in order], [records["metadatas"][i] for i in order])
+
+
+def fresh_backend(path: Path):
+    Config.CHROMA_PERSIST_DIR = path
+    SharedSystemClient.clear_system_cache()
+    return create_backend()
+
+
+def test_snapshot(temp_store: Path):
+    """Run all snapshot checks."""
+    print("=" * 60)
+    print("MEMORY SNAPSHOT TEST")
+    print("=" * 60)
+
+    formats = ["jsonl", "parquet"] if PYARROW_AVAILABLE else ["jsonl"]
+    source = fill(fresh_backend(temp_store / "source"), 300)
+    expected = read_all(source)
+    for fmt in formats:
+        manifest = export_snapshot(source, temp_store / f"full_{fmt}", fmt=fmt, page_size=64)
+        assert manifest["rows"] == 300 and manifest["dim"] == 16 and manifest["format"] == fmt
+
+        backend = fresh_backend(temp_store / f"target_{fmt}")
+        report = import_snapshot(backend, temp_store / f"full_{fmt}", batch_size=100)
+        assert report["imported"] == report["matched"] == 300, report
+        restored = backend.get_collection(NAME)
+        ids, embeddings, documents, metadatas = read_all(restored)
+        assert ids == expected[0] and documents == expected[2] and metadatas == expected[3]
+        assert np.allclose(embeddings, expected[1], atol=1e-6)
+        assert read_params(restored)["space"] == "cosine" and read_params(restored)["M"] == 24
+        print(f"✓ {fmt}: roundtrip keeps every memory, embedding and the index settings")
+
+    since = 1_700_000_000.0 + 100 * DAY
+    filters = build_filters(memory_type="conversation", user_id="user1", since=since)
+    wanted = {f"m{i}" for i in range(100, 300) if i % 3 and i % 2 == 1}
+    export_snapshot(source, temp_store / "filtered", filters, fmt=formats[-1])
+    backend = fresh_backend(temp_store / "filtered_export")
+    import_snapshot(backend, temp_store / "filtered")
+    assert set(backend.get_collection(NAME).get(include=[])["ids"]) == wanted
+    backend = fresh_backend(temp_store / "filtered_import")
+    report = import_snapshot(backend, temp_store / f"full_{formats[-1]}", "restored", filters)
+    assert report["matched"] == len(wanted)
+    assert set(backend.get_collection("restored").get(include=[])["ids"]) == wanted
+    print(f"✓ Filters select the same {len(wanted)} memories on export and on import")
+
+    report = import_snapshot(backend, temp_store / "full_jsonl", "restored")
+    assert report["matched"] == 300 and report["imported"] == 300 - len(wanted)
+    print("✓ Import over existing memories only adds the missing ones")
+
+    records = next(path for path in (temp_store / "full_jsonl").iterdir() if path.name.startswith("records"))
+    records.write_bytes(records.read_bytes()[:-10])
+    for check in (lambda: verify_snapshot(temp_store / "full_jsonl"),
+                  lambda: import_snapshot(backend, temp_store / "full_jsonl", "corrupted")):
+        try:
+            check()
+            raise AssertionError("A truncated snapshot must be refused")
+        except SnapshotError as e:
+            assert "checksum" in str(e)
+    assert "corrupted" not in backend.list_collections()
+    print("✓ A truncated snapshot fails its checksum and is refused")
+
+    print("\n✅ All snapshot tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_snapshot(store)
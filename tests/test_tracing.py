@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Test per-stage latency tracing.
+
+Tests that:
+1. Instrumented stages are recorded with p50/p95 stats (including TTFT) and
+   rendered as the /perf table in pipeline order
+2. Spans are exported to the local JSONL file with correct parent/child links
+3. Spans nest across the async executors
+"""
+
+import asyncio
+import json
+from pathlib import Path
+
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from ai_brain.config import Config
+from ai_brain.langchain_brain import LangChainBrain
+from ai_brain.memory import MemoryStore
+from ai_brain.log_writer import read_segment
+from ai_brain.tracing import format_perf_report, get_stage_stats, shutdown_tracing, span
+
+from helpers import temp_store_dir
+
+
+def run_turn(memory: MemoryStore, brain: LangChainBrain, message: str) -> str:
+    """A minimal version of the CLI turn pipeline."""
+    with span("turn"):
+        memories = memory.retrieve_memories(message, n_results=3)
+        history = memory.get_conversation_history(n_recent=10)
+        response = "".join(brain.generate_response_streaming(message, memories, history))
+        memory.add_memory(message, metadata={"role": "user"}, enable_nlp=False)
+        memory.add_memory(response, metadata={"role": "assistant"}, enable_nlp=False)
+    return response
+
+
+async def run_async_turn(memory: MemoryStore, message: str):
+    with span("turn", mode="async"):
+        await memory.aretrieve_memories(message, n_results=3)
+
+
+def load_spans(directory: Path):
+    spans = []
+    for path in sorted(directory.glob("traces_*")):
+        spans += [json.loads(line) for line in read_segment(path).splitlines() if line]
+    return spans
+
+
+def test_tracing(temp_store: Path):
+    """Run all tracing checks."""
+    print("=" * 60)
+    print("TRACING TEST")
+    print("=" * 60)
+
+    original = (Config.TRACING_DIR, Config.TRACING_EXPORTER)
+    Config.TRACING_DIR = temp_store / "traces"
+    Config.TRACING_EXPORTER = "file"
+    shutdown_tracing()
+    get_stage_stats().reset()
+    try:
+        memory = MemoryStore()
+        brain = LangChainBrain()
+        brain.llm = FakeListChatModel(responses=["Sure, tell me more!"] * 5)
+
+        for i in range(5):
+            run_turn(memory, brain, f"I practiced the cello for {i} hours today")
+        asyncio.run(run_async_turn(memory, "cello"))
+
+        summary = get_stage_stats().summary()
+        for stage in ["turn", "memory.retrieve", "memory.embed", "memory.query", "memory.history",
+                      "brain.build_system_message", "llm.generate", "llm.ttft", "memory.add"]:
+            assert stage in summary, f"Missing stage {stage}"
+        assert summary["turn"]["count"] == 6
+        assert summary["llm.ttft"]["p50_ms"] <= summary["llm.generate"]["p50_ms"]
+        print(f"✓ {len(summary)} stages recorded, turn p50 {summary['turn']['p50_ms']}ms")
+
+        report = format_perf_report()
+        assert report.splitlines()[4].startswith("| turn | 6 |"), "The turn row should lead the /perf table"
+        assert "*Spans exported via: file*" in report
+        print("✓ /perf report lists the stages in pipeline order")
+
+        shutdown_tracing()  # Flush the batch processor
+        spans = load_spans(Config.TRACING_DIR)
+        by_id = {s["span_id"]: s for s in spans}
+        retrieve = next(s for s in spans if s["name"] == "memory.retrieve")
+        assert by_id[retrieve["parent_id"]]["name"] == "turn", "retrieve should be a child of turn"
+        generate = next(s for s in spans if s["name"] == "llm.generate")
+        assert any(e["name"] == "first_token" for e in generate["events"]), "TTFT event missing"
+        assert by_id[generate["parent_id"]]["name"] == "turn"
+        print(f"✓ {len(spans)} spans exported with parent links and TTFT event")
+
+        async_turn = next(s for s in spans if s["name"] == "turn" and s["attributes"].get("mode") == "async")
+        async_embed = [s for s in spans if s["name"] == "memory.embed" and s["trace_id"] == async_turn["trace_id"]]
+        assert async_embed, "Embedding on the model executor should nest under retrieve"
+        print("✓ Spans nest across the async executors")
+    finally:
+        shutdown_tracing()
+        Config.TRACING_DIR, Config.TRACING_EXPORTER = original
+
+    print("\n✅ All tracing tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_tracing(store)
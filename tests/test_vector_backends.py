@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Test the pluggable vector backends.
+
+Tests that:
+1. The local engine returns the same neighbours, distances and filtered rows
+   as ChromaDB
+2. Updates and deletes persist across a reopen (even after a torn log
+   line), and compaction keeps results
+3. The HNSW index (if hnswlib is installed) agrees with the exact scan
+4. MemoryStore works end to end on VECTOR_BACKEND=local
+"""
+
+from pathlib import Path
+
+import numpy as np
+
+from ai_brain.config import Config
+from ai_brain.index_params import hnsw_metadata
+from ai_brain.memory import MemoryStore
+from ai_brain.vector_backends import HNSWLIB_AVAILABLE, LocalBackend, create_backend
+
+from helpers import temp_store_dir
+
+
+def fill(collection, n: int, seed: int = 0):
+    """Add n random memories with filterable metadata."""
+    vectors = np.random.default_rng(seed).normal(size=(n, 32)).astype(np.float32)
+    collection.add(
+        ids=[f"m{i}" for i in range(n)],
+        embeddings=vectors.tolist(),
+        documents=[f"memory {i}" for i in range(n)],
+        metadatas=[{"type": "fact" if i % 3 == 0 else "conversation", "user_id": f"u{i % 4}", "n": i}
+                   for i in range(n)]
+    )
+
+
+def reopen(path: Path):
+    """The local collection as a new process would see it."""
+    LocalBackend.flush_all()
+    LocalBackend._open.clear()
+    return create_backend("local", path).get_collection("memories")
+
+
+def test_vector_backends(temp_store: Path):
+    """Run all vector backend checks."""
+    print("=" * 60)
+    print("VECTOR BACKENDS TEST")
+    print("=" * 60)
+
+    original = (Config.VECTOR_BACKEND, Config.LOCAL_HNSW_THRESHOLD)
+    try:
+        Config.LOCAL_HNSW_THRESHOLD = 10**9
+        chroma = create_backend("chroma", temp_store / "chroma").get_or_create_collection("memories", hnsw_metadata())
+        local = create_backend("local", temp_store / "local").get_or_create_collection("memories", hnsw_metadata())
+        empty = local.query(query_embeddings=[[0.0] * 32], n_results=3, include=["documents", "embeddings"])
+        assert empty["ids"] == [[]] and len(empty["embeddings"][0]) == 0
+        fill(chroma, 2400)
+        fill(local, 2400)
+        queries = np.random.default_rng(1).normal(size=(10, 32)).astype(np.float32).tolist()
+
+        for where in [{"type": "fact"}, {"$and": [{"type": "conversation"}, {"user_id": "u1"}]},
+                      {"n": {"$gte": 990}}, {"user_id": {"$in": ["u0", "u2"]}}]:
+            expected = chroma.query(query_embeddings=queries, n_results=5, where=where)
+            found = local.query(query_embeddings=queries, n_results=5, where=where)
+            assert found["ids"] == expected["ids"], where
+            assert np.allclose(found["distances"], expected["distances"], atol=1e-5)
+            assert local.get(where=where)["ids"] == chroma.get(where=where)["ids"]
+        assert local.count() == chroma.count() == 2400
+        print("✓ Local engine matches ChromaDB on filtered queries and gets")
+
+        local.update(ids=["m3"], documents=["updated"], metadatas=[{"n": None, "pinned": True}])
+        local.delete(where={"user_id": "u1"})
+        local = reopen(temp_store / "local")
+        assert local.count() == 1800
+        assert local.get(ids=["m3"])["documents"] == ["updated"]
+        assert local.get(ids=["m3"])["metadatas"][0] == {"type": "fact", "user_id": "u3", "pinned": True}
+        assert not local.get(where={"user_id": "u1"})["ids"]
+        with open(local._file("records"), "a", encoding="utf-8") as f:
+            f.write('{"op": "add", "slot": 24')  # Crash mid-write
+        local = reopen(temp_store / "local")
+        local.add(ids=["late"], embeddings=[[0.5] * 32])
+        assert reopen(temp_store / "local").count() == 1801
+        print("✓ Updates and deletes survive a reopen (and a torn log line)")
+
+        before = local.query(query_embeddings=queries, n_results=5)
+        local.delete(ids=[f"m{i}" for i in range(2400) if i % 4 != 1 and i >= 100])
+        assert local.count() == 76 and local._state["generation"] == 1, "Mass delete should compact"
+        after = reopen(temp_store / "local").query(query_embeddings=queries, n_results=5)
+        survivors = {f"m{i}" for i in range(100) if i % 4 != 1} | {"late"}
+        for old, new in zip(before["ids"], after["ids"]):
+            assert [i for i in old if i in survivors] == new[:len([i for i in old if i in survivors])]
+        print("✓ Compaction keeps every surviving memory")
+
+        if HNSWLIB_AVAILABLE:
+            Config.LOCAL_HNSW_THRESHOLD = 500
+            indexed = create_backend("local", temp_store / "hnsw").get_or_create_collection("memories", hnsw_metadata())
+            fill(indexed, 2000)
+            assert indexed._hnsw is not None
+            exact = indexed._search(np.asarray(queries, dtype=np.float32), 10,
+                                    indexed._alive[:indexed._size], filtered=True)[0]
+            approximate = indexed.query(query_embeddings=queries, n_results=10)["ids"]
+            recall = np.mean([len({f"m{s}" for s in e} & set(a)) / 10 for e, a in zip(exact, approximate)])
+            assert recall >= 0.95, recall
+            assert reopen(temp_store / "hnsw").query(query_embeddings=queries, n_results=10)["ids"] == approximate
+            print(f"✓ HNSW index recall@10 {recall:.2f}, reloaded from disk")
+        else:
+            print("⚠️  hnswlib not installed, skipping HNSW checks")
+
+        Config.CHROMA_PERSIST_DIR, Config.VECTOR_BACKEND = temp_store / "store", "local"
+        memory = MemoryStore()
+        memory.add_memory("I adopted a puppy named Biscuit", metadata={"role": "user"}, enable_nlp=False)
+        memory.add_memories([f"Note {i} about the garden" for i in range(20)])
+        assert memory.collection.count() == 21
+        assert memory.retrieve_memories("puppy named Biscuit", n_results=1)[0]["content"].startswith("I adopted")
+        assert len(memory.get_conversation_history(n_recent=5)) == 5
+        memory.clear_all_memories()
+        assert memory.collection.count() == 0
+        print("✓ MemoryStore runs on the local backend")
+    finally:
+        Config.VECTOR_BACKEND, Config.LOCAL_HNSW_THRESHOLD = original
+        LocalBackend._open.clear()
+
+    print("\n✅ All vector backend tests passed!")
+
+
+if __name__ == "__main__":
+    with temp_store_dir() as store:
+        test_vector_backends(store)